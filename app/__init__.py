@@ -153,5 +153,10 @@ def create_app(config_class=Config):
     from app.routes import global_field_mappings
     app.register_blueprint(global_field_mappings.global_field_mappings_bp)
     
+    # Drainer da fila de webhooks: retoma entregas pendentes após restart/deploy
+    from app.services.webhook_ingestion import DRAINER_ENABLED, get_webhook_drainer
+    if DRAINER_ENABLED:
+        get_webhook_drainer().start(app)
+    
     return app
 
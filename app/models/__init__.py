@@ -3,11 +3,15 @@ from .organization import Organization, User, OrganizationFeature
 from .connection import DataSourceConnection
 from .template import Template
 from .workflow import Workflow, WorkflowFieldMapping, AIGenerationMapping, WorkflowNode
+from .ai_response_cache import AIResponseCache
 from .approval import WorkflowApproval
 from .hubspot_property_cache import HubSpotPropertyCache
 from .document import GeneratedDocument
 from .signature import SignatureRequest
-from .execution import WorkflowExecution
+from .execution import WorkflowExecution, WorkflowExecutionLog
+from .batch import BatchGenerationJob, BatchGenerationItem
+from .webhook import WebhookDelivery
+from .temporal_payload import TemporalPayload
 from .pkce import PKCEVerifier
 from .user_settings import (
     UserPreference,
@@ -74,12 +78,18 @@ __all__ = [
     'Workflow',
     'WorkflowFieldMapping',
     'AIGenerationMapping',
+    'AIResponseCache',
     'WorkflowNode',
     'WorkflowApproval',
     'HubSpotPropertyCache',
     'GeneratedDocument',
     'SignatureRequest',
     'WorkflowExecution',
+    'WorkflowExecutionLog',
+    'BatchGenerationJob',
+    'BatchGenerationItem',
+    'WebhookDelivery',
+    'TemporalPayload',
     'PKCEVerifier',
     # User settings models
     'UserPreference',
@@ -0,0 +1,23 @@
+from datetime import datetime
+from app.database import db
+from sqlalchemy.dialects.postgresql import JSONB
+
+class AIResponseCache(db.Model):
+    """
+    Cache de respostas de LLM (backend 'database' do AI response cache).
+    
+    A chave é o hash de (provider, model, temperature, max_tokens, prompt),
+    então o prompt em si não é armazenado.
+    """
+    __tablename__ = 'ai_response_cache'
+    
+    cache_key = db.Column(db.String(64), primary_key=True)
+    response = db.Column(JSONB, nullable=False)  # LLMResponse.to_dict()
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False)
+    
+    # Índices
+    __table_args__ = (
+        db.Index('idx_ai_response_cache_expires', 'expires_at'),
+    )
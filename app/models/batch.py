@@ -0,0 +1,110 @@
+import uuid
+from datetime import datetime
+from app.database import db
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+
+class BatchGenerationJob(db.Model):
+    """
+    Geração em lote: um workflow executado para muitos objetos da fonte.
+    
+    Cada objeto vira um BatchGenerationItem com sua própria
+    WorkflowExecution. Os contadores são atualizados atomicamente à medida
+    que os itens terminam.
+    """
+    __tablename__ = 'batch_generation_jobs'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    organization_id = db.Column(UUID(as_uuid=True), db.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False)
+    workflow_id = db.Column(UUID(as_uuid=True), db.ForeignKey('workflows.id', ondelete='CASCADE'), nullable=False)
+    created_by = db.Column(UUID(as_uuid=True), db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    
+    status = db.Column(db.String(50), default='pending')
+    # pending, running, completed, completed_with_errors, failed, cancelled
+    
+    source_object_type = db.Column(db.String(100))
+    # Origem dos IDs: {type: 'ids'} | {type: 'hubspot_list', list_id} | {type: 'hubspot_filter', filter_groups}
+    source = db.Column(JSONB)
+    
+    concurrency = db.Column(db.Integer, default=5)
+    total_items = db.Column(db.Integer, default=0)
+    completed_items = db.Column(db.Integer, default=0)
+    failed_items = db.Column(db.Integer, default=0)
+    
+    # Execução no Temporal (cada retomada gera um novo run)
+    temporal_workflow_id = db.Column(db.String(255), nullable=True)
+    runs = db.Column(db.Integer, default=0)
+    
+    error_message = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    # Último sinal de vida do runner (página preparada ou item concluído)
+    heartbeat_at = db.Column(db.DateTime)
+    
+    # Relationships
+    items = db.relationship('BatchGenerationItem', backref='job', lazy='dynamic', cascade='all, delete-orphan')
+    
+    TERMINAL_STATUSES = ('completed', 'completed_with_errors', 'failed', 'cancelled')
+    
+    @property
+    def pending_items(self) -> int:
+        return max(0, (self.total_items or 0) - (self.completed_items or 0) - (self.failed_items or 0))
+    
+    def to_dict(self):
+        total = self.total_items or 0
+        done = (self.completed_items or 0) + (self.failed_items or 0)
+        return {
+            'id': str(self.id),
+            'workflow_id': str(self.workflow_id),
+            'status': self.status,
+            'source_object_type': self.source_object_type,
+            'source': self.source,
+            'concurrency': self.concurrency,
+            'total_items': total,
+            'completed_items': self.completed_items or 0,
+            'failed_items': self.failed_items or 0,
+            'pending_items': self.pending_items,
+            'progress': round(done / total, 4) if total else 0,
+            'runs': self.runs or 0,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'heartbeat_at': self.heartbeat_at.isoformat() if self.heartbeat_at else None,
+        }
+
+
+class BatchGenerationItem(db.Model):
+    """Um objeto da fonte dentro de uma geração em lote"""
+    __tablename__ = 'batch_generation_items'
+    
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    job_id = db.Column(UUID(as_uuid=True), db.ForeignKey('batch_generation_jobs.id', ondelete='CASCADE'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    source_object_id = db.Column(db.String(255), nullable=False)
+    
+    status = db.Column(db.String(50), default='pending')
+    # pending, running, completed, failed
+    execution_id = db.Column(UUID(as_uuid=True), db.ForeignKey('workflow_executions.id', ondelete='SET NULL'), nullable=True)
+    generated_document_id = db.Column(UUID(as_uuid=True), db.ForeignKey('generated_documents.id', ondelete='SET NULL'), nullable=True)
+    error_message = db.Column(db.Text)
+    attempts = db.Column(db.Integer, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_batch_items_job_status', 'job_id', 'status', 'position'),
+    )
+    
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'position': self.position,
+            'source_object_id': self.source_object_id,
+            'status': self.status,
+            'execution_id': str(self.execution_id) if self.execution_id else None,
+            'generated_document_id': str(self.generated_document_id) if self.generated_document_id else None,
+            'error_message': self.error_message,
+            'attempts': self.attempts or 0,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+        }
@@ -21,6 +21,15 @@ class DataSourceConnection(db.Model):
     workflows = db.relationship('Workflow', backref='source_connection', lazy='dynamic')
     documents = db.relationship('GeneratedDocument', backref='source_connection', lazy='dynamic')
     
+    __table_args__ = (
+        # portal_id -> organização (ver get_organization_id_from_portal_id)
+        db.Index(
+            'idx_connections_hubspot_portal',
+            db.text("(config->>'portal_id')"),
+            postgresql_where=db.text("source_type = 'hubspot'")
+        ),
+    )
+    
     # Para HubSpot - campos de conveniência
     @property
     def portal_id(self):
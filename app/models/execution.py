@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
 from app.database import db
+from sqlalchemy import func, inspect
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 class WorkflowExecution(db.Model):
@@ -30,8 +31,11 @@ class WorkflowExecution(db.Model):
     current_node_id = db.Column(UUID(as_uuid=True), db.ForeignKey('workflow_nodes.id', ondelete='SET NULL'), nullable=True)
     # Snapshot do ExecutionContext para retomada
     execution_context = db.Column(JSONB, nullable=True)
-    # Logs por node: [{node_id, node_type, started_at, completed_at, duration_ms, status, output, error}]
-    execution_logs = db.Column(JSONB, default=list)
+    # Legado: logs por node em um array JSONB (reescrito a cada node).
+    # Os logs agora ficam em workflow_execution_logs; a coluna só é lida sob demanda.
+    execution_logs = db.deferred(db.Column(JSONB, default=list))
+    # Nodes concluídos (success/failed), mantido por add_log
+    steps_completed = db.Column(db.Integer, default=0)
     
     # Métricas de geração de IA
     # Estrutura:
@@ -81,31 +85,85 @@ class WorkflowExecution(db.Model):
         }
         
         if include_logs:
-            result['execution_logs'] = self.execution_logs or []
+            result['execution_logs'] = self.get_logs()
         
         return result
     
     def add_log(self, node_id: str, node_type: str, status: str, 
                 started_at: datetime = None, completed_at: datetime = None,
                 output: dict = None, error: str = None):
-        """Adiciona log de execução de um node"""
-        if self.execution_logs is None:
-            self.execution_logs = []
+        """
+        Adiciona log de execução de um node (sem commit).
         
+        Um INSERT em workflow_execution_logs; a execução só recebe o
+        incremento de steps_completed.
+        """
         duration_ms = None
         if started_at and completed_at:
             duration_ms = int((completed_at - started_at).total_seconds() * 1000)
         
-        log_entry = {
-            'node_id': node_id,
-            'node_type': node_type,
-            'status': status,
-            'started_at': started_at.isoformat() if started_at else None,
-            'completed_at': completed_at.isoformat() if completed_at else None,
-            'duration_ms': duration_ms,
-            'output': output,
-            'error': error
-        }
+        if self.id is None:
+            self.id = uuid.uuid4()
+        
+        db.session.add(WorkflowExecutionLog(
+            execution_id=self.id,
+            node_id=str(node_id) if node_id else None,
+            node_type=node_type,
+            status=status,
+            started_at=started_at,
+            completed_at=completed_at,
+            duration_ms=duration_ms,
+            output=output,
+            error=error
+        ))
         
-        self.execution_logs = self.execution_logs + [log_entry]
+        if status in WorkflowExecutionLog.COMPLETED_STATUSES:
+            if inspect(self).persistent:
+                # Incremento no banco (não depende do valor carregado)
+                self.steps_completed = func.coalesce(WorkflowExecution.steps_completed, 0) + 1
+            else:
+                self.steps_completed = (self.steps_completed or 0) + 1
+    
+    def get_logs(self) -> list:
+        """Logs dos nodes em ordem de gravação"""
+        logs = WorkflowExecutionLog.query.filter_by(
+            execution_id=self.id
+        ).order_by(WorkflowExecutionLog.created_at, WorkflowExecutionLog.id).all()
+        return [log.to_dict() for log in logs]
+
+
+class WorkflowExecutionLog(db.Model):
+    """Log de um node de uma execução (append-only)"""
+    __tablename__ = 'workflow_execution_logs'
+    __table_args__ = (
+        db.Index('idx_execution_logs_execution_created', 'execution_id', 'created_at'),
+    )
+    
+    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    execution_id = db.Column(UUID(as_uuid=True), db.ForeignKey('workflow_executions.id', ondelete='CASCADE'), nullable=False)
+    node_id = db.Column(db.String(255))
+    node_type = db.Column(db.String(50))
+    status = db.Column(db.String(50))
+    started_at = db.Column(db.DateTime)
+    completed_at = db.Column(db.DateTime)
+    duration_ms = db.Column(db.Integer)
+    output = db.Column(JSONB)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    # Status que contam em steps_completed
+    COMPLETED_STATUSES = ('success', 'failed')
+    
+    def to_dict(self):
+        """Mesmo formato das entradas do antigo execution_logs"""
+        return {
+            'node_id': self.node_id,
+            'node_type': self.node_type,
+            'status': self.status,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None,
+            'duration_ms': self.duration_ms,
+            'output': self.output,
+            'error': self.error
+        }
 
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
 from app.database import db
+from sqlalchemy import func, or_, update
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 class Organization(db.Model):
@@ -42,10 +43,74 @@ class Organization(db.Model):
         return self.documents_used < self.documents_limit
     
     def increment_document_count(self):
-        """Incrementa contador de documentos usados"""
+        """Incrementa contador de documentos usados (prefira reserve_documents)"""
         self.documents_used += 1
         db.session.commit()
     
+    @classmethod
+    def reserve_documents(cls, organization_id, count: int = 1) -> bool:
+        """
+        Reserva `count` documentos da quota em um único UPDATE atômico.
+        
+        UPDATE ... SET documents_used = documents_used + count
+        WHERE documents_used + count <= documents_limit RETURNING: sem
+        ler-checar-escrever (duas gerações em paralelo não passam do limite)
+        e sem commit próprio - a reserva é confirmada junto com a transação
+        de quem chamou, que deve ser curta (o UPDATE trava a linha até o commit).
+        
+        Returns:
+            True se reservou, False se a quota não comporta
+        """
+        table = cls.__table__
+        used = func.coalesce(table.c.documents_used, 0)
+        result = db.session.execute(
+            update(table)
+            .where(table.c.id == organization_id)
+            .where(or_(table.c.documents_limit.is_(None), used + count <= table.c.documents_limit))
+            .values(documents_used=used + count)
+            .returning(table.c.documents_used)
+        )
+        return result.first() is not None
+    
+    @classmethod
+    def reserve_documents_up_to(cls, organization_id, count: int) -> int:
+        """
+        Reserva até `count` documentos (o que couber na quota).
+        
+        Usado pela geração em lote: a página inteira é reservada de uma vez
+        e o que não couber falha com erro de limite.
+        
+        Returns:
+            Quantidade reservada (0 se a quota acabou)
+        """
+        for _ in range(3):
+            row = db.session.query(cls.documents_used, cls.documents_limit).filter(
+                cls.id == organization_id
+            ).first()
+            if row is None:
+                return 0
+            
+            used, limit = row
+            wanted = count if limit is None else min(count, limit - (used or 0))
+            if wanted <= 0:
+                return 0
+            if cls.reserve_documents(organization_id, wanted):
+                return wanted
+            # Outra reserva entrou entre a leitura e o UPDATE: ler de novo
+        return 0
+    
+    @classmethod
+    def release_documents(cls, organization_id, count: int = 1) -> None:
+        """Devolve à quota documentos reservados e não gerados (sem commit)"""
+        if count <= 0:
+            return
+        table = cls.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.id == organization_id)
+            .values(documents_used=func.greatest(func.coalesce(table.c.documents_used, 0) - count, 0))
+        )
+    
     def can_create_workflow(self):
         """Verifica se pode criar novo workflow"""
         from app.models import Workflow
@@ -87,6 +152,9 @@ class Organization(db.Model):
         
         self.is_active = True
         db.session.commit()
+        
+        from app.utils.org_cache import invalidate_organization
+        invalidate_organization(self.id)
     
     def get_limits(self):
         """Retorna limites do plano atual"""
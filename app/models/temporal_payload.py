@@ -0,0 +1,21 @@
+from datetime import datetime
+from app.database import db
+
+
+class TemporalPayload(db.Model):
+    """
+    Payload grande do Temporal fora do histórico (claim-check no Postgres).
+    
+    A chave é o sha256 do payload serializado; o histórico do workflow
+    guarda só a chave (ver app/temporal/codec.py). created_at é renovado a
+    cada novo uso e entradas antigas são removidas pelo codec.
+    """
+    __tablename__ = 'temporal_payloads'
+    
+    key = db.Column(db.String(64), primary_key=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('idx_temporal_payloads_created', 'created_at'),
+    )
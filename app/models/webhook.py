@@ -0,0 +1,51 @@
+import uuid
+from datetime import datetime
+from app.database import db
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+
+
+class WebhookDelivery(db.Model):
+    """
+    Webhook recebido, aguardando o drainer (fila durável).
+
+    O endpoint público só grava a entrega e responde 202; o drainer cria a
+    WorkflowExecution e inicia o workflow. dedup_key (Idempotency-Key ou
+    hash do payload) é único por workflow: reenvios do remetente não geram
+    execuções duplicadas.
+    """
+    __tablename__ = 'webhook_deliveries'
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    workflow_id = db.Column(UUID(as_uuid=True), db.ForeignKey('workflows.id', ondelete='CASCADE'), nullable=False)
+    trigger_node_id = db.Column(UUID(as_uuid=True), db.ForeignKey('workflow_nodes.id', ondelete='CASCADE'), nullable=False)
+
+    dedup_key = db.Column(db.String(255), nullable=False)
+    payload = db.Column(JSONB)
+
+    status = db.Column(db.String(50), default='pending')
+    # pending, starting, processed, failed
+    execution_id = db.Column(UUID(as_uuid=True), db.ForeignKey('workflow_executions.id', ondelete='SET NULL'), nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    error_message = db.Column(db.Text)
+
+    received_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('workflow_id', 'dedup_key', name='unique_webhook_delivery_dedup'),
+        db.Index('idx_webhook_deliveries_status_received', 'status', 'received_at'),
+    )
+
+    DONE_STATUSES = ('processed', 'failed')
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'workflow_id': str(self.workflow_id),
+            'status': self.status,
+            'execution_id': str(self.execution_id) if self.execution_id else None,
+            'attempts': self.attempts or 0,
+            'error_message': self.error_message,
+            'received_at': self.received_at.isoformat() if self.received_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime
 from app.database import db
+from sqlalchemy import func, inspect
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 # Node type constants
@@ -86,6 +87,21 @@ class Workflow(db.Model):
             }
         
         return result
+    
+    @classmethod
+    def touch_for_template(cls, template_id):
+        """
+        Atualiza updated_at dos workflows que usam o template (sem commit).
+        
+        Os planos de execução em cache no worker são versionados por
+        updated_at; sem isso, continuariam com o template antigo até o TTL.
+        """
+        node_workflows = db.session.query(WorkflowNode.workflow_id).filter(
+            WorkflowNode.config['template_id'].astext == str(template_id)
+        )
+        cls.query.filter(
+            db.or_(cls.id.in_(node_workflows), cls.template_id == template_id)
+        ).update({cls.updated_at: datetime.utcnow()}, synchronize_session=False)
 
 
 class WorkflowFieldMapping(db.Model):
@@ -146,6 +162,10 @@ class AIGenerationMapping(db.Model):
     # Fallback (se IA falhar)
     fallback_value = db.Column(db.Text)  # Valor padrão se geração falhar
     
+    # Cache de respostas (opt-in): mesmo prompt/modelo/parâmetros reutiliza o texto gerado
+    cache_enabled = db.Column(db.Boolean, default=False, nullable=False)
+    cache_ttl_seconds = db.Column(db.Integer)  # None = AI_RESPONSE_CACHE_TTL
+    
     # Métricas de uso (para auditoria/debugging)
     last_used_at = db.Column(db.DateTime)
     usage_count = db.Column(db.Integer, default=0)
@@ -175,6 +195,8 @@ class AIGenerationMapping(db.Model):
             'temperature': self.temperature,
             'max_tokens': self.max_tokens,
             'fallback_value': self.fallback_value,
+            'cache_enabled': self.cache_enabled,
+            'cache_ttl_seconds': self.cache_ttl_seconds,
             'last_used_at': self.last_used_at.isoformat() if self.last_used_at else None,
             'usage_count': self.usage_count,
             'created_at': self.created_at.isoformat() if self.created_at else None,
@@ -183,7 +205,12 @@ class AIGenerationMapping(db.Model):
     
     def increment_usage(self):
         """Incrementa contador de uso e atualiza timestamp"""
-        self.usage_count = (self.usage_count or 0) + 1
+        if inspect(self).persistent:
+            # Incremento no banco: o mapping pode vir do plano de execução
+            # em cache, com usage_count antigo
+            self.usage_count = func.coalesce(AIGenerationMapping.usage_count, 0) + 1
+        else:
+            self.usage_count = (self.usage_count or 0) + 1
         self.last_used_at = datetime.utcnow()
 
 
@@ -5,6 +5,8 @@ from app.services.data_sources.hubspot import HubSpotDataSource
 from app.utils.auth import require_auth, require_org, require_admin
 from app.utils.hubspot_auth import flexible_hubspot_auth
 from app.utils.encryption import encrypt_credentials, decrypt_credentials
+from app.utils.org_cache import invalidate_organization
+from app.services.data_sources.hubspot_property_store import get_property_store
 import logging
 
 logger = logging.getLogger(__name__)
@@ -105,6 +107,9 @@ def create_connection():
     db.session.add(connection)
     db.session.commit()
     
+    if connection.source_type == 'hubspot':
+        invalidate_organization(g.organization_id)
+    
     return jsonify({
         'success': True,
         'connection': connection.to_dict(include_credentials=False)
@@ -140,6 +145,13 @@ def update_connection(connection_id):
     
     db.session.commit()
     
+    if connection.source_type == 'microsoft':
+        from app.services.credential_resolver import get_credential_resolver
+        get_credential_resolver().invalidate(g.organization_id, 'microsoft')
+    elif connection.source_type == 'hubspot':
+        invalidate_organization(g.organization_id)
+        get_property_store().invalidate(g.organization_id)
+    
     return jsonify({
         'success': True,
         'connection': connection.to_dict(include_credentials=False)
@@ -211,9 +223,17 @@ def delete_connection(connection_id):
             'error': 'Conexão está sendo usada por workflows. Remova os workflows primeiro.'
         }), 400
     
+    source_type = connection.source_type
     db.session.delete(connection)
     db.session.commit()
     
+    if source_type == 'microsoft':
+        from app.services.credential_resolver import get_credential_resolver
+        get_credential_resolver().invalidate(g.organization_id, 'microsoft')
+    elif source_type == 'hubspot':
+        invalidate_organization(g.organization_id)
+        get_property_store().invalidate(g.organization_id)
+    
     return jsonify({'success': True})
 
 
@@ -7,6 +7,7 @@ from app.models import (
 from app.services.document_generation import DocumentGenerator
 from app.services.workflow_executor import WorkflowExecutor
 from app.services.data_sources.hubspot import HubSpotDataSource
+from app.services.data_sources.property_planner import get_property_plan
 from app.utils.auth import require_auth, require_org
 from app.utils.hubspot_auth import flexible_hubspot_auth
 from app.routes.google_drive_routes import get_google_credentials
@@ -120,7 +121,8 @@ def generate_document():
             source_data = data_source.get_object_data(
                 workflow.source_object_type,
                 source_object_id,
-                additional_properties=additional_properties if additional_properties else None
+                additional_properties=additional_properties if additional_properties else None,
+                plan=get_property_plan(workflow)
             )
         else:
             return jsonify({'error': f'Fonte {connection.source_type} não suportada ainda'}), 400
@@ -269,6 +271,148 @@ def delete_document(document_id):
     return jsonify({'success': True})
 
 
+@documents_bp.route('/batch', methods=['POST'])
+@flexible_hubspot_auth
+@require_org
+def create_batch():
+    """
+    Gera documentos em lote (um workflow para muitos objetos).
+
+    Body:
+    {
+        "workflow_id": "uuid",
+        "object_ids": ["123", "456"],     // ou
+        "hubspot_list_id": "42",          // ou
+        "filter_groups": [...],           // filtros da Search API do HubSpot
+        "concurrency": 5                  // opcional
+    }
+    """
+    from app.services import batch_generation
+
+    data = request.get_json() or {}
+
+    workflow_id = data.get('workflow_id')
+    if not workflow_id:
+        return jsonify({'error': 'workflow_id é obrigatório'}), 400
+
+    workflow = Workflow.query.filter_by(
+        id=workflow_id,
+        organization_id=g.organization_id
+    ).first_or_404()
+
+    try:
+        job = batch_generation.create_batch_job(
+            workflow,
+            source={
+                'object_ids': data.get('object_ids'),
+                'hubspot_list_id': data.get('hubspot_list_id'),
+                'filter_groups': data.get('filter_groups'),
+            },
+            concurrency=data.get('concurrency', 5),
+            user_id=getattr(g, 'user_id', None)
+        )
+        batch_generation.start_batch_job(job)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f"Erro ao criar lote: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify({'success': True, 'batch': job.to_dict()}), 201
+
+
+@documents_bp.route('/batch/<job_id>', methods=['GET'])
+@flexible_hubspot_auth
+@require_org
+def get_batch(job_id):
+    """Retorna status e progresso de um lote"""
+    job = _get_batch_or_404(job_id)
+    return jsonify(job.to_dict())
+
+
+@documents_bp.route('/batch/<job_id>/items', methods=['GET'])
+@flexible_hubspot_auth
+@require_org
+def list_batch_items(job_id):
+    """
+    Lista itens de um lote.
+
+    Query params:
+    - status: pending, running, completed, failed
+    - page, per_page
+    """
+    from app.models import BatchGenerationItem
+
+    job = _get_batch_or_404(job_id)
+
+    query = job.items
+    status = request.args.get('status')
+    if status:
+        query = query.filter_by(status=status)
+
+    page = request.args.get('page', 1, type=int)
+    per_page = min(request.args.get('per_page', 50, type=int), 500)
+
+    pagination = query.order_by(BatchGenerationItem.position).paginate(
+        page=page, per_page=per_page, error_out=False
+    )
+
+    return jsonify({
+        'items': [item.to_dict() for item in pagination.items],
+        'total': pagination.total,
+        'page': page,
+        'per_page': per_page
+    })
+
+
+@documents_bp.route('/batch/<job_id>/resume', methods=['POST'])
+@flexible_hubspot_auth
+@require_org
+def resume_batch(job_id):
+    """
+    Retoma um lote interrompido.
+
+    Body:
+    {
+        "retry_failed": false  // reprocessar também os itens que falharam
+    }
+    """
+    from app.services import batch_generation
+
+    job = _get_batch_or_404(job_id)
+    data = request.get_json(silent=True) or {}
+
+    try:
+        batch_generation.resume_batch_job(job, retry_failed=bool(data.get('retry_failed')))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'success': True, 'batch': job.to_dict()})
+
+
+@documents_bp.route('/batch/<job_id>/cancel', methods=['POST'])
+@flexible_hubspot_auth
+@require_org
+def cancel_batch(job_id):
+    """Cancela um lote (itens em andamento terminam, pendentes não iniciam)"""
+    from app.services import batch_generation
+
+    job = _get_batch_or_404(job_id)
+    batch_generation.cancel_batch_job(job)
+
+    return jsonify({'success': True, 'batch': job.to_dict()})
+
+
+def _get_batch_or_404(job_id):
+    from app.models import BatchGenerationJob
+
+    org_id = uuid.UUID(g.organization_id) if isinstance(g.organization_id, str) else g.organization_id
+    return BatchGenerationJob.query.filter_by(
+        id=job_id,
+        organization_id=org_id
+    ).first_or_404()
+
+
 def doc_to_dict(doc: GeneratedDocument, include_details: bool = False) -> dict:
     """Converte documento para dicionário"""
     # Usar o método to_dict do modelo que já inclui informações do HubSpot
@@ -2,6 +2,8 @@ from flask import Blueprint, request, jsonify
 from app.database import db
 from app.models import FieldMapping
 from app.auth import require_auth
+from app.services.data_sources.hubspot_property_store import OBJECT_TYPES, get_property_store
+from app.utils.org_cache import get_organization_cache
 import uuid
 
 bp = Blueprint('field_mappings', __name__, url_prefix='/api/v1/field-mappings')
@@ -38,6 +40,45 @@ def list_field_mappings():
         }), 500
 
 
+@bp.route('/properties', methods=['GET'])
+@require_auth
+def list_hubspot_properties():
+    """Propriedades HubSpot do portal para o seletor de mapeamento (cacheadas)"""
+    try:
+        portal_id = request.args.get('portal_id')
+        object_type = request.args.get('object_type')
+        
+        if not portal_id or not object_type:
+            return jsonify({
+                'error': 'portal_id and object_type are required'
+            }), 400
+        
+        if object_type not in OBJECT_TYPES:
+            return jsonify({
+                'error': f'object_type must be one of: {", ".join(OBJECT_TYPES)}'
+            }), 400
+        
+        organization = get_organization_cache().get_by_portal(portal_id)
+        if not organization:
+            return jsonify({
+                'error': 'Portal not connected'
+            }), 404
+        
+        snapshot, stale = get_property_store().get(organization.id, object_type)
+        
+        return jsonify({
+            'success': True,
+            'data': snapshot.properties,
+            'stale': stale
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': 'Internal server error',
+            'message': str(e)
+        }), 500
+
+
 @bp.route('', methods=['POST'])
 @require_auth
 def create_field_mapping():
@@ -17,37 +17,9 @@ import base64
 bp = Blueprint('google_drive', __name__, url_prefix='/api/v1/google-drive')
 
 def get_google_credentials(organization_id):
-    """Obter credenciais Google para uma organização"""
-    token = GoogleOAuthToken.query.filter_by(organization_id=organization_id).first()
-    
-    if not token:
-        return None
-    
-    try:
-        creds_data = json.loads(token.access_token)
-        creds = Credentials.from_authorized_user_info(creds_data)
-        
-        # Se token expirou, tentar renovar usando refresh_token
-        if creds.expired or token.is_expired():
-            if creds.refresh_token:
-                try:
-                    creds.refresh(Request())
-                    # Atualizar no banco após renovação bem-sucedida
-                    token.access_token = creds.to_json()
-                    token.token_expiry = creds.expiry
-                    db.session.commit()
-                except Exception as refresh_error:
-                    # Se renovação falhar, retornar None
-                    print(f"Error refreshing token: {refresh_error}")
-                    return None
-            else:
-                # Não há refresh_token para renovar
-                return None
-        
-        return creds
-    except Exception as e:
-        print(f"Error getting credentials: {e}")
-        return None
+    """Obter credenciais Google para uma organização (cache em processo, ver credential_resolver)"""
+    from app.services.credential_resolver import get_credential_resolver
+    return get_credential_resolver().get_google_credentials(organization_id)
 
 
 @bp.route('/folders', methods=['GET'])
@@ -532,6 +532,9 @@ def callback():
         
         db.session.commit()
         
+        from app.services.credential_resolver import get_credential_resolver
+        get_credential_resolver().invalidate(organization_id_uuid, 'google')
+        
         # Registrar login bem-sucedido
         try:
             from app.utils.login_logger import log_successful_login
@@ -690,6 +693,9 @@ def disconnect():
             db.session.delete(token)
             db.session.commit()
         
+        from app.services.credential_resolver import get_credential_resolver
+        get_credential_resolver().invalidate(organization_id, 'google')
+        
         # Também remover configuração do Google Drive se existir
         config = GoogleDriveConfig.query.filter_by(organization_id=organization_id).first()
         if config:
@@ -1,10 +1,11 @@
 """
 Endpoint de health check geral da API
 """
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, g
 from datetime import datetime
 from sqlalchemy import text
 from app.database import db
+from app.utils.auth import require_auth, require_org
 
 bp = Blueprint('health', __name__, url_prefix='/api')
 
@@ -30,3 +31,23 @@ def health_check():
             'timestamp': datetime.utcnow().isoformat()
         }), 503
 
+
+
+@bp.route('/health/hubspot', methods=['GET'])
+@require_auth
+@require_org
+def hubspot_client_metrics():
+    """Métricas dos clientes HubSpot (deste processo) dos portais da organização"""
+    from app.models import DataSourceConnection
+    from app.services.data_sources.hubspot_client import get_hubspot_metrics
+    
+    connections = DataSourceConnection.query.filter_by(
+        organization_id=g.organization_id,
+        source_type='hubspot'
+    ).all()
+    portal_ids = [c.config.get('portal_id') for c in connections if c.config and c.config.get('portal_id')]
+    
+    return jsonify({
+        'portals': get_hubspot_metrics(portal_ids),
+        'timestamp': datetime.utcnow().isoformat()
+    }), 200
@@ -6,6 +6,8 @@ from flask import Blueprint, request, jsonify
 import requests
 import logging
 from functools import wraps
+from app.services.data_sources.hubspot_client import get_hubspot_client
+from app.utils.hubspot_token_cache import get_token_cache
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +21,15 @@ def get_hubspot_token():
     return request.headers.get('X-HubSpot-Access-Token')
 
 
+def _client_for_token(hubspot_token):
+    """Cliente HubSpot do portal dono do token (introspecção cacheada)"""
+    try:
+        token_info = get_token_cache().introspect(hubspot_token)
+    except requests.RequestException:
+        token_info = None
+    return get_hubspot_client(token_info.get('hub_id') if token_info else None)
+
+
 @hubspot_events_bp.route('/create', methods=['POST'])
 def create_timeline_event():
     """
@@ -57,7 +68,7 @@ def create_timeline_event():
     
     try:
         # Criar evento via HubSpot Timeline Events API
-        response = requests.post(
+        response = _client_for_token(hubspot_token).post(
             'https://api.hubapi.com/crm/v3/timeline/events',
             headers={
                 'Authorization': f'Bearer {hubspot_token}',
@@ -196,7 +207,7 @@ def create_timeline_event_internal(object_type, object_id, event_type, propertie
         })
     
     try:
-        response = requests.post(
+        response = _client_for_token(hubspot_token).post(
             'https://api.hubapi.com/crm/v3/timeline/events',
             headers={
                 'Authorization': f'Bearer {hubspot_token}',
@@ -2,13 +2,11 @@
 Rotas para propriedades do HubSpot com cache.
 """
 from flask import Blueprint, request, jsonify, g
-from app.database import db
-from app.models import HubSpotPropertyCache, DataSourceConnection
-from app.services.data_sources.hubspot import HubSpotDataSource
+from app.models import DataSourceConnection
+from app.services.data_sources.hubspot_property_store import OBJECT_TYPES, get_property_store
 from app.utils.auth import require_auth, require_org
 from app.utils.hubspot_auth import flexible_hubspot_auth
 import logging
-import uuid
 
 logger = logging.getLogger(__name__)
 hubspot_properties_bp = Blueprint('hubspot_properties', __name__, url_prefix='/api/v1/hubspot/properties')
@@ -32,75 +30,22 @@ def list_properties():
     if not object_type:
         return jsonify({'error': 'object_type é obrigatório'}), 400
     
-    valid_types = ['deal', 'contact', 'company', 'ticket']
-    if object_type not in valid_types:
+    if object_type not in OBJECT_TYPES:
         return jsonify({
-            'error': f'object_type deve ser um de: {", ".join(valid_types)}'
+            'error': f'object_type deve ser um de: {", ".join(OBJECT_TYPES)}'
         }), 400
     
     use_cache = request.args.get('use_cache', 'true').lower() == 'true'
     
-    # Buscar do cache se disponível
-    if use_cache:
-        cached_properties = HubSpotPropertyCache.query.filter_by(
-            organization_id=org_id,
-            object_type=object_type
-        ).all()
-        
-        if cached_properties:
-            return jsonify({
-                'properties': [prop.to_dict() for prop in cached_properties],
-                'cached': True,
-                'cached_at': cached_properties[0].cached_at.isoformat() if cached_properties else None
-            })
-    
-    # Buscar do HubSpot
     try:
-        # Buscar conexão HubSpot da organização
-        connection = DataSourceConnection.query.filter_by(
-            organization_id=org_id,
-            source_type='hubspot',
-            status='active'
-        ).first()
-        
-        if not connection:
-            return jsonify({
-                'error': 'Conexão HubSpot não encontrada ou não está ativa'
-            }), 400
-        
-        # Buscar propriedades do HubSpot
-        data_source = HubSpotDataSource(connection)
-        properties = data_source.get_object_properties(object_type)
-        
-        # Salvar no cache
-        # Limpar cache antigo
-        HubSpotPropertyCache.query.filter_by(
-            organization_id=org_id,
-            object_type=object_type
-        ).delete()
-        
-        # Criar novos registros
-        for prop in properties:
-            # Truncar campos para evitar erro de tamanho no banco
-            property_name = (prop.get('name', '') or '')[:255]
-            label = (prop.get('label', prop.get('name', '')) or '')[:255]
-            prop_type = (prop.get('type', 'string') or 'string')[:50]
-            
-            cached_prop = HubSpotPropertyCache(
-                organization_id=org_id,
-                object_type=object_type,
-                property_name=property_name,
-                label=label,
-                type=prop_type,
-                options=prop.get('options')
-            )
-            db.session.add(cached_prop)
-        
-        db.session.commit()
+        # Cache vencido é servido na hora e atualizado em background
+        snapshot, stale = get_property_store().get(org_id, object_type, force_refresh=not use_cache)
         
         return jsonify({
-            'properties': properties,
-            'cached': False
+            'properties': snapshot.properties,
+            'cached': snapshot.from_cache,
+            'stale': stale,
+            'cached_at': snapshot.cached_at.isoformat() if snapshot.cached_at else None
         })
         
     except Exception as e:
@@ -127,15 +72,13 @@ def refresh_properties():
     data = request.get_json() or {}
     object_type = data.get('object_type')
     
-    valid_types = ['deal', 'contact', 'company', 'ticket']
-    object_types = [object_type] if object_type else valid_types
+    object_types = [object_type] if object_type else list(OBJECT_TYPES)
     
-    if object_type and object_type not in valid_types:
+    if object_type and object_type not in OBJECT_TYPES:
         return jsonify({
-            'error': f'object_type deve ser um de: {", ".join(valid_types)}'
+            'error': f'object_type deve ser um de: {", ".join(OBJECT_TYPES)}'
         }), 400
     
-    # Buscar conexão HubSpot
     connection = DataSourceConnection.query.filter_by(
         organization_id=org_id,
         source_type='hubspot',
@@ -147,45 +90,18 @@ def refresh_properties():
             'error': 'Conexão HubSpot não encontrada ou não está ativa'
         }), 400
     
-    data_source = HubSpotDataSource(connection)
+    store = get_property_store()
     updated_count = 0
     
     for obj_type in object_types:
         try:
-            # Buscar propriedades do HubSpot
-            properties = data_source.get_object_properties(obj_type)
-            
-            # Limpar cache antigo
-            HubSpotPropertyCache.query.filter_by(
-                organization_id=org_id,
-                object_type=obj_type
-            ).delete()
-            
-            # Criar novos registros
-            for prop in properties:
-                # Truncar campos para evitar erro de tamanho no banco
-                property_name = (prop.get('name', '') or '')[:255]
-                label = (prop.get('label', prop.get('name', '')) or '')[:255]
-                prop_type = (prop.get('type', 'string') or 'string')[:50]
-                
-                cached_prop = HubSpotPropertyCache(
-                    organization_id=org_id,
-                    object_type=obj_type,
-                    property_name=property_name,
-                    label=label,
-                    type=prop_type,
-                    options=prop.get('options')
-                )
-                db.session.add(cached_prop)
-            
-            updated_count += len(properties)
+            snapshot = store.refresh(org_id, obj_type)
+            updated_count += len(snapshot.properties)
             
         except Exception as e:
             logger.error(f"Erro ao atualizar propriedades para {obj_type}: {str(e)}")
             continue
     
-    db.session.commit()
-    
     return jsonify({
         'success': True,
         'updated_count': updated_count,
@@ -128,6 +128,7 @@ def execute_workflow_action():
             # Buscar dados do objeto
             from app.models import DataSourceConnection
             from app.services.data_sources.hubspot import HubSpotDataSource
+            from app.services.data_sources.property_planner import get_property_plan
             
             connection = workflow.source_connection
             if not connection:
@@ -136,7 +137,8 @@ def execute_workflow_action():
             data_source = HubSpotDataSource(connection)
             source_data = data_source.get_object_data(
                 hubspot_object_type,
-                hubspot_object_id
+                hubspot_object_id,
+                plan=get_property_plan(workflow, hubspot_object_type)
             )
             
             generator = DocumentGenerator(google_creds)
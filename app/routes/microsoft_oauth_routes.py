@@ -376,6 +376,9 @@ def callback():
         
         db.session.commit()
         
+        from app.services.credential_resolver import get_credential_resolver
+        get_credential_resolver().invalidate(organization_id_uuid, 'microsoft')
+        
         # Registrar login bem-sucedido
         try:
             from app.utils.login_logger import log_successful_login
@@ -553,45 +556,8 @@ def get_microsoft_credentials(organization_id: str) -> Optional[Dict[str, Any]]:
     Returns:
         Dict com credenciais (access_token, refresh_token, expires_at, user_email) ou None
     """
-    from app.models import DataSourceConnection
-    
-    connection = DataSourceConnection.query.filter_by(
-        organization_id=organization_id,
-        source_type='microsoft',
-        status='active'
-    ).first()
-    
-    if not connection:
-        return None
-    
-    try:
-        credentials = connection.get_decrypted_credentials()
-        access_token = credentials.get('access_token')
-        
-        if not access_token:
-            return None
-        
-        # Verificar se token expirou e renovar se necessário
-        expires_at_str = credentials.get('expires_at')
-        if expires_at_str:
-            expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-            if expires_at < datetime.utcnow():
-                # Tentar refresh
-                refreshed = _refresh_microsoft_token(connection)
-                if not refreshed:
-                    return None
-                credentials = connection.get_decrypted_credentials()
-                access_token = credentials.get('access_token')
-        
-        return {
-            'access_token': access_token,
-            'refresh_token': credentials.get('refresh_token'),
-            'expires_at': credentials.get('expires_at'),
-            'user_email': credentials.get('user_email'),
-        }
-    except Exception as e:
-        logger.exception(f'Erro ao obter credenciais Microsoft: {str(e)}')
-        return None
+    from app.services.credential_resolver import get_credential_resolver
+    return get_credential_resolver().get_microsoft_credentials(organization_id)
 
 
 def _refresh_microsoft_token(connection: DataSourceConnection) -> bool:
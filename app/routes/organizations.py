@@ -2,6 +2,7 @@ from flask import Blueprint, request, jsonify, g
 from app.database import db
 from app.models import Organization
 from app.utils.auth import require_auth, require_org, require_admin
+from app.utils.org_cache import invalidate_organization
 from app.config import Config
 from app.services.stripe_service import get_subscription_info
 from datetime import datetime
@@ -105,6 +106,7 @@ def update_organization(organization_id):
             setattr(org, field, data[field])
     
     db.session.commit()
+    invalidate_organization(org.id)
     
     return jsonify({
         'success': True,
@@ -196,6 +198,7 @@ def update_my_organization():
                 setattr(org, field, data[field])
         
         db.session.commit()
+        invalidate_organization(org.id)
         
         return jsonify({
             'success': True,
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify, g
 from app.database import db
-from app.models import Template
+from app.models import Template, Workflow
 from app.services.document_generation.google_docs import GoogleDocsService
 from app.routes.google_drive_routes import get_google_credentials
 from app.utils.auth import require_auth, require_org, require_admin
@@ -416,6 +416,8 @@ def upload_template():
         
         # Extrair tags do documento (opcional)
         detected_tags = []
+        normalized_bytes = None
+        is_valid = False
         try:
             from app.services.document_generation.document_converter import DocumentConverter
             from docx import Document
@@ -477,6 +479,11 @@ def upload_template():
         db.session.add(template)
         db.session.commit()
         
+        # Pré-aquecer cache de geração com o arquivo já normalizado
+        if normalized_bytes is not None and is_valid:
+            from app.services.document_generation.template_cache import get_template_cache
+            get_template_cache().put(template, normalized_bytes)
+        
         return jsonify({
             'success': True,
             'template': template_to_dict(template, include_tags=True)
@@ -677,8 +684,13 @@ def sync_template(template_id):
         template.detected_tags = detected_tags
         template.version += 1
         template.last_synced_at = db.func.now()
+        Workflow.touch_for_template(template.id)
         db.session.commit()
         
+        # Versões anteriores não serão mais usadas na geração
+        from app.services.document_generation.template_cache import get_template_cache
+        get_template_cache().invalidate(template.id)
+        
         return jsonify({
             'success': True,
             'detected_tags': detected_tags,
@@ -817,9 +829,14 @@ def delete_template(template_id):
             logger.warning(f"Erro ao deletar arquivo do Spaces: {str(e)}")
             # Continuar mesmo se falhar deletar do Spaces
     
+    template_id = template.id
+    Workflow.touch_for_template(template_id)
     db.session.delete(template)
     db.session.commit()
     
+    from app.services.document_generation.template_cache import get_template_cache
+    get_template_cache().invalidate(template_id)
+    
     return jsonify({'success': True})
 
 
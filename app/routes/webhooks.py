@@ -3,9 +3,10 @@ Rotas para webhooks - endpoints públicos e de teste para webhook triggers.
 """
 from flask import Blueprint, request, jsonify, g
 from app.database import db
-from app.models import Workflow, WorkflowNode, WorkflowExecution, Organization
-from app.services.workflow_executor import WorkflowExecutor
+from app.models import Workflow, WorkflowNode, WorkflowExecution, Organization, WebhookDelivery
 from app.utils.auth import require_auth, require_org
+from app.utils.org_cache import invalidate_organization
+from app.utils.webhook_routes import get_webhook_routes, invalidate_webhook_routes
 from app.config import Config
 import logging
 import secrets
@@ -19,143 +20,82 @@ logger = logging.getLogger(__name__)
 webhooks_bp = Blueprint('webhooks', __name__, url_prefix='/api/v1/webhooks')
 
 
-def _map_webhook_payload(payload, field_mapping):
-    """
-    Mapeia campos do payload do webhook para source_data conforme field_mapping.
-    
-    Args:
-        payload: Dict com dados recebidos do webhook
-        field_mapping: Dict com mapeamento {target_field: source_path}
-    
-    Returns:
-        Dict com source_data mapeado
-    """
-    source_data = {}
-    
-    if not field_mapping:
-        # Se não há mapeamento, usar payload completo
-        return payload
-    
-    def get_nested_value(obj, path):
-        """Obtém valor aninhado usando path como 'payload.deal.id'"""
-        keys = path.split('.')
-        value = obj
-        for key in keys:
-            if isinstance(value, dict):
-                value = value.get(key)
-            else:
-                return None
-            if value is None:
-                return None
-        return value
-    
-    for target_field, source_path in field_mapping.items():
-        value = get_nested_value(payload, source_path)
-        if value is not None:
-            source_data[target_field] = value
-    
-    return source_data
-
-
 @webhooks_bp.route('/<workflow_id>/<webhook_token>', methods=['POST', 'GET'])
 def receive_webhook(workflow_id, webhook_token):
     """
     Endpoint público para receber webhooks.
     Não requer autenticação - usa webhook_token para validação.
     
+    Só enfileira o payload (webhook_deliveries) e responde 202; a execução
+    é criada e iniciada pelo drainer (app/services/webhook_ingestion.py).
+    Reenvios com o mesmo Idempotency-Key (ou o mesmo payload e query
+    string) não geram nova execução; chamadas sem header, body e query
+    string não são deduplicadas. Com records_path no trigger, cada registro do payload
+    vira uma entrega (e uma execução).
+    
     Args:
         workflow_id: UUID do workflow
         webhook_token: Token único do webhook trigger node
     """
+    from app.services.webhook_ingestion import MAX_RECORDS, enqueue_delivery, enqueue_records
+    
     try:
-        # Buscar trigger node pelo token (webhook trigger)
-        trigger_node = WorkflowNode.query.filter(
-            WorkflowNode.webhook_token == webhook_token,
-            WorkflowNode.workflow_id == workflow_id,
-            WorkflowNode.node_type.in_(['webhook', 'trigger'])  # webhook ou trigger (compatibilidade) - usar TRIGGER_NODE_TYPES se necessário
-        ).first()
+        # Token -> workflow/trigger pela tabela de rotas em memória
+        route = get_webhook_routes().get(webhook_token)
         
-        if not trigger_node:
+        if route is None or route.workflow_id != str(workflow_id):
             logger.warning(f'Webhook token inválido: {webhook_token}')
             return jsonify({'error': 'Invalid webhook token'}), 401
         
         # Verificar se workflow está ativo
-        workflow = Workflow.query.get(workflow_id)
-        if not workflow or workflow.status != 'active':
+        if not route.is_active:
             logger.warning(f'Workflow não encontrado ou inativo: {workflow_id}')
             return jsonify({'error': 'Workflow not found or inactive'}), 404
         
+        if route.mapping_error:
+            return jsonify({'error': f'Invalid trigger mapping: {route.mapping_error}'}), 422
+        
         # Extrair payload
         if request.is_json:
             payload = request.get_json()
         else:
             payload = request.form.to_dict() or {}
         
-        # Obter field mapping do config
-        config = trigger_node.config or {}
-        field_mapping = config.get('field_mapping', {})
-        source_object_type = config.get('source_object_type', 'webhook')
-        
-        # Mapear payload para source_data
-        source_data = _map_webhook_payload(payload, field_mapping)
-        
-        # Determinar source_object_id (pode vir do payload ou gerar)
-        source_object_id = source_data.get('id') or source_data.get('object_id') or f'webhook_{datetime.utcnow().isoformat()}'
-        
-        # Criar execução do workflow com trigger_data incluindo payload
-        from app.models import WorkflowExecution
-        from app.temporal.service import start_workflow_execution, is_temporal_enabled
-        
-        # Criar execução manualmente para incluir payload no trigger_data
-        execution = WorkflowExecution(
-            workflow_id=workflow.id,
-            trigger_type='webhook',
-            trigger_data={
-                'source_object_id': str(source_object_id),
-                'source_object_type': source_object_type,
-                'payload': payload,  # Payload original
-                'source_data': source_data  # Payload mapeado
-            },
-            status='running'
-        )
-        db.session.add(execution)
-        db.session.commit()
-        
-        # Iniciar via Temporal se habilitado
-        try:
-            if is_temporal_enabled():
-                start_workflow_execution(
-                    execution_id=str(execution.id),
-                    workflow_id=str(workflow.id)
-                )
-                logger.info(f"Workflow {workflow.id} iniciado via Temporal (execution: {execution.id})")
-            else:
-                # Fallback: executar sincronamente
-                executor = WorkflowExecutor()
-                execution = executor.execute_workflow(
-                    workflow=workflow,
-                    source_object_id=str(source_object_id),
-                    source_object_type=source_object_type,
-                    user_id=None
-                )
-            
-            logger.info(f'Webhook executado com sucesso: workflow={workflow_id}, execution={execution.id}')
+        if route.records is not None:
+            # Webhook em lote: uma entrega por registro
+            records = route.records(payload)
+            if not records:
+                return jsonify({'error': 'No records found in payload'}), 400
+            if len(records) > MAX_RECORDS:
+                return jsonify({'error': f'Too many records (max {MAX_RECORDS})'}), 413
             
+            delivery_ids, duplicates = enqueue_records(
+                route.workflow_id, route.trigger_node_id, records, request.headers
+            )
             return jsonify({
                 'success': True,
-                'execution_id': str(execution.id),
-                'status': execution.status
-            }), 200
-            
-        except Exception as e:
-            logger.error(f'Erro ao executar workflow via webhook: {str(e)}')
-            return jsonify({
-                'success': False,
-                'error': str(e)
-            }), 500
+                'delivery_ids': delivery_ids,
+                'queued': len(delivery_ids),
+                'duplicates': duplicates
+            }), 202
+        
+        delivery_id, duplicate = enqueue_delivery(
+            route.workflow_id, route.trigger_node_id, payload, request.headers,
+            query=request.args.to_dict(flat=False)
+        )
+        
+        if duplicate:
+            logger.info(f'Webhook duplicado ignorado: workflow={workflow_id}, delivery={delivery_id}')
+        
+        return jsonify({
+            'success': True,
+            'delivery_id': delivery_id,
+            'status': 'duplicate' if duplicate else 'queued'
+        }), 202
         
     except Exception as e:
         logger.exception(f'Erro ao processar webhook: {str(e)}')
+        db.session.rollback()
         return jsonify({'error': 'Internal server error'}), 500
 
 
@@ -275,9 +215,16 @@ def get_webhook_logs(workflow_id):
                 'error_message': execution.error_message
             })
         
+        # Recebidos e ainda não iniciados (fila do drainer)
+        queued = WebhookDelivery.query.filter(
+            WebhookDelivery.workflow_id == workflow.id,
+            WebhookDelivery.status.in_(['pending', 'starting'])
+        ).count()
+        
         return jsonify({
             'logs': logs,
-            'total': len(logs)
+            'total': len(logs),
+            'queued': queued
         }), 200
         
     except Exception as e:
@@ -321,8 +268,10 @@ def regenerate_webhook_token(workflow_id):
             return jsonify({'error': 'Este workflow não usa webhook trigger'}), 400
         
         # Gerar novo token
+        old_token = trigger_node.webhook_token
         new_token = trigger_node.generate_webhook_token()
         db.session.commit()
+        invalidate_webhook_routes(workflow_id=workflow.id, token=old_token)
         
         # Obter URL base da API
         from flask import current_app
@@ -516,6 +465,7 @@ def _handle_subscription_deleted(subscription):
                     org.workflows_limit = 5
                     org.plan_expires_at = None
                     db.session.commit()
+                    invalidate_organization(organization_id)
                     logger.info(f'Organização {organization_id} rebaixada para free')
         except Exception as e:
             logger.exception(f'Erro ao processar subscription deleted: {str(e)}')
@@ -541,6 +491,7 @@ def _handle_payment_succeeded(invoice):
                         org.plan_expires_at = datetime.fromtimestamp(subscription.current_period_end)
                         org.is_active = True
                         db.session.commit()
+                        invalidate_organization(organization_id)
                         logger.info(f'Pagamento bem-sucedido para organização {organization_id}')
         except Exception as e:
             logger.exception(f'Erro ao processar payment succeeded: {str(e)}')
@@ -4,8 +4,12 @@ from app.models import Workflow, WorkflowFieldMapping, Template, AIGenerationMap
 from app.models.workflow import TRIGGER_NODE_TYPES
 from app.utils.auth import require_auth, require_org, require_admin
 from app.utils.hubspot_auth import flexible_hubspot_auth
+from app.utils.webhook_routes import invalidate_webhook_routes
+from app.services.webhook_mapping import validate_trigger_mapping
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer, load_only
 import logging
+from datetime import datetime
 
 logger = logging.getLogger(__name__)
 workflows_bp = Blueprint('workflows', __name__, url_prefix='/api/v1/workflows')
@@ -162,6 +166,11 @@ def create_workflow():
         if not is_valid:
             return jsonify({'error': error_msg}), 400
     
+    # Validar mapeamento do webhook trigger (compilado pela tabela de rotas)
+    mapping_error = validate_trigger_mapping(data)
+    if mapping_error:
+        return jsonify({'error': mapping_error}), 400
+    
     # Verificar limite de workflows
     org = Organization.query.filter_by(id=g.organization_id).first()
     if org and not org.can_create_workflow():
@@ -199,6 +208,8 @@ def create_workflow():
         'trigger_config': data.get('trigger_config', {}),
         'field_mapping': data.get('field_mapping', {})  # Para webhook trigger
     }
+    if data.get('records_path'):
+        trigger_config['records_path'] = data['records_path']  # Webhook em lote
     
     trigger_node = WorkflowNode(
         workflow_id=workflow.id,
@@ -276,7 +287,11 @@ def update_workflow(workflow_id):
             )
             db.session.add(mapping)
     
+    # Nodes, mappings e AI mappings não alteram a linha do workflow; o
+    # updated_at explícito faz parte da chave do plano de propriedades
+    workflow.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_webhook_routes(workflow_id=workflow.id)
     
     return jsonify({
         'success': True,
@@ -313,6 +328,7 @@ def delete_workflow(workflow_id):
     # Deletar o workflow
     db.session.delete(workflow)
     db.session.commit()
+    invalidate_webhook_routes(workflow_id=workflow_id)
     
     logger.info(f'Workflow {workflow_id} deletado com sucesso')
     
@@ -363,6 +379,7 @@ def activate_workflow(workflow_id):
     
     workflow.status = 'active'
     db.session.commit()
+    invalidate_webhook_routes(workflow_id=workflow.id)
     
     return jsonify({
         'success': True,
@@ -470,7 +487,9 @@ def create_ai_mapping(workflow_id):
         "prompt_template": "Gere um parágrafo descrevendo o deal {{dealname}}...",
         "temperature": 0.7,
         "max_tokens": 500,
-        "fallback_value": "[Texto não gerado]"
+        "fallback_value": "[Texto não gerado]",
+        "cache_enabled": false,
+        "cache_ttl_seconds": 86400
     }
     """
     workflow = Workflow.query.filter_by(
@@ -528,10 +547,13 @@ def create_ai_mapping(workflow_id):
         prompt_template=data.get('prompt_template'),
         temperature=data.get('temperature', 0.7),
         max_tokens=data.get('max_tokens', 1000),
-        fallback_value=data.get('fallback_value')
+        fallback_value=data.get('fallback_value'),
+        cache_enabled=bool(data.get('cache_enabled', False)),
+        cache_ttl_seconds=data.get('cache_ttl_seconds')
     )
     
     db.session.add(mapping)
+    workflow.updated_at = datetime.utcnow()
     db.session.commit()
     
     logger.info(f"AI mapping criado: workflow={workflow_id}, tag={data['ai_tag']}")
@@ -579,7 +601,9 @@ def update_ai_mapping(workflow_id, mapping_id):
         "prompt_template": "...",
         "temperature": 0.5,
         "max_tokens": 800,
-        "fallback_value": "..."
+        "fallback_value": "...",
+        "cache_enabled": true,
+        "cache_ttl_seconds": 86400
     }
     """
     workflow = Workflow.query.filter_by(
@@ -632,6 +656,13 @@ def update_ai_mapping(workflow_id, mapping_id):
     if 'fallback_value' in data:
         mapping.fallback_value = data['fallback_value']
     
+    if 'cache_enabled' in data:
+        mapping.cache_enabled = bool(data['cache_enabled'])
+    
+    if 'cache_ttl_seconds' in data:
+        mapping.cache_ttl_seconds = data['cache_ttl_seconds']
+    
+    workflow.updated_at = datetime.utcnow()
     db.session.commit()
     
     return jsonify({
@@ -658,6 +689,7 @@ def delete_ai_mapping(workflow_id, mapping_id):
     ).first_or_404()
     
     db.session.delete(mapping)
+    workflow.updated_at = datetime.utcnow()
     db.session.commit()
     
     return jsonify({'success': True})
@@ -819,6 +851,7 @@ def create_workflow_node(workflow_id):
         )
         
         db.session.add(node)
+        workflow.updated_at = datetime.utcnow()
         db.session.commit()
         
         return jsonify({
@@ -897,6 +930,10 @@ def update_workflow_node(workflow_id, node_id):
         node.parent_node_id = parent_node_id
     
     if 'config' in data:
+        if node.is_trigger():
+            mapping_error = validate_trigger_mapping(data['config'])
+            if mapping_error:
+                return jsonify({'error': mapping_error}), 400
         node.config = data['config']
         # Atualizar status baseado na configuração
         if node.is_configured():
@@ -907,7 +944,9 @@ def update_workflow_node(workflow_id, node_id):
     if 'status' in data:
         node.status = data['status']
     
+    workflow.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_webhook_routes(workflow_id=workflow.id)
     
     return jsonify({
         'success': True,
@@ -949,6 +988,7 @@ def delete_workflow_node(workflow_id, node_id):
         }), 400
     
     db.session.delete(node)
+    workflow.updated_at = datetime.utcnow()
     db.session.commit()
     
     return jsonify({'success': True})
@@ -1021,6 +1061,7 @@ def reorder_workflow_nodes(workflow_id):
             if node:
                 node.position = item['position']
         
+        workflow.updated_at = datetime.utcnow()
         db.session.commit()
         
         current_app.logger.info(f'Nodes reordenados com sucesso no workflow {workflow_id}')
@@ -1092,6 +1133,11 @@ def update_workflow_node_config(workflow_id, node_id):
     if 'config' not in data:
         return jsonify({'error': 'config é obrigatório'}), 400
     
+    if node.is_trigger():
+        mapping_error = validate_trigger_mapping(data['config'])
+        if mapping_error:
+            return jsonify({'error': mapping_error}), 400
+    
     node.config = data['config']
     
     # Atualizar status baseado na configuração
@@ -1100,7 +1146,9 @@ def update_workflow_node_config(workflow_id, node_id):
     else:
         node.status = 'draft'
     
+    workflow.updated_at = datetime.utcnow()
     db.session.commit()
+    invalidate_webhook_routes(workflow_id=workflow.id)
     
     return jsonify({
         'success': True,
@@ -1224,8 +1272,11 @@ def preview_workflow_data(workflow_id):
         
         # Buscar dados do objeto
         from app.services.data_sources.hubspot import HubSpotDataSource
+        from app.services.data_sources.property_planner import get_property_plan
         data_source = HubSpotDataSource(connection)
-        source_data = data_source.get_object_data(object_type, object_id)
+        source_data = data_source.get_object_data(
+            object_type, object_id, plan=get_property_plan(workflow, object_type)
+        )
         
         # Normalizar dados
         if isinstance(source_data, dict) and 'properties' in source_data:
@@ -1294,6 +1345,52 @@ def preview_workflow_data(workflow_id):
 
 # ==================== WORKFLOW EXECUTIONS (RUNS) ENDPOINTS ====================
 
+# Status do backend -> status da interface
+RUN_STATUS_MAPPING = {
+    'completed': 'success',
+    'failed': 'error',
+    'running': 'running'
+}
+
+# Colunas usadas pela listagem (execution_context/execution_logs/ai_metrics ficam de fora)
+RUN_LIST_COLUMNS = (
+    WorkflowExecution.id,
+    WorkflowExecution.status,
+    WorkflowExecution.started_at,
+    WorkflowExecution.completed_at,
+    WorkflowExecution.execution_time_ms,
+    WorkflowExecution.trigger_type,
+    WorkflowExecution.trigger_data,
+    WorkflowExecution.error_message,
+    WorkflowExecution.current_node_id,
+    WorkflowExecution.steps_completed,
+)
+
+
+def _run_steps_completed(execution, nodes, total_steps):
+    """
+    Steps concluídos de uma execução.
+    
+    completed conta todos os steps; running usa a posição do node atual
+    quando existe; nos demais casos vale o contador mantido por add_log.
+    """
+    if execution.status == 'completed':
+        return total_steps
+    
+    if execution.status == 'running' and execution.current_node_id:
+        current_node = next((n for n in nodes if str(n.id) == str(execution.current_node_id)), None)
+        if current_node:
+            # Contar nodes executados antes do atual (excluindo trigger)
+            return len([n for n in nodes
+                        if n.position < current_node.position and not n.is_trigger()])
+        return None
+    
+    if execution.status in ('failed', 'running'):
+        return execution.steps_completed or 0
+    
+    return None
+
+
 @workflows_bp.route('/<workflow_id>/runs', methods=['GET'])
 @flexible_hubspot_auth
 @require_auth
@@ -1335,72 +1432,32 @@ def list_workflow_runs(workflow_id):
     # Contar total antes de aplicar paginação
     total_count = query.count()
     
-    # Aplicar paginação e ordenação
-    executions = query.order_by(WorkflowExecution.started_at.desc()).offset(offset).limit(limit).all()
+    # Aplicar paginação e ordenação (só as colunas exibidas)
+    executions = query.options(
+        load_only(*RUN_LIST_COLUMNS)
+    ).order_by(WorkflowExecution.started_at.desc()).offset(offset).limit(limit).all()
     
     # Buscar nodes do workflow para calcular steps
     nodes = WorkflowNode.query.filter_by(
         workflow_id=workflow.id
+    ).options(
+        load_only(WorkflowNode.id, WorkflowNode.node_type, WorkflowNode.position)
     ).order_by(WorkflowNode.position).all()
     total_steps = len([n for n in nodes if not n.is_trigger()])  # Excluir trigger node
     
     # Converter para formato esperado pela interface
     runs = []
     for execution in executions:
-        # Mapear status do backend para interface
-        status_mapping = {
-            'completed': 'success',
-            'failed': 'error',
-            'running': 'running'
-        }
-        interface_status = status_mapping.get(execution.status, 'pending')
-        
-        # Calcular steps_completed baseado em current_node_id ou logs
-        steps_completed = None
-        if execution.status == 'completed':
-            steps_completed = total_steps
-        elif execution.status == 'failed':
-            # Para failed, contar nodes que foram executados antes do erro
-            if execution.execution_logs:
-                completed_nodes = [log for log in execution.execution_logs 
-                                 if log.get('status') in ['success', 'failed']]
-                steps_completed = len(completed_nodes)
-            else:
-                steps_completed = 0
-        elif execution.status == 'running':
-            # Para running, calcular baseado no current_node_id ou logs
-            if execution.current_node_id:
-                # Encontrar posição do node atual
-                current_node = next((n for n in nodes if str(n.id) == str(execution.current_node_id)), None)
-                if current_node:
-                    # Contar nodes executados antes do atual (excluindo trigger)
-                    steps_completed = len([n for n in nodes 
-                                         if n.position < current_node.position and not n.is_trigger()])
-            elif execution.execution_logs:
-                # Calcular baseado nos logs (nodes com status 'success' ou 'failed')
-                completed_nodes = [log for log in execution.execution_logs 
-                                 if log.get('status') in ['success', 'failed']]
-                steps_completed = len(completed_nodes)
-        
-        # Mapear trigger_type para trigger_source
-        trigger_source = execution.trigger_type or 'manual'
-        if trigger_source == 'manual':
-            trigger_source = 'manual'
-        elif trigger_source == 'webhook':
-            trigger_source = 'webhook'
-        elif trigger_source == 'scheduled':
-            trigger_source = 'scheduled'
-        
         run_dict = {
             'id': str(execution.id),
-            'status': interface_status,
+            'status': RUN_STATUS_MAPPING.get(execution.status, 'pending'),
             'started_at': execution.started_at.isoformat() if execution.started_at else None,
             'completed_at': execution.completed_at.isoformat() if execution.completed_at else None,
             'duration_ms': execution.execution_time_ms,
-            'trigger_source': trigger_source,
+            'trigger_source': execution.trigger_type or 'manual',
             'trigger_data': execution.trigger_data,
             'error_message': execution.error_message,
-            'steps_completed': steps_completed,
+            'steps_completed': _run_steps_completed(execution, nodes, total_steps),
             'steps_total': total_steps if total_steps > 0 else None
         }
         
@@ -1436,6 +1493,8 @@ def get_workflow_run(workflow_id, run_id):
     execution = WorkflowExecution.query.filter_by(
         id=run_id,
         workflow_id=workflow.id
+    ).options(
+        defer(WorkflowExecution.execution_context)
     ).first_or_404()
     
     # Buscar nodes do workflow para calcular steps
@@ -1444,45 +1503,10 @@ def get_workflow_run(workflow_id, run_id):
     ).order_by(WorkflowNode.position).all()
     total_steps = len([n for n in nodes if not n.is_trigger()])
     
-    # Mapear status
-    status_mapping = {
-        'completed': 'success',
-        'failed': 'error',
-        'running': 'running'
-    }
-    interface_status = status_mapping.get(execution.status, 'pending')
-    
-    # Calcular steps_completed baseado em current_node_id ou logs
-    steps_completed = None
-    if execution.status == 'completed':
-        steps_completed = total_steps
-    elif execution.status == 'failed':
-        # Para failed, contar nodes que foram executados antes do erro
-        if execution.execution_logs:
-            completed_nodes = [log for log in execution.execution_logs 
-                             if log.get('status') in ['success', 'failed']]
-            steps_completed = len(completed_nodes)
-        else:
-            steps_completed = 0
-    elif execution.status == 'running':
-        # Para running, calcular baseado no current_node_id ou logs
-        if execution.current_node_id:
-            # Encontrar posição do node atual
-            current_node = next((n for n in nodes if str(n.id) == str(execution.current_node_id)), None)
-            if current_node:
-                # Contar nodes executados antes do atual (excluindo trigger)
-                steps_completed = len([n for n in nodes 
-                                     if n.position < current_node.position and not n.is_trigger()])
-        elif execution.execution_logs:
-            # Calcular baseado nos logs (nodes com status 'success' ou 'failed')
-            completed_nodes = [log for log in execution.execution_logs 
-                             if log.get('status') in ['success', 'failed']]
-            steps_completed = len(completed_nodes)
-    
-    # Buscar informações do node atual
+    # Informações do node atual (já carregado com os nodes do workflow)
     current_node_info = None
     if execution.current_node_id:
-        current_node = WorkflowNode.query.get(execution.current_node_id)
+        current_node = next((n for n in nodes if str(n.id) == str(execution.current_node_id)), None)
         if current_node:
             current_node_info = {
                 'id': str(current_node.id),
@@ -1494,20 +1518,17 @@ def get_workflow_run(workflow_id, run_id):
     # Verificar se deve incluir logs
     include_logs = request.args.get('include_logs', 'false').lower() == 'true'
     
-    # Mapear trigger_source
-    trigger_source = execution.trigger_type or 'manual'
-    
     run_dict = {
         'id': str(execution.id),
         'workflow_id': str(execution.workflow_id),
-        'status': interface_status,
+        'status': RUN_STATUS_MAPPING.get(execution.status, 'pending'),
         'started_at': execution.started_at.isoformat() if execution.started_at else None,
         'completed_at': execution.completed_at.isoformat() if execution.completed_at else None,
         'duration_ms': execution.execution_time_ms,
-        'trigger_source': trigger_source,
+        'trigger_source': execution.trigger_type or 'manual',
         'trigger_data': execution.trigger_data,
         'error_message': execution.error_message,
-        'steps_completed': steps_completed,
+        'steps_completed': _run_steps_completed(execution, nodes, total_steps),
         'steps_total': total_steps if total_steps > 0 else None,
         'generated_document_id': str(execution.generated_document_id) if execution.generated_document_id else None,
         'ai_metrics': execution.ai_metrics,
@@ -1517,9 +1538,9 @@ def get_workflow_run(workflow_id, run_id):
         'temporal_run_id': execution.temporal_run_id
     }
     
-    # Incluir logs se solicitado
+    # Logs só quando pedidos (consulta indexada por execução)
     if include_logs:
-        run_dict['execution_logs'] = execution.execution_logs or []
+        run_dict['execution_logs'] = execution.get_logs()
     
     return jsonify(run_dict)
 
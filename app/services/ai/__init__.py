@@ -22,6 +22,8 @@ from .utils import (
     validate_model,
     estimate_cost
 )
+from .rate_limiter import TokenBucket, get_rate_limiter
+from .response_cache import build_cache_key, get_response_cache
 
 __all__ = [
     # Service
@@ -42,5 +44,11 @@ __all__ = [
     'validate_provider',
     'validate_model',
     'estimate_cost',
+    # Rate limiting
+    'TokenBucket',
+    'get_rate_limiter',
+    # Cache de respostas
+    'build_cache_key',
+    'get_response_cache',
 ]
 
@@ -0,0 +1,105 @@
+"""
+Rate limiting para chamadas de IA.
+
+Token bucket por (provedor, API key), compartilhado pelo processo inteiro.
+Usa threading.Lock (e não primitivas asyncio) porque cada geração de
+documento pode rodar em seu próprio event loop/thread.
+"""
+
+import os
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Tuple
+
+# Requisições por minuto por provedor/API key (sobrescreva com AI_RATE_LIMIT_RPM_<PROVIDER>)
+DEFAULT_REQUESTS_PER_MINUTE = {
+    'openai': 500,
+    'gemini': 300,
+    'anthropic': 50,
+}
+FALLBACK_REQUESTS_PER_MINUTE = 60
+
+# Máximo de tags AI geradas simultaneamente por documento
+MAX_CONCURRENT_AI_TAGS = int(os.getenv('AI_MAX_CONCURRENT_TAGS', '4'))
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe.
+
+    Args:
+        rate: Tokens repostos por segundo
+        capacity: Máximo de tokens acumulados (rajada)
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Reserva tokens e retorna quanto tempo esperar antes de usá-los"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            # Saldo pode ficar negativo: a dívida é paga com espera
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens: float = 1) -> float:
+        """Bloqueia até ter tokens disponíveis. Retorna segundos esperados."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self, tokens: float = 1) -> float:
+        """Versão async de acquire()"""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+_buckets_lock = threading.Lock()
+
+
+def get_requests_per_minute(provider: str) -> int:
+    """Limite de requisições por minuto configurado para o provedor"""
+    provider = (provider or '').lower()
+    env_value = os.getenv(f'AI_RATE_LIMIT_RPM_{provider.upper()}')
+    if env_value:
+        return int(env_value)
+    return DEFAULT_REQUESTS_PER_MINUTE.get(provider, FALLBACK_REQUESTS_PER_MINUTE)
+
+
+def get_rate_limiter(provider: str, api_key: str) -> TokenBucket:
+    """
+    Retorna o token bucket do par (provedor, API key).
+
+    A API key nunca é guardada em claro, apenas seu hash.
+    """
+    key_hash = hashlib.sha256((api_key or '').encode()).hexdigest()[:16]
+    key = ((provider or '').lower(), key_hash)
+
+    bucket = _buckets.get(key)
+    if bucket is not None:
+        return bucket
+
+    with _buckets_lock:
+        bucket = _buckets.get(key)
+        if bucket is None:
+            rpm = get_requests_per_minute(provider)
+            # Rajada de até 1/10 do limite por minuto (mínimo 1)
+            bucket = TokenBucket(rate=rpm / 60.0, capacity=max(1, rpm // 10))
+            _buckets[key] = bucket
+        return bucket
@@ -0,0 +1,200 @@
+"""
+Cache de respostas de LLM endereçado por conteúdo.
+
+A chave é o SHA-256 de (provider, model, temperature, max_tokens, prompt),
+então documentos regerados ou execuções repetidas para o mesmo objeto
+reaproveitam o texto já gerado sem nova chamada (nem custo) ao provedor.
+
+Backends (AI_RESPONSE_CACHE_BACKEND):
+- memory: LRU em processo (padrão)
+- redis: compartilhado entre processos (REDIS_URL)
+- database: tabela ai_response_cache no Postgres
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger('docugen.ai')
+
+DEFAULT_TTL_SECONDS = int(os.getenv('AI_RESPONSE_CACHE_TTL', '86400'))  # 24h
+MEMORY_MAX_ENTRIES = int(os.getenv('AI_RESPONSE_CACHE_MAX_ENTRIES', '1000'))
+
+
+def build_cache_key(
+    provider: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    prompt: str
+) -> str:
+    """
+    Gera a chave do cache para uma requisição de LLM.
+
+    Example:
+        >>> len(build_cache_key('openai', 'gpt-4', 0.7, 1000, 'Olá'))
+        64
+    """
+    payload = json.dumps(
+        [(provider or '').lower(), model, float(temperature), int(max_tokens), prompt],
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class AIResponseCacheBackend(ABC):
+    """Interface dos backends de cache"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Resposta em cache (None se ausente ou expirada)"""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        """Grava resposta com expiração"""
+        pass
+
+
+class MemoryCacheBackend(AIResponseCacheBackend):
+    """LRU em processo com expiração por entrada"""
+
+    def __init__(self, max_entries: int = MEMORY_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class RedisCacheBackend(AIResponseCacheBackend):
+    """Cache compartilhado via Redis"""
+
+    KEY_PREFIX = 'docg:ai_response:'
+
+    def __init__(self, url: str):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = self._client.get(self.KEY_PREFIX + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        self._client.setex(self.KEY_PREFIX + key, ttl_seconds, json.dumps(value))
+
+
+class DatabaseCacheBackend(AIResponseCacheBackend):
+    """
+    Cache persistente na tabela ai_response_cache.
+
+    Usa conexões próprias (fora de db.session): chamado no meio da geração
+    de documentos, não pode commitar o que o chamador tem pendente nem
+    deixar a sessão exigindo rollback quando falha.
+    """
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        from app.database import db
+        from app.models import AIResponseCache
+        from sqlalchemy import select
+
+        table = AIResponseCache.__table__
+        with db.engine.connect() as connection:
+            row = connection.execute(
+                select(table.c.response, table.c.expires_at).where(table.c.cache_key == key)
+            ).first()
+        if row is None or row.expires_at < datetime.utcnow():
+            return None
+        return row.response
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: int) -> None:
+        from app.database import db
+        from app.models import AIResponseCache
+        from sqlalchemy.dialects.postgresql import insert
+
+        expires_at = datetime.utcnow() + timedelta(seconds=ttl_seconds)
+        stmt = insert(AIResponseCache.__table__).values(
+            cache_key=key,
+            response=value,
+            created_at=datetime.utcnow(),
+            expires_at=expires_at
+        ).on_conflict_do_update(
+            index_elements=['cache_key'],
+            set_={'response': value, 'expires_at': expires_at}
+        )
+        with db.engine.begin() as connection:
+            connection.execute(stmt)
+
+
+_backend: Optional[AIResponseCacheBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_response_cache() -> AIResponseCacheBackend:
+    """Retorna o backend configurado (singleton)"""
+    global _backend
+
+    if _backend is not None:
+        return _backend
+
+    with _backend_lock:
+        if _backend is None:
+            backend_name = os.getenv('AI_RESPONSE_CACHE_BACKEND', 'memory').lower()
+
+            if backend_name == 'redis' and os.getenv('REDIS_URL'):
+                _backend = RedisCacheBackend(os.getenv('REDIS_URL'))
+            elif backend_name == 'database':
+                _backend = DatabaseCacheBackend()
+            else:
+                if backend_name != 'memory':
+                    logger.warning(
+                        f"[AI] Backend de cache '{backend_name}' indisponível, usando memory"
+                    )
+                _backend = MemoryCacheBackend()
+
+            logger.info(f"[AI] Cache de respostas: {type(_backend).__name__}")
+
+    return _backend
+
+
+def cache_get(key: str) -> Optional[Dict[str, Any]]:
+    """Busca resposta no cache. Falhas do backend contam como miss."""
+    try:
+        return get_response_cache().get(key)
+    except Exception as e:
+        logger.warning(f"[AI] Erro ao ler cache de respostas: {e}")
+        return None
+
+
+def cache_set(key: str, value: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+    """Grava resposta no cache. Falhas do backend são apenas logadas."""
+    try:
+        get_response_cache().set(key, value, ttl_seconds or DEFAULT_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"[AI] Erro ao gravar cache de respostas: {e}")
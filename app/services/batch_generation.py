@@ -0,0 +1,624 @@
+"""
+Serviço de geração em lote - um workflow executado para muitos objetos.
+
+Fluxo:
+1. create_batch_job: resolve os IDs (lista explícita, lista ou filtro do
+   HubSpot) e grava um BatchGenerationItem por objeto
+2. start_batch_job: inicia o BatchGenerationWorkflow no Temporal (ou uma
+   thread local quando o Temporal não está configurado)
+3. prepare_next_items: em páginas, busca os dados da fonte em lote,
+   reserva a quota da página (Organization.reserve_documents_up_to) e cria
+   uma WorkflowExecution por item, com source_data já no trigger_data.
+   Idempotente: um retry depois do commit devolve a mesma página
+4. record_item_result / finalize_batch_job: atualizam contadores e status
+
+Retomada: resume_batch_job devolve para 'pending' os itens interrompidos
+(e opcionalmente os que falharam) e inicia um novo run. Recusa enquanto
+houver filhos em andamento (ex: lote cancelado terminando a página atual);
+um lote 'running' cujo runner parou de dar sinal (heartbeat_at mais velho
+que BATCH_HEARTBEAT_TIMEOUT) pode ser retomado.
+"""
+import logging
+import os
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+from app.database import db
+from app.models import (
+    BatchGenerationJob, BatchGenerationItem, Workflow, WorkflowNode,
+    WorkflowExecution, DataSourceConnection, Organization
+)
+from app.models.workflow import TRIGGER_NODE_TYPES
+
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', '10000'))
+MAX_BATCH_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '20'))
+HEARTBEAT_TIMEOUT = int(os.getenv('BATCH_HEARTBEAT_TIMEOUT', '900'))
+BATCH_PAGE_SIZE = 100  # limite das APIs batch do HubSpot
+QUOTA_EXCEEDED_MESSAGE = 'Limite de documentos atingido para este período'
+
+
+def create_batch_job(
+    workflow: Workflow,
+    source: Dict[str, Any],
+    concurrency: int = 5,
+    user_id: Optional[str] = None
+) -> BatchGenerationJob:
+    """
+    Cria o job e seus itens.
+
+    Args:
+        workflow: Workflow a executar para cada objeto
+        source: {object_ids: [...]} | {hubspot_list_id: '...'} | {filter_groups: [...]}
+        concurrency: Execuções simultâneas (1..BATCH_MAX_CONCURRENCY)
+        user_id: Usuário que criou o lote
+
+    Returns:
+        BatchGenerationJob com status 'pending'
+
+    Raises:
+        ValueError: Origem inválida, vazia ou maior que BATCH_MAX_ITEMS
+    """
+    object_type = _trigger_config(workflow).get('source_object_type') or workflow.source_object_type
+    if not object_type:
+        raise ValueError('Workflow não possui tipo de objeto configurado')
+
+    object_ids, source_info = _resolve_object_ids(workflow, object_type, source)
+
+    # Remover duplicados mantendo a ordem
+    object_ids = list(dict.fromkeys(str(i) for i in object_ids if i))
+
+    if not object_ids:
+        raise ValueError('Nenhum objeto encontrado para o lote')
+    if len(object_ids) > MAX_BATCH_ITEMS:
+        raise ValueError(f'Lote excede o limite de {MAX_BATCH_ITEMS} objetos')
+
+    job = BatchGenerationJob(
+        organization_id=workflow.organization_id,
+        workflow_id=workflow.id,
+        created_by=user_id,
+        status='pending',
+        source_object_type=object_type,
+        source=source_info,
+        concurrency=max(1, min(int(concurrency or 1), MAX_BATCH_CONCURRENCY)),
+        total_items=len(object_ids),
+        completed_items=0,
+        failed_items=0,
+        runs=0
+    )
+    db.session.add(job)
+    db.session.flush()
+
+    db.session.execute(
+        BatchGenerationItem.__table__.insert(),
+        [
+            {
+                'id': uuid.uuid4(),
+                'job_id': job.id,
+                'position': position,
+                'source_object_id': object_id,
+                'status': 'pending',
+                'attempts': 0,
+                'updated_at': datetime.utcnow()
+            }
+            for position, object_id in enumerate(object_ids)
+        ]
+    )
+    db.session.commit()
+
+    logger.info(f"Lote {job.id} criado: {len(object_ids)} objetos do workflow {workflow.id}")
+    return job
+
+
+def start_batch_job(job: BatchGenerationJob) -> BatchGenerationJob:
+    """Inicia (ou reinicia) o processamento do lote"""
+    from app.temporal.service import is_temporal_enabled
+
+    job.status = 'running'
+    job.started_at = job.started_at or datetime.utcnow()
+    job.heartbeat_at = datetime.utcnow()
+    job.completed_at = None
+    job.runs = (job.runs or 0) + 1
+    db.session.commit()
+
+    try:
+        if is_temporal_enabled():
+            from app.temporal.service import start_batch_workflow
+            job.temporal_workflow_id = start_batch_workflow(str(job.id), job.runs)
+            db.session.commit()
+        else:
+            _start_local_runner(str(job.id))
+    except Exception as e:
+        # Sem runner o lote ficaria 'running' até o heartbeat vencer
+        logger.exception(f"Erro ao iniciar o lote {job.id}: {e}")
+        db.session.rollback()
+        job.status = 'failed'
+        job.error_message = f'Erro ao iniciar o lote: {e}'
+        job.completed_at = datetime.utcnow()
+        job.heartbeat_at = None
+        db.session.commit()
+        raise
+
+    return job
+
+
+def resume_batch_job(job: BatchGenerationJob, retry_failed: bool = False) -> BatchGenerationJob:
+    """
+    Retoma um lote interrompido, cancelado ou com falhas.
+
+    Itens 'running' de um run anterior voltam para 'pending' (a execução
+    órfã é marcada como falha). Com retry_failed, itens que falharam
+    também são reprocessados.
+
+    Raises:
+        ValueError: Lote em execução ou com itens ainda em andamento
+    """
+    runner_alive = _runner_alive(job)
+    if job.status == 'running' and runner_alive:
+        raise ValueError('Lote já está em execução')
+
+    # Filhos ainda rodando terminariam depois da retomada: o mesmo objeto
+    # seria gerado duas vezes e a quota liberada aqui seria consumida de novo
+    in_flight = _in_flight_items(job, runner_alive)
+    if in_flight:
+        raise ValueError(f'{in_flight} itens do lote ainda em execução; aguarde terminarem para retomar')
+
+    if job.status == 'running' and job.temporal_workflow_id:
+        # Runner sem sinal de vida: garantir que o run anterior não prepare mais páginas
+        from app.temporal.service import terminate_workflow
+        terminate_workflow(job.temporal_workflow_id, 'Lote retomado')
+
+    interrupted = job.items.filter_by(status='running').all()
+    for item in interrupted:
+        if item.execution_id:
+            WorkflowExecution.query.filter_by(id=item.execution_id, status='running').update(
+                {'status': 'failed', 'error_message': 'Interrompido (lote retomado)'},
+                synchronize_session=False
+            )
+        item.status = 'pending'
+        item.execution_id = None
+
+    # Reservados na preparação e não concluídos: voltam para a quota
+    Organization.release_documents(job.organization_id, len(interrupted))
+
+    if retry_failed:
+        job.items.filter_by(status='failed').update(
+            {'status': 'pending', 'execution_id': None, 'error_message': None},
+            synchronize_session=False
+        )
+
+    _recount(job)
+    job.error_message = None
+    db.session.commit()
+
+    return start_batch_job(job)
+
+
+def cancel_batch_job(job: BatchGenerationJob) -> BatchGenerationJob:
+    """Cancela o lote: itens pendentes não são iniciados (os em andamento terminam)"""
+    if job.status in BatchGenerationJob.TERMINAL_STATUSES:
+        return job
+
+    job.status = 'cancelled'
+    job.completed_at = datetime.utcnow()
+    db.session.commit()
+    return job
+
+
+def _runner_alive(job: BatchGenerationJob) -> bool:
+    """Runner do lote deu sinal de vida há menos de BATCH_HEARTBEAT_TIMEOUT"""
+    if job.heartbeat_at is None:
+        return False
+    return job.heartbeat_at > datetime.utcnow() - timedelta(seconds=HEARTBEAT_TIMEOUT)
+
+
+def _in_flight_items(job: BatchGenerationJob, runner_alive: bool) -> int:
+    """
+    Itens 'running' cuja execução ainda pode terminar.
+
+    No Temporal os filhos são duráveis e atualizam o status da execução; no
+    runner local, as execuções morrem com ele (heartbeat vencido).
+    """
+    running = job.items.filter_by(status='running')
+    if job.temporal_workflow_id:
+        return running.join(
+            WorkflowExecution, WorkflowExecution.id == BatchGenerationItem.execution_id
+        ).filter(WorkflowExecution.status.in_(('running', 'paused'))).count()
+    return running.count() if runner_alive else 0
+
+
+def prepare_next_items(
+    job_id: str,
+    limit: int = BATCH_PAGE_SIZE,
+    create_executions: bool = True
+) -> Dict[str, Any]:
+    """
+    Prepara a próxima página de itens pendentes.
+
+    Busca os dados da fonte em lote e cria uma WorkflowExecution por item
+    (trigger_type='batch', source_data já no trigger_data, então o trigger
+    node não consulta a fonte de novo). Itens que não existem na fonte ou
+    que não cabem na quota da organização são marcados como falha aqui mesmo.
+
+    Args:
+        job_id: ID do BatchGenerationJob
+        limit: Tamanho da página
+        create_executions: False no executor local, que cria a própria
+            execução (execution_id e source_data não são preenchidos)
+
+    Returns:
+        {cancelled: bool, items: [{item_id, execution_id, source_object_id}]}
+    """
+    job = BatchGenerationJob.query.get(job_id)
+    if not job:
+        raise ValueError(f'Lote não encontrado: {job_id}')
+
+    if create_executions:
+        # A activity é reexecutada quando a tentativa anterior commitou a
+        # página mas o resultado não chegou ao workflow (worker caiu, timeout).
+        # Os filhos de uma página sempre terminam antes da próxima preparação,
+        # então itens 'running' com execução nunca iniciada são essa página
+        prepared = _prepared_items(job, limit)
+        if job.status == 'cancelled':
+            _release_prepared(job, prepared)
+        elif prepared:
+            job.heartbeat_at = datetime.utcnow()
+            db.session.commit()
+            return {'cancelled': False, 'items': [_item_ref(item) for item in prepared]}
+
+    if job.status == 'cancelled':
+        return {'cancelled': True, 'items': []}
+
+    items = job.items.filter_by(status='pending').order_by(
+        BatchGenerationItem.position
+    ).limit(limit).all()
+
+    if not items:
+        return {'cancelled': False, 'items': []}
+
+    workflow = Workflow.query.get(job.workflow_id)
+    source_data = None
+    if create_executions:
+        source_data = _fetch_source_data(workflow, job.source_object_type, [i.source_object_id for i in items])
+
+    runnable = []
+    for item in items:
+        item.attempts = (item.attempts or 0) + 1
+        if source_data is not None and source_data.get(item.source_object_id) is None:
+            item.status = 'failed'
+            item.error_message = 'Objeto não encontrado na fonte'
+        else:
+            runnable.append(item)
+
+    # Quota da página inteira em um UPDATE; o que não couber falha aqui.
+    # Itens que falharem depois devolvem a unidade (record_item_result)
+    reserved = Organization.reserve_documents_up_to(job.organization_id, len(runnable))
+    for item in runnable[reserved:]:
+        item.status = 'failed'
+        item.error_message = QUOTA_EXCEEDED_MESSAGE
+
+    prepared = []
+    for item in runnable[:reserved]:
+        data = source_data.get(item.source_object_id) if source_data is not None else None
+
+        execution_id = None
+        if create_executions:
+            trigger_data = {
+                'source_object_id': item.source_object_id,
+                'source_object_type': job.source_object_type,
+                'batch_job_id': str(job.id),
+                'batch_item_id': str(item.id)
+            }
+            if data is not None:
+                trigger_data['source_data'] = data
+
+            execution = WorkflowExecution(
+                id=uuid.uuid4(),
+                workflow_id=job.workflow_id,
+                trigger_type='batch',
+                trigger_data=trigger_data,
+                status='running'
+            )
+            execution.temporal_workflow_id = f"exec_{execution.id}"
+            db.session.add(execution)
+            execution_id = execution.id
+
+        item.status = 'running'
+        item.execution_id = execution_id
+        item.error_message = None
+        prepared.append(_item_ref(item))
+
+    job.heartbeat_at = datetime.utcnow()
+    failed_now = len(items) - len(prepared)
+    if failed_now:
+        _increment(job.id, failed=failed_now)
+
+    db.session.commit()
+    return {'cancelled': False, 'items': prepared}
+
+
+def _prepared_items(job: BatchGenerationJob, limit: int) -> List[BatchGenerationItem]:
+    """Itens 'running' cuja execução não começou (nenhum node registrado)"""
+    return job.items.filter_by(status='running').join(
+        WorkflowExecution, WorkflowExecution.id == BatchGenerationItem.execution_id
+    ).filter(
+        WorkflowExecution.status == 'running',
+        WorkflowExecution.current_node_id.is_(None)
+    ).order_by(BatchGenerationItem.position).limit(limit).all()
+
+
+def _release_prepared(job: BatchGenerationJob, items: List[BatchGenerationItem]) -> None:
+    """Lote cancelado: a página preparada e nunca iniciada volta para 'pending'"""
+    if not items:
+        return
+
+    WorkflowExecution.query.filter(
+        WorkflowExecution.id.in_([item.execution_id for item in items])
+    ).update(
+        {'status': 'failed', 'error_message': 'Lote cancelado'},
+        synchronize_session=False
+    )
+    for item in items:
+        item.status = 'pending'
+        item.execution_id = None
+
+    Organization.release_documents(job.organization_id, len(items))
+    db.session.commit()
+
+
+def _item_ref(item: BatchGenerationItem) -> Dict[str, Any]:
+    """Item como retornado para o workflow do lote"""
+    return {
+        'item_id': str(item.id),
+        'execution_id': str(item.execution_id) if item.execution_id else None,
+        'source_object_id': item.source_object_id
+    }
+
+
+def record_item_result(item_id: str, status: str, error: Optional[str] = None) -> None:
+    """
+    Registra o resultado de um item e atualiza os contadores do lote.
+
+    Args:
+        item_id: ID do BatchGenerationItem
+        status: 'completed' | 'failed'
+        error: Mensagem de erro (status 'failed')
+    """
+    item = BatchGenerationItem.query.get(item_id)
+    if not item or item.status in ('completed', 'failed'):
+        return
+
+    item.status = 'completed' if status == 'completed' else 'failed'
+    item.error_message = error
+
+    if item.status == 'failed':
+        Organization.release_documents(item.job.organization_id)
+
+    if item.execution_id:
+        execution = WorkflowExecution.query.get(item.execution_id)
+        if execution:
+            item.generated_document_id = execution.generated_document_id
+
+    if item.status == 'completed':
+        _increment(item.job_id, completed=1)
+    else:
+        _increment(item.job_id, failed=1)
+
+    db.session.commit()
+
+
+def finalize_batch_job(job_id: str) -> Dict[str, Any]:
+    """Define o status final do lote a partir dos contadores"""
+    job = BatchGenerationJob.query.get(job_id)
+    if not job:
+        raise ValueError(f'Lote não encontrado: {job_id}')
+
+    if job.status != 'cancelled':
+        if job.failed_items and not job.completed_items:
+            job.status = 'failed'
+        elif job.failed_items:
+            job.status = 'completed_with_errors'
+        else:
+            job.status = 'completed'
+        job.completed_at = datetime.utcnow()
+
+    db.session.commit()
+    logger.info(
+        f"Lote {job.id} finalizado: {job.status} "
+        f"({job.completed_items} ok, {job.failed_items} falhas)"
+    )
+    return job.to_dict()
+
+
+def fail_batch_job(job_id: str, error_message: str) -> None:
+    """Marca o lote como falho (erro fora dos itens, ex: fonte indisponível)"""
+    job = BatchGenerationJob.query.get(job_id)
+    if job and job.status not in BatchGenerationJob.TERMINAL_STATUSES:
+        job.status = 'failed'
+        job.error_message = error_message
+        job.completed_at = datetime.utcnow()
+        db.session.commit()
+
+
+def _resolve_object_ids(workflow: Workflow, object_type: str, source: Dict[str, Any]):
+    """Resolve a origem do lote em uma lista de IDs"""
+    source = source or {}
+
+    if source.get('object_ids'):
+        object_ids = source['object_ids']
+        if not isinstance(object_ids, list):
+            raise ValueError('object_ids deve ser uma lista')
+        return object_ids, {'type': 'ids'}
+
+    if source.get('hubspot_list_id') or source.get('filter_groups'):
+        data_source = _hubspot_data_source(workflow)
+        if data_source is None:
+            raise ValueError('Workflow não possui conexão HubSpot configurada')
+
+        if source.get('hubspot_list_id'):
+            list_id = str(source['hubspot_list_id'])
+            ids = data_source.list_member_ids(list_id, max_results=MAX_BATCH_ITEMS + 1)
+            return ids, {'type': 'hubspot_list', 'list_id': list_id}
+
+        filter_groups = source['filter_groups']
+        ids = data_source.search_object_ids(
+            object_type, filter_groups, max_results=MAX_BATCH_ITEMS + 1
+        )
+        return ids, {'type': 'hubspot_filter', 'filter_groups': filter_groups}
+
+    raise ValueError('Informe object_ids, hubspot_list_id ou filter_groups')
+
+
+def _trigger_config(workflow: Workflow) -> Dict[str, Any]:
+    """Config do trigger node do workflow (vazio se não houver)"""
+    trigger = WorkflowNode.query.filter(
+        WorkflowNode.workflow_id == workflow.id,
+        WorkflowNode.node_type.in_(TRIGGER_NODE_TYPES)
+    ).order_by(WorkflowNode.position).first()
+    return (trigger.config or {}) if trigger else {}
+
+
+def _hubspot_data_source(workflow: Workflow):
+    """DataSource HubSpot do trigger node (ou da conexão do workflow)"""
+    from app.services.data_sources.hubspot import HubSpotDataSource
+
+    connection_id = _trigger_config(workflow).get('source_connection_id') or workflow.source_connection_id
+    if not connection_id:
+        return None
+
+    connection = DataSourceConnection.query.get(connection_id)
+    if connection is None or connection.source_type != 'hubspot':
+        return None
+    return HubSpotDataSource(connection)
+
+
+def _fetch_source_data(
+    workflow: Workflow,
+    object_type: str,
+    object_ids: List[str]
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    Busca os dados de uma página de objetos em lote.
+
+    Returns:
+        {object_id: source_data normalizado} ou None se a fonte não suporta
+        busca em lote (o trigger node busca individualmente)
+    """
+    from app.services.data_sources.property_planner import get_property_plan
+
+    data_source = _hubspot_data_source(workflow)
+    if data_source is None:
+        return None
+
+    additional_properties = [
+        m.source_field for m in workflow.field_mappings
+        if m.source_field and '.' not in m.source_field
+    ]
+
+    objects = data_source.get_objects_batch(
+        object_type, object_ids,
+        additional_properties=additional_properties or None,
+        plan=get_property_plan(workflow, object_type)
+    )
+
+    # Mesma normalização do trigger node (properties no nível raiz)
+    result = {}
+    for object_id, data in objects.items():
+        properties = data.pop('properties', {})
+        if isinstance(properties, dict):
+            data.update(properties)
+        result[object_id] = data
+    return result
+
+
+def _increment(job_id, completed: int = 0, failed: int = 0) -> None:
+    """Incrementa contadores sem ler a linha (UPDATE atômico; também é o heartbeat do runner)"""
+    BatchGenerationJob.query.filter_by(id=job_id).update(
+        {
+            BatchGenerationJob.completed_items: BatchGenerationJob.completed_items + completed,
+            BatchGenerationJob.failed_items: BatchGenerationJob.failed_items + failed,
+            BatchGenerationJob.heartbeat_at: datetime.utcnow(),
+        },
+        synchronize_session=False
+    )
+
+
+def _recount(job: BatchGenerationJob) -> None:
+    """Recalcula os contadores a partir dos itens"""
+    from sqlalchemy import func
+
+    counts = dict(
+        db.session.query(BatchGenerationItem.status, func.count())
+        .filter(BatchGenerationItem.job_id == job.id)
+        .group_by(BatchGenerationItem.status)
+        .all()
+    )
+    job.completed_items = counts.get('completed', 0)
+    job.failed_items = counts.get('failed', 0)
+
+
+def _start_local_runner(job_id: str) -> None:
+    """
+    Processa o lote em uma thread local (sem Temporal).
+
+    Usado em desenvolvimento; cada item roda pelo WorkflowExecutor.
+    """
+    from flask import current_app
+    app = current_app._get_current_object()
+
+    thread = threading.Thread(
+        target=_run_local, args=(app, job_id), name=f'batch-{job_id}', daemon=True
+    )
+    thread.start()
+
+
+def _run_local(app, job_id: str) -> None:
+    from app.services.workflow_executor import WorkflowExecutor
+
+    with app.app_context():
+        job = BatchGenerationJob.query.get(job_id)
+        concurrency = job.concurrency or 1
+        object_type = job.source_object_type
+        job_workflow_id = job.workflow_id
+
+    def run_item(item: Dict[str, Any]):
+        with app.app_context():
+            try:
+                workflow = Workflow.query.get(job_workflow_id)
+                execution = WorkflowExecutor().execute_workflow(
+                    workflow,
+                    item['source_object_id'],
+                    object_type
+                )
+                BatchGenerationItem.query.filter_by(id=item['item_id']).update(
+                    {'execution_id': execution.id}, synchronize_session=False
+                )
+                db.session.commit()
+                record_item_result(
+                    item['item_id'],
+                    'completed' if execution.status == 'completed' else 'failed',
+                    execution.error_message
+                )
+            except Exception as e:
+                db.session.rollback()
+                record_item_result(item['item_id'], 'failed', str(e))
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while True:
+                with app.app_context():
+                    page = prepare_next_items(job_id, create_executions=False)
+                if page['cancelled'] or not page['items']:
+                    break
+                list(pool.map(run_item, page['items']))
+
+        with app.app_context():
+            finalize_batch_job(job_id)
+    except Exception as e:
+        logger.exception(f"Erro no lote {job_id}: {e}")
+        with app.app_context():
+            fail_batch_job(job_id, str(e))
@@ -0,0 +1,256 @@
+"""
+Resolver de credenciais OAuth (Google, Microsoft) com cache em processo.
+
+Antes, cada consumidor (activity de documento, anexos de email, download
+para assinatura...) lia o token do banco, descriptografava e, se expirado,
+renovava e fazia commit - várias vezes na mesma execução. O resolver:
+
+- mantém em memória as credenciais já descriptografadas e válidas por
+  (organização, provedor[, conexão]), respeitando a expiração do token
+- renova em background quando o token entra na margem de expiração
+  (CREDENTIAL_REFRESH_MARGIN), devolvendo o token ainda válido enquanto isso
+- usa single-flight: chamadas concorrentes para a mesma chave aguardam a
+  mesma leitura/renovação em vez de chamar o endpoint de token várias vezes
+
+Cada entrada também expira após CREDENTIAL_CACHE_MAX_AGE, para que outros
+processos (ex: desconexão feita pela API) sejam refletidos no worker.
+As rotas de OAuth chamam invalidate() ao conectar/desconectar.
+"""
+import os
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+REFRESH_MARGIN = timedelta(seconds=int(os.getenv('CREDENTIAL_REFRESH_MARGIN', '300')))
+CACHE_MAX_AGE = timedelta(seconds=int(os.getenv('CREDENTIAL_CACHE_MAX_AGE', '600')))
+LOAD_TIMEOUT = 60  # espera máxima por uma leitura/renovação em andamento (s)
+
+GOOGLE = 'google'
+MICROSOFT = 'microsoft'
+
+CacheKey = Tuple[str, str, Optional[str]]
+
+
+class _Entry:
+    """Credencial em cache"""
+
+    __slots__ = ('value', 'expires_at', 'cached_at')
+
+    def __init__(self, value: Any, expires_at: Optional[datetime]):
+        self.value = value
+        self.expires_at = expires_at
+        self.cached_at = datetime.utcnow()
+
+
+class _Flight:
+    """Leitura/renovação em andamento compartilhada entre threads"""
+
+    __slots__ = ('done', 'entry')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.entry: Optional[_Entry] = None
+
+
+class CredentialResolver:
+    """Cache de credenciais OAuth por organização e provedor"""
+
+    def __init__(self, refresh_margin: timedelta = REFRESH_MARGIN, max_age: timedelta = CACHE_MAX_AGE):
+        self.refresh_margin = refresh_margin
+        self.max_age = max_age
+        self._entries: Dict[CacheKey, _Entry] = {}
+        self._flights: Dict[CacheKey, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def get_google_credentials(self, organization_id):
+        """
+        Retorna google.oauth2.credentials.Credentials válidas da organização.
+
+        Returns:
+            Credentials ou None (não conectado ou renovação falhou)
+        """
+        return self._get((str(organization_id), GOOGLE, None), self._load_google)
+
+    def get_microsoft_credentials(self, organization_id, connection_id=None) -> Optional[Dict[str, Any]]:
+        """
+        Retorna as credenciais Microsoft da organização.
+
+        Args:
+            organization_id: ID da organização
+            connection_id: Conexão específica (padrão: conexão Microsoft ativa)
+
+        Returns:
+            {access_token, refresh_token, expires_at, user_email} ou None
+        """
+        key = (str(organization_id), MICROSOFT, str(connection_id) if connection_id else None)
+        return self._get(key, self._load_microsoft)
+
+    def invalidate(self, organization_id, provider: Optional[str] = None) -> None:
+        """Remove do cache as credenciais da organização (todas ou de um provedor)"""
+        organization_id = str(organization_id)
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == organization_id]:
+                if provider is None or key[1] == provider:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key: CacheKey, loader):
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry is not None and self._is_usable(entry, now):
+            if self._needs_refresh(entry, now):
+                self._refresh_in_background(key, loader)
+            return entry.value
+
+        entry = self._single_flight(key, loader, force_refresh=False)
+        return entry.value if entry else None
+
+    def _is_usable(self, entry: _Entry, now: datetime) -> bool:
+        if now - entry.cached_at > self.max_age:
+            return False
+        return entry.expires_at is None or entry.expires_at > now
+
+    def _needs_refresh(self, entry: _Entry, now: datetime) -> bool:
+        return entry.expires_at is not None and entry.expires_at - now <= self.refresh_margin
+
+    def _single_flight(self, key: CacheKey, loader, force_refresh: bool) -> Optional[_Entry]:
+        """Executa o loader uma vez por chave; chamadas concorrentes aguardam o resultado"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait(LOAD_TIMEOUT)
+            return flight.entry
+
+        try:
+            flight.entry = loader(key, force_refresh)
+            with self._lock:
+                if flight.entry is not None:
+                    self._entries[key] = flight.entry
+                elif not force_refresh:
+                    # Renovação antecipada que falhou mantém o token ainda válido
+                    self._entries.pop(key, None)
+        except Exception as e:
+            logger.exception(f'Erro ao obter credenciais {key[1]} da organização {key[0]}: {e}')
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+        return flight.entry
+
+    def _refresh_in_background(self, key: CacheKey, loader) -> None:
+        """Renova o token antes de expirar sem bloquear quem chamou"""
+        with self._lock:
+            if key in self._flights:
+                return
+
+        from flask import current_app
+        app = current_app._get_current_object()
+
+        def refresh():
+            with app.app_context():
+                self._single_flight(key, loader, force_refresh=True)
+
+        threading.Thread(target=refresh, name=f'credential-refresh-{key[1]}', daemon=True).start()
+
+    @staticmethod
+    def _load_google(key: CacheKey, force_refresh: bool) -> Optional[_Entry]:
+        """Lê o token Google do banco e renova se expirado (ou se forçado)"""
+        from google.oauth2.credentials import Credentials
+        from google.auth.transport.requests import Request
+        from app.models import GoogleOAuthToken
+
+        token = GoogleOAuthToken.query.filter_by(organization_id=key[0]).first()
+        if not token:
+            return None
+
+        creds = Credentials.from_authorized_user_info(json.loads(token.access_token))
+
+        if force_refresh or creds.expired or token.is_expired():
+            if not creds.refresh_token:
+                return None
+            try:
+                creds.refresh(Request())
+            except Exception as e:
+                logger.error(f'Erro ao renovar token Google: {e}')
+                db.session.rollback()
+                return None
+            token.access_token = creds.to_json()
+            token.token_expiry = creds.expiry
+            db.session.commit()
+
+        return _Entry(creds, creds.expiry)
+
+    @staticmethod
+    def _load_microsoft(key: CacheKey, force_refresh: bool) -> Optional[_Entry]:
+        """Lê a conexão Microsoft do banco e renova se expirada (ou se forçado)"""
+        from app.models import DataSourceConnection
+        from app.routes.microsoft_oauth_routes import _refresh_microsoft_token
+
+        organization_id, _, connection_id = key
+        filters = {'organization_id': organization_id, 'source_type': 'microsoft'}
+        if connection_id:
+            filters['id'] = connection_id
+        else:
+            filters['status'] = 'active'
+
+        connection = DataSourceConnection.query.filter_by(**filters).first()
+        if not connection:
+            return None
+
+        credentials = connection.get_decrypted_credentials()
+        if not credentials.get('access_token'):
+            return None
+
+        expires_at = _parse_expiry(credentials.get('expires_at'))
+        if force_refresh or (expires_at is not None and expires_at < datetime.utcnow()):
+            if not _refresh_microsoft_token(connection):
+                return None
+            credentials = connection.get_decrypted_credentials()
+            expires_at = _parse_expiry(credentials.get('expires_at'))
+
+        return _Entry({
+            'access_token': credentials.get('access_token'),
+            'refresh_token': credentials.get('refresh_token'),
+            'expires_at': credentials.get('expires_at'),
+            'user_email': credentials.get('user_email'),
+        }, expires_at)
+
+
+def _parse_expiry(value: Optional[str]) -> Optional[datetime]:
+    """Converte expires_at ISO para datetime UTC sem timezone"""
+    if not value:
+        return None
+    expires_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if expires_at.tzinfo is not None:
+        expires_at = expires_at.replace(tzinfo=None) - expires_at.utcoffset()
+    return expires_at
+
+
+_resolver: Optional[CredentialResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_credential_resolver() -> CredentialResolver:
+    """Retorna singleton do resolver de credenciais"""
+    global _resolver
+    if _resolver is None:
+        with _resolver_lock:
+            if _resolver is None:
+                _resolver = CredentialResolver()
+    return _resolver
@@ -2,6 +2,7 @@ from typing import Dict, Any, List
 import requests
 import logging
 from .base import BaseDataSource
+from .hubspot_client import get_hubspot_client
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +17,10 @@ class HubSpotDataSource(BaseDataSource):
         super().__init__(connection)
         self.access_token = connection.credentials.get('access_token') if connection.credentials else None
         self.portal_id = connection.config.get('portal_id') if connection.config else None
+        self.client = get_hubspot_client(self.portal_id)
     
-    def _normalize_object_type(self, object_type: str) -> str:
+    @staticmethod
+    def _normalize_object_type(object_type: str) -> str:
         """
         Normaliza o tipo de objeto para o formato esperado pela API do HubSpot.
         Converte formas plurais para singulares e padroniza nomes.
@@ -40,12 +43,19 @@ class HubSpotDataSource(BaseDataSource):
             'quote': 'quote',
             'quotes': 'quote',
             'line_item': 'line_item',
-            'line_items': 'line_item'
+            'line_items': 'line_item',
+            'line items': 'line_item'
         }
         
         return normalization_map.get(object_type.lower(), object_type.lower())
     
-    def get_object_data(self, object_type: str, object_id: str, additional_properties: List[str] = None) -> Dict[str, Any]:
+    def get_object_data(
+        self,
+        object_type: str,
+        object_id: str,
+        additional_properties: List[str] = None,
+        plan=None
+    ) -> Dict[str, Any]:
         """
         Busca dados de um objeto específico do HubSpot.
         
@@ -53,6 +63,8 @@ class HubSpotDataSource(BaseDataSource):
             object_type: Tipo do objeto (contacts, deals, companies, tickets, quotes, line_items)
             object_id: ID do objeto
             additional_properties: Lista opcional de propriedades adicionais a buscar
+            plan: Plano de propriedades do workflow (property_planner); sem
+                plano, usa as propriedades e associações padrão
         
         Returns:
             Dict com os dados do objeto, incluindo propriedades e associações
@@ -79,11 +91,14 @@ class HubSpotDataSource(BaseDataSource):
         
         url = f"{self.BASE_URL}/{endpoint}/{object_id}"
         
-        # Combinar propriedades padrão com adicionais
-        default_props = self._get_default_properties(object_type)
+        # Combinar propriedades padrão (ou planejadas) com adicionais
+        if plan is not None:
+            default_props = ','.join(plan.properties_for(object_type))
+        else:
+            default_props = self._get_default_properties(object_type)
         if additional_properties:
             # Converter string de propriedades padrão em lista
-            default_props_list = default_props.split(',') if default_props != '*' else []
+            default_props_list = default_props.split(',') if default_props not in ('*', '') else []
             # Adicionar propriedades adicionais (removendo duplicatas)
             all_properties = list(set(default_props_list + additional_properties))
             # Se tinha '*', manter '*', senão juntar com vírgula
@@ -94,11 +109,15 @@ class HubSpotDataSource(BaseDataSource):
         else:
             properties_param = default_props
         
-        # Buscar propriedades e associações
-        params = {
-            'properties': properties_param,
-            'associations': self._get_default_associations(object_type)
-        }
+        associations = list(plan.associations) if plan is not None else self._get_default_associations(object_type)
+        
+        # Buscar propriedades e associações (sem propriedades, o HubSpot
+        # devolve as básicas do objeto)
+        params = {}
+        if properties_param:
+            params['properties'] = properties_param
+        if associations:
+            params['associations'] = associations
         
         headers = {
             'Authorization': f'Bearer {self.access_token}',
@@ -106,7 +125,7 @@ class HubSpotDataSource(BaseDataSource):
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.client.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -118,15 +137,30 @@ class HubSpotDataSource(BaseDataSource):
                 'associations': {}
             }
             
-            # Processar associações
-            if 'associations' in data:
-                for assoc_type, assoc_data in data['associations'].items():
-                    results = assoc_data.get('results', [])
-                    if results:
-                        # Buscar detalhes das associações
-                        normalized['associations'][assoc_type] = self._fetch_associations(
-                            object_type, object_id, assoc_type
-                        )
+            # IDs associados já vêm no GET; só associações paginadas
+            # (mais resultados que o GET devolve) usam a API v4 batch
+            # (o v3 nomeia as chaves à sua maneira, ex: "line items")
+            response_associations = {
+                self._normalize_object_type(key): value
+                for key, value in data.get('associations', {}).items()
+            }
+            for assoc_type in associations:
+                assoc_data = response_associations.get(self._normalize_object_type(assoc_type))
+                if not assoc_data:
+                    continue
+                if assoc_data.get('paging', {}).get('next'):
+                    associated_ids = self._fetch_associations_batch(
+                        object_type, [str(object_id)], assoc_type, headers
+                    ).get(str(object_id), [])
+                else:
+                    associated_ids = [r.get('id') for r in assoc_data.get('results', []) if r.get('id')]
+                
+                # O v3 repete o mesmo ID para cada tipo de associação (ex: primary)
+                associated_ids = list(dict.fromkeys(associated_ids))
+                if associated_ids:
+                    normalized['associations'][assoc_type] = associated_ids
+            
+            self.hydrate_associations([normalized], headers, plan)
             
             return normalized
             
@@ -134,42 +168,305 @@ class HubSpotDataSource(BaseDataSource):
             logger.error(f"Erro ao buscar objeto do HubSpot: {str(e)}")
             raise Exception(f'Erro ao buscar dados do HubSpot: {str(e)}')
     
-    def _fetch_associations(self, object_type: str, object_id: str, association_type: str) -> List[Dict]:
-        """Busca detalhes de objetos associados usando API v4"""
+    # Limite de inputs por chamada das APIs batch do HubSpot
+    BATCH_CHUNK_SIZE = 100
+    
+    OBJECT_PATHS = {
+        'contact': 'contacts',
+        'company': 'companies',
+        'deal': 'deals',
+        'ticket': 'tickets',
+        'quote': 'quotes',
+        'line_item': 'line_items'
+    }
+    
+    def get_objects_batch(
+        self,
+        object_type: str,
+        object_ids: List[str],
+        additional_properties: List[str] = None,
+        plan=None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Busca vários objetos com as APIs batch (v3 batch/read + v4 associations).
+        
+        Mesmo formato de get_object_data (incluindo objetos associados
+        hidratados), mas com ceil(N/100) chamadas por tipo (objeto, cada
+        associação e cada tipo associado) em vez de N chamadas.
+        
+        Args:
+            object_type: Tipo do objeto
+            object_ids: IDs dos objetos
+            additional_properties: Propriedades adicionais a buscar
+            plan: Plano de propriedades do workflow (ver get_object_data)
+        
+        Returns:
+            {object_id: {id, properties, associations}} (IDs não encontrados ficam de fora)
+        """
+        if not self.access_token:
+            raise Exception('HubSpot access token não configurado')
+        
+        normalized_type = self._normalize_object_type(object_type)
+        object_path = self.OBJECT_PATHS.get(normalized_type)
+        if not object_path:
+            raise Exception(f'Tipo de objeto não suportado: {object_type}')
+        
+        if plan is not None:
+            properties = plan.properties_for(object_type)
+            association_types = list(plan.associations)
+        else:
+            default_props = self._get_default_properties(object_type)
+            properties = [] if default_props == '*' else default_props.split(',')
+            association_types = self._get_default_associations(object_type)
+        properties = list(dict.fromkeys(properties + (additional_properties or [])))
+        
+        headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/json'
+        }
+        
+        objects: Dict[str, Dict[str, Any]] = {}
+        ids = [str(i) for i in object_ids]
+        
         try:
-            # Normalizar tipos de objeto
-            normalized_from_type = self._normalize_object_type(object_type)
-            normalized_to_type = self._normalize_object_type(association_type)
+            for object_id, properties_data in self._read_objects_batch(
+                normalized_type, ids, properties, headers
+            ).items():
+                objects[object_id] = {
+                    'id': object_id,
+                    'properties': properties_data,
+                    'associations': {}
+                }
             
-            # Usar endpoint correto da API v4 para buscar associações individuais
-            # Formato: /crm/v4/objects/{fromObjectType}/{fromObjectId}/associations/{toObjectType}
-            url = f"{self.BASE_URL}/crm/v4/objects/{normalized_from_type}/{object_id}/associations/{normalized_to_type}"
+            for association_type in association_types:
+                associations = self._fetch_associations_batch(
+                    object_type, list(objects.keys()), association_type, headers
+                )
+                for object_id, associated_ids in associations.items():
+                    if associated_ids and object_id in objects:
+                        objects[object_id]['associations'][association_type] = associated_ids
             
-            headers = {
-                'Authorization': f'Bearer {self.access_token}',
-                'Content-Type': 'application/json'
-            }
+            self.hydrate_associations(list(objects.values()), headers, plan)
             
-            response = requests.get(url, headers=headers)
-            if response.ok:
-                data = response.json()
-                # A resposta da API v4 retorna objetos com toObjectId
-                results = data.get('results', [])
-                # Extrair IDs dos objetos associados
-                associated_ids = []
-                for result in results:
-                    to_object_id = result.get('toObjectId')
-                    if to_object_id:
-                        associated_ids.append(to_object_id)
-                return associated_ids
+            return objects
             
-            return []
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro ao buscar objetos em lote do HubSpot: {str(e)}")
+            raise Exception(f'Erro ao buscar dados do HubSpot: {str(e)}')
+    
+    def hydrate_associations(
+        self,
+        objects: List[Dict[str, Any]],
+        headers: Dict[str, str],
+        plan=None
+    ) -> None:
+        """
+        Carrega os objetos associados e os mescla nos dados de origem.
+        
+        Junta os IDs associados de todos os objetos e busca cada tipo com
+        v3 batch/read (chunks de 100), então um deal com 3 contatos, 1 empresa
+        e 40 line items custa uma chamada por tipo. Cada objeto recebe, no
+        nível raiz:
+        
+        - plural (contacts, companies, line_items...): lista de {id, **properties}
+        - singular (contact, company, line_item...): o primeiro da lista
+        
+        Assim templates usam {{company.name}} e {{contact.email}}. Propriedades
+        do próprio objeto com o mesmo nome têm precedência na normalização.
+        Com plano, cada tipo traz só as propriedades planejadas.
+        Falhas ao carregar um tipo são logadas e deixam o tipo sem hidratação.
+        """
+        ids_by_type: Dict[str, Dict[str, None]] = {}
+        for obj in objects:
+            for assoc_type, associated_ids in obj.get('associations', {}).items():
+                type_ids = ids_by_type.setdefault(self._normalize_object_type(assoc_type), {})
+                type_ids.update(dict.fromkeys(str(i) for i in associated_ids))
+        
+        records_by_type: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        for assoc_type, type_ids in ids_by_type.items():
+            if assoc_type not in self.OBJECT_PATHS:
+                continue
+            if plan is not None:
+                properties = plan.properties_for(assoc_type)
+            else:
+                default_props = self._get_default_properties(assoc_type)
+                properties = [] if default_props == '*' else default_props.split(',')
+            try:
+                records_by_type[assoc_type] = self._read_objects_batch(
+                    assoc_type, list(type_ids), properties, headers
+                )
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Erro ao carregar objetos associados ({assoc_type}): {str(e)}")
+        
+        for obj in objects:
+            for assoc_type, associated_ids in obj.get('associations', {}).items():
+                normalized_type = self._normalize_object_type(assoc_type)
+                records = records_by_type.get(normalized_type)
+                if records is None:
+                    continue
+                hydrated = [
+                    {'id': str(i), **records[str(i)]} for i in associated_ids if str(i) in records
+                ]
+                obj[self.OBJECT_PATHS[normalized_type]] = hydrated
+                obj[normalized_type] = hydrated[0] if hydrated else None
+    
+    def _read_objects_batch(
+        self,
+        object_type: str,
+        object_ids: List[str],
+        properties: List[str],
+        headers: Dict[str, str]
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Lê propriedades de vários objetos de um tipo (API v3 batch/read).
+        
+        Returns:
+            {object_id: properties} (IDs não encontrados ficam de fora)
+        
+        Raises:
+            requests.exceptions.RequestException: Erro HTTP do HubSpot
+        """
+        url = f"{self.BASE_URL}/crm/v3/objects/{self.OBJECT_PATHS[object_type]}/batch/read"
+        
+        records: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(object_ids), self.BATCH_CHUNK_SIZE):
+            chunk = object_ids[start:start + self.BATCH_CHUNK_SIZE]
+            body = {'inputs': [{'id': object_id} for object_id in chunk]}
+            if properties:
+                body['properties'] = properties
             
-        except Exception as e:
-            logger.warning(f"Erro ao buscar associações: {str(e)}")
-            return []
+            response = self.client.post(url, headers=headers, json=body)
+            response.raise_for_status()
+            
+            for result in response.json().get('results', []):
+                records[str(result.get('id'))] = result.get('properties', {})
+        
+        return records
+    
+    def _fetch_associations_batch(
+        self,
+        object_type: str,
+        object_ids: List[str],
+        association_type: str,
+        headers: Dict[str, str]
+    ) -> Dict[str, List]:
+        """Busca IDs associados de vários objetos (API v4 batch)"""
+        from_type = self._normalize_object_type(object_type)
+        to_type = self._normalize_object_type(association_type)
+        url = f"{self.BASE_URL}/crm/v4/associations/{from_type}/{to_type}/batch/read"
+        
+        associations: Dict[str, List] = {}
+        for start in range(0, len(object_ids), self.BATCH_CHUNK_SIZE):
+            chunk = object_ids[start:start + self.BATCH_CHUNK_SIZE]
+            response = self.client.post(
+                url, headers=headers,
+                json={'inputs': [{'id': object_id} for object_id in chunk]}
+            )
+            # 207 (multi-status) quando parte dos objetos não tem associações
+            if not response.ok:
+                logger.warning(f"Erro ao buscar associações em lote ({to_type}): {response.status_code}")
+                continue
+            
+            for result in response.json().get('results', []):
+                from_id = str(result.get('from', {}).get('id'))
+                associations[from_id] = [
+                    to.get('toObjectId') for to in result.get('to', []) if to.get('toObjectId')
+                ]
+        
+        return associations
+    
+    def list_member_ids(self, list_id: str, max_results: int = None) -> List[str]:
+        """
+        Retorna os IDs dos registros de uma lista do HubSpot (Lists API v3).
+        
+        Args:
+            list_id: ID da lista (ILS list id)
+            max_results: Limite opcional de IDs
+        """
+        if not self.access_token:
+            raise Exception('HubSpot access token não configurado')
+        
+        headers = {'Authorization': f'Bearer {self.access_token}'}
+        url = f"{self.BASE_URL}/crm/v3/lists/{list_id}/memberships"
+        
+        ids: List[str] = []
+        after = None
+        try:
+            while True:
+                params = {'limit': 250}
+                if after:
+                    params['after'] = after
+                response = self.client.get(url, headers=headers, params=params)
+                response.raise_for_status()
+                data = response.json()
+                
+                ids.extend(str(r['recordId']) for r in data.get('results', []) if r.get('recordId'))
+                if max_results and len(ids) >= max_results:
+                    return ids[:max_results]
+                
+                after = data.get('paging', {}).get('next', {}).get('after')
+                if not after:
+                    return ids
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro ao buscar membros da lista do HubSpot: {str(e)}")
+            raise Exception(f'Erro ao buscar lista do HubSpot: {str(e)}')
+    
+    def search_object_ids(
+        self,
+        object_type: str,
+        filter_groups: List[Dict[str, Any]],
+        max_results: int = None
+    ) -> List[str]:
+        """
+        Retorna os IDs de objetos que atendem aos filtros (Search API v3).
+        
+        Args:
+            object_type: Tipo do objeto
+            filter_groups: filterGroups no formato da Search API
+            max_results: Limite opcional de IDs (a Search API pagina até 10.000)
+        """
+        if not self.access_token:
+            raise Exception('HubSpot access token não configurado')
+        
+        object_path = self.OBJECT_PATHS.get(self._normalize_object_type(object_type))
+        if not object_path:
+            raise Exception(f'Tipo de objeto não suportado: {object_type}')
+        
+        headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/json'
+        }
+        url = f"{self.BASE_URL}/crm/v3/objects/{object_path}/search"
+        
+        ids: List[str] = []
+        after = None
+        try:
+            while True:
+                body = {
+                    'filterGroups': filter_groups,
+                    'properties': ['hs_object_id'],
+                    'sorts': [{'propertyName': 'hs_object_id', 'direction': 'ASCENDING'}],
+                    'limit': 100
+                }
+                if after:
+                    body['after'] = after
+                response = self.client.post(url, headers=headers, json=body)
+                response.raise_for_status()
+                data = response.json()
+                
+                ids.extend(str(r['id']) for r in data.get('results', []))
+                if max_results and len(ids) >= max_results:
+                    return ids[:max_results]
+                
+                after = data.get('paging', {}).get('next', {}).get('after')
+                if not after:
+                    return ids
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Erro ao buscar objetos no HubSpot: {str(e)}")
+            raise Exception(f'Erro ao buscar objetos no HubSpot: {str(e)}')
     
-    def _get_default_properties(self, object_type: str) -> str:
+    @staticmethod
+    def _get_default_properties(object_type: str) -> str:
         """Retorna propriedades padrão para cada tipo de objeto"""
         property_map = {
             'contact': 'firstname,lastname,email,phone,company,lifecyclestage,hs_lead_status',
@@ -188,7 +485,8 @@ class HubSpotDataSource(BaseDataSource):
         
         return property_map.get(object_type.lower(), '*')
     
-    def _get_default_associations(self, object_type: str) -> List[str]:
+    @staticmethod
+    def _get_default_associations(object_type: str) -> List[str]:
         """Retorna associações padrão para cada tipo de objeto"""
         assoc_map = {
             'contact': ['companies', 'deals'],
@@ -248,7 +546,7 @@ class HubSpotDataSource(BaseDataSource):
         }
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self.client.get(url, headers=headers, params=params)
             response.raise_for_status()
             
             data = response.json()
@@ -275,7 +573,7 @@ class HubSpotDataSource(BaseDataSource):
                 'Content-Type': 'application/json'
             }
             
-            response = requests.get(url, headers=headers, timeout=5)
+            response = self.client.get(url, headers=headers, timeout=5)
             return response.ok
             
         except Exception as e:
@@ -318,7 +616,7 @@ class HubSpotDataSource(BaseDataSource):
         }
         
         try:
-            response = requests.get(url, headers=headers)
+            response = self.client.get(url, headers=headers)
             response.raise_for_status()
             
             data = response.json()
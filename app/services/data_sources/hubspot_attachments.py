@@ -3,10 +3,13 @@ import requests
 import logging
 import time
 from .hubspot import HubSpotDataSource
+from .hubspot_client import get_hubspot_client
 from app.utils.encryption import decrypt_credentials
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_TIMEOUT = 120  # uploads de PDF/DOCX grandes
+
 
 class HubSpotAttachmentService:
     """
@@ -36,6 +39,8 @@ class HubSpotAttachmentService:
         
         if not self.access_token:
             raise Exception('HubSpot access token não configurado')
+        
+        self.client = get_hubspot_client(connection.config.get('portal_id') if connection.config else None)
     
     def _normalize_object_type_for_api(self, object_type: str) -> str:
         """
@@ -105,7 +110,7 @@ class HubSpotAttachmentService:
             data['folderPath'] = folder_path
         
         try:
-            response = requests.post(url, headers=headers, files=files, data=data)
+            response = self.client.post(url, headers=headers, files=files, data=data, timeout=UPLOAD_TIMEOUT)
             response.raise_for_status()
             
             result = response.json()
@@ -173,7 +178,7 @@ class HubSpotAttachmentService:
         }
         
         try:
-            response = requests.post(url, headers=headers, json=payload)
+            response = self.client.post(url, headers=headers, json=payload)
             response.raise_for_status()
             
             result = response.json()
@@ -242,7 +247,7 @@ class HubSpotAttachmentService:
         }
         
         try:
-            response = requests.patch(url, headers=headers, json=payload)
+            response = self.client.patch(url, headers=headers, json=payload)
             response.raise_for_status()
             
             result = response.json()
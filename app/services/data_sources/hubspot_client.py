@@ -0,0 +1,250 @@
+"""
+Cliente HTTP compartilhado para a API do HubSpot, um por portal.
+
+Os conectores chamavam requests.get/post soltos: uma conexão TCP/TLS nova
+por chamada, quase sempre sem timeout e sem tratar 429. O cliente:
+
+- reaproveita conexões com um requests.Session (pool keep-alive)
+- aplica timeout padrão (HUBSPOT_REQUEST_TIMEOUT)
+- limita as chamadas com um token bucket por portal, dimensionado pelos
+  headers X-HubSpot-RateLimit-Max / -Interval-Milliseconds / -Remaining
+- em 429 (e 502/503/504 em GET) espera Retry-After (ou backoff
+  exponencial) e tenta de novo, até HUBSPOT_MAX_RETRIES vezes
+- guarda métricas por portal (get_hubspot_metrics)
+
+O token de acesso continua sendo passado pelo chamador nos headers; o
+cliente só cuida do transporte.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = float(os.getenv('HUBSPOT_REQUEST_TIMEOUT', '30'))
+MAX_RETRIES = int(os.getenv('HUBSPOT_MAX_RETRIES', '3'))
+POOL_SIZE = int(os.getenv('HUBSPOT_POOL_SIZE', '10'))
+# Limite padrão até o primeiro response trazer os headers (apps OAuth: 100/10s)
+DEFAULT_RATE_LIMIT = int(os.getenv('HUBSPOT_RATE_LIMIT_MAX', '100'))
+DEFAULT_RATE_INTERVAL = float(os.getenv('HUBSPOT_RATE_LIMIT_INTERVAL', '10'))
+MAX_RETRY_AFTER = 60.0
+
+RETRYABLE_GET_STATUS = {502, 503, 504}
+
+
+class _TokenBucket:
+    """Token bucket com capacidade/intervalo ajustáveis"""
+
+    def __init__(self, capacity: int, interval: float):
+        self.capacity = capacity
+        self.interval = interval
+        self.tokens = float(capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.interval
+
+    def acquire(self) -> float:
+        """Consome um token, esperando se necessário. Retorna o tempo esperado (s)"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def update(self, capacity: Optional[int], interval: Optional[float], remaining: Optional[int]) -> None:
+        """Ajusta o bucket ao limite informado pelo HubSpot"""
+        with self._lock:
+            self._refill()
+            if capacity and interval and (capacity != self.capacity or interval != self.interval):
+                self.capacity = capacity
+                self.interval = interval
+                self.tokens = min(self.tokens, float(capacity))
+            if remaining is not None:
+                self.tokens = min(self.tokens, float(remaining))
+
+    def pause(self, seconds: float) -> None:
+        """Esvazia o bucket para que ninguém chame o portal pelos próximos segundos"""
+        with self._lock:
+            self._refill()
+            self.tokens = min(self.tokens, 0.0) - seconds * self.rate
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(float(self.capacity), self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class HubSpotClient:
+    """Sessão HTTP + rate limit + métricas de um portal HubSpot"""
+
+    def __init__(
+        self,
+        portal_id: Optional[str] = None,
+        timeout: float = REQUEST_TIMEOUT,
+        max_retries: int = MAX_RETRIES,
+        pool_size: int = POOL_SIZE
+    ):
+        self.portal_id = portal_id
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._bucket = _TokenBucket(DEFAULT_RATE_LIMIT, DEFAULT_RATE_INTERVAL)
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {
+            'requests': 0,
+            'errors': 0,
+            'throttled': 0,
+            'retries': 0,
+            'wait_seconds': 0.0,
+            'rate_limit_max': DEFAULT_RATE_LIMIT,
+            'rate_limit_remaining': None,
+            'daily_remaining': None,
+        }
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PATCH', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Executa a chamada respeitando o rate limit do portal.
+
+        Aceita os mesmos argumentos de requests.request. Depois das
+        tentativas, devolve o último response (inclusive 429) para o chamador
+        tratar com raise_for_status como antes.
+
+        Raises:
+            requests.exceptions.RequestException: Falha de rede/timeout
+        """
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            self._record('wait_seconds', self._bucket.acquire())
+            self._record('requests')
+
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException:
+                self._record('errors')
+                raise
+
+            self._observe(response)
+
+            retryable = response.status_code == 429 or (
+                method == 'GET' and response.status_code in RETRYABLE_GET_STATUS
+            )
+            if not retryable:
+                if response.status_code >= 400:
+                    self._record('errors')
+                return response
+
+            if response.status_code == 429:
+                self._record('throttled')
+            if attempt == self.max_retries:
+                self._record('errors')
+                return response
+
+            delay = self._retry_delay(response, attempt)
+            logger.warning(
+                f'HubSpot {response.status_code} (portal {self.portal_id}); '
+                f'nova tentativa em {delay:.1f}s'
+            )
+            if response.status_code == 429:
+                # Outras threads do mesmo portal também esperam
+                self._bucket.pause(delay)
+            else:
+                time.sleep(delay)
+            self._record('retries')
+
+        return response
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._metrics_lock:
+            return dict(self._metrics)
+
+    def _observe(self, response: requests.Response) -> None:
+        """Atualiza o bucket e as métricas a partir dos headers de rate limit"""
+        headers = response.headers
+        capacity = _int_header(headers, 'X-HubSpot-RateLimit-Max')
+        interval_ms = _int_header(headers, 'X-HubSpot-RateLimit-Interval-Milliseconds')
+        remaining = _int_header(headers, 'X-HubSpot-RateLimit-Remaining')
+        daily_remaining = _int_header(headers, 'X-HubSpot-RateLimit-Daily-Remaining')
+
+        self._bucket.update(capacity, interval_ms / 1000 if interval_ms else None, remaining)
+
+        with self._metrics_lock:
+            if capacity is not None:
+                self._metrics['rate_limit_max'] = capacity
+            if remaining is not None:
+                self._metrics['rate_limit_remaining'] = remaining
+            if daily_remaining is not None:
+                self._metrics['daily_remaining'] = daily_remaining
+
+    @staticmethod
+    def _retry_delay(response: requests.Response, attempt: int) -> float:
+        retry_after = response.headers.get('Retry-After')
+        if retry_after:
+            try:
+                return min(MAX_RETRY_AFTER, max(0.0, float(retry_after)))
+            except ValueError:
+                pass
+        return min(MAX_RETRY_AFTER, float(2 ** attempt))
+
+    def _record(self, name: str, value: float = 1) -> None:
+        with self._metrics_lock:
+            self._metrics[name] += value
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+_clients: Dict[str, HubSpotClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_hubspot_client(portal_id=None) -> HubSpotClient:
+    """Retorna o cliente do portal (criado na primeira chamada)"""
+    key = str(portal_id) if portal_id else 'default'
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = HubSpotClient(portal_id=key)
+    return client
+
+
+def get_hubspot_metrics(portal_ids=None) -> Dict[str, Dict[str, Any]]:
+    """Métricas dos clientes deste processo ({portal_id: métricas})"""
+    with _clients_lock:
+        clients = dict(_clients)
+    if portal_ids is not None:
+        wanted = {str(p) for p in portal_ids}
+        clients = {k: v for k, v in clients.items() if k in wanted}
+    return {portal_id: client.metrics() for portal_id, client in clients.items()}
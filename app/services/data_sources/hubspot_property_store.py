@@ -0,0 +1,279 @@
+"""
+Metadados de propriedades HubSpot com stale-while-revalidate.
+
+A tabela hubspot_property_cache já existia, mas a leitura sem cache (ou o
+refresh) buscava crm/v3/properties/{type} no HubSpot na hora e gravava
+linha a linha. Aqui:
+
+- leituras servem o que está no banco, mesmo vencido; se passou do prazo
+  de frescor do tipo (PROPERTY_FRESHNESS), um refresh roda em background
+- o refresh grava em lote (INSERT ... ON CONFLICT em
+  unique_org_object_property) e remove propriedades que não vieram mais
+  (arquivadas/excluídas no HubSpot)
+- um memo em processo (HUBSPOT_PROPERTY_MEMO_TTL) evita ir ao banco a cada
+  abertura da tela de mapeamento
+
+Só quando não há nada no banco a leitura espera o HubSpot.
+"""
+import os
+import time
+import uuid
+import logging
+import threading
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import db
+from app.models import DataSourceConnection, HubSpotPropertyCache
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FRESHNESS = int(os.getenv('HUBSPOT_PROPERTY_CACHE_TTL', '3600'))
+MEMO_TTL = float(os.getenv('HUBSPOT_PROPERTY_MEMO_TTL', '60'))
+UPSERT_CHUNK_SIZE = 1000
+
+# Tipos de objeto aceitos pelas rotas (e os únicos gravados no cache)
+OBJECT_TYPES = ('deal', 'contact', 'company', 'ticket')
+
+# Frescor por tipo (s): deals costumam ganhar propriedades novas com mais frequência
+PROPERTY_FRESHNESS = {
+    'deal': min(DEFAULT_FRESHNESS, 900),
+    'contact': DEFAULT_FRESHNESS,
+    'company': DEFAULT_FRESHNESS,
+    'ticket': DEFAULT_FRESHNESS,
+}
+
+StoreKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PropertySnapshot:
+    """Propriedades de um tipo de objeto como estão no cache"""
+    properties: List[Dict[str, Any]]
+    cached_at: Optional[datetime]
+    loaded_at: float
+    from_cache: bool = True  # False quando acabou de vir do HubSpot
+
+    def is_stale(self, object_type: str) -> bool:
+        if self.cached_at is None:
+            return True
+        freshness = PROPERTY_FRESHNESS.get(object_type, DEFAULT_FRESHNESS)
+        return datetime.utcnow() - self.cached_at > timedelta(seconds=freshness)
+
+
+class HubSpotPropertyStore:
+    """Cache de propriedades HubSpot por (organização, tipo de objeto)"""
+
+    def __init__(self, memo_ttl: float = MEMO_TTL):
+        self.memo_ttl = memo_ttl
+        self._memo: Dict[StoreKey, PropertySnapshot] = {}
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+
+    def get(self, organization_id, object_type: str, force_refresh: bool = False) -> Tuple[PropertySnapshot, bool]:
+        """
+        Propriedades do tipo de objeto.
+
+        Args:
+            organization_id: ID da organização
+            object_type: deal, contact, company, ticket
+            force_refresh: Buscar no HubSpot agora (ignora o cache)
+
+        Returns:
+            (snapshot, stale) - stale indica que um refresh foi disparado em background
+
+        Raises:
+            Exception: Sem conexão HubSpot ativa ou erro do HubSpot (só quando
+                não há cache para servir)
+        """
+        key = (str(organization_id), object_type)
+
+        if force_refresh:
+            return self.refresh(organization_id, object_type), False
+
+        snapshot = self._get_memo(key)
+        if snapshot is None:
+            snapshot = self._load(key)
+            if snapshot is None:
+                return self.refresh(organization_id, object_type), False
+            self._set_memo(key, snapshot)
+
+        stale = snapshot.is_stale(object_type)
+        if stale:
+            self._refresh_in_background(key)
+        return snapshot, stale
+
+    def refresh(self, organization_id, object_type: str) -> PropertySnapshot:
+        """
+        Busca as propriedades no HubSpot e regrava o cache em lote.
+
+        Raises:
+            ValueError: object_type fora de OBJECT_TYPES
+        """
+        from app.services.data_sources.hubspot import HubSpotDataSource
+
+        if object_type not in OBJECT_TYPES:
+            raise ValueError(f'object_type deve ser um de: {", ".join(OBJECT_TYPES)}')
+
+        connection = DataSourceConnection.query.filter_by(
+            organization_id=organization_id,
+            source_type='hubspot',
+            status='active'
+        ).first()
+        if not connection:
+            raise Exception('Conexão HubSpot não encontrada ou não está ativa')
+
+        properties = HubSpotDataSource(connection).get_object_properties(object_type)
+        cached_at = datetime.utcnow()
+        rows = _rows(organization_id, object_type, properties, cached_at)
+
+        try:
+            for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+                db.session.execute(upsert_statement(rows[start:start + UPSERT_CHUNK_SIZE]))
+
+            # Propriedades que não vieram mais foram arquivadas/excluídas
+            # (resposta vazia não apaga o cache)
+            if rows:
+                HubSpotPropertyCache.query.filter(
+                    HubSpotPropertyCache.organization_id == organization_id,
+                    HubSpotPropertyCache.object_type == object_type,
+                    HubSpotPropertyCache.property_name.notin_([r['property_name'] for r in rows])
+                ).delete(synchronize_session=False)
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        snapshot = PropertySnapshot(
+            properties=[_to_dict(object_type, row) for row in rows],
+            cached_at=cached_at,
+            loaded_at=time.monotonic()
+        )
+        self._set_memo((str(organization_id), object_type), snapshot)
+        return replace(snapshot, from_cache=False)
+
+    def invalidate(self, organization_id) -> None:
+        """Descarta o memo da organização (o banco continua servindo)"""
+        organization_id = str(organization_id)
+        with self._lock:
+            for key in [k for k in self._memo if k[0] == organization_id]:
+                del self._memo[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memo.clear()
+
+    def _get_memo(self, key: StoreKey) -> Optional[PropertySnapshot]:
+        with self._lock:
+            snapshot = self._memo.get(key)
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at <= self.memo_ttl:
+            return snapshot
+        return None
+
+    def _set_memo(self, key: StoreKey, snapshot: PropertySnapshot) -> None:
+        with self._lock:
+            self._memo[key] = snapshot
+
+    @staticmethod
+    def _load(key: StoreKey) -> Optional[PropertySnapshot]:
+        """Lê o cache do banco (None se vazio)"""
+        organization_id, object_type = key
+        rows = HubSpotPropertyCache.query.filter_by(
+            organization_id=organization_id,
+            object_type=object_type
+        ).order_by(HubSpotPropertyCache.property_name).all()
+        if not rows:
+            return None
+
+        # O mais antigo define o frescor do conjunto
+        cached_at = [row.cached_at for row in rows if row.cached_at]
+        return PropertySnapshot(
+            properties=[row.to_dict() for row in rows],
+            cached_at=min(cached_at) if cached_at else None,
+            loaded_at=time.monotonic()
+        )
+
+    def _refresh_in_background(self, key: StoreKey) -> None:
+        """Atualiza o cache sem bloquear quem chamou (um refresh por chave)"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        from flask import current_app
+        app = current_app._get_current_object()
+
+        def refresh():
+            try:
+                with app.app_context():
+                    self.refresh(*key)
+            except Exception as e:
+                logger.warning(f'Erro ao atualizar propriedades HubSpot {key[1]} da organização {key[0]}: {e}')
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, name=f'hubspot-properties-{key[1]}', daemon=True).start()
+
+
+def upsert_statement(rows: List[Dict[str, Any]]):
+    """INSERT ... ON CONFLICT (unique_org_object_property) DO UPDATE"""
+    statement = insert(HubSpotPropertyCache.__table__).values(rows)
+    return statement.on_conflict_do_update(
+        constraint='unique_org_object_property',
+        set_={
+            'label': statement.excluded.label,
+            'type': statement.excluded.type,
+            'options': statement.excluded.options,
+            'cached_at': statement.excluded.cached_at,
+        }
+    )
+
+
+def _rows(organization_id, object_type: str, properties: List[Dict[str, Any]], cached_at: datetime) -> List[Dict[str, Any]]:
+    """Linhas da tabela (campos truncados ao tamanho das colunas, sem nomes repetidos)"""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for prop in properties:
+        property_name = (prop.get('name', '') or '')[:255]
+        if not property_name:
+            continue
+        rows[property_name] = {
+            'id': uuid.uuid4(),
+            'organization_id': organization_id,
+            'object_type': object_type,
+            'property_name': property_name,
+            'label': (prop.get('label', prop.get('name', '')) or '')[:255],
+            'type': (prop.get('type', 'string') or 'string')[:50],
+            'options': prop.get('options'),
+            'cached_at': cached_at,
+        }
+    return list(rows.values())
+
+
+def _to_dict(object_type: str, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Mesmo formato de HubSpotPropertyCache.to_dict()"""
+    return {
+        'name': row['property_name'],
+        'label': row['label'] or row['property_name'],
+        'type': row['type'],
+        'options': row['options'],
+        'tag': f"{{{{{object_type}.{row['property_name']}}}}}"
+    }
+
+
+_store: Optional[HubSpotPropertyStore] = None
+_store_lock = threading.Lock()
+
+
+def get_property_store() -> HubSpotPropertyStore:
+    """Retorna singleton do cache de propriedades"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HubSpotPropertyStore()
+    return _store
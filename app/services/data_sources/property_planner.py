@@ -0,0 +1,243 @@
+"""
+Planejamento das propriedades HubSpot que um workflow realmente usa.
+
+get_object_data pedia a lista fixa de _get_default_properties (ou '*'),
+independente do template: trazia payloads grandes ou deixava de fora campos
+usados nas tags, que viravam ''. O plano junta:
+
+- Template.detected_tags dos templates do workflow
+- field mappings (WorkflowFieldMapping e field_mappings dos nodes)
+- source_fields e placeholders do prompt dos AI mappings
+- tags nas configs dos nodes (nome do documento, email, etc.)
+
+e calcula o conjunto exato de propriedades por tipo de objeto, incluindo
+os objetos associados referenciados (ex: company.name -> company: [name]).
+
+Templates do Google/Microsoft são renderizados a partir do documento vivo,
+mas detected_tags só muda no /sync: uma tag adicionada no Drive sem sync
+não estaria no plano. Para eles o plano também inclui a lista padrão
+(objeto e associações padrão), como antes do planejamento.
+
+O plano é cacheado por (workflow, updated_at, object_type, versões dos
+templates). As rotas que alteram nodes e AI mappings atualizam
+Workflow.updated_at, então a chave muda em todos os processos.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.services.data_sources.hubspot import HubSpotDataSource
+from app.services.document_generation.tag_processor import TagProcessor
+
+MAX_CACHED_PLANS = 1000
+
+# Tags preenchidas pelo próprio DocG, não pelo HubSpot
+NON_PROPERTY_TAGS = {'date', 'timestamp', 'object_type'}
+
+
+@dataclass(frozen=True)
+class PropertyPlan:
+    """Propriedades a buscar por tipo de objeto (tipos normalizados)"""
+    object_type: str
+    properties: Dict[str, Tuple[str, ...]]
+    associations: Tuple[str, ...]
+
+    def properties_for(self, object_type: str) -> List[str]:
+        return list(self.properties.get(HubSpotDataSource._normalize_object_type(object_type), ()))
+
+
+def plan_properties(object_type: str, fields: Iterable[str]) -> PropertyPlan:
+    """
+    Calcula as propriedades usadas por uma lista de campos/tags.
+
+    Args:
+        object_type: Tipo do objeto principal (deal, contact...)
+        fields: Campos como 'dealname', 'company.name', 'associations.contact.email'
+
+    Returns:
+        PropertyPlan com as propriedades do objeto principal e dos associados
+    """
+    primary = HubSpotDataSource._normalize_object_type(object_type)
+    association_names = {
+        HubSpotDataSource._normalize_object_type(name): name
+        for name in HubSpotDataSource._get_default_associations(object_type)
+    }
+
+    properties: Dict[str, Dict[str, None]] = {primary: {}}
+    associations: Dict[str, None] = {}
+
+    for field in fields:
+        if not field or field.startswith('ai:'):
+            continue
+
+        keys = [key.strip() for key in field.strip().split('.')]
+        if keys[0] == 'associations':
+            keys = keys[1:]
+        if not keys or not keys[0]:
+            continue
+
+        if len(keys) == 1:
+            if keys[0] not in NON_PROPERTY_TAGS:
+                properties[primary][keys[0]] = None
+            continue
+
+        target = HubSpotDataSource._normalize_object_type(keys[0])
+        if target == primary:
+            properties[primary][keys[1]] = None
+        elif target in association_names:
+            properties.setdefault(target, {})[keys[1]] = None
+            associations[association_names[target]] = None
+
+    return PropertyPlan(
+        object_type=primary,
+        properties={t: tuple(props) for t, props in properties.items()},
+        associations=tuple(associations)
+    )
+
+
+def collect_workflow_fields(workflow, templates) -> Optional[List[str]]:
+    """
+    Lista os campos que o workflow pode ler dos dados de origem.
+
+    Returns:
+        Lista de campos ou None se algum template não tem tags detectadas
+        (não dá para saber o que ele usa)
+    """
+    fields: List[str] = []
+    mapped_tags = set()
+
+    for mapping in workflow.field_mappings:
+        mapped_tags.add(mapping.template_tag)
+        fields.append(mapping.source_field)
+
+    for node in workflow.nodes:
+        config = node.config or {}
+        for mapping in config.get('field_mappings') or []:
+            if mapping.get('template_tag') and mapping.get('source_field'):
+                mapped_tags.add(mapping['template_tag'])
+                fields.append(mapping['source_field'])
+        fields.extend(_config_tags(config))
+
+    for ai_mapping in workflow.ai_mappings:
+        fields.extend(ai_mapping.source_fields or [])
+        if ai_mapping.prompt_template:
+            fields.extend(TagProcessor.extract_tags(ai_mapping.prompt_template))
+
+    if workflow.output_name_template:
+        fields.extend(TagProcessor.extract_tags(workflow.output_name_template))
+
+    for template in templates:
+        if not template.detected_tags:
+            return None
+        fields.extend(tag for tag in template.detected_tags if tag not in mapped_tags)
+
+    return fields
+
+
+def default_fields(object_type: str) -> List[str]:
+    """Campos da lista padrão do objeto e das suas associações padrão"""
+    fields: List[str] = []
+    targets = [(object_type, None)] + [
+        (association, association)
+        for association in HubSpotDataSource._get_default_associations(object_type)
+    ]
+    for target, prefix in targets:
+        properties = HubSpotDataSource._get_default_properties(target)
+        if properties == '*':
+            continue
+        fields.extend(f'{prefix}.{name}' if prefix else name for name in properties.split(','))
+    return fields
+
+
+def _config_tags(value) -> List[str]:
+    """Tags {{...}} em qualquer string da config de um node"""
+    if isinstance(value, str):
+        return TagProcessor.extract_tags(value) if '{{' in value else []
+    if isinstance(value, dict):
+        return [tag for item in value.values() for tag in _config_tags(item)]
+    if isinstance(value, list):
+        return [tag for item in value for tag in _config_tags(item)]
+    return []
+
+
+class PropertyPlanCache:
+    """Cache LRU de planos por workflow e versão dos templates"""
+
+    def __init__(self, max_entries: int = MAX_CACHED_PLANS):
+        self.max_entries = max_entries
+        self._plans: 'OrderedDict[tuple, Optional[PropertyPlan]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, workflow, object_type: Optional[str] = None) -> Optional[PropertyPlan]:
+        """
+        Plano de propriedades do workflow.
+
+        Args:
+            workflow: Workflow
+            object_type: Tipo do objeto (padrão: workflow.source_object_type)
+
+        Returns:
+            PropertyPlan ou None (usar as propriedades padrão)
+        """
+        from app.models import Template
+
+        object_type = object_type or workflow.source_object_type
+        if not object_type:
+            return None
+
+        template_ids = _workflow_template_ids(workflow)
+        templates = Template.query.filter(Template.id.in_(template_ids)).all() if template_ids else []
+        if not templates:
+            return None
+
+        key = (
+            str(workflow.id),
+            workflow.updated_at,
+            HubSpotDataSource._normalize_object_type(object_type),
+            tuple(sorted((str(t.id), t.version) for t in templates))
+        )
+
+        with self._lock:
+            if key in self._plans:
+                self._plans.move_to_end(key)
+                return self._plans[key]
+
+        fields = collect_workflow_fields(workflow, templates)
+        if fields is not None and any(t.storage_type != 'uploaded' for t in templates):
+            fields.extend(default_fields(object_type))
+        plan = plan_properties(object_type, fields) if fields is not None else None
+
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+
+def _workflow_template_ids(workflow) -> List[str]:
+    ids = {str(workflow.template_id)} if workflow.template_id else set()
+    for node in workflow.nodes:
+        template_id = (node.config or {}).get('template_id')
+        if template_id:
+            ids.add(str(template_id))
+    return sorted(ids)
+
+
+_cache: Optional[PropertyPlanCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_property_plan(workflow, object_type: Optional[str] = None) -> Optional[PropertyPlan]:
+    """Retorna o plano (cacheado) de propriedades HubSpot do workflow"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PropertyPlanCache()
+    return _cache.get(workflow, object_type)
@@ -1,19 +1,17 @@
 """
 Serviço para conversão de documentos e validação.
 Suporta:
-- Conversão de .doc para .docx (usando LibreOffice)
-- Conversão de .docx para PDF (usando LibreOffice)
+- Conversão de .doc para .docx (pool de workers LibreOffice)
+- Conversão de .docx para PDF (pool de workers LibreOffice)
 - Validação de estrutura de documentos
 """
 import logging
-import subprocess
-import tempfile
-import os
-from pathlib import Path
 from io import BytesIO
 from typing import Optional, Tuple
 from docx import Document
 
+from .libreoffice_pool import get_libreoffice_pool, ConversionTimeout
+
 logger = logging.getLogger(__name__)
 
 
@@ -25,6 +23,8 @@ class DocumentConverter:
         """
         Converte arquivo .doc (Word 97-2003) para .docx usando LibreOffice.
         
+        A conversão roda no pool de workers LibreOffice (libreoffice_pool).
+        
         Args:
             doc_bytes: Bytes do arquivo .doc
             
@@ -34,82 +34,30 @@ class DocumentConverter:
         Raises:
             ValueError: Se LibreOffice não estiver disponível ou conversão falhar
         """
-        # Verificar se LibreOffice está disponível
-        try:
-            result = subprocess.run(
-                ['soffice', '--version'],
-                capture_output=True,
-                timeout=5
-            )
-            if result.returncode != 0:
-                raise ValueError('LibreOffice não está disponível no sistema')
-        except (FileNotFoundError, subprocess.TimeoutExpired):
+        pool = get_libreoffice_pool()
+        if not pool.available:
             raise ValueError(
                 'LibreOffice não está instalado. '
                 'Instale LibreOffice para suportar arquivos .doc'
             )
         
-        # Criar arquivo temporário para input
-        with tempfile.NamedTemporaryFile(suffix='.doc', delete=False) as input_file:
-            input_file.write(doc_bytes)
-            input_path = input_file.name
-        
         try:
-            # Criar diretório temporário para output
-            output_dir = tempfile.mkdtemp()
-            
-            # Converter usando LibreOffice
-            result = subprocess.run(
-                [
-                    'soffice',
-                    '--headless',
-                    '--convert-to', 'docx',
-                    '--outdir', output_dir,
-                    input_path
-                ],
-                capture_output=True,
-                timeout=30
-            )
-            
-            if result.returncode != 0:
-                error_msg = result.stderr.decode('utf-8', errors='ignore')
-                raise ValueError(f'Erro ao converter .doc para .docx: {error_msg}')
-            
-            # Encontrar arquivo convertido
-            input_name = Path(input_path).stem
-            output_path = os.path.join(output_dir, f'{input_name}.docx')
-            
-            if not os.path.exists(output_path):
-                raise ValueError('Arquivo convertido não foi encontrado')
-            
-            # Ler arquivo convertido
-            with open(output_path, 'rb') as f:
-                docx_bytes = f.read()
-            
-            # Limpar arquivos temporários
-            os.unlink(input_path)
-            os.unlink(output_path)
-            os.rmdir(output_dir)
-            
-            logger.info(f'Documento .doc convertido para .docx: {len(docx_bytes)} bytes')
-            return docx_bytes
-            
-        except subprocess.TimeoutExpired:
-            # Limpar em caso de timeout
-            if os.path.exists(input_path):
-                os.unlink(input_path)
+            docx_bytes = pool.convert(doc_bytes, '.doc', 'docx', timeout=30)
+        except ConversionTimeout:
             raise ValueError('Timeout ao converter documento .doc')
-        except Exception as e:
-            # Limpar em caso de erro
-            if os.path.exists(input_path):
-                os.unlink(input_path)
+        except ValueError as e:
             raise ValueError(f'Erro ao converter .doc: {str(e)}')
+        
+        logger.info(f'Documento .doc convertido para .docx: {len(docx_bytes)} bytes')
+        return docx_bytes
     
     @staticmethod
     def convert_docx_to_pdf(docx_bytes: bytes) -> bytes:
         """
         Converte arquivo .docx para PDF usando LibreOffice.
         
+        A conversão roda no pool de workers LibreOffice (libreoffice_pool).
+        
         Args:
             docx_bytes: Bytes do arquivo .docx
             
@@ -119,76 +67,22 @@ class DocumentConverter:
         Raises:
             ValueError: Se LibreOffice não estiver disponível ou conversão falhar
         """
-        # Verificar se LibreOffice está disponível
-        try:
-            result = subprocess.run(
-                ['soffice', '--version'],
-                capture_output=True,
-                timeout=5
-            )
-            if result.returncode != 0:
-                raise ValueError('LibreOffice não está disponível no sistema')
-        except (FileNotFoundError, subprocess.TimeoutExpired):
+        pool = get_libreoffice_pool()
+        if not pool.available:
             raise ValueError(
                 'LibreOffice não está instalado. '
                 'Instale LibreOffice para gerar PDFs'
             )
         
-        # Criar arquivo temporário para input
-        with tempfile.NamedTemporaryFile(suffix='.docx', delete=False) as input_file:
-            input_file.write(docx_bytes)
-            input_path = input_file.name
-        
         try:
-            # Criar diretório temporário para output
-            output_dir = tempfile.mkdtemp()
-            
-            # Converter usando LibreOffice
-            result = subprocess.run(
-                [
-                    'soffice',
-                    '--headless',
-                    '--convert-to', 'pdf',
-                    '--outdir', output_dir,
-                    input_path
-                ],
-                capture_output=True,
-                timeout=60  # PDF pode demorar mais
-            )
-            
-            if result.returncode != 0:
-                error_msg = result.stderr.decode('utf-8', errors='ignore')
-                raise ValueError(f'Erro ao converter .docx para PDF: {error_msg}')
-            
-            # Encontrar arquivo convertido
-            input_name = Path(input_path).stem
-            output_path = os.path.join(output_dir, f'{input_name}.pdf')
-            
-            if not os.path.exists(output_path):
-                raise ValueError('Arquivo PDF não foi gerado')
-            
-            # Ler arquivo PDF gerado
-            with open(output_path, 'rb') as f:
-                pdf_bytes = f.read()
-            
-            # Limpar arquivos temporários
-            os.unlink(input_path)
-            os.unlink(output_path)
-            os.rmdir(output_dir)
-            
-            logger.info(f'Documento .docx convertido para PDF: {len(pdf_bytes)} bytes')
-            return pdf_bytes
-            
-        except subprocess.TimeoutExpired:
-            # Limpar em caso de timeout
-            if os.path.exists(input_path):
-                os.unlink(input_path)
+            pdf_bytes = pool.convert(docx_bytes, '.docx', 'pdf', timeout=60)  # PDF pode demorar mais
+        except ConversionTimeout:
             raise ValueError('Timeout ao gerar PDF')
-        except Exception as e:
-            # Limpar em caso de erro
-            if os.path.exists(input_path):
-                os.unlink(input_path)
+        except ValueError as e:
             raise ValueError(f'Erro ao gerar PDF: {str(e)}')
+        
+        logger.info(f'Documento .docx convertido para PDF: {len(pdf_bytes)} bytes')
+        return pdf_bytes
     
     @staticmethod
     def validate_document_structure(docx_bytes: bytes) -> Tuple[bool, Optional[str]]:
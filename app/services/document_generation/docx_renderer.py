@@ -0,0 +1,197 @@
+"""
+Renderização de templates .docx direto no XML do pacote.
+
+Em vez de montar o modelo de objetos do python-docx e reatribuir
+paragraph.text (o que apaga a formatação dos runs), cada parte de texto do
+pacote (corpo, cabeçalhos, rodapés, notas) é lida uma vez e as tags são
+substituídas dentro dos próprios elementos <w:t>:
+
+- o valor entra no run onde a tag começa (herdando sua formatação)
+- o restante da tag é removido dos runs seguintes (tags quebradas pelo Word)
+- tabelas aninhadas e caixas de texto são cobertas porque todos os <w:p>
+  da parte são visitados
+
+As demais entradas do zip são copiadas sem descompactar o conteúdo.
+"""
+import re
+import logging
+import zipfile
+from bisect import bisect_right
+from io import BytesIO
+from typing import Dict, Any, Optional, List
+
+from lxml import etree
+
+from .tag_processor import TagProcessor, CompiledTemplateSet
+
+logger = logging.getLogger(__name__)
+
+W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+W_P = f'{{{W_NS}}}p'
+W_T = f'{{{W_NS}}}t'
+W_BR = f'{{{W_NS}}}br'
+XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+DOCUMENT_PART = 'word/document.xml'
+TEXT_PARTS = re.compile(r'^word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$')
+
+
+class DocxTemplateRenderer:
+    """Substitui tags {{...}} em arquivos .docx preservando a formatação"""
+
+    @staticmethod
+    def render(
+        docx_bytes: bytes,
+        data: Dict[str, Any],
+        mappings: Dict[str, str] = None,
+        compiled: Optional[CompiledTemplateSet] = None
+    ) -> bytes:
+        """
+        Renderiza o template.
+
+        Args:
+            docx_bytes: Bytes do template .docx
+            data: Dados para substituição (tags AI em data['ai:nome'])
+            mappings: Mapeamento opcional de tag -> campo no data
+            compiled: Textos compilados do template (TagProcessor.compiled_for)
+
+        Returns:
+            Bytes do documento gerado
+
+        Raises:
+            ValueError: Se o arquivo não for um .docx válido
+        """
+        try:
+            source = zipfile.ZipFile(BytesIO(docx_bytes))
+        except zipfile.BadZipFile as e:
+            raise ValueError(f'Arquivo .docx inválido: {e}')
+
+        names = source.namelist()
+        if DOCUMENT_PART not in names:
+            raise ValueError(f'Arquivo .docx inválido: {DOCUMENT_PART} não encontrado')
+
+        output = BytesIO()
+        with source, zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                content = source.read(info.filename)
+
+                if TEXT_PARTS.match(info.filename):
+                    content = DocxTemplateRenderer._render_part(content, data, mappings, compiled)
+
+                target.writestr(info, content, compress_type=zipfile.ZIP_DEFLATED)
+
+        return output.getvalue()
+
+    @staticmethod
+    def _render_part(
+        xml: bytes,
+        data: Dict[str, Any],
+        mappings: Optional[Dict[str, str]],
+        compiled: Optional[CompiledTemplateSet]
+    ) -> bytes:
+        """Renderiza uma parte XML (document, header, footer...)"""
+        # Atalho: parte sem nenhuma chave (checagem em bytes, sem parse). Não
+        # dá para testar b'{{': o Word pode separar as duas chaves em runs
+        # diferentes; quem decide é o texto unido de cada parágrafo.
+        if b'{' not in xml:
+            return xml
+
+        try:
+            root = etree.fromstring(xml)
+        except etree.XMLSyntaxError as e:
+            raise ValueError(f'Arquivo .docx inválido: {e}')
+
+        # Uma passada: agrupa os <w:t> pelo parágrafo dono (o <w:p> mais próximo)
+        paragraphs: Dict[Any, List[Any]] = {}
+        for t in root.iter(W_T):
+            owner = next(t.iterancestors(W_P), None)
+            if owner is not None:
+                paragraphs.setdefault(owner, []).append(t)
+
+        changed = False
+        for text_nodes in paragraphs.values():
+            if DocxTemplateRenderer._render_paragraph(text_nodes, data, mappings, compiled):
+                changed = True
+
+        if not changed:
+            return xml
+
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+    @staticmethod
+    def _render_paragraph(
+        text_nodes: List[Any],
+        data: Dict[str, Any],
+        mappings: Optional[Dict[str, str]],
+        compiled: Optional[CompiledTemplateSet]
+    ) -> bool:
+        """
+        Substitui as tags de um parágrafo nos seus <w:t>.
+
+        Returns:
+            True se algum texto foi alterado
+        """
+        texts = [t.text or '' for t in text_nodes]
+        full_text = ''.join(texts)
+        if '{{' not in full_text:
+            return False
+
+        template = compiled.get(full_text) if compiled is not None else TagProcessor.compile(full_text)
+        if not template.has_tags:
+            return False
+
+        # Offset inicial e tamanho original de cada <w:t> no texto do parágrafo
+        lengths = [len(text) for text in texts]
+        starts = []
+        offset = 0
+        for length in lengths:
+            starts.append(offset)
+            offset += length
+
+        # Da última para a primeira tag: os offsets das anteriores continuam válidos
+        for start, end, segment in reversed(list(template.tag_spans())):
+            value = template.render_tag(segment, data, mappings, keep_unresolved_ai=True)
+            first = DocxTemplateRenderer._node_at(starts, lengths, start)
+            last = DocxTemplateRenderer._node_at(starts, lengths, end - 1)
+
+            head = texts[first][:start - starts[first]]
+            tail = texts[last][end - starts[last]:]
+
+            if first == last:
+                texts[first] = head + value + tail
+            else:
+                texts[first] = head + value
+                for index in range(first + 1, last):
+                    texts[index] = ''
+                texts[last] = tail
+
+        for node, text in zip(text_nodes, texts):
+            if node.text != text:
+                DocxTemplateRenderer._set_text(node, text)
+
+        return True
+
+    @staticmethod
+    def _node_at(starts: List[int], lengths: List[int], position: int) -> int:
+        """Índice do <w:t> que contém a posição (ignorando <w:t> vazios)"""
+        index = bisect_right(starts, position) - 1
+        while lengths[index] == 0 or position >= starts[index] + lengths[index]:
+            index += 1
+        return index
+
+    @staticmethod
+    def _set_text(node, text: str) -> None:
+        """Atualiza um <w:t>; quebras de linha viram <w:br/> no mesmo run"""
+        lines = text.split('\n')
+        node.text = lines[0]
+        node.set(XML_SPACE, 'preserve')
+
+        anchor = node
+        for line in lines[1:]:
+            br = etree.Element(W_BR)
+            anchor.addnext(br)
+            t = etree.Element(W_T)
+            t.text = line
+            t.set(XML_SPACE, 'preserve')
+            br.addnext(t)
+            anchor = t
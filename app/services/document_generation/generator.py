@@ -1,5 +1,7 @@
 from typing import Dict, Any, Optional, List
 from datetime import datetime
+import asyncio
+import concurrent.futures
 import logging
 import time
 
@@ -16,6 +18,21 @@ from .tag_processor import TagProcessor
 logger = logging.getLogger(__name__)
 ai_logger = logging.getLogger('docugen.ai')
 
+
+def _run_coroutine(coro):
+    """
+    Executa coroutine em contexto síncrono.
+    
+    Se a thread atual já tem um event loop rodando, executa em outra thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
 class AIGenerationMetrics:
     """Classe para rastrear métricas de geração de IA"""
     
@@ -26,8 +43,17 @@ class AIGenerationMetrics:
         self.total_cost = 0.0
         self.successful = 0
         self.failed = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
     
-    def add_success(self, mapping: 'AIGenerationMapping', time_ms: float, tokens: int = 0, cost: float = 0.0):
+    def add_success(
+        self,
+        mapping: 'AIGenerationMapping',
+        time_ms: float,
+        tokens: int = 0,
+        cost: float = 0.0,
+        cached: bool = False
+    ):
         self.details.append({
             'tag': mapping.ai_tag,
             'provider': mapping.provider,
@@ -35,6 +61,7 @@ class AIGenerationMetrics:
             'time_ms': round(time_ms),
             'tokens': tokens,
             'cost_usd': cost,
+            'cached': cached,
             'status': 'success'
         })
         self.total_time_ms += time_ms
@@ -42,6 +69,12 @@ class AIGenerationMetrics:
         self.total_cost += cost
         self.successful += 1
     
+    def add_cache_lookup(self, hit: bool):
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+    
     def add_failure(self, mapping: 'AIGenerationMapping', error: str, time_ms: float = 0):
         self.details.append({
             'tag': mapping.ai_tag,
@@ -62,6 +95,8 @@ class AIGenerationMetrics:
             'total_time_ms': round(self.total_time_ms),
             'total_tokens': self.total_tokens,
             'estimated_cost_usd': round(self.total_cost, 6),
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
             'details': self.details
         }
 
@@ -107,6 +142,7 @@ class DocumentGenerator:
             GeneratedDocument criado
         """
         execution = None
+        quota_reserved = False
         
         try:
             # Criar registro de execução
@@ -117,13 +153,15 @@ class DocumentGenerator:
                 status='running'
             )
             db.session.add(execution)
+            
+            # Reservar quota no mesmo commit da execução (UPDATE atômico);
+            # devolvida se a geração falhar
+            quota_reserved = Organization.reserve_documents(workflow.organization_id)
             db.session.commit()
             
             start_time = datetime.utcnow()
             
-            # Verificar quota da organização
-            org = workflow.organization
-            if not org.can_generate_document():
+            if not quota_reserved:
                 raise Exception('Limite de documentos atingido para este período')
             
             # Buscar template
@@ -224,9 +262,6 @@ class DocumentGenerator:
                 doc_name=doc_name
             )
             
-            # Incrementar contador da organização
-            org.increment_document_count()
-            
             # Atualizar execução
             end_time = datetime.utcnow()
             execution.status = 'completed'
@@ -250,6 +285,8 @@ class DocumentGenerator:
                 execution.status = 'failed'
                 execution.error_message = str(e)
                 execution.completed_at = datetime.utcnow()
+                if quota_reserved:
+                    Organization.release_documents(workflow.organization_id)
                 db.session.commit()
             
             raise
@@ -361,35 +398,51 @@ class DocumentGenerator:
         self,
         workflow: Workflow,
         source_data: Dict[str, Any],
-        metrics: AIGenerationMetrics
+        metrics: AIGenerationMetrics,
+        ai_mappings: Optional[List[AIGenerationMapping]] = None
     ) -> Dict[str, str]:
         """
         Processa todas as tags AI do workflow.
         
+        As chamadas ao LLM rodam concorrentemente (até MAX_CONCURRENT_AI_TAGS)
+        e passam pelo token bucket do provedor/API key. Métricas e fallbacks
+        são aplicados na ordem dos mapeamentos, como no processamento
+        sequencial: erros críticos (quota, API key) interrompem o documento.
+        
+        Mapeamentos com cache_enabled consultam antes o cache de respostas
+        (chave = hash de provider/model/temperature/max_tokens/prompt); um hit
+        não chama o provedor e é contabilizado com 0 tokens e custo zero.
+        
         Args:
             workflow: Workflow com mapeamentos de IA
             source_data: Dados da fonte para montar prompts
             metrics: Objeto para rastrear métricas
+            ai_mappings: Mapeamentos já carregados (plano de execução do
+                worker); sem eles, busca workflow.ai_mappings
         
         Returns:
             Dicionário com {ai:tag_name: texto_gerado}
         """
-        from app.services.ai import LLMService, AIGenerationError, AITimeoutError, AIQuotaExceededError, AIInvalidKeyError
+        from app.services.ai import LLMService, LLMResponse, AIGenerationError, AITimeoutError, AIQuotaExceededError, AIInvalidKeyError
         from app.services.ai.utils import get_model_string
+        from app.services.ai.response_cache import build_cache_key, cache_get, cache_set
         
         replacements = {}
         
         # Buscar mapeamentos de IA do workflow
-        ai_mappings = list(workflow.ai_mappings)
+        ai_mappings = list(workflow.ai_mappings if ai_mappings is None else ai_mappings)
         
         if not ai_mappings:
             return replacements
         
         ai_logger.info(f"[AI] Processando {len(ai_mappings)} tags AI para workflow {workflow.id}")
         
+        # 1. Preparar requisições (banco e descriptografia ficam nesta thread)
+        jobs = []
         for mapping in ai_mappings:
             start_time = time.time()
-            tag_key = f"ai:{mapping.ai_tag}"
+            job = {'mapping': mapping, 'provider': mapping.provider, 'ai_tag': mapping.ai_tag}
+            jobs.append(job)
             
             try:
                 # Buscar API key da conexão
@@ -402,76 +455,152 @@ class DocumentGenerator:
                     )
                 
                 # Montar prompt
-                prompt = TagProcessor.build_ai_prompt(
-                    prompt_template=mapping.prompt_template,
-                    source_data=source_data,
-                    source_fields=mapping.source_fields
-                )
+                job.update({
+                    'api_key': api_key,
+                    'model': get_model_string(mapping.provider, mapping.model),
+                    'prompt': TagProcessor.build_ai_prompt(
+                        prompt_template=mapping.prompt_template,
+                        source_data=source_data,
+                        source_fields=mapping.source_fields
+                    ),
+                    'temperature': mapping.temperature or 0.7,
+                    'max_tokens': mapping.max_tokens or 1000,
+                })
                 
-                # Gerar texto
-                model_string = get_model_string(mapping.provider, mapping.model)
-                response = self.llm_service.generate_text(
-                    model=model_string,
-                    prompt=prompt,
-                    api_key=api_key,
-                    temperature=mapping.temperature or 0.7,
-                    max_tokens=mapping.max_tokens or 1000,
-                    timeout=60
-                )
+                if mapping.cache_enabled:
+                    job['cache_key'] = build_cache_key(
+                        mapping.provider, job['model'], job['temperature'],
+                        job['max_tokens'], job['prompt']
+                    )
+                    cached = cache_get(job['cache_key'])
+                    metrics.add_cache_lookup(hit=cached is not None)
+                    if cached is not None:
+                        job['response'] = LLMResponse(**cached)
+                        job['cached'] = True
+                        job['elapsed_ms'] = (time.time() - start_time) * 1000
+            except Exception as e:
+                job['error'] = e
+                job['elapsed_ms'] = (time.time() - start_time) * 1000
+                # Erro crítico: mapeamentos seguintes não seriam processados
+                if isinstance(e, (AIQuotaExceededError, AIInvalidKeyError)):
+                    break
+        
+        # 2. Gerar textos concorrentemente
+        _run_coroutine(self._generate_ai_texts(jobs))
+        
+        # 3. Aplicar resultados na ordem dos mapeamentos
+        for job in jobs:
+            mapping = job['mapping']
+            tag_key = f"ai:{mapping.ai_tag}"
+            elapsed_ms = job.get('elapsed_ms', 0)
+            error = job.get('error')
+            
+            if error is None and 'response' not in job:
+                # Cancelado após erro crítico em outra tag
+                continue
+            
+            if error is None:
+                response = job['response']
+                cached = job.get('cached', False)
                 
                 # Salvar resultado
                 replacements[tag_key] = response.text
-                elapsed_ms = (time.time() - start_time) * 1000
                 
-                # Atualizar métricas
+                if not cached and 'cache_key' in job:
+                    cache_set(job['cache_key'], response.to_dict(), mapping.cache_ttl_seconds)
+                
+                # Atualizar métricas (hit de cache não consome tokens)
                 metrics.add_success(
                     mapping=mapping,
                     time_ms=elapsed_ms,
-                    tokens=response.total_tokens,
-                    cost=response.estimated_cost_usd
+                    tokens=0 if cached else response.total_tokens,
+                    cost=0.0 if cached else response.estimated_cost_usd,
+                    cached=cached
                 )
                 
                 # Atualizar contador de uso do mapping
                 mapping.increment_usage()
                 
                 ai_logger.info(
-                    f"[AI] Tag '{mapping.ai_tag}' gerada - "
+                    f"[AI] Tag '{mapping.ai_tag}' {'obtida do cache' if cached else 'gerada'} - "
                     f"tokens={response.total_tokens}, time_ms={elapsed_ms:.0f}"
                 )
-                
-            except (AIQuotaExceededError, AIInvalidKeyError) as e:
+            
+            elif isinstance(error, (AIQuotaExceededError, AIInvalidKeyError)):
                 # Erros críticos - propagar para interromper documento
-                elapsed_ms = (time.time() - start_time) * 1000
-                metrics.add_failure(mapping, str(e), elapsed_ms)
-                ai_logger.error(f"[AI] Erro crítico na tag '{mapping.ai_tag}': {e}")
-                raise
+                metrics.add_failure(mapping, str(error), elapsed_ms)
+                ai_logger.error(f"[AI] Erro crítico na tag '{mapping.ai_tag}': {error}")
+                raise error
             
-            except AITimeoutError as e:
+            elif isinstance(error, AITimeoutError):
                 # Timeout - usar fallback
-                elapsed_ms = (time.time() - start_time) * 1000
-                metrics.add_failure(mapping, str(e), elapsed_ms)
+                metrics.add_failure(mapping, str(error), elapsed_ms)
                 fallback = mapping.fallback_value or f"[Timeout: {mapping.ai_tag}]"
                 replacements[tag_key] = fallback
                 ai_logger.warning(f"[AI] Timeout na tag '{mapping.ai_tag}', usando fallback")
             
-            except AIGenerationError as e:
+            elif isinstance(error, AIGenerationError):
                 # Outros erros de IA - usar fallback
-                elapsed_ms = (time.time() - start_time) * 1000
-                metrics.add_failure(mapping, str(e), elapsed_ms)
+                metrics.add_failure(mapping, str(error), elapsed_ms)
                 fallback = mapping.fallback_value or f"[Erro: {mapping.ai_tag}]"
                 replacements[tag_key] = fallback
-                ai_logger.warning(f"[AI] Erro na tag '{mapping.ai_tag}': {e}")
+                ai_logger.warning(f"[AI] Erro na tag '{mapping.ai_tag}': {error}")
             
-            except Exception as e:
+            else:
                 # Erro inesperado - usar fallback
-                elapsed_ms = (time.time() - start_time) * 1000
-                metrics.add_failure(mapping, str(e), elapsed_ms)
+                metrics.add_failure(mapping, str(error), elapsed_ms)
                 fallback = mapping.fallback_value or f"[Erro: {mapping.ai_tag}]"
                 replacements[tag_key] = fallback
-                ai_logger.error(f"[AI] Erro inesperado na tag '{mapping.ai_tag}': {e}")
+                ai_logger.error(f"[AI] Erro inesperado na tag '{mapping.ai_tag}': {error}")
         
         return replacements
     
+    async def _generate_ai_texts(self, jobs: List[Dict[str, Any]]) -> None:
+        """
+        Executa as chamadas ao LLM dos jobs preparados.
+        
+        Preenche job['response'] ou job['error'] e job['elapsed_ms']. Um erro
+        crítico (quota, API key) cancela as chamadas ainda pendentes.
+        """
+        from app.services.ai import AIQuotaExceededError, AIInvalidKeyError
+        from app.services.ai.rate_limiter import get_rate_limiter, MAX_CONCURRENT_AI_TAGS
+        
+        semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENT_AI_TAGS))
+        
+        async def run(job):
+            async with semaphore:
+                start_time = time.time()
+                try:
+                    await get_rate_limiter(job['provider'], job['api_key']).acquire_async()
+                    job['response'] = await self.llm_service.generate_text_async(
+                        model=job['model'],
+                        prompt=job['prompt'],
+                        api_key=job['api_key'],
+                        temperature=job['temperature'],
+                        max_tokens=job['max_tokens'],
+                        timeout=60
+                    )
+                except (AIQuotaExceededError, AIInvalidKeyError) as e:
+                    job['error'] = e
+                    raise
+                except Exception as e:
+                    job['error'] = e
+                finally:
+                    job['elapsed_ms'] = (time.time() - start_time) * 1000
+        
+        tasks = [
+            asyncio.ensure_future(run(job))
+            for job in jobs
+            if 'error' not in job and 'response' not in job
+        ]
+        if not tasks:
+            return
+        
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
     def _get_ai_api_key(self, mapping: AIGenerationMapping) -> Optional[str]:
         """
         Obtém a API key descriptografada para a conexão de IA.
@@ -0,0 +1,367 @@
+"""
+Pool de workers LibreOffice para conversões (.doc -> .docx, .docx -> PDF).
+
+Cada worker tem um perfil de usuário próprio (-env:UserInstallation), então
+conversões concorrentes não disputam o mesmo perfil. Dois modos:
+
+- uno: um soffice headless de longa duração por worker, escutando em um
+  socket local; a conversão é feita via UNO sem pagar o startup do
+  LibreOffice a cada documento (requer o módulo python3-uno)
+- subprocess: fallback quando o UNO não está disponível; um
+  `soffice --convert-to` por job, reaproveitando o perfil já inicializado
+  do worker
+
+O pool enfileira jobs quando todos os workers estão ocupados, aplica
+timeout por job, recicla workers após N jobs e verifica a saúde do
+worker antes de cada uso.
+
+Configuração (variáveis de ambiente):
+- LIBREOFFICE_POOL_SIZE: número de workers (padrão 2)
+- LIBREOFFICE_MAX_JOBS_PER_WORKER: jobs antes de reciclar (padrão 200)
+- LIBREOFFICE_QUEUE_TIMEOUT: espera máxima por um worker livre (s, padrão 120)
+- LIBREOFFICE_START_TIMEOUT: espera pelo socket UNO no startup (s, padrão 30)
+"""
+import os
+import time
+import queue
+import atexit
+import shutil
+import socket
+import logging
+import tempfile
+import threading
+import subprocess
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = int(os.getenv('LIBREOFFICE_POOL_SIZE', '2'))
+MAX_JOBS_PER_WORKER = int(os.getenv('LIBREOFFICE_MAX_JOBS_PER_WORKER', '200'))
+QUEUE_TIMEOUT = float(os.getenv('LIBREOFFICE_QUEUE_TIMEOUT', '120'))
+START_TIMEOUT = float(os.getenv('LIBREOFFICE_START_TIMEOUT', '30'))
+
+# Filtros de exportação do LibreOffice por formato de saída
+EXPORT_FILTERS = {
+    'pdf': 'writer_pdf_Export',
+    'docx': 'MS Word 2007 XML',
+}
+
+
+class ConversionTimeout(ValueError):
+    """Conversão excedeu o timeout do job"""
+
+
+def _soffice_binary() -> Optional[str]:
+    return shutil.which('soffice') or shutil.which('libreoffice')
+
+
+def _uno_available() -> bool:
+    try:
+        import uno  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class SubprocessWorker:
+    """Worker que executa `soffice --convert-to` com perfil isolado"""
+
+    def __init__(self, slot: int, binary: str):
+        self.slot = slot
+        self.binary = binary
+        self.jobs = 0
+        self.base_dir = tempfile.mkdtemp(prefix=f'docg-lo-{slot}-')
+        self.profile_url = f'file://{os.path.join(self.base_dir, "profile")}'
+
+    def start(self) -> None:
+        pass
+
+    def is_healthy(self) -> bool:
+        return os.path.isdir(self.base_dir)
+
+    def convert(self, input_path: str, output_dir: str, target: str, timeout: float) -> str:
+        try:
+            result = subprocess.run(
+                [
+                    self.binary,
+                    f'-env:UserInstallation={self.profile_url}',
+                    '--headless', '--norestore', '--nologo',
+                    '--convert-to', target,
+                    '--outdir', output_dir,
+                    input_path
+                ],
+                capture_output=True,
+                timeout=timeout
+            )
+        except subprocess.TimeoutExpired:
+            raise ConversionTimeout(f'Timeout ao converter documento para {target}')
+
+        if result.returncode != 0:
+            error_msg = result.stderr.decode('utf-8', errors='ignore')
+            raise ValueError(f'Erro na conversão para {target}: {error_msg}')
+
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        return os.path.join(output_dir, f'{stem}.{target}')
+
+    def stop(self) -> None:
+        shutil.rmtree(self.base_dir, ignore_errors=True)
+
+
+class UnoWorker(SubprocessWorker):
+    """Worker com um soffice headless de longa duração acessado via UNO"""
+
+    def __init__(self, slot: int, binary: str):
+        super().__init__(slot, binary)
+        self.port = None
+        self.process: Optional[subprocess.Popen] = None
+        self._desktop = None
+
+    def start(self) -> None:
+        import uno
+
+        self.port = _free_port()
+        self.process = subprocess.Popen(
+            [
+                self.binary,
+                f'-env:UserInstallation={self.profile_url}',
+                '--headless', '--invisible', '--norestore', '--nologo', '--nodefault',
+                f'--accept=socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext'
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+
+        local_context = uno.getComponentContext()
+        resolver = local_context.ServiceManager.createInstanceWithContext(
+            'com.sun.star.bridge.UnoUrlResolver', local_context
+        )
+
+        deadline = time.monotonic() + START_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(
+                    f'uno:socket,host=127.0.0.1,port={self.port};urp;StarOffice.ComponentContext'
+                )
+                self._desktop = context.ServiceManager.createInstanceWithContext(
+                    'com.sun.star.frame.Desktop', context
+                )
+                break
+            except Exception:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise ValueError('Não foi possível iniciar o LibreOffice')
+                time.sleep(0.25)
+
+        logger.info(f'LibreOffice worker {self.slot} iniciado (pid={self.process.pid}, port={self.port})')
+
+    def is_healthy(self) -> bool:
+        if self.process is None or self.process.poll() is not None or self._desktop is None:
+            return False
+        try:
+            self._desktop.getComponents()
+            return True
+        except Exception:
+            return False
+
+    def convert(self, input_path: str, output_dir: str, target: str, timeout: float) -> str:
+        import uno
+        from com.sun.star.beans import PropertyValue
+
+        def props(**kwargs):
+            return tuple(PropertyValue(Name=k, Value=v) for k, v in kwargs.items())
+
+        stem = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(output_dir, f'{stem}.{target}')
+
+        # Chamadas UNO não podem ser interrompidas: no timeout o processo é
+        # encerrado, o que faz a chamada pendente falhar
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self.stop()
+
+        watchdog = threading.Timer(timeout, kill)
+        watchdog.start()
+        try:
+            document = self._desktop.loadComponentFromURL(
+                uno.systemPathToFileUrl(input_path), '_blank', 0, props(Hidden=True)
+            )
+            try:
+                document.storeToURL(
+                    uno.systemPathToFileUrl(output_path),
+                    props(FilterName=EXPORT_FILTERS[target])
+                )
+            finally:
+                document.close(True)
+        except Exception as e:
+            if timed_out.is_set():
+                raise ConversionTimeout(f'Timeout ao converter documento para {target}')
+            raise ValueError(f'Erro na conversão para {target}: {e}')
+        finally:
+            watchdog.cancel()
+
+        return output_path
+
+    def stop(self) -> None:
+        self._desktop = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+        self.process = None
+        super().stop()
+
+
+class LibreOfficePool:
+    """
+    Pool de workers LibreOffice.
+
+    Os slots ficam em uma fila; convert() aguarda um slot livre (até
+    queue_timeout), cria ou recicla o worker do slot se necessário e
+    devolve o slot ao final.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        max_jobs_per_worker: int = MAX_JOBS_PER_WORKER,
+        queue_timeout: float = QUEUE_TIMEOUT
+    ):
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.queue_timeout = queue_timeout
+        self._binary = _soffice_binary()
+        self._use_uno = _uno_available()
+        self._slots: 'queue.Queue[Tuple[int, Optional[SubprocessWorker]]]' = queue.Queue()
+        self._workers = {}
+        self._lock = threading.Lock()
+
+        for slot in range(self.size):
+            self._slots.put((slot, None))
+
+    @property
+    def available(self) -> bool:
+        return self._binary is not None
+
+    def convert(self, data: bytes, input_ext: str, target: str, timeout: float) -> bytes:
+        """
+        Converte um documento.
+
+        Args:
+            data: Bytes do arquivo de entrada
+            input_ext: Extensão do arquivo de entrada ('.doc', '.docx')
+            target: Formato de saída ('docx', 'pdf')
+            timeout: Timeout da conversão em segundos
+
+        Returns:
+            Bytes do arquivo convertido
+
+        Raises:
+            ValueError: LibreOffice indisponível, fila cheia, timeout ou falha
+        """
+        if not self.available:
+            raise ValueError('LibreOffice não está instalado')
+
+        try:
+            slot, worker = self._slots.get(timeout=self.queue_timeout)
+        except queue.Empty:
+            raise ValueError('Nenhum worker LibreOffice livre (fila de conversão cheia)')
+
+        try:
+            worker = self._lease(slot, worker)
+            worker.jobs += 1
+
+            job_dir = tempfile.mkdtemp(dir=worker.base_dir)
+            try:
+                input_path = os.path.join(job_dir, f'input{input_ext}')
+                with open(input_path, 'wb') as f:
+                    f.write(data)
+
+                output_path = worker.convert(input_path, job_dir, target, timeout)
+
+                if not os.path.exists(output_path):
+                    raise ValueError('Arquivo convertido não foi encontrado')
+
+                with open(output_path, 'rb') as f:
+                    return f.read()
+            finally:
+                shutil.rmtree(job_dir, ignore_errors=True)
+
+        except ConversionTimeout:
+            # Worker possivelmente travado: descartar
+            self._discard(slot, worker)
+            worker = None
+            raise
+        finally:
+            self._slots.put((slot, worker))
+
+    def shutdown(self) -> None:
+        """Encerra todos os workers"""
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.stop()
+
+    def _lease(self, slot: int, worker: Optional[SubprocessWorker]) -> SubprocessWorker:
+        """Garante um worker saudável e dentro do limite de jobs no slot"""
+        if worker is not None:
+            if worker.jobs >= self.max_jobs_per_worker:
+                logger.info(f'Reciclando LibreOffice worker {slot} após {worker.jobs} jobs')
+                self._discard(slot, worker)
+                worker = None
+            elif not worker.is_healthy():
+                logger.warning(f'LibreOffice worker {slot} não está saudável, reiniciando')
+                self._discard(slot, worker)
+                worker = None
+
+        if worker is None:
+            worker = self._create_worker(slot)
+            worker.start()
+            with self._lock:
+                self._workers[slot] = worker
+
+        return worker
+
+    def _create_worker(self, slot: int) -> SubprocessWorker:
+        worker_class = UnoWorker if self._use_uno else SubprocessWorker
+        return worker_class(slot, self._binary)
+
+    def _discard(self, slot: int, worker: Optional[SubprocessWorker]) -> None:
+        with self._lock:
+            self._workers.pop(slot, None)
+        if worker is not None:
+            worker.stop()
+
+
+_pool: Optional[LibreOfficePool] = None
+_pool_lock = threading.Lock()
+
+
+def get_libreoffice_pool() -> LibreOfficePool:
+    """Retorna singleton do pool (criado no primeiro uso)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = LibreOfficePool()
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def shutdown_libreoffice_pool() -> None:
+    """Encerra os workers do pool, se criado"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -126,37 +126,17 @@ class MicrosoftPowerPointService:
                 # Substituir em shapes de texto
                 for shape in slide.shapes:
                     if hasattr(shape, 'text'):
-                        text = shape.text
-                        tags = TagProcessor.extract_tags(text)
-                        
-                        for tag in tags:
-                            field = mappings.get(tag, tag) if mappings else tag
-                            value = TagProcessor._get_nested_value(data, field)
-                            
-                            if value is not None:
-                                text = text.replace(f'{{{{{tag}}}}}', str(value))
-                            else:
-                                text = text.replace(f'{{{{{tag}}}}}', '')
-                        
-                        shape.text = text
+                        tpl = TagProcessor.compile(shape.text)
+                        if tpl.has_tags:
+                            shape.text = tpl.render(data, mappings, keep_unresolved_ai=True)
                     
                     # Substituir em tabelas
                     if shape.has_table:
                         for row in shape.table.rows:
                             for cell in row.cells:
-                                text = cell.text
-                                tags = TagProcessor.extract_tags(text)
-                                
-                                for tag in tags:
-                                    field = mappings.get(tag, tag) if mappings else tag
-                                    value = TagProcessor._get_nested_value(data, field)
-                                    
-                                    if value is not None:
-                                        text = text.replace(f'{{{{{tag}}}}}', str(value))
-                                    else:
-                                        text = text.replace(f'{{{{{tag}}}}}', '')
-                                
-                                cell.text = text
+                                tpl = TagProcessor.compile(cell.text)
+                                if tpl.has_tags:
+                                    cell.text = tpl.render(data, mappings, keep_unresolved_ai=True)
             
             # Salvar em buffer
             output = BytesIO()
@@ -161,37 +161,17 @@ class MicrosoftWordService:
             
             # Substituir tags em parágrafos
             for paragraph in doc.paragraphs:
-                text = paragraph.text
-                tags = TagProcessor.extract_tags(text)
-                
-                for tag in tags:
-                    field = mappings.get(tag, tag) if mappings else tag
-                    value = TagProcessor._get_nested_value(data, field)
-                    
-                    if value is not None:
-                        text = text.replace(f'{{{{{tag}}}}}', str(value))
-                    else:
-                        text = text.replace(f'{{{{{tag}}}}}', '')
-                
-                paragraph.text = text
+                tpl = TagProcessor.compile(paragraph.text)
+                if tpl.has_tags:
+                    paragraph.text = tpl.render(data, mappings, keep_unresolved_ai=True)
             
             # Substituir tags em tabelas
             for table in doc.tables:
                 for row in table.rows:
                     for cell in row.cells:
-                        text = cell.text
-                        tags = TagProcessor.extract_tags(text)
-                        
-                        for tag in tags:
-                            field = mappings.get(tag, tag) if mappings else tag
-                            value = TagProcessor._get_nested_value(data, field)
-                            
-                            if value is not None:
-                                text = text.replace(f'{{{{{tag}}}}}', str(value))
-                            else:
-                                text = text.replace(f'{{{{{tag}}}}}', '')
-                        
-                        cell.text = text
+                        tpl = TagProcessor.compile(cell.text)
+                        if tpl.has_tags:
+                            cell.text = tpl.render(data, mappings, keep_unresolved_ai=True)
             
             # Salvar em buffer
             output = BytesIO()
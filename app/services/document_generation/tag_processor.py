@@ -1,9 +1,172 @@
 import re
-from typing import Dict, List, Any, Optional
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple, Union
 import logging
 
 logger = logging.getLogger(__name__)
 
+_TAG_REGEX = re.compile(r'\{\{([^}]+)\}\}')
+
+# Templates compilados mantidos em memória (por template_id + version)
+COMPILED_TEMPLATES_MAX = 256
+
+
+@lru_cache(maxsize=4096)
+def _split_path(path: str) -> Tuple[str, ...]:
+    """Divide um dot-path uma única vez ("contact.firstname" -> ('contact', 'firstname'))"""
+    return tuple(path.split('.'))
+
+
+def _resolve_path(data: Dict, keys: Tuple[str, ...]) -> Any:
+    value = data
+    for key in keys:
+        if isinstance(value, dict):
+            value = value.get(key)
+        else:
+            return None
+        
+        if value is None:
+            return None
+    
+    return value
+
+
+class _TagSegment:
+    """Tag {{...}} de um template compilado"""
+    
+    __slots__ = ('raw', 'name', 'keys', 'is_ai')
+    
+    def __init__(self, raw: str):
+        self.raw = raw
+        self.name = raw.strip()
+        self.keys = _split_path(self.name)
+        self.is_ai = raw.startswith('ai:')
+
+
+class CompiledTemplate:
+    """
+    Texto com tags {{...}} já dividido em segmentos literais e tags.
+    
+    O parse acontece uma vez; render() monta o resultado em uma única
+    passada, sem regex, resolvendo os dot-paths pré-divididos.
+    
+    Example:
+        >>> tpl = TagProcessor.compile("Olá {{contact.firstname}}")
+        >>> tpl.render({'contact': {'firstname': 'Ana'}})
+        'Olá Ana'
+    """
+    
+    __slots__ = ('source', 'segments', 'tag_names', 'ai_tag_names')
+    
+    def __init__(self, source: str):
+        self.source = source
+        segments: List[Union[str, _TagSegment]] = []
+        position = 0
+        
+        for match in _TAG_REGEX.finditer(source):
+            if match.start() > position:
+                segments.append(source[position:match.start()])
+            segments.append(_TagSegment(match.group(1)))
+            position = match.end()
+        
+        if position < len(source):
+            segments.append(source[position:])
+        
+        tags = [s for s in segments if isinstance(s, _TagSegment)]
+        self.segments = tuple(segments)
+        self.tag_names = list(dict.fromkeys(t.raw for t in tags if not t.is_ai))
+        self.ai_tag_names = list(dict.fromkeys(t.raw[3:] for t in tags if t.is_ai))
+    
+    @property
+    def has_tags(self) -> bool:
+        return bool(self.tag_names or self.ai_tag_names)
+    
+    def render(
+        self,
+        data: Dict[str, Any],
+        mappings: Dict[str, str] = None,
+        transforms: Dict[str, Tuple[str, Optional[Dict]]] = None,
+        keep_unresolved_ai: bool = False
+    ) -> str:
+        """
+        Substitui as tags pelos valores de data.
+        
+        Args:
+            data: Dicionário com os dados (tags AI são buscadas em data['ai:nome'])
+            mappings: Mapeamento opcional de tag -> campo no data
+            transforms: Opcional {tag: (transform_type, transform_config)}
+            keep_unresolved_ai: Mantém {{ai:...}} sem valor em vez de remover
+        
+        Returns:
+            Texto renderizado (tags sem valor viram '')
+        """
+        if not self.has_tags:
+            return self.source
+        
+        return ''.join(
+            segment if isinstance(segment, str)
+            else self.render_tag(segment, data, mappings, transforms, keep_unresolved_ai)
+            for segment in self.segments
+        )
+    
+    def tag_spans(self):
+        """Itera (início, fim, segmento) de cada tag no texto original"""
+        position = 0
+        for segment in self.segments:
+            if isinstance(segment, str):
+                position += len(segment)
+            else:
+                end = position + len(segment.raw) + 4
+                yield position, end, segment
+                position = end
+    
+    @staticmethod
+    def render_tag(
+        segment: '_TagSegment',
+        data: Dict[str, Any],
+        mappings: Dict[str, str] = None,
+        transforms: Dict[str, Tuple[str, Optional[Dict]]] = None,
+        keep_unresolved_ai: bool = False
+    ) -> str:
+        """Valor de uma única tag (mesmas regras de render())"""
+        if segment.is_ai:
+            value = data.get(segment.name)
+            if value is None and keep_unresolved_ai:
+                return '{{' + segment.raw + '}}'
+        else:
+            field = mappings.get(segment.name, segment.name) if mappings else segment.name
+            keys = segment.keys if field == segment.name else _split_path(field)
+            value = _resolve_path(data, keys)
+        
+        transform = transforms.get(segment.name) if transforms else None
+        if transform and transform[0]:
+            return TagProcessor.apply_transform(value, transform[0], transform[1])
+        
+        return '' if value is None else str(value)
+
+
+class CompiledTemplateSet:
+    """Textos compilados de um template (parágrafos, células, shapes)"""
+    
+    def __init__(self):
+        self._compiled: Dict[str, CompiledTemplate] = {}
+    
+    def get(self, text: str) -> CompiledTemplate:
+        compiled = self._compiled.get(text)
+        if compiled is None:
+            compiled = TagProcessor.compile(text)
+            self._compiled[text] = compiled
+        return compiled
+    
+    def __len__(self) -> int:
+        return len(self._compiled)
+
+
+_template_sets: 'OrderedDict[Tuple[str, int], CompiledTemplateSet]' = OrderedDict()
+_template_sets_lock = threading.Lock()
+
 
 class TagProcessor:
     """
@@ -20,12 +183,49 @@ class TagProcessor:
     TAG_PATTERN = r'\{\{([^}]+)\}\}'
     AI_TAG_PATTERN = r'\{\{ai:([^}]+)\}\}'
     
+    @classmethod
+    @lru_cache(maxsize=2048)
+    def compile(cls, text: str) -> CompiledTemplate:
+        """
+        Compila um texto em CompiledTemplate.
+        
+        Textos iguais reaproveitam a mesma instância (nomes de documento,
+        assuntos de email e prompts se repetem entre execuções).
+        """
+        return CompiledTemplate(text)
+    
+    @classmethod
+    def compiled_for(cls, template_id: Any, version: Any) -> CompiledTemplateSet:
+        """
+        Retorna os textos compilados de um template (por id + version).
+        
+        Uma nova versão do template gera outra entrada; as versões antigas
+        saem por LRU ou via invalidate_compiled().
+        """
+        key = (str(template_id), version)
+        with _template_sets_lock:
+            template_set = _template_sets.get(key)
+            if template_set is None:
+                template_set = CompiledTemplateSet()
+                _template_sets[key] = template_set
+                while len(_template_sets) > COMPILED_TEMPLATES_MAX:
+                    _template_sets.popitem(last=False)
+            else:
+                _template_sets.move_to_end(key)
+            return template_set
+    
+    @classmethod
+    def invalidate_compiled(cls, template_id: Any) -> None:
+        """Remove todas as versões compiladas de um template"""
+        template_id = str(template_id)
+        with _template_sets_lock:
+            for key in [k for k in _template_sets if k[0] == template_id]:
+                del _template_sets[key]
+    
     @classmethod
     def extract_tags(cls, text: str) -> List[str]:
         """Extrai todas as tags de um texto (excluindo tags AI)"""
-        matches = re.findall(cls.TAG_PATTERN, text)
-        # Filtra tags AI que serão processadas separadamente
-        return list(set(m for m in matches if not m.startswith('ai:')))
+        return list(cls.compile(text).tag_names)
     
     @classmethod
     def extract_ai_tags(cls, text: str) -> List[str]:
@@ -44,8 +244,7 @@ class TagProcessor:
             >>> TagProcessor.extract_ai_tags("Hello {{ai:intro}} world {{ai:outro}}")
             ['intro', 'outro']
         """
-        matches = re.findall(cls.AI_TAG_PATTERN, text)
-        return list(set(matches))
+        return list(cls.compile(text).ai_tag_names)
     
     @classmethod
     def replace_tags(cls, text: str, data: Dict[str, Any], mappings: Dict[str, str] = None) -> str:
@@ -60,21 +259,7 @@ class TagProcessor:
         Returns:
             Texto com tags substituídas
         """
-        def replace_match(match):
-            tag = match.group(1).strip()
-            
-            # Se tem mapeamento, usa o campo mapeado
-            field = mappings.get(tag, tag) if mappings else tag
-            
-            # Busca o valor (suporta dot notation: "contact.firstname")
-            value = cls._get_nested_value(data, field)
-            
-            if value is None:
-                return ''  # ou match.group(0) para manter a tag
-            
-            return str(value)
-        
-        return re.sub(cls.TAG_PATTERN, replace_match, text)
+        return cls.compile(text).render(data, mappings)
     
     @classmethod
     def _get_nested_value(cls, data: Dict, path: str) -> Any:
@@ -82,19 +267,7 @@ class TagProcessor:
         Busca valor em dicionário usando dot notation.
         Ex: "contact.firstname" -> data['contact']['firstname']
         """
-        keys = path.split('.')
-        value = data
-        
-        for key in keys:
-            if isinstance(value, dict):
-                value = value.get(key)
-            else:
-                return None
-            
-            if value is None:
-                return None
-        
-        return value
+        return _resolve_path(data, _split_path(path))
     
     @classmethod
     def apply_transform(cls, value: Any, transform_type: str, config: Dict = None) -> str:
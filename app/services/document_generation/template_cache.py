@@ -0,0 +1,231 @@
+"""
+Cache de templates enviados (DigitalOcean Spaces).
+
+Guarda o .docx já normalizado (.doc convertido pelo LibreOffice) e validado,
+chaveado por (template.id, template.version, storage_file_key). Como o
+conteúdo de uma versão nunca muda, não há expiração: versões antigas saem
+por LRU ou por invalidate() nas rotas de templates.
+
+Dois níveis:
+- memória: LRU limitado por bytes (TEMPLATE_CACHE_MEMORY_MB)
+- disco: arquivos em TEMPLATE_CACHE_DIR, LRU por mtime (TEMPLATE_CACHE_DISK_MB)
+
+Os textos compilados (TagProcessor.compiled_for) usam a mesma chave de
+versão e são invalidados junto.
+"""
+import os
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .tag_processor import TagProcessor
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv(
+    'TEMPLATE_CACHE_DIR',
+    os.path.join(tempfile.gettempdir(), 'docg-template-cache')
+)
+MEMORY_LIMIT_BYTES = int(os.getenv('TEMPLATE_CACHE_MEMORY_MB', '64')) * 1024 * 1024
+DISK_LIMIT_BYTES = int(os.getenv('TEMPLATE_CACHE_DISK_MB', '512')) * 1024 * 1024
+
+
+class UploadedTemplateCache:
+    """Cache em memória + disco de templates enviados normalizados"""
+
+    def __init__(
+        self,
+        cache_dir: str = CACHE_DIR,
+        memory_limit: int = MEMORY_LIMIT_BYTES,
+        disk_limit: int = DISK_LIMIT_BYTES
+    ):
+        self.cache_dir = cache_dir
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory: 'OrderedDict[Tuple, bytes]' = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        # chave -> [lock, chamadores usando o lock]
+        self._fill_locks: Dict[Tuple, list] = {}
+
+    @staticmethod
+    def cache_key(template) -> Tuple[str, int, str]:
+        return (str(template.id), template.version or 1, template.storage_file_key or '')
+
+    def get_normalized(self, template) -> bytes:
+        """
+        Retorna o .docx normalizado do template, baixando só em cache miss.
+
+        Raises:
+            ValueError: Se o arquivo não puder ser normalizado ou for inválido
+        """
+        key = self.cache_key(template)
+
+        content = self._get(key)
+        if content is not None:
+            return content
+
+        # Um único download/conversão por chave, mesmo com gerações concorrentes.
+        # O lock só sai do dicionário quando ninguém mais o usa: senão um novo
+        # chamador criaria outro lock enquanto alguém ainda espera o antigo
+        with self._lock:
+            fill = self._fill_locks.setdefault(key, [threading.Lock(), 0])
+            fill[1] += 1
+
+        try:
+            with fill[0]:
+                content = self._get(key)
+                if content is None:
+                    content = self._load(template)
+                    self.put(template, content)
+        finally:
+            with self._lock:
+                fill[1] -= 1
+                if not fill[1]:
+                    del self._fill_locks[key]
+
+        return content
+
+    def put(self, template, content: bytes) -> None:
+        """Armazena o .docx normalizado de uma versão do template"""
+        key = self.cache_key(template)
+        self._put_memory(key, content)
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            self._evict_disk()
+        except OSError as e:
+            logger.warning(f'Não foi possível gravar template {key[0]} no cache em disco: {e}')
+
+    def invalidate(self, template_id) -> None:
+        """Remove todas as versões de um template (memória, disco e compilados)"""
+        template_id = str(template_id)
+
+        with self._lock:
+            for key in [k for k in self._memory if k[0] == template_id]:
+                self._memory_size -= len(self._memory.pop(key))
+
+        prefix = f'{template_id}-'
+        try:
+            for name in os.listdir(self.cache_dir):
+                if name.startswith(prefix):
+                    os.remove(os.path.join(self.cache_dir, name))
+        except OSError:
+            pass
+
+        TagProcessor.invalidate_compiled(template_id)
+        logger.info(f'Cache do template {template_id} invalidado')
+
+    def _get(self, key: Tuple) -> Optional[bytes]:
+        with self._lock:
+            content = self._memory.get(key)
+            if content is not None:
+                self._memory.move_to_end(key)
+                return content
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            os.utime(path)  # marca uso para o LRU em disco
+        except OSError:
+            return None
+
+        self._put_memory(key, content)
+        return content
+
+    def _put_memory(self, key: Tuple, content: bytes) -> None:
+        if len(content) > self.memory_limit:
+            return
+
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_size -= len(previous)
+
+            self._memory[key] = content
+            self._memory_size += len(content)
+
+            while self._memory_size > self.memory_limit:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_size -= len(evicted)
+
+    def _path(self, key: Tuple) -> str:
+        template_id, version, storage_key = key
+        digest = hashlib.sha256(storage_key.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f'{template_id}-{version}-{digest}.docx')
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.docx'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    @staticmethod
+    def _load(template) -> bytes:
+        """Baixa, normaliza e valida o template (executado só em cache miss)"""
+        import requests
+        from app.services.storage import DigitalOceanSpacesService
+        from .document_converter import DocumentConverter
+
+        storage_service = DigitalOceanSpacesService()
+        template_url = storage_service.generate_signed_url(
+            template.storage_file_key,
+            expiration=300  # 5 minutos
+        )
+
+        response = requests.get(template_url, timeout=60)
+        response.raise_for_status()
+        template_bytes = response.content
+
+        logger.info(f'Template {template.id} v{template.version} baixado: {len(template_bytes)} bytes')
+
+        file_extension = os.path.splitext(template.storage_file_key)[1] or '.docx'
+        try:
+            normalized_bytes, _ = DocumentConverter.normalize_document(template_bytes, file_extension)
+        except ValueError as e:
+            raise ValueError(f'Não foi possível processar o arquivo: {str(e)}')
+
+        is_valid, error_message = DocumentConverter.validate_document_structure(normalized_bytes)
+        if not is_valid:
+            raise ValueError(f'Documento não é válido: {error_message}')
+
+        return normalized_bytes
+
+
+_cache: Optional[UploadedTemplateCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_template_cache() -> UploadedTemplateCache:
+    """Retorna singleton do cache de templates enviados"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = UploadedTemplateCache()
+    return _cache
@@ -240,36 +240,8 @@ class EnvelopeCreationService:
     
     def get_google_credentials(self):
         """Obter credenciais Google"""
-        token = GoogleOAuthToken.query.filter_by(organization_id=self.organization_id).first()
-        
-        if not token:
-            return None
-        
-        try:
-            creds_data = json.loads(token.access_token)
-            creds = Credentials.from_authorized_user_info(creds_data)
-            
-            # Se token expirou, tentar renovar usando refresh_token
-            if creds.expired or token.is_expired():
-                if creds.refresh_token:
-                    try:
-                        creds.refresh(Request())
-                        # Atualizar no banco após renovação bem-sucedida
-                        token.access_token = creds.to_json()
-                        token.token_expiry = creds.expiry
-                        db.session.commit()
-                    except Exception as refresh_error:
-                        # Se renovação falhar, retornar None
-                        print(f"Error refreshing token: {refresh_error}")
-                        return None
-                else:
-                    # Não há refresh_token para renovar
-                    return None
-            
-            return creds
-        except Exception as e:
-            print(f"Error getting credentials: {e}")
-            return None
+        from app.services.credential_resolver import get_credential_resolver
+        return get_credential_resolver().get_google_credentials(self.organization_id)
     
     def download_google_drive_file(self, file_id):
         """Baixar arquivo do Google Drive"""
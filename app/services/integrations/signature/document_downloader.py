@@ -112,52 +112,14 @@ class DocumentDownloader:
     
     def _get_google_credentials(self) -> Optional[Credentials]:
         """Obtém credenciais do Google"""
-        from app.models import GoogleOAuthToken
-        from app.database import db
-        
-        token = GoogleOAuthToken.query.filter_by(
-            organization_id=self.organization_id
-        ).first()
-        
-        if not token:
-            return None
-        
-        try:
-            creds_data = json.loads(token.access_token)
-            creds = Credentials.from_authorized_user_info(creds_data)
-            
-            # Renovar token se expirado
-            if creds.expired or token.is_expired():
-                if creds.refresh_token:
-                    try:
-                        creds.refresh(Request())
-                        token.access_token = creds.to_json()
-                        token.token_expiry = creds.expiry
-                        db.session.commit()
-                    except Exception as e:
-                        logger.error(f"Error refreshing Google token: {e}")
-                        return None
-            
-            return creds
-        except Exception as e:
-            logger.error(f"Error getting Google credentials: {e}")
-            return None
+        from app.services.credential_resolver import get_credential_resolver
+        return get_credential_resolver().get_google_credentials(self.organization_id)
     
     def _get_microsoft_access_token(self) -> Optional[str]:
         """Obtém access token do Microsoft"""
-        from app.models import DataSourceConnection
-        
-        connection = DataSourceConnection.query.filter_by(
-            organization_id=self.organization_id,
-            source_type='microsoft',
-            status='active'
-        ).first()
-        
-        if not connection:
-            return None
-        
-        credentials = connection.get_decrypted_credentials()
-        return credentials.get('access_token')
+        from app.services.credential_resolver import get_credential_resolver
+        credentials = get_credential_resolver().get_microsoft_credentials(self.organization_id)
+        return credentials.get('access_token') if credentials else None
     
     def get_file_info(self, file_id: str, storage_type: str = 'google_drive') -> dict:
         """
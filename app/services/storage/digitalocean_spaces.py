@@ -81,6 +81,27 @@ class DigitalOceanSpacesService:
             logger.error(f"Error uploading file to Spaces: {str(e)}")
             raise Exception(f"Erro ao fazer upload do arquivo: {str(e)}")
     
+    def download_file(self, key: str) -> bytes:
+        """
+        Baixa o conteúdo de um arquivo do DigitalOcean Spaces.
+
+        Args:
+            key: Chave do arquivo no Spaces
+
+        Returns:
+            Conteúdo do arquivo
+
+        Raises:
+            ClientError: Se houver erro no download
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+            return response['Body'].read()
+
+        except ClientError as e:
+            logger.error(f"Error downloading file from Spaces: {str(e)}")
+            raise Exception(f"Erro ao baixar arquivo: {str(e)}")
+
     def generate_signed_url(self, key: str, expiration: int = 3600) -> str:
         """
         Gera URL assinada temporária para download/visualização.
@@ -0,0 +1,509 @@
+"""
+Ingestão de webhooks de trigger com fila durável (webhook_deliveries).
+
+O endpoint público fazia tudo dentro do request: criava a WorkflowExecution,
+iniciava o workflow no Temporal (ou executava o WorkflowExecutor inteiro sem
+Temporal). Remetentes em rajada estouravam o timeout e reenviavam, gerando
+execuções duplicadas. Agora:
+
+1. enqueue_delivery: um INSERT ... ON CONFLICT com dedup_key
+   (Idempotency-Key ou hash do payload + query string; sem nenhum dos
+   dois, não deduplica) e o endpoint responde 202.
+   Webhooks em lote (records_path no trigger) viram uma entrega por
+   registro (enqueue_records)
+2. WebhookDrainer (thread por processo, iniciada no create_app e
+   acordada a cada enfileiramento): drain_deliveries pega lotes com
+   FOR UPDATE SKIP LOCKED, cria as execuções num commit e inicia os
+   workflows em lote (start_workflow_executions); sem Temporal, pega e
+   executa uma entrega por vez. Workflow, config do
+   trigger e mapeamento vêm da tabela de rotas (app/utils/webhook_routes.py)
+3. Entregas presas em 'starting' (processo morreu entre o commit e o start)
+   são retomadas depois de WEBHOOK_START_TIMEOUT; o ID do workflow no
+   Temporal é determinístico, então o reinício não duplica
+
+Janelas de deduplicação: chaves de idempotência (header) valem por
+WEBHOOK_DEDUP_WINDOW; o hash do payload só por WEBHOOK_PAYLOAD_DEDUP_WINDOW,
+porque o mesmo corpo pode ser um evento novo (ex: status que volta ao valor
+anterior). Fora da janela a linha concluída é reaproveitada pela nova
+entrega e depois removida pelo prune_deliveries.
+"""
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.dialects.postgresql import insert
+
+from app.database import db
+from app.models import Workflow, WorkflowExecution, WebhookDelivery
+from app.utils.webhook_routes import WebhookRoute, get_webhook_routes
+
+logger = logging.getLogger(__name__)
+
+DRAIN_BATCH_SIZE = int(os.getenv('WEBHOOK_DRAIN_BATCH_SIZE', '50'))
+DRAIN_INTERVAL = float(os.getenv('WEBHOOK_DRAIN_INTERVAL', '1'))
+START_TIMEOUT = int(os.getenv('WEBHOOK_START_TIMEOUT', '300'))
+DEDUP_WINDOW = int(os.getenv('WEBHOOK_DEDUP_WINDOW', '86400'))
+PAYLOAD_DEDUP_WINDOW = int(os.getenv('WEBHOOK_PAYLOAD_DEDUP_WINDOW', '300'))
+MAX_RECORDS = int(os.getenv('WEBHOOK_MAX_RECORDS', '1000'))
+DRAINER_ENABLED = os.getenv('WEBHOOK_DRAINER_ENABLED', 'true').lower() == 'true'
+MAX_ATTEMPTS = 5
+PRUNE_INTERVAL = 600
+
+# Headers aceitos como chave de idempotência (na ordem)
+IDEMPOTENCY_HEADERS = ('Idempotency-Key', 'X-Idempotency-Key', 'X-Webhook-Id')
+
+
+def dedup_key(payload: Any, headers, query: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Chave de deduplicação: header de idempotência ou hash do payload (+ query string).
+
+    Sem header, body vazio e sem query string (ex: GET sem parâmetros) não
+    há o que comparar: cada chamada recebe uma chave única e executa.
+    """
+    for header in IDEMPOTENCY_HEADERS:
+        value = headers.get(header)
+        if value:
+            return f'h:{value.strip()[:240]}'
+
+    if not payload and not query:
+        return f'u:{uuid.uuid4().hex}'
+
+    content = {'payload': payload, 'query': query} if query else payload
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), default=str)
+    return f'p:{hashlib.sha256(canonical.encode()).hexdigest()}'
+
+
+def enqueue_delivery(
+    workflow_id, trigger_node_id, payload: Any, headers, query: Optional[Dict[str, Any]] = None
+) -> Tuple[str, bool]:
+    """
+    Grava o webhook na fila (commit) e acorda o drainer.
+
+    Args:
+        query: Query string do request (entra no hash de deduplicação)
+
+    Returns:
+        (delivery_id, duplicate) - duplicate indica reenvio já enfileirado
+    """
+    key = dedup_key(payload, headers, query)
+    now = datetime.utcnow()
+
+    statement = _insert_deliveries([_delivery_row(workflow_id, trigger_node_id, key, payload, now)], now)
+
+    row = db.session.execute(statement).first()
+    if row is None:
+        existing = db.session.query(WebhookDelivery.id).filter_by(
+            workflow_id=workflow_id,
+            dedup_key=key
+        ).scalar()
+        db.session.rollback()
+        return str(existing), True
+
+    db.session.commit()
+    get_webhook_drainer().notify()
+    return str(row[0]), False
+
+
+def enqueue_records(workflow_id, trigger_node_id, records: List[Any], headers) -> Tuple[List[str], int]:
+    """
+    Webhook em lote: grava um registro por entrega (um INSERT) e acorda o drainer.
+
+    A chave de cada registro é a chave de idempotência + posição, ou o hash
+    do próprio registro.
+
+    Returns:
+        (ids das entregas novas, quantidade de registros duplicados)
+    """
+    has_header = any(headers.get(header) for header in IDEMPOTENCY_HEADERS)
+    base_key = dedup_key(None, headers)[:230] if has_header else None
+
+    now = datetime.utcnow()
+    rows = {}
+    for position, record in enumerate(records):
+        key = f'{base_key}:{position}' if base_key else dedup_key(record, {})
+        rows[key] = _delivery_row(workflow_id, trigger_node_id, key, record, now)
+
+    statement = _insert_deliveries(list(rows.values()), now)
+    inserted = [str(row[0]) for row in db.session.execute(statement)]
+    db.session.commit()
+
+    if inserted:
+        get_webhook_drainer().notify()
+    return inserted, len(records) - len(inserted)
+
+
+def _delivery_row(workflow_id, trigger_node_id, key: str, payload: Any, now: datetime) -> Dict[str, Any]:
+    return {
+        'id': uuid.uuid4(),
+        'workflow_id': workflow_id,
+        'trigger_node_id': trigger_node_id,
+        'dedup_key': key,
+        'payload': payload,
+        'status': 'pending',
+        'attempts': 0,
+        'received_at': now,
+        'updated_at': now
+    }
+
+
+def _insert_deliveries(rows: List[Dict[str, Any]], now: datetime):
+    """
+    INSERT das entregas; conflito de dedup_key é duplicata (nenhuma linha retornada).
+
+    Exceção: chave de hash de payload cuja entrega já terminou e está fora
+    de PAYLOAD_DEDUP_WINDOW - a linha antiga vira a nova entrega.
+    """
+    table = WebhookDelivery.__table__
+    statement = insert(table).values(rows)
+    excluded = statement.excluded
+    return statement.on_conflict_do_update(
+        constraint='unique_webhook_delivery_dedup',
+        set_={
+            'trigger_node_id': excluded.trigger_node_id,
+            'payload': excluded.payload,
+            'status': 'pending',
+            'execution_id': None,
+            'attempts': 0,
+            'error_message': None,
+            'received_at': excluded.received_at,
+            'updated_at': excluded.updated_at
+        },
+        where=and_(
+            ~table.c.dedup_key.startswith('h:'),
+            table.c.status.in_(WebhookDelivery.DONE_STATUSES),
+            table.c.received_at < now - timedelta(seconds=PAYLOAD_DEDUP_WINDOW)
+        )
+    ).returning(table.c.id)
+
+
+def drain_deliveries(limit: int = DRAIN_BATCH_SIZE) -> int:
+    """
+    Processa até limit entregas pendentes (ou presas em 'starting').
+
+    Returns:
+        Quantidade de entregas pegas neste lote
+    """
+    from app.temporal.service import is_temporal_enabled
+
+    temporal = is_temporal_enabled()
+    if not temporal:
+        # A execução local roda o workflow inteiro: uma entrega por vez, senão
+        # as seguintes do lote ficam em 'starting' além de START_TIMEOUT e
+        # outro processo as toma como presas
+        limit = 1
+
+    stuck_before = datetime.utcnow() - timedelta(seconds=START_TIMEOUT)
+    deliveries = WebhookDelivery.query.filter(
+        or_(
+            WebhookDelivery.status == 'pending',
+            and_(WebhookDelivery.status == 'starting', WebhookDelivery.updated_at < stuck_before)
+        )
+    ).order_by(WebhookDelivery.received_at).limit(limit).with_for_update(skip_locked=True).all()
+
+    if not deliveries:
+        db.session.rollback()
+        return 0
+
+    if temporal:
+        _start_via_temporal(deliveries)
+    else:
+        _execute_locally(deliveries)
+
+    return len(deliveries)
+
+
+def prune_deliveries() -> int:
+    """Remove entregas concluídas fora da janela de deduplicação da sua chave"""
+    now = datetime.utcnow()
+    deleted = WebhookDelivery.query.filter(
+        WebhookDelivery.status.in_(WebhookDelivery.DONE_STATUSES),
+        or_(
+            WebhookDelivery.received_at < now - timedelta(seconds=DEDUP_WINDOW),
+            and_(
+                ~WebhookDelivery.dedup_key.startswith('h:'),
+                WebhookDelivery.received_at < now - timedelta(seconds=PAYLOAD_DEDUP_WINDOW)
+            )
+        )
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
+
+
+def _start_via_temporal(deliveries: List[WebhookDelivery]) -> None:
+    """Cria as execuções (um commit) e inicia os workflows em lote"""
+    from temporalio.exceptions import WorkflowAlreadyStartedError
+    from app.temporal.service import start_workflow_executions
+
+    routes = _load_routes(deliveries)
+    mapped = _map_deliveries(deliveries, routes)
+    now = datetime.utcnow()
+    pending = []
+
+    for delivery in deliveries:
+        delivery.attempts = (delivery.attempts or 0) + 1
+        delivery.updated_at = now
+
+        if delivery.execution_id:
+            # Retomada: a execução já existe, só falta o start
+            execution = WorkflowExecution.query.get(delivery.execution_id)
+            if execution is None or delivery.attempts > MAX_ATTEMPTS:
+                _fail(delivery, execution, 'Não foi possível iniciar o workflow')
+                continue
+        else:
+            route = routes.get(delivery.trigger_node_id)
+            if route is None or not route.is_active:
+                _fail(delivery, None, 'Workflow não encontrado ou inativo')
+                continue
+            if route.mapping_error:
+                _fail(delivery, None, route.mapping_error)
+                continue
+            execution = _build_execution(route, delivery.payload, mapped[delivery.id])
+            db.session.add(execution)
+            delivery.execution_id = execution.id
+
+        delivery.status = 'starting'
+        pending.append((delivery, execution))
+
+    # Execuções gravadas (e locks liberados) antes de falar com o Temporal
+    db.session.commit()
+    if not pending:
+        return
+
+    try:
+        results = start_workflow_executions([execution for _, execution in pending])
+    except Exception as e:
+        # Ficam em 'starting' e são retomadas depois de START_TIMEOUT
+        logger.error(f'Erro ao iniciar lote de {len(pending)} webhooks no Temporal: {e}')
+        db.session.rollback()
+        return
+
+    for delivery, execution in pending:
+        result = results.get(str(execution.id))
+        if isinstance(result, WorkflowAlreadyStartedError):
+            execution.temporal_workflow_id = f'exec_{execution.id}'
+            result = None
+        if isinstance(result, BaseException):
+            _fail(delivery, execution, str(result))
+        else:
+            delivery.status = 'processed'
+            delivery.error_message = None
+        delivery.updated_at = datetime.utcnow()
+    db.session.commit()
+
+    logger.info(f'{len(pending)} webhooks iniciados no Temporal')
+
+
+def _execute_locally(deliveries: List[WebhookDelivery]) -> None:
+    """Sem Temporal: executa pelo WorkflowExecutor na thread do drainer (uma entrega por chamada)"""
+    from app.services.workflow_executor import WorkflowExecutor
+
+    routes = _load_routes(deliveries)
+    mapped = _map_deliveries(deliveries, routes)
+    now = datetime.utcnow()
+    runnable = []
+
+    for delivery in deliveries:
+        delivery.attempts = (delivery.attempts or 0) + 1
+        delivery.updated_at = now
+        if delivery.status == 'starting':
+            # Processo morreu no meio da execução local
+            _fail(delivery, None, 'Execução interrompida')
+            continue
+        delivery.status = 'starting'
+        runnable.append(delivery)
+
+    # Marcar como 'starting' antes de executar: o executor faz commits e
+    # liberaria os locks das outras entregas do lote
+    db.session.commit()
+
+    executor = WorkflowExecutor()
+    for delivery in runnable:
+        route = routes.get(delivery.trigger_node_id)
+        workflow = Workflow.query.get(route.workflow_id) if route is not None else None
+        if workflow is None or workflow.status != 'active':
+            _fail(delivery, None, 'Workflow não encontrado ou inativo')
+            db.session.commit()
+            continue
+        if route.mapping_error:
+            _fail(delivery, None, route.mapping_error)
+            db.session.commit()
+            continue
+
+        source_object_id, source_object_type, _ = _trigger_source(route, mapped[delivery.id])
+        try:
+            execution = executor.execute_workflow(
+                workflow=workflow,
+                source_object_id=str(source_object_id),
+                source_object_type=source_object_type,
+                user_id=None
+            )
+            delivery.execution_id = execution.id
+            delivery.status = 'processed'
+        except Exception as e:
+            logger.error(f'Erro ao executar workflow {workflow.id} via webhook: {e}')
+            db.session.rollback()
+            _fail(delivery, None, str(e))
+        delivery.updated_at = datetime.utcnow()
+        db.session.commit()
+
+
+def _load_routes(deliveries: List[WebhookDelivery]) -> Dict[Any, Optional[WebhookRoute]]:
+    """{trigger_node_id: rota} das entregas do lote (tabela de rotas em memória)"""
+    routes = get_webhook_routes()
+    return {
+        node_id: routes.get_by_node(node_id)
+        for node_id in {d.trigger_node_id for d in deliveries}
+    }
+
+
+def _map_deliveries(
+    deliveries: List[WebhookDelivery],
+    routes: Dict[Any, Optional[WebhookRoute]]
+) -> Dict[Any, Any]:
+    """{delivery_id: source_data}, mapeando de uma vez os payloads de cada rota"""
+    by_node: Dict[Any, List[WebhookDelivery]] = {}
+    for delivery in deliveries:
+        by_node.setdefault(delivery.trigger_node_id, []).append(delivery)
+
+    mapped = {}
+    for node_id, node_deliveries in by_node.items():
+        route = routes.get(node_id)
+        if route is None or route.mapping_error:
+            continue
+        source_data = route.mapping.map_many([d.payload for d in node_deliveries])
+        mapped.update(zip((d.id for d in node_deliveries), source_data))
+    return mapped
+
+
+def _trigger_source(route: WebhookRoute, source_data: Any) -> Tuple[str, str, Any]:
+    """(source_object_id, source_object_type, source_data) do payload já mapeado"""
+    # Determinar source_object_id (pode vir do payload ou gerar)
+    source_object_id = (
+        (source_data.get('id') or source_data.get('object_id')) if isinstance(source_data, dict) else None
+    ) or f'webhook_{datetime.utcnow().isoformat()}'
+
+    return source_object_id, route.source_object_type, source_data
+
+
+def _build_execution(route: WebhookRoute, payload: Any, source_data: Any) -> WorkflowExecution:
+    source_object_id, source_object_type, source_data = _trigger_source(route, source_data)
+    return WorkflowExecution(
+        id=uuid.uuid4(),
+        workflow_id=route.workflow_id,
+        trigger_type='webhook',
+        trigger_data={
+            'source_object_id': str(source_object_id),
+            'source_object_type': source_object_type,
+            'payload': payload,  # Payload original
+            'source_data': source_data  # Payload mapeado
+        },
+        status='running'
+    )
+
+
+def _fail(delivery: WebhookDelivery, execution: Optional[WorkflowExecution], message: str) -> None:
+    """Marca a entrega (e a execução, se houver) como falha (sem commit)"""
+    delivery.status = 'failed'
+    delivery.error_message = message
+    if execution is not None and execution.status == 'running':
+        execution.status = 'failed'
+        execution.error_message = message
+        execution.completed_at = datetime.utcnow()
+
+
+class WebhookDrainer:
+    """
+    Thread daemon que esvazia a fila de webhooks deste processo.
+
+    Iniciada no boot (create_app) para retomar entregas pendentes ou presas
+    depois de crash/deploy/reciclagem de worker, sem esperar um novo
+    webhook. Acorda a cada enfileiramento (notify) ou a cada
+    WEBHOOK_DRAIN_INTERVAL segundos. Vários processos podem drenar ao mesmo
+    tempo (SKIP LOCKED).
+    """
+
+    def __init__(self, interval: float = DRAIN_INTERVAL):
+        self.interval = interval
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._app = None
+        self._lock = threading.Lock()
+        self._pruned_at = 0.0
+
+    def start(self, app) -> None:
+        """Inicia a thread neste processo, se ainda não estiver rodando"""
+        if self._running():
+            return
+        with self._lock:
+            if self._running():
+                return
+            self._app = app
+            self._thread = threading.Thread(
+                target=self._run, args=(app,), name='webhook-drainer', daemon=True
+            )
+            self._pid = os.getpid()
+            self._thread.start()
+
+    def notify(self) -> None:
+        """Garante a thread rodando (com o app atual) e a acorda"""
+        if not self._running():
+            from flask import current_app
+            self.start(current_app._get_current_object())
+        self._wake.set()
+
+    def after_fork(self) -> None:
+        """No processo filho (gunicorn --preload): a thread do pai não existe mais"""
+        self._lock = threading.Lock()
+        if self._app is not None:
+            self.start(self._app)
+
+    def _running(self) -> bool:
+        return self._thread is not None and self._pid == os.getpid() and self._thread.is_alive()
+
+    def _run(self, app) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with app.app_context():
+                try:
+                    while drain_deliveries():
+                        pass
+                    if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+                        self._pruned_at = time.monotonic()
+                        prune_deliveries()
+                except Exception as e:
+                    logger.exception(f'Erro ao drenar fila de webhooks: {e}')
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+
+
+_drainer: Optional[WebhookDrainer] = None
+_drainer_lock = threading.Lock()
+
+
+def get_webhook_drainer() -> WebhookDrainer:
+    """Retorna singleton do drainer de webhooks"""
+    global _drainer
+    if _drainer is None:
+        with _drainer_lock:
+            if _drainer is None:
+                _drainer = WebhookDrainer()
+    return _drainer
+
+
+def _restart_drainer_after_fork() -> None:
+    if _drainer is not None:
+        _drainer.after_fork()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_drainer_after_fork)
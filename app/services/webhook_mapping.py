@@ -0,0 +1,210 @@
+"""
+Mapeamento do payload de webhooks de trigger para source_data.
+
+O field_mapping do trigger node é compilado uma vez (quando a rota do
+token é montada, e validado quando o node é salvo) em acessores; aplicar o
+mapeamento só percorre os passos já resolvidos.
+
+Formato do field_mapping ({campo: origem}):
+- 'deal.id'                      caminho com pontos
+- 'items[0].sku' / 'items.0.sku' índice de array
+- 'items[*].sku'                 curinga: lista com o valor de cada item
+- {'path': 'deal.amount', 'default': 0}  valor padrão quando não existe
+
+records_path (config do trigger, opcional) aponta para a lista de registros
+de um webhook em lote ('data', 'events[*].object'); cada registro vira uma
+execução.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Passos de um caminho: chave (str), índice (int) ou curinga
+WILDCARD = object()
+Step = Union[str, int, object]
+
+_MISSING = object()
+_SEGMENT = re.compile(r'([^.\[\]]+)|\[(\d+|\*)\]|(\.)')
+
+
+class CompiledMapping:
+    """field_mapping compilado: payload -> source_data"""
+
+    def __init__(self, accessors: Tuple[Tuple[str, Callable[[Any], Any], Any], ...]):
+        self._accessors = accessors
+
+    def __call__(self, payload: Any) -> Any:
+        if not self._accessors:
+            # Sem mapeamento, usar payload completo
+            return payload
+
+        source_data = {}
+        for target_field, accessor, default in self._accessors:
+            value = accessor(payload)
+            if value is _MISSING or value is None:
+                value = default
+            if value is not None:
+                source_data[target_field] = value
+        return source_data
+
+    def map_many(self, payloads: List[Any]) -> List[Any]:
+        """Mapeia vários payloads (webhooks em lote)"""
+        return [self(payload) for payload in payloads]
+
+
+def compile_field_mapping(field_mapping: Optional[Dict[str, Any]]) -> CompiledMapping:
+    """
+    Compila o field_mapping.
+
+    Raises:
+        ValueError: Caminho ou especificação inválida
+    """
+    if field_mapping and not isinstance(field_mapping, dict):
+        raise ValueError('field_mapping deve ser um objeto {campo: caminho}')
+
+    accessors = []
+    for target_field, spec in (field_mapping or {}).items():
+        default = None
+        if isinstance(spec, dict):
+            default = spec.get('default')
+            spec = spec.get('path')
+        if not isinstance(spec, str) or not spec.strip():
+            raise ValueError(f'Mapeamento inválido para "{target_field}": informe o caminho no payload')
+        accessors.append((target_field, compile_path(spec), default))
+    return CompiledMapping(tuple(accessors))
+
+
+def compile_records_path(records_path: Optional[str]) -> Callable[[Any], List[Any]]:
+    """
+    Compila records_path em uma função payload -> lista de registros.
+
+    Sem records_path, o payload inteiro é o único registro.
+
+    Raises:
+        ValueError: Caminho inválido
+    """
+    if not records_path:
+        return _single_record
+
+    accessor = compile_path(records_path)
+
+    def records(payload: Any) -> List[Any]:
+        value = accessor(payload)
+        if value is _MISSING or value is None:
+            return []
+        return value if isinstance(value, list) else [value]
+
+    return records
+
+
+def compile_path(path: str) -> Callable[[Any], Any]:
+    """
+    Compila um caminho ('a.b[0].c', 'items[*].id') em um acessor.
+
+    O acessor devolve _MISSING quando o caminho não existe no payload.
+
+    Raises:
+        ValueError: Sintaxe inválida
+    """
+    if not isinstance(path, str):
+        raise ValueError(f'Caminho inválido: {path!r}')
+    steps = tuple(_parse_path(path))
+
+    def access(payload: Any) -> Any:
+        return _walk(payload, steps, 0)
+
+    return access
+
+
+def validate_trigger_mapping(config: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Mensagem de erro se field_mapping/records_path do trigger não compilam"""
+    config = config or {}
+    try:
+        compile_field_mapping(config.get('field_mapping'))
+        compile_records_path(config.get('records_path'))
+    except ValueError as e:
+        return str(e)
+    return None
+
+
+def map_webhook_payload(payload, field_mapping):
+    """
+    Mapeia campos do payload do webhook para source_data conforme field_mapping.
+
+    Args:
+        payload: Dict com dados recebidos do webhook
+        field_mapping: Dict com mapeamento {target_field: source_path}
+
+    Returns:
+        Dict com source_data mapeado
+    """
+    return compile_field_mapping(field_mapping)(payload)
+
+
+def _parse_path(path: str) -> List[Step]:
+    steps: List[Step] = []
+    position = 0
+    expect_key = True
+    path = path.strip()
+
+    while position < len(path):
+        match = _SEGMENT.match(path, position)
+        if match is None:
+            raise ValueError(f'Caminho inválido: "{path}"')
+        key, index, dot = match.groups()
+        if dot:
+            if expect_key:
+                raise ValueError(f'Caminho inválido: "{path}"')
+            expect_key = True
+        elif key is not None:
+            if not expect_key:
+                raise ValueError(f'Caminho inválido: "{path}"')
+            if key == '*':
+                steps.append(WILDCARD)
+            elif key.isdigit():
+                steps.append(int(key))
+            else:
+                steps.append(key)
+            expect_key = False
+        else:
+            steps.append(WILDCARD if index == '*' else int(index))
+            expect_key = False
+        position = match.end()
+
+    if not steps or expect_key:
+        raise ValueError(f'Caminho inválido: "{path}"')
+    return steps
+
+
+def _walk(value: Any, steps: Tuple[Step, ...], start: int) -> Any:
+    for position in range(start, len(steps)):
+        step = steps[position]
+        if step is WILDCARD:
+            if isinstance(value, dict):
+                items = list(value.values())
+            elif isinstance(value, list):
+                items = value
+            else:
+                return _MISSING
+            results = [_walk(item, steps, position + 1) for item in items]
+            return [item for item in results if item is not _MISSING and item is not None]
+        if isinstance(step, int):
+            if isinstance(value, list):
+                if not -len(value) <= step < len(value):
+                    return _MISSING
+                value = value[step]
+                continue
+            if isinstance(value, dict):
+                # Chave numérica em objeto ('0')
+                step = str(step)
+            else:
+                return _MISSING
+        if not isinstance(value, dict) or step not in value:
+            return _MISSING
+        value = value[step]
+        if value is None:
+            return None
+    return value
+
+
+def _single_record(payload: Any) -> List[Any]:
+    return [payload]
@@ -10,6 +10,7 @@ import requests
 from app.database import db
 from app.models import Workflow, WorkflowNode, WorkflowExecution, GeneratedDocument
 from app.services.data_sources.hubspot import HubSpotDataSource
+from app.services.data_sources.property_planner import get_property_plan
 
 logger = logging.getLogger(__name__)
 
@@ -124,11 +125,15 @@ class TriggerNodeExecutor(NodeExecutor):
             if connection.source_type != 'hubspot':
                 raise ValueError(f'Tipo de conexão não suportado: {connection.source_type}')
             
-            # Extrair dados do HubSpot
+            # Extrair dados do HubSpot (só as propriedades que o workflow usa)
+            workflow = Workflow.query.get(context.workflow_id)
+            plan = get_property_plan(workflow, source_object_type) if workflow else None
+            
             data_source = HubSpotDataSource(connection)
             source_data = data_source.get_object_data(
                 source_object_type,
-                context.source_object_id
+                context.source_object_id,
+                plan=plan
             )
             
             # Normalizar dados (mover properties para nível raiz)
@@ -1480,7 +1485,8 @@ class WorkflowExecutor:
                 try:
                     start_workflow_execution(
                         execution_id=str(execution.id),
-                        workflow_id=str(workflow.id)
+                        workflow_id=str(workflow.id),
+                        execution=execution
                     )
                     logger.info(f"Workflow {workflow.id} iniciado via Temporal (execution: {execution.id})")
                     return execution
@@ -16,11 +16,12 @@ Estrutura:
 """
 
 from .config import TemporalConfig
-from .client import get_temporal_client, send_signal
+from .client import get_temporal_client, get_client_thread, send_signal
 
 __all__ = [
     'TemporalConfig',
     'get_temporal_client',
+    'get_client_thread',
     'send_signal',
 ]
 
@@ -8,6 +8,7 @@ Cada activity representa uma operação específica:
 - approval: Criação e gerenciamento de aprovações
 - signature: Envio para assinatura e rastreamento
 - email: Envio de emails (Gmail, Outlook)
+- batch: Preparação e contadores da geração em lote
 """
 
 from .base import (
@@ -19,6 +20,7 @@ from .base import (
     complete_execution,
     fail_execution,
     add_execution_log,
+    record_node_transition,
 )
 from .trigger import execute_trigger_node
 from .document import execute_document_node
@@ -26,6 +28,12 @@ from .approval import create_approval, expire_approval
 from .signature import create_signature_request, expire_signature
 from .email import execute_email_node
 from .webhook import execute_webhook_node
+from .batch import (
+    load_batch_job,
+    prepare_batch_items,
+    record_batch_item_result,
+    finalize_batch_job,
+)
 
 # Lista de todas as activities para registrar no Worker
 ALL_ACTIVITIES = [
@@ -38,6 +46,7 @@ ALL_ACTIVITIES = [
     complete_execution,
     fail_execution,
     add_execution_log,
+    record_node_transition,
     # Trigger
     execute_trigger_node,
     # Document
@@ -52,6 +61,11 @@ ALL_ACTIVITIES = [
     execute_email_node,
     # Webhook
     execute_webhook_node,
+    # Batch
+    load_batch_job,
+    prepare_batch_items,
+    record_batch_item_result,
+    finalize_batch_job,
 ]
 
 __all__ = [
@@ -63,6 +77,7 @@ __all__ = [
     'complete_execution',
     'fail_execution',
     'add_execution_log',
+    'record_node_transition',
     'execute_trigger_node',
     'execute_document_node',
     'create_approval',
@@ -71,6 +86,10 @@ __all__ = [
     'expire_signature',
     'execute_email_node',
     'execute_webhook_node',
+    'load_batch_job',
+    'prepare_batch_items',
+    'record_batch_item_result',
+    'finalize_batch_job',
     'ALL_ACTIVITIES',
 ]
 
@@ -7,11 +7,14 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, List
 from temporalio import activity
 
+from ..executor import blocking_activity, ActivityClass
+
 logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def create_approval(data: Dict[str, Any]) -> Dict[str, Any]:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def create_approval(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Cria aprovação para revisão humana.
     
@@ -120,7 +123,8 @@ async def create_approval(data: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @activity.defn
-async def expire_approval(approval_id: str) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def expire_approval(approval_id: str) -> bool:
     """
     Marca aprovação como expirada.
     
@@ -6,50 +6,59 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List
 from temporalio import activity
 
+from ..executor import blocking_activity, ActivityClass
+
 logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def load_execution(execution_id: str) -> Dict[str, Any]:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def load_execution(execution_id: str) -> Dict[str, Any]:
     """
-    Carrega dados da execução e workflow do banco.
+    Carrega dados da execução e o plano do workflow.
+    
+    Só a WorkflowExecution (com o updated_at do workflow) vem do banco;
+    workflow e nodes vêm do plano em cache do worker (execution_plan.py).
     
     Args:
         execution_id: ID da WorkflowExecution
     
     Returns:
-        Dict com execution, workflow e nodes
+        Dict com execution, workflow, nodes e plan_version
     """
     from app.database import db
-    from app.models import WorkflowExecution, Workflow, WorkflowNode
+    from app.models import WorkflowExecution, Workflow
+    from app.temporal.execution_plan import get_execution_plans, plan_version
     from flask import current_app
     
     # Precisa do contexto Flask para acessar o banco
     with current_app.app_context():
-        execution = WorkflowExecution.query.get(execution_id)
-        if not execution:
+        row = db.session.query(WorkflowExecution, Workflow.id, Workflow.updated_at).outerjoin(
+            Workflow, Workflow.id == WorkflowExecution.workflow_id
+        ).filter(WorkflowExecution.id == execution_id).first()
+        if not row:
             raise ValueError(f'Execução não encontrada: {execution_id}')
         
-        workflow = Workflow.query.get(execution.workflow_id)
-        if not workflow:
+        execution, workflow_id, workflow_updated_at = row
+        if workflow_id is None:
             raise ValueError(f'Workflow não encontrado: {execution.workflow_id}')
         
-        nodes = WorkflowNode.query.filter_by(
-            workflow_id=workflow.id
-        ).order_by(WorkflowNode.position).all()
+        plan = get_execution_plans().get(workflow_id, version=plan_version(workflow_updated_at))
         
-        activity.logger.info(f"Carregada execução {execution_id} com {len(nodes)} nodes")
+        activity.logger.info(f"Carregada execução {execution_id} com {len(plan.nodes)} nodes")
         
         return {
-            'execution': execution.to_dict(include_logs=True),
-            'workflow': workflow.to_dict(),
-            'nodes': [n.to_dict(include_config=True) for n in nodes],
-            'organization_id': str(workflow.organization_id)
+            'execution': execution.to_dict(),
+            'workflow': plan.workflow_data,
+            'nodes': plan.nodes,
+            'organization_id': plan.organization_id,
+            'plan_version': plan.version
         }
 
 
 @activity.defn
-async def update_current_node(data: Dict[str, Any]) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def update_current_node(data: Dict[str, Any]) -> bool:
     """
     Atualiza o node atual sendo executado.
     
@@ -73,7 +82,8 @@ async def update_current_node(data: Dict[str, Any]) -> bool:
 
 
 @activity.defn
-async def save_execution_context(data: Dict[str, Any]) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def save_execution_context(data: Dict[str, Any]) -> bool:
     """
     Salva snapshot do ExecutionContext no banco.
     
@@ -97,7 +107,8 @@ async def save_execution_context(data: Dict[str, Any]) -> bool:
 
 
 @activity.defn
-async def pause_execution(execution_id: str) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def pause_execution(execution_id: str) -> bool:
     """
     Marca execução como pausada.
     
@@ -121,7 +132,8 @@ async def pause_execution(execution_id: str) -> bool:
 
 
 @activity.defn
-async def resume_execution(execution_id: str) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def resume_execution(execution_id: str) -> bool:
     """
     Marca execução como running (retomada).
     
@@ -145,7 +157,8 @@ async def resume_execution(execution_id: str) -> bool:
 
 
 @activity.defn
-async def complete_execution(execution_id: str) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def complete_execution(execution_id: str) -> bool:
     """
     Marca execução como completa.
     
@@ -161,14 +174,7 @@ async def complete_execution(execution_id: str) -> bool:
         if not execution:
             raise ValueError(f'Execução não encontrada: {execution_id}')
         
-        execution.status = 'completed'
-        execution.completed_at = datetime.utcnow()
-        
-        if execution.started_at:
-            execution.execution_time_ms = int(
-                (execution.completed_at - execution.started_at).total_seconds() * 1000
-            )
-        
+        _mark_completed(execution)
         db.session.commit()
         
         activity.logger.info(f"Execução {execution_id} completada em {execution.execution_time_ms}ms")
@@ -176,7 +182,8 @@ async def complete_execution(execution_id: str) -> bool:
 
 
 @activity.defn
-async def fail_execution(data: Dict[str, Any]) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def fail_execution(data: Dict[str, Any]) -> bool:
     """
     Marca execução como falha.
     
@@ -208,7 +215,8 @@ async def fail_execution(data: Dict[str, Any]) -> bool:
 
 
 @activity.defn
-async def add_execution_log(data: Dict[str, Any]) -> bool:
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def add_execution_log(data: Dict[str, Any]) -> bool:
     """
     Adiciona log de execução de um node.
     
@@ -233,27 +241,92 @@ async def add_execution_log(data: Dict[str, Any]) -> bool:
         if not execution:
             raise ValueError(f'Execução não encontrada: {data["execution_id"]}')
         
-        # Parsear datas se forem strings
-        started_at = data.get('started_at')
-        completed_at = data.get('completed_at')
+        _append_log(execution, data)
+        db.session.commit()
         
-        if isinstance(started_at, str):
-            started_at = datetime.fromisoformat(started_at)
-        if isinstance(completed_at, str):
-            completed_at = datetime.fromisoformat(completed_at)
+        activity.logger.info(f"Log adicionado para node {data['node_id']}: {data['status']}")
+        return True
+
+
+
+@activity.defn
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def record_node_transition(data: Dict[str, Any]) -> bool:
+    """
+    Registra a transição entre nodes em uma única transação.
+    
+    Substitui a sequência update_current_node + add_execution_log +
+    save_execution_context por um único round trip e um único commit.
+    Todos os campos (exceto execution_id) são opcionais.
+    
+    Args:
+        data: {
+            execution_id,
+            log: {node_id, node_type, status, started_at, completed_at, output, error},
+            current_node_id: próximo node a executar,
+            context: snapshot do ExecutionContext,
+            complete: True para marcar a execução como completa
+        }
+    """
+    from app.database import db
+    from app.models import WorkflowExecution
+    from flask import current_app
+    
+    with current_app.app_context():
+        execution = WorkflowExecution.query.get(data['execution_id'])
+        if not execution:
+            raise ValueError(f'Execução não encontrada: {data["execution_id"]}')
         
-        execution.add_log(
-            node_id=data['node_id'],
-            node_type=data['node_type'],
-            status=data['status'],
-            started_at=started_at,
-            completed_at=completed_at,
-            output=data.get('output'),
-            error=data.get('error')
-        )
+        if data.get('log'):
+            _append_log(execution, data['log'])
+        
+        if data.get('current_node_id'):
+            execution.current_node_id = data['current_node_id']
+        
+        if data.get('context') is not None:
+            execution.execution_context = data['context']
+        
+        if data.get('complete'):
+            _mark_completed(execution)
         
         db.session.commit()
         
-        activity.logger.info(f"Log adicionado para node {data['node_id']}: {data['status']}")
+        activity.logger.info(
+            f"Transição registrada para execução {data['execution_id']}: "
+            f"log={bool(data.get('log'))}, current_node={data.get('current_node_id')}, "
+            f"context={data.get('context') is not None}, complete={bool(data.get('complete'))}"
+        )
         return True
 
+
+def _append_log(execution, log: Dict[str, Any]):
+    """Adiciona entrada de log à execução (sem commit)"""
+    # Parsear datas se forem strings
+    started_at = log.get('started_at')
+    completed_at = log.get('completed_at')
+    
+    if isinstance(started_at, str):
+        started_at = datetime.fromisoformat(started_at)
+    if isinstance(completed_at, str):
+        completed_at = datetime.fromisoformat(completed_at)
+    
+    execution.add_log(
+        node_id=log['node_id'],
+        node_type=log['node_type'],
+        status=log['status'],
+        started_at=started_at,
+        completed_at=completed_at,
+        output=log.get('output'),
+        error=log.get('error')
+    )
+
+
+def _mark_completed(execution):
+    """Marca execução como completa (sem commit)"""
+    execution.status = 'completed'
+    execution.completed_at = datetime.utcnow()
+    
+    if execution.started_at:
+        execution.execution_time_ms = int(
+            (execution.completed_at - execution.started_at).total_seconds() * 1000
+        )
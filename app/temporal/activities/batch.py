@@ -0,0 +1,83 @@
+"""
+Activities de geração em lote - preparação de páginas e contadores do lote.
+"""
+import logging
+from typing import Dict, Any
+from temporalio import activity
+
+from ..executor import blocking_activity, ActivityClass
+
+logger = logging.getLogger(__name__)
+
+
+@activity.defn
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def load_batch_job(job_id: str) -> Dict[str, Any]:
+    """
+    Carrega o lote do banco.
+
+    Returns:
+        BatchGenerationJob.to_dict()
+    """
+    from app.models import BatchGenerationJob
+    from flask import current_app
+
+    with current_app.app_context():
+        job = BatchGenerationJob.query.get(job_id)
+        if not job:
+            raise ValueError(f'Lote não encontrado: {job_id}')
+        return job.to_dict()
+
+
+@activity.defn
+@blocking_activity(ActivityClass.INTEGRATION)
+def prepare_batch_items(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Prepara a próxima página de itens (busca em lote na fonte + execuções).
+
+    Args:
+        data: {job_id, limit}
+
+    Returns:
+        {cancelled: bool, items: [{item_id, execution_id, source_object_id}]}
+    """
+    from app.services.batch_generation import prepare_next_items
+    from flask import current_app
+
+    with current_app.app_context():
+        result = prepare_next_items(data['job_id'], limit=data.get('limit', 100))
+        activity.logger.info(f"Lote {data['job_id']}: {len(result['items'])} itens preparados")
+        return result
+
+
+@activity.defn
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def record_batch_item_result(data: Dict[str, Any]) -> bool:
+    """
+    Registra o resultado de um item do lote.
+
+    Args:
+        data: {item_id, status, error}
+    """
+    from app.services.batch_generation import record_item_result
+    from flask import current_app
+
+    with current_app.app_context():
+        record_item_result(data['item_id'], data['status'], data.get('error'))
+        return True
+
+
+@activity.defn
+@blocking_activity(ActivityClass.BOOKKEEPING)
+def finalize_batch_job(job_id: str) -> Dict[str, Any]:
+    """
+    Define o status final do lote.
+
+    Returns:
+        BatchGenerationJob.to_dict()
+    """
+    from app.services import batch_generation
+    from flask import current_app
+
+    with current_app.app_context():
+        return batch_generation.finalize_batch_job(job_id)
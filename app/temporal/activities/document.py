@@ -6,15 +6,18 @@ from datetime import datetime
 from typing import Dict, Any, Optional
 from temporalio import activity
 
+from ..executor import blocking_activity, ActivityClass
+
 logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def execute_document_node(data: Dict[str, Any]) -> Dict[str, Any]:
+@blocking_activity(ActivityClass.DOCUMENT)
+def execute_document_node(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Executa node de documento (geração).
     
-    IDEMPOTÊNCIA: Verifica se documento já foi gerado antes de criar novo.
+    IDEMPOTÊNCIA: o Temporal não reexecuta a activity depois de concluída.
     
     Suporta:
     - google-docs: Google Docs
@@ -28,6 +31,7 @@ async def execute_document_node(data: Dict[str, Any]) -> Dict[str, Any]:
             node: {id, node_type, config, ...},
             workflow_id,
             organization_id,
+            plan_version,  # versão do plano carregado em load_execution
             source_data: {...},
             source_object_id,
             source_object_type
@@ -43,72 +47,26 @@ async def execute_document_node(data: Dict[str, Any]) -> Dict[str, Any]:
             reused: bool
         }
     """
-    from app.database import db
-    from app.models import (
-        GeneratedDocument, Template, Workflow, 
-        DataSourceConnection, WorkflowNode
-    )
-    from app.services.document_generation.tag_processor import TagProcessor
     from flask import current_app
+    from app.services.document_generation.tag_processor import TagProcessor
+    from app.temporal.execution_plan import attach, get_execution_plans
     
     node = data['node']
-    node_type = node.get('node_type')
     config = node.get('config', {})
-    execution_id = data['execution_id']
     node_id = node['id']
     
-    activity.logger.info(f"Executando document node {node_id} tipo {node_type}")
+    activity.logger.info(f"Executando document node {node_id} tipo {node.get('node_type')}")
     
     with current_app.app_context():
-        # === IDEMPOTÊNCIA: Verificar se já existe ===
-        existing = GeneratedDocument.query.filter_by(
-            workflow_id=data['workflow_id']
-        ).join(
-            WorkflowNode, WorkflowNode.id == GeneratedDocument.template_id
-        ).filter(
-            # Buscar por execution via trigger_data ou outro meio
-            GeneratedDocument.source_object_id == data['source_object_id']
-        ).first()
-        
-        # Alternativa: buscar pelo context de execução
-        # Por enquanto, sempre gerar novo documento (o Temporal garante que não vai duplicar)
+        # Workflow, template, tipo resolvido e mapeamentos vêm do plano
+        # compilado do workflow (sem consultas por node)
+        plan = get_execution_plans().get(data['workflow_id'], version=data.get('plan_version'))
+        step = plan.document_step(node)
         
-        # === EXECUÇÃO ===
-        template_id = config.get('template_id')
-        if not template_id:
-            raise ValueError(f'template_id não configurado no {node_type} node')
-        
-        template = Template.query.get(template_id)
-        if not template:
-            raise ValueError(f'Template não encontrado: {template_id}')
-        
-        workflow = Workflow.query.get(data['workflow_id'])
-        if not workflow:
-            raise ValueError(f'Workflow não encontrado: {data["workflow_id"]}')
-        
-        # Determinar/inferir node_type baseado em storage_type do template
-        # Se node_type não foi especificado ou não corresponde ao template, inferir
-        if template.storage_type == 'uploaded':
-            # Template enviado - usar uploaded-document ou file-upload
-            if node_type not in ['uploaded-document', 'file-upload']:
-                node_type = 'file-upload'
-                activity.logger.info(f"Inferindo node_type='file-upload' para template {template_id}")
-        elif template.google_file_id:
-            # Template do Google - inferir se necessário
-            if node_type not in ['google-docs', 'google-slides']:
-                if template.google_file_type == 'document':
-                    node_type = 'google-docs'
-                elif template.google_file_type == 'presentation':
-                    node_type = 'google-slides'
-                activity.logger.info(f"Inferindo node_type='{node_type}' para template Google {template_id}")
-        elif template.microsoft_file_id:
-            # Template do Microsoft - inferir se necessário
-            if node_type not in ['microsoft-word', 'microsoft-powerpoint']:
-                if template.microsoft_file_type == 'word':
-                    node_type = 'microsoft-word'
-                elif template.microsoft_file_type == 'powerpoint':
-                    node_type = 'microsoft-powerpoint'
-                activity.logger.info(f"Inferindo node_type='{node_type}' para template Microsoft {template_id}")
+        workflow = attach(plan.workflow)
+        template = attach(step.template)
+        node_type = step.node_type
+        mappings = step.mappings
         
         # Gerar nome do documento
         output_name_template = config.get('output_name_template', '{{object_type}} - {{timestamp}}')
@@ -120,19 +78,9 @@ async def execute_document_node(data: Dict[str, Any]) -> Dict[str, Any]:
         }
         doc_name = TagProcessor.replace_tags(output_name_template, data_with_meta)
         
-        # Buscar field mappings
-        field_mappings_data = config.get('field_mappings', [])
-        mappings = {}
-        for mapping_data in field_mappings_data:
-            template_tag = mapping_data.get('template_tag')
-            source_field = mapping_data.get('source_field')
-            if template_tag and source_field:
-                mappings[template_tag] = source_field
-        
         # Processar AI mappings se houver
         ai_replacements = {}
-        ai_mappings = list(workflow.ai_mappings)
-        if ai_mappings:
+        if plan.ai_mappings:
             try:
                 from app.services.document_generation.generator import DocumentGenerator, AIGenerationMetrics
                 from app.routes.google_drive_routes import get_google_credentials
@@ -144,7 +92,8 @@ async def execute_document_node(data: Dict[str, Any]) -> Dict[str, Any]:
                     ai_replacements = generator._process_ai_tags(
                         workflow=workflow,
                         source_data=data['source_data'],
-                        metrics=ai_metrics
+                        metrics=ai_metrics,
+                        ai_mappings=[attach(m) for m in plan.ai_mappings]
                     )
                     activity.logger.info(f'AI tags processadas: {len(ai_replacements)} substituições')
             except Exception as e:
@@ -153,60 +102,40 @@ async def execute_document_node(data: Dict[str, Any]) -> Dict[str, Any]:
         # Combinar dados
         combined_data = {**data['source_data'], **ai_replacements}
         
-        # Executar baseado no tipo
-        if node_type == 'google-docs':
-            result = await _generate_google_docs(
-                workflow, template, config, doc_name, combined_data, mappings, data
-            )
-        elif node_type == 'google-slides':
-            result = await _generate_google_slides(
-                workflow, template, config, doc_name, combined_data, mappings, data
-            )
-        elif node_type == 'microsoft-word':
-            result = await _generate_microsoft_word(
-                workflow, template, config, doc_name, combined_data, mappings, data
-            )
-        elif node_type == 'microsoft-powerpoint':
-            result = await _generate_microsoft_powerpoint(
-                workflow, template, config, doc_name, combined_data, mappings, data
-            )
-        elif node_type in ['uploaded-document', 'file-upload']:
-            result = await _generate_uploaded_document(
-                workflow, template, config, doc_name, combined_data, mappings, data
-            )
-        else:
+        # Executar baseado no tipo (resolvido no plano)
+        generate = DOCUMENT_GENERATORS.get(node_type)
+        if generate is None:
             raise ValueError(f'Tipo de documento não suportado: {node_type}')
+        result = generate(workflow, template, config, doc_name, combined_data, mappings, data)
         
         activity.logger.info(f"Documento gerado: {result['document_id']}")
         return result
 
 
-async def _generate_uploaded_document(
+def _generate_uploaded_document(
     workflow, template, config, doc_name, combined_data, mappings, data
 ) -> Dict[str, Any]:
     """
     Gera documento a partir de template enviado (DigitalOcean Spaces).
     
     Fluxo:
-    1. Baixar template do DigitalOcean Spaces
-    2. Normalizar .doc para .docx se necessário
-    3. Validar estrutura do documento
-    4. Processar com python-docx para substituir tags
-    5. Salvar documento gerado no DigitalOcean Spaces (outputs/)
-    6. Gerar PDF se configurado
-    7. Criar registro GeneratedDocument
+    1. Obter template normalizado (.doc -> .docx) e validado do cache
+       (baixa do DigitalOcean Spaces em cache miss)
+    2. Substituir tags no XML do .docx (DocxTemplateRenderer)
+    3. Salvar documento gerado no DigitalOcean Spaces (outputs/)
+    4. Gerar PDF se configurado
+    5. Criar registro GeneratedDocument
     """
     from app.database import db
     from app.models import GeneratedDocument
     from app.services.storage import DigitalOceanSpacesService
     from app.services.document_generation.tag_processor import TagProcessor
     from app.services.document_generation.document_converter import DocumentConverter
+    from app.services.document_generation.docx_renderer import DocxTemplateRenderer
+    from app.services.document_generation.template_cache import get_template_cache
     from datetime import datetime
     import uuid
     from io import BytesIO
-    from docx import Document
-    import requests
-    import os
     
     # Validar template
     if template.storage_type != 'uploaded':
@@ -217,86 +146,29 @@ async def _generate_uploaded_document(
     
     logger.info(f"Gerando documento a partir de template enviado: {template.id}")
     
-    # Baixar template do DigitalOcean Spaces
-    storage_service = DigitalOceanSpacesService()
-    
-    # Gerar URL assinada para download
-    template_url = storage_service.generate_signed_url(
-        template.storage_file_key,
-        expiration=300  # 5 minutos
-    )
-    
-    # Baixar arquivo
-    response = requests.get(template_url, timeout=60)
-    response.raise_for_status()
-    template_bytes = response.content
-    
-    logger.info(f"Template baixado: {len(template_bytes)} bytes")
+    # Template normalizado (.doc -> .docx) e validado, do cache local quando
+    # a versão já foi usada; só baixa do Spaces em cache miss
+    try:
+        normalized_bytes = get_template_cache().get_normalized(template)
+    except ValueError as e:
+        logger.error(f"Erro ao preparar template: {e}")
+        raise
     
-    # Determinar extensão do arquivo original
-    file_extension = os.path.splitext(template.storage_file_key)[1] or '.docx'
+    storage_service = DigitalOceanSpacesService()
     
-    # Normalizar documento (.doc -> .docx)
+    # Substituir tags direto no XML (corpo, cabeçalhos, rodapés e notas),
+    # preservando a formatação dos runs. Textos compilados são
+    # reaproveitados entre documentos da mesma versão.
     try:
-        normalized_bytes, normalized_ext = DocumentConverter.normalize_document(
-            template_bytes,
-            file_extension
+        processed_bytes = DocxTemplateRenderer.render(
+            normalized_bytes,
+            combined_data,
+            mappings,
+            compiled=TagProcessor.compiled_for(template.id, template.version)
         )
-        logger.info(f"Documento normalizado: {normalized_ext}")
     except ValueError as e:
-        logger.error(f"Erro ao normalizar documento: {e}")
-        raise ValueError(f"Não foi possível processar o arquivo: {str(e)}")
-    
-    # Validar estrutura do documento antes de processar
-    is_valid, error_message = DocumentConverter.validate_document_structure(normalized_bytes)
-    if not is_valid:
-        logger.error(f"Documento inválido: {error_message}")
-        raise ValueError(f"Documento não é válido: {error_message}")
-    
-    logger.info("Estrutura do documento validada com sucesso")
-    
-    # Processar documento com python-docx
-    doc = Document(BytesIO(normalized_bytes))
-    
-    # Substituir tags em parágrafos
-    for paragraph in doc.paragraphs:
-        text = paragraph.text
-        tags = TagProcessor.extract_tags(text)
-        
-        for tag in tags:
-            field = mappings.get(tag, tag) if mappings else tag
-            value = TagProcessor._get_nested_value(combined_data, field)
-            
-            if value is not None:
-                text = text.replace(f'{{{{{tag}}}}}', str(value))
-            else:
-                text = text.replace(f'{{{{{tag}}}}}', '')
-        
-        paragraph.text = text
-    
-    # Substituir tags em tabelas
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                text = cell.text
-                tags = TagProcessor.extract_tags(text)
-                
-                for tag in tags:
-                    field = mappings.get(tag, tag) if mappings else tag
-                    value = TagProcessor._get_nested_value(combined_data, field)
-                    
-                    if value is not None:
-                        text = text.replace(f'{{{{{tag}}}}}', str(value))
-                    else:
-                        text = text.replace(f'{{{{{tag}}}}}', '')
-                
-                cell.text = text
-    
-    # Salvar documento processado em buffer
-    output_buffer = BytesIO()
-    doc.save(output_buffer)
-    output_buffer.seek(0)
-    processed_bytes = output_buffer.read()
+        logger.error(f"Documento inválido: {e}")
+        raise ValueError(f"Documento não é válido: {str(e)}")
     
     logger.info(f"Documento processado: {len(processed_bytes)} bytes")
     
@@ -390,7 +262,7 @@ async def _generate_uploaded_document(
     }
 
 
-async def _generate_google_docs(
+def _generate_google_docs(
     workflow, template, config, doc_name, combined_data, mappings, data
 ) -> Dict[str, Any]:
     """Gera documento no Google Docs"""
@@ -464,7 +336,7 @@ async def _generate_google_docs(
     }
 
 
-async def _generate_google_slides(
+def _generate_google_slides(
     workflow, template, config, doc_name, combined_data, mappings, data
 ) -> Dict[str, Any]:
     """Gera apresentação no Google Slides"""
@@ -540,7 +412,7 @@ async def _generate_google_slides(
     }
 
 
-async def _generate_microsoft_word(
+def _generate_microsoft_word(
     workflow, template, config, doc_name, combined_data, mappings, data
 ) -> Dict[str, Any]:
     """Gera documento no Microsoft Word"""
@@ -554,32 +426,16 @@ async def _generate_microsoft_word(
     if not connection_id:
         raise ValueError('connection_id não configurado no Microsoft Word node')
     
-    connection = DataSourceConnection.query.filter_by(
-        id=connection_id,
-        organization_id=workflow.organization_id,
-        source_type='microsoft'
-    ).first()
-    
-    if not connection:
-        raise ValueError(f'Conexão Microsoft não encontrada: {connection_id}')
+    # Token válido (renovado se necessário) do cache de credenciais
+    from app.services.credential_resolver import get_credential_resolver
+    credentials = get_credential_resolver().get_microsoft_credentials(
+        workflow.organization_id, connection_id=connection_id
+    )
+    if not credentials:
+        raise ValueError(f'Conexão Microsoft não encontrada ou token inválido: {connection_id}')
     
-    credentials = connection.get_decrypted_credentials()
     access_token = credentials.get('access_token')
     
-    if not access_token:
-        raise ValueError('Access token não encontrado na conexão Microsoft')
-    
-    # Verificar expiração do token
-    expires_at_str = credentials.get('expires_at')
-    if expires_at_str:
-        expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-        if expires_at < datetime.utcnow():
-            from app.routes.microsoft_oauth_routes import _refresh_microsoft_token
-            if not _refresh_microsoft_token(connection):
-                raise ValueError('Não foi possível renovar token Microsoft')
-            credentials = connection.get_decrypted_credentials()
-            access_token = credentials.get('access_token')
-    
     word_service = MicrosoftWordService({
         'access_token': access_token,
         'refresh_token': credentials.get('refresh_token'),
@@ -655,7 +511,7 @@ async def _generate_microsoft_word(
     }
 
 
-async def _generate_microsoft_powerpoint(
+def _generate_microsoft_powerpoint(
     workflow, template, config, doc_name, combined_data, mappings, data
 ) -> Dict[str, Any]:
     """Gera apresentação no Microsoft PowerPoint"""
@@ -669,32 +525,16 @@ async def _generate_microsoft_powerpoint(
     if not connection_id:
         raise ValueError('connection_id não configurado no Microsoft PowerPoint node')
     
-    connection = DataSourceConnection.query.filter_by(
-        id=connection_id,
-        organization_id=workflow.organization_id,
-        source_type='microsoft'
-    ).first()
-    
-    if not connection:
-        raise ValueError(f'Conexão Microsoft não encontrada: {connection_id}')
+    # Token válido (renovado se necessário) do cache de credenciais
+    from app.services.credential_resolver import get_credential_resolver
+    credentials = get_credential_resolver().get_microsoft_credentials(
+        workflow.organization_id, connection_id=connection_id
+    )
+    if not credentials:
+        raise ValueError(f'Conexão Microsoft não encontrada ou token inválido: {connection_id}')
     
-    credentials = connection.get_decrypted_credentials()
     access_token = credentials.get('access_token')
     
-    if not access_token:
-        raise ValueError('Access token não encontrado na conexão Microsoft')
-    
-    # Verificar expiração do token
-    expires_at_str = credentials.get('expires_at')
-    if expires_at_str:
-        expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-        if expires_at < datetime.utcnow():
-            from app.routes.microsoft_oauth_routes import _refresh_microsoft_token
-            if not _refresh_microsoft_token(connection):
-                raise ValueError('Não foi possível renovar token Microsoft')
-            credentials = connection.get_decrypted_credentials()
-            access_token = credentials.get('access_token')
-    
     ppt_service = MicrosoftPowerPointService({
         'access_token': access_token,
         'refresh_token': credentials.get('refresh_token'),
@@ -769,3 +609,13 @@ async def _generate_microsoft_powerpoint(
         'reused': False
     }
 
+
+# node_type (resolvido no plano de execução) -> gerador
+DOCUMENT_GENERATORS = {
+    'google-docs': _generate_google_docs,
+    'google-slides': _generate_google_slides,
+    'microsoft-word': _generate_microsoft_word,
+    'microsoft-powerpoint': _generate_microsoft_powerpoint,
+    'uploaded-document': _generate_uploaded_document,
+    'file-upload': _generate_uploaded_document,
+}
@@ -6,11 +6,14 @@ from datetime import datetime
 from typing import Dict, Any, List
 from temporalio import activity
 
+from ..executor import blocking_activity, ActivityClass
+
 logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def execute_email_node(data: Dict[str, Any]) -> Dict[str, Any]:
+@blocking_activity(ActivityClass.INTEGRATION)
+def execute_email_node(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Executa node de email.
     
@@ -41,14 +44,14 @@ async def execute_email_node(data: Dict[str, Any]) -> Dict[str, Any]:
     
     with current_app.app_context():
         if node_type == 'gmail':
-            return await _send_gmail(data, config)
+            return _send_gmail(data, config)
         elif node_type == 'outlook':
-            return await _send_outlook(data, config)
+            return _send_outlook(data, config)
         else:
             raise ValueError(f'Tipo de email não suportado: {node_type}')
 
 
-async def _send_gmail(data: Dict[str, Any], config: Dict) -> Dict[str, Any]:
+def _send_gmail(data: Dict[str, Any], config: Dict) -> Dict[str, Any]:
     """Envia email via Gmail SMTP"""
     from app.database import db
     from app.models import DataSourceConnection, GeneratedDocument, Workflow
@@ -123,7 +126,7 @@ async def _send_gmail(data: Dict[str, Any], config: Dict) -> Dict[str, Any]:
     }
 
 
-async def _send_outlook(data: Dict[str, Any], config: Dict) -> Dict[str, Any]:
+def _send_outlook(data: Dict[str, Any], config: Dict) -> Dict[str, Any]:
     """Envia email via Outlook (Microsoft Graph API)"""
     from app.database import db
     from app.models import DataSourceConnection, GeneratedDocument, Workflow
@@ -138,33 +141,20 @@ async def _send_outlook(data: Dict[str, Any], config: Dict) -> Dict[str, Any]:
     if not workflow:
         raise ValueError(f'Workflow não encontrado: {data["workflow_id"]}')
     
-    connection = DataSourceConnection.query.filter_by(
-        id=connection_id,
-        organization_id=workflow.organization_id,
-        source_type='microsoft'
-    ).first()
-    
-    if not connection:
-        raise ValueError(f'Conexão Microsoft não encontrada: {connection_id}')
+    # Token válido (renovado se necessário) do cache de credenciais
+    from app.services.credential_resolver import get_credential_resolver
+    credentials = get_credential_resolver().get_microsoft_credentials(
+        workflow.organization_id, connection_id=connection_id
+    )
+    if not credentials:
+        raise ValueError(f'Conexão Microsoft não encontrada ou token inválido: {connection_id}')
     
-    credentials = connection.get_decrypted_credentials()
     access_token = credentials.get('access_token')
     from_email = credentials.get('user_email')
     
     if not access_token or not from_email:
         raise ValueError('Access token ou email não encontrado')
     
-    # Verificar expiração
-    expires_at_str = credentials.get('expires_at')
-    if expires_at_str:
-        expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
-        if expires_at < datetime.utcnow():
-            from app.routes.microsoft_oauth_routes import _refresh_microsoft_token
-            if not _refresh_microsoft_token(connection):
-                raise ValueError('Não foi possível renovar token Microsoft')
-            credentials = connection.get_decrypted_credentials()
-            access_token = credentials.get('access_token')
-    
     # Processar templates
     source_data = data.get('source_data', {})
     to_emails = config.get('to', [])
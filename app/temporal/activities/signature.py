@@ -6,11 +6,14 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from temporalio import activity
 
+from ..executor import blocking_activity, ActivityClass
+
 logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def create_signature_request(data: Dict[str, Any]) -> Dict[str, Any]:
+@blocking_activity(ActivityClass.INTEGRATION)
+def create_signature_request(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Cria request de assinatura.
     
@@ -173,7 +176,8 @@ def _get_document(data: Dict, config: Dict, document_source: str) -> Optional['G
 
 
 @activity.defn
-async def expire_signature(signature_request_id: str) -> bool:
+@blocking_activity(ActivityClass.INTEGRATION)
+def expire_signature(signature_request_id: str) -> bool:
     """
     Marca signature request como expirada.
     
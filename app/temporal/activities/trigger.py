@@ -5,11 +5,14 @@ import logging
 from typing import Dict, Any
 from temporalio import activity
 
+from ..executor import blocking_activity, ActivityClass
+
 logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def execute_trigger_node(data: Dict[str, Any]) -> Dict[str, Any]:
+@blocking_activity(ActivityClass.INTEGRATION)
+def execute_trigger_node(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Executa node de trigger (extração de dados).
     
@@ -31,8 +34,9 @@ async def execute_trigger_node(data: Dict[str, Any]) -> Dict[str, Any]:
         {source_data: {...}, source_object_id, source_object_type}
     """
     from app.database import db
-    from app.models import DataSourceConnection
+    from app.models import DataSourceConnection, Workflow
     from app.services.data_sources.hubspot import HubSpotDataSource
+    from app.services.data_sources.property_planner import get_property_plan
     from flask import current_app
     
     node = data['node']
@@ -120,6 +124,14 @@ async def execute_trigger_node(data: Dict[str, Any]) -> Dict[str, Any]:
             if not source_object_id:
                 raise ValueError('source_object_id não encontrado no trigger_data')
             
+            # Geração em lote: dados já buscados em lote na preparação do item
+            if trigger_data.get('source_data') is not None:
+                return {
+                    'source_data': trigger_data['source_data'],
+                    'source_object_id': source_object_id,
+                    'source_object_type': source_object_type
+                }
+            
             # Buscar conexão
             connection = DataSourceConnection.query.get(source_connection_id)
             if not connection:
@@ -128,11 +140,15 @@ async def execute_trigger_node(data: Dict[str, Any]) -> Dict[str, Any]:
             if connection.source_type != 'hubspot':
                 raise ValueError(f'Tipo de conexão não suportado: {connection.source_type}')
             
-            # Extrair dados do HubSpot
+            # Extrair dados do HubSpot (só as propriedades que o workflow usa)
+            workflow = Workflow.query.get(data['workflow_id']) if data.get('workflow_id') else None
+            plan = get_property_plan(workflow, source_object_type) if workflow else None
+            
             data_source = HubSpotDataSource(connection)
             source_data = data_source.get_object_data(
                 source_object_type,
-                source_object_id
+                source_object_id,
+                plan=plan
             )
             
             # Normalizar dados (mover properties para nível raiz)
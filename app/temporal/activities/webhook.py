@@ -5,13 +5,16 @@ import logging
 import json
 from typing import Dict, Any
 from temporalio import activity
+
+from ..executor import blocking_activity, ActivityClass
 import requests
 
 logger = logging.getLogger(__name__)
 
 
 @activity.defn
-async def execute_webhook_node(data: Dict[str, Any]) -> Dict[str, Any]:
+@blocking_activity(ActivityClass.INTEGRATION)
+def execute_webhook_node(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Executa node de webhook (envia POST com resultado da execução).
     
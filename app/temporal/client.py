@@ -1,15 +1,30 @@
 """
 Cliente Temporal para conectar ao servidor e enviar signals.
+
+- get_temporal_client(): cliente do event loop de quem chama (worker, código async)
+- get_client_thread(): cliente persistente para código síncrono (Flask). Um
+  event loop em thread dedicada mantém a conexão gRPC aberta; start/signal
+  viram uma única RPC em vez de Client.connect + asyncio.run por chamada.
 """
+import os
 import asyncio
 import logging
-from typing import Optional, Any, Dict
+import threading
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Optional, Any, Awaitable, Callable, Dict, List
 from temporalio.client import Client, WorkflowHandle
+from temporalio.converter import DataConverter
+from temporalio.service import RPCError, RPCStatusCode
 
+from .codec import get_data_converter
 from .config import get_config, SignalNames
 
 logger = logging.getLogger(__name__)
 
+# Timeout (s) de uma chamada síncrona via get_client_thread()
+CALL_TIMEOUT = float(os.getenv('TEMPORAL_CLIENT_TIMEOUT', '30'))
+
 # Cliente singleton
 _client: Optional[Client] = None
 
@@ -27,7 +42,8 @@ async def get_temporal_client() -> Client:
         
         _client = await Client.connect(
             config.address,
-            namespace=config.namespace
+            namespace=config.namespace,
+            data_converter=get_data_converter()
         )
         
         logger.info(f"Conectado ao Temporal Server no namespace: {config.namespace}")
@@ -113,26 +129,15 @@ def send_signal_sync(workflow_id: str, signal_name: str, payload: Dict[str, Any]
     """
     Versão síncrona de send_signal para uso em contextos não-async (Flask).
     
-    Cria um novo event loop se necessário.
+    Usa o cliente persistente de get_client_thread() (uma RPC, sem conexão nova).
     """
     try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # Se já tem loop rodando, criar task
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(
-                    asyncio.run,
-                    send_signal(workflow_id, signal_name, payload)
-                )
-                return future.result(timeout=30)
-        else:
-            return loop.run_until_complete(
-                send_signal(workflow_id, signal_name, payload)
-            )
-    except RuntimeError:
-        # Não tem event loop, criar um novo
-        return asyncio.run(send_signal(workflow_id, signal_name, payload))
+        get_client_thread().signal(workflow_id, signal_name, payload)
+        logger.info(f"Signal '{signal_name}' enviado para workflow {workflow_id}")
+        return True
+    except Exception as e:
+        logger.error(f"Erro ao enviar signal '{signal_name}' para {workflow_id}: {e}")
+        raise
 
 
 def send_approval_signal_sync(workflow_id: str, approval_id: str, decision: str) -> bool:
@@ -158,3 +163,153 @@ def send_signature_signal_sync(workflow_id: str, signature_request_id: str, stat
         }
     )
 
+
+@dataclass(frozen=True)
+class WorkflowStart:
+    """Um workflow a iniciar (TemporalClientThread.start_workflows)"""
+    workflow: str
+    arg: Any
+    id: str
+    task_queue: str
+
+
+class TemporalClientThread:
+    """
+    Cliente Temporal persistente num event loop em thread daemon.
+    
+    Métodos síncronos e thread-safe: submetem a coroutine ao loop
+    (run_coroutine_threadsafe) e esperam o resultado. A conexão é criada na
+    primeira chamada e refeita quando o servidor fica indisponível.
+    """
+    
+    def __init__(self, call_timeout: float = CALL_TIMEOUT, data_converter: Optional[DataConverter] = None):
+        self.call_timeout = call_timeout
+        # Criado aqui: o codec precisa do app Flask, ausente na thread do loop
+        self.data_converter = data_converter or get_data_converter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._client: Optional[Client] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+        self._lock = threading.Lock()
+    
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args) -> concurrent.futures.Future:
+        """Agenda fn(client, *args) no loop do cliente (não bloqueia)"""
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(self._call(fn, *args), loop)
+    
+    def run(self, fn: Callable[..., Awaitable[Any]], *args, timeout: Optional[float] = None) -> Any:
+        """Executa fn(client, *args) no loop do cliente e espera o resultado"""
+        return self.submit(fn, *args).result(timeout=timeout or self.call_timeout)
+    
+    def start_workflow(self, workflow: str, arg: Any, id: str, task_queue: str) -> str:
+        """Inicia um workflow. Retorna o run_id"""
+        return self.run(_start, WorkflowStart(workflow, arg, id, task_queue))
+    
+    def start_workflows(self, starts: List[WorkflowStart]) -> List[Any]:
+        """
+        Inicia vários workflows de uma vez (RPCs concorrentes no mesmo canal).
+        
+        Returns:
+            Lista na ordem de starts: run_id ou a exceção daquele start
+        """
+        if not starts:
+            return []
+        
+        async def _start_all(client: Client):
+            return await asyncio.gather(
+                *(_start(client, start) for start in starts),
+                return_exceptions=True
+            )
+        
+        return self.run(_start_all)
+    
+    def signal(self, workflow_id: str, signal_name: str, payload: Dict[str, Any]) -> None:
+        """Envia signal para um workflow"""
+        async def _signal(client: Client):
+            await client.get_workflow_handle(workflow_id).signal(signal_name, payload)
+        
+        self.run(_signal)
+    
+    def terminate(self, workflow_id: str, reason: str) -> None:
+        """Termina um workflow"""
+        async def _terminate(client: Client):
+            await client.get_workflow_handle(workflow_id).terminate(reason=reason)
+        
+        self.run(_terminate)
+    
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Inicia a thread do loop (de novo após fork: threads não sobrevivem)"""
+        if self._loop is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return self._loop
+        
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid() or not self._thread.is_alive():
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                
+                def run_loop():
+                    asyncio.set_event_loop(loop)
+                    loop.call_soon(ready.set)
+                    loop.run_forever()
+                
+                thread = threading.Thread(target=run_loop, name='temporal-client', daemon=True)
+                thread.start()
+                ready.wait()
+                
+                self._loop, self._thread, self._pid = loop, thread, os.getpid()
+                self._client = None
+                self._connect_lock = None
+        return self._loop
+    
+    async def _get_client(self) -> Client:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._client is None:
+                config = get_config()
+                logger.info(f"Conectando ao Temporal Server: {config.address}")
+                self._client = await Client.connect(
+                    config.address,
+                    namespace=config.namespace,
+                    data_converter=self.data_converter
+                )
+        return self._client
+    
+    async def _call(self, fn: Callable[..., Awaitable[Any]], *args) -> Any:
+        client = await self._get_client()
+        try:
+            return await fn(client, *args)
+        except RPCError as e:
+            if e.status != RPCStatusCode.UNAVAILABLE:
+                raise
+            # Conexão caiu: reconectar e tentar uma vez
+            logger.warning(f"Temporal indisponível ({e}); reconectando")
+            if self._client is client:
+                self._client = None
+            client = await self._get_client()
+            return await fn(client, *args)
+
+
+async def _start(client: Client, start: WorkflowStart) -> str:
+    handle = await client.start_workflow(
+        start.workflow,
+        start.arg,
+        id=start.id,
+        task_queue=start.task_queue
+    )
+    return handle.result_run_id
+
+
+_client_thread: Optional[TemporalClientThread] = None
+_client_thread_lock = threading.Lock()
+
+
+def get_client_thread() -> TemporalClientThread:
+    """Retorna singleton do cliente Temporal para código síncrono"""
+    global _client_thread
+    if _client_thread is None:
+        with _client_thread_lock:
+            if _client_thread is None:
+                _client_thread = TemporalClientThread()
+    return _client_thread
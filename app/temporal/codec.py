@@ -0,0 +1,229 @@
+"""
+Codec de payloads do Temporal: compressão e claim-check.
+
+Inputs de activities (source_data com propriedades e associações do
+HubSpot, generated_documents) e snapshots do context ficam gravados no
+histórico do workflow; deals grandes incham o histórico e deixam o replay
+lento. O DocGPayloadCodec, configurado no cliente da API e no worker:
+
+- comprime (zlib) payloads maiores que TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD
+  bytes, quando a compressão reduz o tamanho
+- com TEMPORAL_PAYLOAD_CLAIM_CHECK=postgres|spaces, payloads que continuam
+  maiores que TEMPORAL_PAYLOAD_CLAIM_CHECK_THRESHOLD vão para a tabela
+  temporal_payloads (ou para o DigitalOcean Spaces) e o histórico guarda só
+  a chave (sha256 do conteúdo)
+
+decode aceita todos os formatos independente da configuração: ligar ou
+desligar compressão/claim-check não quebra workflows em andamento.
+
+Retenção: no Postgres, payloads sem novo uso há
+TEMPORAL_PAYLOAD_RETENTION_DAYS dias são removidos; no Spaces, configurar
+uma regra de expiração para o prefixo docg/temporal-payloads/. Nos dois
+casos, manter acima da retenção do namespace + duração máxima do workflow.
+"""
+import asyncio
+import dataclasses
+import hashlib
+import logging
+import time
+import zlib
+from datetime import datetime, timedelta
+from io import BytesIO
+from typing import Dict, List, Optional, Sequence
+
+import temporalio.converter
+from temporalio.api.common.v1 import Payload
+from temporalio.converter import DataConverter, PayloadCodec
+
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+ENCODING_ZLIB = b'binary/zlib'
+ENCODING_CLAIM_CHECK = b'binary/claim-check'
+
+COMPRESSION_LEVEL = 6
+PRUNE_INTERVAL = 3600
+
+
+class PostgresPayloadStore:
+    """Claim-check na tabela temporal_payloads"""
+
+    name = 'postgres'
+
+    def __init__(self, app, retention_days: int):
+        self.app = app
+        self.retention = timedelta(days=retention_days)
+        self._pruned_at = 0.0
+
+    def put_many(self, blobs: Dict[str, bytes]) -> None:
+        from sqlalchemy.dialects.postgresql import insert
+        from app.database import db
+        from app.models import TemporalPayload
+
+        table = TemporalPayload.__table__
+        now = datetime.utcnow()
+        statement = insert(table).values([
+            {'key': key, 'data': data, 'created_at': now} for key, data in blobs.items()
+        ])
+        # Chave = hash do conteúdo: reenvio só renova created_at
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={'created_at': statement.excluded.created_at}
+        )
+
+        with self.app.app_context(), db.engine.begin() as connection:
+            connection.execute(statement)
+            if time.monotonic() - self._pruned_at > PRUNE_INTERVAL:
+                self._pruned_at = time.monotonic()
+                connection.execute(table.delete().where(table.c.created_at < now - self.retention))
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        from sqlalchemy import select
+        from app.database import db
+        from app.models import TemporalPayload
+
+        table = TemporalPayload.__table__
+        with self.app.app_context(), db.engine.connect() as connection:
+            rows = connection.execute(
+                select(table.c.key, table.c.data).where(table.c.key.in_(set(keys)))
+            ).all()
+        return {key: bytes(data) for key, data in rows}
+
+
+class SpacesPayloadStore:
+    """Claim-check no DigitalOcean Spaces (docg/temporal-payloads/<sha256>)"""
+
+    name = 'spaces'
+    PREFIX = 'docg/temporal-payloads/'
+
+    def __init__(self, app):
+        self.app = app
+
+    def put_many(self, blobs: Dict[str, bytes]) -> None:
+        from app.services.storage import DigitalOceanSpacesService
+
+        with self.app.app_context():
+            storage_service = DigitalOceanSpacesService()
+            for key, data in blobs.items():
+                storage_service.upload_file(BytesIO(data), self.PREFIX + key, 'application/octet-stream')
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        from app.services.storage import DigitalOceanSpacesService
+
+        with self.app.app_context():
+            storage_service = DigitalOceanSpacesService()
+            return {key: storage_service.download_file(self.PREFIX + key) for key in set(keys)}
+
+
+PAYLOAD_STORES = {
+    PostgresPayloadStore.name: lambda app, config: PostgresPayloadStore(app, config.payload_retention_days),
+    SpacesPayloadStore.name: lambda app, config: SpacesPayloadStore(app),
+}
+
+
+class DocGPayloadCodec(PayloadCodec):
+    """Compressão zlib + claim-check de payloads grandes"""
+
+    def __init__(
+        self,
+        app=None,
+        compression_threshold: Optional[int] = None,
+        claim_check: Optional[str] = None,
+        claim_check_threshold: Optional[int] = None
+    ):
+        config = get_config()
+        self.app = app
+        self.compression_threshold = (
+            config.payload_compression_threshold if compression_threshold is None else compression_threshold
+        )
+        self.claim_check = config.payload_claim_check if claim_check is None else claim_check
+        self.claim_check_threshold = (
+            config.payload_claim_check_threshold if claim_check_threshold is None else claim_check_threshold
+        )
+        if self.claim_check and self.claim_check not in PAYLOAD_STORES:
+            raise ValueError(f'TEMPORAL_PAYLOAD_CLAIM_CHECK inválido: {self.claim_check}')
+        self._stores: Dict[str, object] = {}
+
+    async def encode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        encoded = [self._compress(payload) for payload in payloads]
+        if not self.claim_check:
+            return encoded
+
+        large = [i for i, payload in enumerate(encoded) if payload.ByteSize() > self.claim_check_threshold]
+        if not large:
+            return encoded
+
+        blobs = {}
+        for i in large:
+            data = encoded[i].SerializeToString()
+            key = hashlib.sha256(data).hexdigest()
+            blobs[key] = data
+            encoded[i] = Payload(
+                metadata={'encoding': ENCODING_CLAIM_CHECK, 'store': self.claim_check.encode()},
+                data=key.encode()
+            )
+
+        # Banco/Spaces são bloqueantes: fora do event loop do worker
+        store = self._store(self.claim_check)
+        await asyncio.get_running_loop().run_in_executor(None, store.put_many, blobs)
+        logger.debug(f'{len(blobs)} payloads enviados para claim-check ({store.name})')
+        return encoded
+
+    async def decode(self, payloads: Sequence[Payload]) -> List[Payload]:
+        decoded = list(payloads)
+
+        claims: Dict[str, List[int]] = {}
+        for i, payload in enumerate(decoded):
+            if payload.metadata.get('encoding') == ENCODING_CLAIM_CHECK:
+                claims.setdefault(payload.metadata['store'].decode(), []).append(i)
+
+        for store_name, positions in claims.items():
+            keys = [decoded[i].data.decode() for i in positions]
+            store = self._store(store_name)
+            blobs = await asyncio.get_running_loop().run_in_executor(None, store.get_many, keys)
+            for i, key in zip(positions, keys):
+                if key not in blobs:
+                    raise ValueError(f'Payload do Temporal não encontrado no claim-check ({store_name}): {key}')
+                decoded[i] = Payload.FromString(blobs[key])
+
+        return [self._decompress(payload) for payload in decoded]
+
+    def _compress(self, payload: Payload) -> Payload:
+        if payload.ByteSize() <= self.compression_threshold:
+            return payload
+        data = payload.SerializeToString()
+        compressed = zlib.compress(data, COMPRESSION_LEVEL)
+        if len(compressed) >= len(data):
+            return payload
+        return Payload(metadata={'encoding': ENCODING_ZLIB}, data=compressed)
+
+    @staticmethod
+    def _decompress(payload: Payload) -> Payload:
+        if payload.metadata.get('encoding') != ENCODING_ZLIB:
+            return payload
+        return Payload.FromString(zlib.decompress(payload.data))
+
+    def _store(self, name: str):
+        store = self._stores.get(name)
+        if store is None:
+            if name not in PAYLOAD_STORES:
+                raise ValueError(f'Claim-check desconhecido: {name}')
+            if self.app is None:
+                raise RuntimeError('Claim-check de payloads do Temporal requer o app Flask')
+            store = self._stores[name] = PAYLOAD_STORES[name](self.app, get_config())
+        return store
+
+
+def get_data_converter(app=None) -> DataConverter:
+    """
+    DataConverter padrão do Temporal com o DocGPayloadCodec.
+
+    Args:
+        app: Flask app para o claim-check (padrão: app do contexto atual)
+    """
+    if app is None:
+        from flask import current_app, has_app_context
+        if has_app_context():
+            app = current_app._get_current_object()
+    return dataclasses.replace(temporalio.converter.default(), payload_codec=DocGPayloadCodec(app))
@@ -38,7 +38,32 @@ class TemporalConfig:
     # Expiração padrão para approvals e signatures (em horas)
     default_approval_timeout_hours: int = 48
     default_signature_timeout_days: int = 7
-    
+
+    # Concorrência por classe de activity (threads por pool no worker)
+    # - bookkeeping: leituras/escritas rápidas no banco (load, logs, status)
+    # - document: geração de documentos (Drive, Graph, LibreOffice)
+    # - integration: chamadas externas (HubSpot, email, assinatura, webhooks)
+    bookkeeping_concurrency: int = int(os.getenv('TEMPORAL_BOOKKEEPING_CONCURRENCY', '16'))
+    document_concurrency: int = int(os.getenv('TEMPORAL_DOCUMENT_CONCURRENCY', '24'))
+    integration_concurrency: int = int(os.getenv('TEMPORAL_INTEGRATION_CONCURRENCY', '16'))
+
+    # Máximo de nodes independentes executados em paralelo por execução
+    max_parallel_nodes: int = int(os.getenv('TEMPORAL_MAX_PARALLEL_NODES', '4'))
+
+    # Codec de payloads (ver codec.py)
+    # - compressão zlib acima de payload_compression_threshold bytes
+    # - claim-check ('postgres' ou 'spaces'; vazio desliga) acima de
+    #   payload_claim_check_threshold bytes (já comprimidos)
+    payload_compression_threshold: int = int(os.getenv('TEMPORAL_PAYLOAD_COMPRESSION_THRESHOLD', '4096'))
+    payload_claim_check: str = os.getenv('TEMPORAL_PAYLOAD_CLAIM_CHECK', '')
+    payload_claim_check_threshold: int = int(os.getenv('TEMPORAL_PAYLOAD_CLAIM_CHECK_THRESHOLD', '262144'))
+    payload_retention_days: int = int(os.getenv('TEMPORAL_PAYLOAD_RETENTION_DAYS', '30'))
+
+    @property
+    def max_concurrent_activities(self) -> int:
+        """Total de activities simultâneas que o worker aceita da task queue"""
+        return self.bookkeeping_concurrency + self.document_concurrency + self.integration_concurrency
+
     @classmethod
     def from_env(cls) -> 'TemporalConfig':
         """Cria config a partir de variáveis de ambiente"""
@@ -56,6 +81,7 @@ class SignalNames:
 class WorkflowNames:
     """Nomes dos workflows"""
     DOCG_WORKFLOW = 'DocGWorkflow'
+    BATCH_GENERATION_WORKFLOW = 'BatchGenerationWorkflow'
 
 
 # Singleton da config
@@ -0,0 +1,266 @@
+"""
+Planos de execução compilados, em memória no worker Temporal.
+
+load_execution buscava WorkflowExecution, Workflow e todos os nodes a cada
+execução, e execute_document_node buscava de novo Template e Workflow e
+materializava workflow.ai_mappings em cada node. O plano de um workflow
+guarda, por EXECUTION_PLAN_CACHE_TTL segundos:
+
+- nodes (to_dict com config) e o Workflow
+- templates dos nodes de documento, com o tipo de documento já resolvido
+  pelo storage do template e os field mappings {template_tag: source_field}
+- mapeamentos de IA
+
+A versão do plano é workflow.updated_at: salvar o workflow, seus nodes ou
+mapeamentos de IA atualiza updated_at (sincronizar um template também, ver
+Workflow.touch_for_template) e a próxima execução recompila. Por execução
+sobra uma consulta: a WorkflowExecution junto com o updated_at do workflow.
+
+Os objetos do ORM do plano ficam fora da sessão e são compartilhados entre
+threads; nunca usar direto, só via attach() (merge sem SELECT).
+"""
+import os
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .workflows.dag import DOCUMENT_TYPES
+
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_TTL = float(os.getenv('EXECUTION_PLAN_CACHE_TTL', '300'))
+PLAN_CACHE_MAX_ENTRIES = int(os.getenv('EXECUTION_PLAN_CACHE_MAX_ENTRIES', '500'))
+
+
+@dataclass(frozen=True)
+class DocumentStep:
+    """Node de documento compilado"""
+    node_id: str
+    config: Dict[str, Any]  # config usada na compilação
+    node_type: str  # tipo resolvido pelo storage do template
+    template: Any  # Template fora da sessão (usar attach)
+    mappings: Dict[str, str]  # {template_tag: source_field}
+
+
+@dataclass(frozen=True)
+class ExecutionPlan:
+    """Workflow compilado para execução no worker"""
+    workflow_id: str
+    version: str
+    organization_id: str
+    workflow_data: Dict[str, Any]
+    nodes: List[Dict[str, Any]]
+    workflow: Any  # Workflow fora da sessão (usar attach)
+    ai_mappings: Tuple[Any, ...]  # AIGenerationMapping fora da sessão
+    documents: Dict[str, DocumentStep]
+
+    def document_step(self, node: Dict[str, Any]) -> DocumentStep:
+        """
+        Passo compilado do node de documento.
+
+        Se o node da execução difere do plano (workflow alterado depois do
+        início), compila na hora sem guardar.
+
+        Raises:
+            ValueError: template_id não configurado ou template inexistente
+        """
+        step = self.documents.get(node['id'])
+        if step is not None and step.config == (node.get('config') or {}):
+            return step
+
+        from app.models import Template
+
+        template_id = (node.get('config') or {}).get('template_id')
+        if not template_id:
+            raise ValueError(f'template_id não configurado no {node.get("node_type")} node')
+        template = Template.query.get(template_id)
+        if not template:
+            raise ValueError(f'Template não encontrado: {template_id}')
+        return compile_document_step(node, template)
+
+
+def compile_execution_plan(workflow_id) -> ExecutionPlan:
+    """
+    Carrega e compila o plano do workflow (chamar com app context).
+
+    Raises:
+        ValueError: Workflow não encontrado
+    """
+    from app.database import db
+    from app.models import Workflow, WorkflowNode, Template
+
+    workflow = Workflow.query.get(workflow_id)
+    if not workflow:
+        raise ValueError(f'Workflow não encontrado: {workflow_id}')
+
+    nodes = [
+        n.to_dict(include_config=True)
+        for n in WorkflowNode.query.filter_by(
+            workflow_id=workflow.id
+        ).order_by(WorkflowNode.position).all()
+    ]
+
+    document_nodes = [n for n in nodes if n['node_type'] in DOCUMENT_TYPES]
+    template_ids = {n['config'].get('template_id') for n in document_nodes} - {None, ''}
+    templates = {
+        str(t.id): t for t in Template.query.filter(Template.id.in_(template_ids)).all()
+    } if template_ids else {}
+
+    documents = {}
+    for node in document_nodes:
+        template = templates.get(str(node['config'].get('template_id')))
+        if template is not None:
+            # Sem template: document_step repete a busca e falha com a mensagem do node
+            documents[node['id']] = compile_document_step(node, template)
+
+    ai_mappings = tuple(workflow.ai_mappings)
+    plan = ExecutionPlan(
+        workflow_id=str(workflow.id),
+        version=plan_version(workflow.updated_at),
+        organization_id=str(workflow.organization_id),
+        workflow_data=workflow.to_dict(),
+        nodes=nodes,
+        workflow=workflow,
+        ai_mappings=ai_mappings,
+        documents=documents
+    )
+
+    # Tirar da sessão com os atributos carregados: o commit da activity
+    # expiraria os objetos compartilhados. workflow.template (legado) foi
+    # carregado pelo to_dict e é copiado junto no merge
+    for obj in (workflow, workflow.template, *templates.values(), *ai_mappings):
+        if obj is not None and obj in db.session:
+            db.session.expunge(obj)
+
+    return plan
+
+
+def compile_document_step(node: Dict[str, Any], template) -> DocumentStep:
+    """Resolve tipo de documento e field mappings de um node"""
+    config = node.get('config') or {}
+
+    mappings = {}
+    for mapping_data in config.get('field_mappings', []):
+        template_tag = mapping_data.get('template_tag')
+        source_field = mapping_data.get('source_field')
+        if template_tag and source_field:
+            mappings[template_tag] = source_field
+
+    return DocumentStep(
+        node_id=node['id'],
+        config=config,
+        node_type=resolve_document_type(node.get('node_type'), template),
+        template=template,
+        mappings=mappings
+    )
+
+
+def resolve_document_type(node_type: Optional[str], template) -> Optional[str]:
+    """Determina/infere o node_type pelo storage_type do template"""
+    if template.storage_type == 'uploaded':
+        # Template enviado - usar uploaded-document ou file-upload
+        if node_type not in ['uploaded-document', 'file-upload']:
+            node_type = 'file-upload'
+            logger.info(f"Inferindo node_type='file-upload' para template {template.id}")
+    elif template.google_file_id:
+        # Template do Google - inferir se necessário
+        if node_type not in ['google-docs', 'google-slides']:
+            if template.google_file_type == 'document':
+                node_type = 'google-docs'
+            elif template.google_file_type == 'presentation':
+                node_type = 'google-slides'
+            logger.info(f"Inferindo node_type='{node_type}' para template Google {template.id}")
+    elif template.microsoft_file_id:
+        # Template do Microsoft - inferir se necessário
+        if node_type not in ['microsoft-word', 'microsoft-powerpoint']:
+            if template.microsoft_file_type == 'word':
+                node_type = 'microsoft-word'
+            elif template.microsoft_file_type == 'powerpoint':
+                node_type = 'microsoft-powerpoint'
+            logger.info(f"Inferindo node_type='{node_type}' para template Microsoft {template.id}")
+    return node_type
+
+
+def plan_version(updated_at) -> str:
+    """Versão do plano (ordenável como string)"""
+    return updated_at.strftime('%Y-%m-%dT%H:%M:%S.%f') if updated_at else ''
+
+
+def attach(obj):
+    """Cópia do objeto do plano na sessão atual (merge sem SELECT)"""
+    from app.database import db
+    return db.session.merge(obj, load=False)
+
+
+class ExecutionPlanCache:
+    """Cache TTL + LRU de planos de execução por workflow"""
+
+    def __init__(self, ttl: float = PLAN_CACHE_TTL, max_entries: int = PLAN_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._plans: 'OrderedDict[str, Tuple[float, ExecutionPlan]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, workflow_id, version: Optional[str] = None) -> ExecutionPlan:
+        """
+        Plano do workflow na versão informada (ou mais nova).
+
+        Sem versão (activities de execuções antigas), usa o plano em cache.
+        """
+        key = str(workflow_id)
+        plan = self._get(key)
+        if plan is not None and (version is None or plan.version >= version):
+            return plan
+
+        plan = compile_execution_plan(key)
+        self._set(key, plan)
+        return plan
+
+    def invalidate(self, workflow_id) -> None:
+        with self._lock:
+            self._plans.pop(str(workflow_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._plans.clear()
+
+    def _get(self, key: str) -> Optional[ExecutionPlan]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._plans.get(key)
+            if entry is None:
+                return None
+            expires_at, plan = entry
+            if expires_at <= now:
+                del self._plans[key]
+                return None
+            self._plans.move_to_end(key)
+            return plan
+
+    def _set(self, key: str, plan: ExecutionPlan) -> None:
+        with self._lock:
+            current = self._plans.get(key)
+            if current is not None and current[1].version > plan.version:
+                # Outra thread já compilou uma versão mais nova
+                return
+            self._plans[key] = (time.monotonic() + self.ttl, plan)
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+
+
+_cache: Optional[ExecutionPlanCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_execution_plans() -> ExecutionPlanCache:
+    """Retorna singleton do cache de planos de execução"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ExecutionPlanCache()
+    return _cache
@@ -0,0 +1,137 @@
+"""
+Executores de activities - Tira o trabalho bloqueante do event loop do worker.
+
+As activities fazem chamadas síncronas (requests, googleapiclient, boto3,
+SQLAlchemy, LibreOffice). Rodando direto no event loop, uma única exportação
+lenta travaria todas as outras activities do worker. Aqui cada activity é
+executada em um pool de threads dedicado à sua classe, com limite de
+concorrência próprio (ver TemporalConfig.*_concurrency).
+
+Uso:
+    @activity.defn
+    @blocking_activity(ActivityClass.DOCUMENT)
+    def execute_document_node(data):
+        ...
+"""
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityClass:
+    """Classes de activity (cada uma com seu pool de threads)"""
+    BOOKKEEPING = 'bookkeeping'
+    DOCUMENT = 'document'
+    INTEGRATION = 'integration'
+
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+_app = None
+
+
+def init_activity_executors(app=None) -> Dict[str, int]:
+    """
+    Registra o Flask app usado pelas threads e cria os pools.
+
+    Args:
+        app: Flask app (usado quando a thread não herda um app context)
+
+    Returns:
+        {classe: max_workers} dos pools criados
+    """
+    global _app
+    if app is not None:
+        _app = app
+
+    return {name: _get_pool(name)._max_workers for name in _pool_sizes()}
+
+
+def shutdown_activity_executors(wait: bool = True):
+    """Encerra todos os pools (chamado no shutdown do worker)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.shutdown(wait=wait)
+
+
+def _pool_sizes() -> Dict[str, int]:
+    config = get_config()
+    return {
+        ActivityClass.BOOKKEEPING: config.bookkeeping_concurrency,
+        ActivityClass.DOCUMENT: config.document_concurrency,
+        ActivityClass.INTEGRATION: config.integration_concurrency,
+    }
+
+
+def _get_pool(activity_class: str) -> ThreadPoolExecutor:
+    pool = _pools.get(activity_class)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(activity_class)
+        if pool is None:
+            sizes = _pool_sizes()
+            if activity_class not in sizes:
+                raise ValueError(f'Classe de activity desconhecida: {activity_class}')
+            pool = ThreadPoolExecutor(
+                max_workers=max(1, sizes[activity_class]),
+                thread_name_prefix=f'activity-{activity_class}'
+            )
+            _pools[activity_class] = pool
+            logger.info(f"Pool '{activity_class}' criado com {pool._max_workers} threads")
+        return pool
+
+
+def _run_with_app_context(fn: Callable, args, kwargs) -> Any:
+    """
+    Executa fn na thread do pool garantindo um app context próprio.
+
+    Cada chamada empurra um app context novo, então a scoped session do
+    Flask-SQLAlchemy é exclusiva da activity e removida no teardown.
+    """
+    from flask import current_app, has_app_context
+
+    app = current_app._get_current_object() if has_app_context() else _app
+    if app is None:
+        raise RuntimeError('Flask app não registrado (chame init_activity_executors)')
+
+    with app.app_context():
+        return fn(*args, **kwargs)
+
+
+def blocking_activity(activity_class: str) -> Callable:
+    """
+    Decorator que transforma uma função síncrona em activity async.
+
+    A função roda no pool da classe informada; o contexto (activity.info,
+    activity.logger, heartbeat) é copiado para a thread.
+
+    Args:
+        activity_class: Uma das constantes de ActivityClass
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            ctx = contextvars.copy_context()
+            return await loop.run_in_executor(
+                _get_pool(activity_class),
+                functools.partial(ctx.run, _run_with_app_context, fn, args, kwargs)
+            )
+
+        wrapper.activity_class = activity_class
+        return wrapper
+
+    return decorator
@@ -2,12 +2,14 @@
 Serviço de integração Temporal - Funções para uso na API Flask.
 
 Este módulo fornece funções síncronas para:
-- Iniciar execuções de workflow via Temporal
+- Iniciar execuções de workflow via Temporal (uma a uma ou em lote)
 - Enviar signals (aprovação, assinatura)
+- Terminar workflows (retomada de lotes)
+
+Todas usam o cliente persistente de client.get_client_thread().
 """
-import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -15,7 +17,8 @@ logger = logging.getLogger(__name__)
 
 def start_workflow_execution(
     execution_id: str,
-    workflow_id: str = None
+    workflow_id: str = None,
+    execution=None
 ) -> Dict[str, Any]:
     """
     Inicia execução de workflow via Temporal.
@@ -25,15 +28,18 @@ def start_workflow_execution(
     Args:
         execution_id: ID da WorkflowExecution criada
         workflow_id: ID do Workflow (opcional, para logging)
+        execution: WorkflowExecution já carregada (evita recarregar do banco)
     
     Returns:
         {temporal_workflow_id, temporal_run_id}
     """
     from app.database import db
     from app.models import WorkflowExecution
-    from .config import get_config
+    from .client import get_client_thread
+    from .config import get_config, WorkflowNames
     
-    execution = WorkflowExecution.query.get(execution_id)
+    if execution is None:
+        execution = WorkflowExecution.query.get(execution_id)
     if not execution:
         raise ValueError(f'Execução não encontrada: {execution_id}')
     
@@ -42,29 +48,17 @@ def start_workflow_execution(
     # Gerar ID do Temporal workflow
     temporal_workflow_id = f"exec_{execution_id}"
     
-    async def _start():
-        from temporalio.client import Client
-        
-        client = await Client.connect(
-            config.address,
-            namespace=config.namespace
-        )
-        
-        # Iniciar workflow
-        handle = await client.start_workflow(
-            "DocGWorkflow",
-            execution_id,
-            id=temporal_workflow_id,
-            task_queue=config.task_queue
-        )
-        
-        return {
-            'temporal_workflow_id': temporal_workflow_id,
-            'temporal_run_id': handle.result_run_id
-        }
-    
-    # Executar async
-    result = _run_async(_start())
+    # Uma RPC no cliente persistente
+    run_id = get_client_thread().start_workflow(
+        WorkflowNames.DOCG_WORKFLOW,
+        execution_id,
+        id=temporal_workflow_id,
+        task_queue=config.task_queue
+    )
+    result = {
+        'temporal_workflow_id': temporal_workflow_id,
+        'temporal_run_id': run_id
+    }
     
     # Atualizar execution com IDs do Temporal
     execution.temporal_workflow_id = result['temporal_workflow_id']
@@ -76,6 +70,104 @@ def start_workflow_execution(
     return result
 
 
+def start_workflow_executions(executions: List['WorkflowExecution']) -> Dict[str, Any]:
+    """
+    Inicia várias execuções de uma vez (modo em lote).
+    
+    Os starts saem em paralelo pelo mesmo canal gRPC e os IDs do Temporal
+    são gravados num único commit.
+    
+    Args:
+        executions: WorkflowExecutions já criadas no banco
+    
+    Returns:
+        {execution_id: {temporal_workflow_id, temporal_run_id} ou Exception}
+    """
+    from app.database import db
+    from .client import get_client_thread, WorkflowStart
+    from .config import get_config, WorkflowNames
+    
+    config = get_config()
+    starts = [
+        WorkflowStart(
+            workflow=WorkflowNames.DOCG_WORKFLOW,
+            arg=str(execution.id),
+            id=f"exec_{execution.id}",
+            task_queue=config.task_queue
+        )
+        for execution in executions
+    ]
+    
+    results = {}
+    for execution, start, run_id in zip(executions, starts, get_client_thread().start_workflows(starts)):
+        if isinstance(run_id, BaseException):
+            logger.error(f"Erro ao iniciar execução {execution.id} no Temporal: {run_id}")
+            results[str(execution.id)] = run_id
+            continue
+        execution.temporal_workflow_id = start.id
+        execution.temporal_run_id = run_id
+        results[str(execution.id)] = {
+            'temporal_workflow_id': start.id,
+            'temporal_run_id': run_id
+        }
+    db.session.commit()
+    
+    logger.info(f"{len(executions)} workflows iniciados no Temporal em lote")
+    
+    return results
+
+
+def start_batch_workflow(job_id: str, run: int = 1) -> str:
+    """
+    Inicia o BatchGenerationWorkflow de um lote.
+
+    Cada retomada do lote é um novo workflow no Temporal (batch_{id}_{run}).
+
+    Args:
+        job_id: ID do BatchGenerationJob
+        run: Número do run (BatchGenerationJob.runs)
+
+    Returns:
+        temporal_workflow_id
+    """
+    from .client import get_client_thread
+    from .config import get_config, WorkflowNames
+
+    config = get_config()
+    temporal_workflow_id = f"batch_{job_id}_{run}"
+
+    get_client_thread().start_workflow(
+        WorkflowNames.BATCH_GENERATION_WORKFLOW,
+        job_id,
+        id=temporal_workflow_id,
+        task_queue=config.task_queue
+    )
+    logger.info(f"Lote iniciado no Temporal: {temporal_workflow_id}")
+
+    return temporal_workflow_id
+
+
+def terminate_workflow(temporal_workflow_id: str, reason: str) -> bool:
+    """
+    Termina um workflow no Temporal.
+
+    Returns:
+        True se terminou, False se o workflow não existe ou já terminou
+    """
+    from temporalio.service import RPCError, RPCStatusCode
+    from .client import get_client_thread
+
+    try:
+        get_client_thread().terminate(temporal_workflow_id, reason)
+    except RPCError as e:
+        if e.status != RPCStatusCode.NOT_FOUND:
+            raise
+        return False
+
+    logger.info(f"Workflow terminado no Temporal: {temporal_workflow_id}")
+    return True
+
+
 def send_approval_decision(
     workflow_execution_id: str,
     approval_id: str,
@@ -102,15 +194,12 @@ def send_approval_decision(
     if not execution.temporal_workflow_id:
         raise ValueError(f'Execução {workflow_execution_id} não tem temporal_workflow_id')
     
-    async def _send():
-        from .client import send_approval_signal
-        return await send_approval_signal(
-            execution.temporal_workflow_id,
-            approval_id,
-            decision
-        )
-    
-    result = _run_async(_send())
+    from .client import send_approval_signal_sync
+    result = send_approval_signal_sync(
+        execution.temporal_workflow_id,
+        approval_id,
+        decision
+    )
     logger.info(f"Signal de aprovação enviado: {decision} para {execution.temporal_workflow_id}")
     
     return result
@@ -141,41 +230,17 @@ def send_signature_update(
     if not execution.temporal_workflow_id:
         raise ValueError(f'Execução {workflow_execution_id} não tem temporal_workflow_id')
     
-    async def _send():
-        from .client import send_signature_signal
-        return await send_signature_signal(
-            execution.temporal_workflow_id,
-            signature_request_id,
-            status
-        )
-    
-    result = _run_async(_send())
+    from .client import send_signature_signal_sync
+    result = send_signature_signal_sync(
+        execution.temporal_workflow_id,
+        signature_request_id,
+        status
+    )
     logger.info(f"Signal de assinatura enviado: {status} para {execution.temporal_workflow_id}")
     
     return result
 
 
-def _run_async(coro):
-    """
-    Executa coroutine em contexto síncrono.
-    
-    Tenta usar o event loop existente ou cria um novo.
-    """
-    try:
-        loop = asyncio.get_event_loop()
-        if loop.is_running():
-            # Estamos dentro de um loop (ex: pytest-asyncio)
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, coro)
-                return future.result(timeout=60)
-        else:
-            return loop.run_until_complete(coro)
-    except RuntimeError:
-        # Não tem event loop
-        return asyncio.run(coro)
-
-
 def is_temporal_enabled() -> bool:
     """
     Verifica se Temporal está habilitado (variáveis de ambiente configuradas).
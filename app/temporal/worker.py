@@ -17,8 +17,10 @@ from typing import Optional
 from temporalio.client import Client
 from temporalio.worker import Worker
 
+from .codec import get_data_converter
 from .config import get_config
-from .workflows import DocGWorkflow
+from .executor import init_activity_executors, shutdown_activity_executors
+from .workflows import DocGWorkflow, BatchGenerationWorkflow
 from .activities import ALL_ACTIVITIES
 
 # Configurar logging
@@ -42,32 +44,43 @@ async def run_worker(app=None):
     logger.info(f"Namespace: {config.namespace}")
     logger.info(f"Task Queue: {config.task_queue}")
     
-    # Conectar ao Temporal
+    # Se não temos app, criar um para contexto do Flask (e claim-check do codec)
+    if app is None:
+        from app import create_app
+        app = create_app()
+    
+    # Conectar ao Temporal (workflows e activities usam o codec do cliente)
     client = await Client.connect(
         config.address,
-        namespace=config.namespace
+        namespace=config.namespace,
+        data_converter=get_data_converter(app)
     )
     
     logger.info("Conexão estabelecida com sucesso!")
     
-    # Se não temos app, criar um para contexto do Flask
-    if app is None:
-        from app import create_app
-        app = create_app()
+    # Pools de threads por classe de activity (trabalho bloqueante fora do loop)
+    pool_sizes = init_activity_executors(app)
     
     # Criar worker com contexto do Flask
-    async with Worker(
-        client,
-        task_queue=config.task_queue,
-        workflows=[DocGWorkflow],
-        activities=ALL_ACTIVITIES,
-    ):
-        logger.info(f"Worker iniciado na task queue: {config.task_queue}")
-        logger.info(f"Workflows registrados: DocGWorkflow")
-        logger.info(f"Activities registradas: {len(ALL_ACTIVITIES)}")
-        
-        # Manter worker rodando
-        await asyncio.Future()
+    try:
+        async with Worker(
+            client,
+            task_queue=config.task_queue,
+            workflows=[DocGWorkflow, BatchGenerationWorkflow],
+            activities=ALL_ACTIVITIES,
+            max_concurrent_activities=config.max_concurrent_activities,
+        ):
+            logger.info(f"Worker iniciado na task queue: {config.task_queue}")
+            logger.info(f"Workflows registrados: DocGWorkflow")
+            logger.info(f"Activities registradas: {len(ALL_ACTIVITIES)}")
+            logger.info(f"Pools de activities: {pool_sizes}")
+            
+            # Manter worker rodando
+            await asyncio.Future()
+    finally:
+        shutdown_activity_executors(wait=False)
+        from app.services.document_generation.libreoffice_pool import shutdown_libreoffice_pool
+        shutdown_libreoffice_pool()
 
 
 def main():
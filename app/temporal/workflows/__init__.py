@@ -3,6 +3,7 @@ Workflows do Temporal - Orquestração de execuções.
 """
 
 from .docg_workflow import DocGWorkflow
+from .batch_workflow import BatchGenerationWorkflow
 
-__all__ = ['DocGWorkflow']
+__all__ = ['DocGWorkflow', 'BatchGenerationWorkflow']
 
@@ -0,0 +1,103 @@
+"""
+BatchGenerationWorkflow - Geração em lote de documentos.
+
+Processa os itens do lote em páginas: cada página é preparada por uma
+activity (dados da fonte buscados em lote) e cada item roda como um
+DocGWorkflow filho, com no máximo `concurrency` filhos simultâneos. Ao fim
+de cada página o workflow continua como novo (continue-as-new) para manter
+o histórico pequeno em lotes grandes.
+"""
+import asyncio
+from datetime import timedelta
+from typing import Dict, Any
+from temporalio import workflow
+from temporalio.common import RetryPolicy
+
+from ..config import WorkflowNames
+
+with workflow.unsafe.imports_passed_through():
+    from ..activities import (
+        load_batch_job,
+        prepare_batch_items,
+        record_batch_item_result,
+        finalize_batch_job,
+    )
+
+MIN_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100  # limite das APIs batch do HubSpot
+
+
+def page_size_for(concurrency: int) -> int:
+    """Itens por página: algumas rodadas de filhos por página, dentro dos limites"""
+    return max(MIN_PAGE_SIZE, min(MAX_PAGE_SIZE, max(1, concurrency) * 4))
+
+
+@workflow.defn(name=WorkflowNames.BATCH_GENERATION_WORKFLOW)
+class BatchGenerationWorkflow:
+    """
+    Workflow de geração em lote.
+
+    Cada execução processa uma página de itens; enquanto houver itens
+    pendentes, continua como novo com o mesmo job_id.
+    """
+
+    @workflow.run
+    async def run(self, job_id: str) -> Dict[str, Any]:
+        """
+        Args:
+            job_id: ID do BatchGenerationJob
+
+        Returns:
+            BatchGenerationJob.to_dict() ao finalizar
+        """
+        job = await workflow.execute_activity(
+            load_batch_job,
+            job_id,
+            start_to_close_timeout=timedelta(seconds=30),
+            retry_policy=RetryPolicy(maximum_attempts=3)
+        )
+
+        concurrency = max(1, job.get('concurrency') or 1)
+        page = await workflow.execute_activity(
+            prepare_batch_items,
+            {'job_id': job_id, 'limit': page_size_for(concurrency)},
+            start_to_close_timeout=timedelta(minutes=5),
+            retry_policy=RetryPolicy(maximum_attempts=3)
+        )
+
+        if page['items']:
+            semaphore = asyncio.Semaphore(concurrency)
+            await asyncio.gather(*[
+                self._run_item(item, semaphore) for item in page['items']
+            ])
+
+        if page['items'] and not page['cancelled']:
+            workflow.continue_as_new(job_id)
+
+        return await workflow.execute_activity(
+            finalize_batch_job,
+            job_id,
+            start_to_close_timeout=timedelta(seconds=30),
+            retry_policy=RetryPolicy(maximum_attempts=3)
+        )
+
+    async def _run_item(self, item: Dict[str, Any], semaphore: asyncio.Semaphore) -> None:
+        """Executa um item como DocGWorkflow filho e registra o resultado"""
+        async with semaphore:
+            try:
+                result = await workflow.execute_child_workflow(
+                    WorkflowNames.DOCG_WORKFLOW,
+                    item['execution_id'],
+                    id=f"exec_{item['execution_id']}"
+                )
+                status = result.get('status', 'failed')
+                error = result.get('error')
+            except Exception as e:
+                status, error = 'failed', str(e)
+
+        await workflow.execute_activity(
+            record_batch_item_result,
+            {'item_id': item['item_id'], 'status': status, 'error': error},
+            start_to_close_timeout=timedelta(seconds=30),
+            retry_policy=RetryPolicy(maximum_attempts=5)
+        )
@@ -0,0 +1,114 @@
+"""
+Grafo de dependências entre nodes do DocGWorkflow.
+
+Regras (nodes ordenados por position):
+- Trigger: sem dependências
+- Documento: depende do trigger
+- Email: depende do trigger e dos documentos que anexa
+  (config.document_node_ids, ou todos os documentos anteriores)
+- Aprovação, assinatura, webhook de saída e tipos desconhecidos são
+  barreiras: dependem de todos os nodes anteriores e todos os nodes
+  seguintes dependem deles
+
+Nodes no mesmo nível não dependem entre si e podem rodar em paralelo.
+Este módulo é puro (sem I/O) para poder ser usado dentro do workflow.
+"""
+from typing import Dict, Any, List
+
+TRIGGER_TYPES = ['hubspot', 'webhook', 'google-forms', 'trigger']
+DOCUMENT_TYPES = [
+    'google-docs', 'google-slides', 'microsoft-word', 'microsoft-powerpoint',
+    'uploaded-document', 'file-upload'
+]
+EMAIL_TYPES = ['gmail', 'outlook']
+
+
+def build_dependencies(nodes: List[Dict[str, Any]]) -> Dict[str, List[str]]:
+    """
+    Calcula as dependências diretas de cada node.
+
+    Args:
+        nodes: Nodes do workflow (com id, node_type, position, config)
+
+    Returns:
+        {node_id: [ids dos nodes dos quais depende]}
+    """
+    ordered = sorted(nodes, key=lambda n: n.get('position', 0))
+
+    dependencies: Dict[str, List[str]] = {}
+    triggers: List[str] = []
+    documents: List[str] = []
+    seen: List[str] = []
+    last_barrier = None
+
+    for node in ordered:
+        node_id = str(node['id'])
+        node_type = node.get('node_type')
+        config = node.get('config') or {}
+
+        if node_type in TRIGGER_TYPES:
+            deps = [last_barrier] if last_barrier else []
+            triggers.append(node_id)
+
+        elif node_type in DOCUMENT_TYPES:
+            deps = triggers + ([last_barrier] if last_barrier else [])
+            documents.append(node_id)
+
+        elif node_type in EMAIL_TYPES:
+            deps = triggers + ([last_barrier] if last_barrier else [])
+            if config.get('attach_documents', False):
+                referenced = [str(n) for n in config.get('document_node_ids') or []]
+                if referenced:
+                    deps += [d for d in documents if d in referenced]
+                else:
+                    deps += documents
+
+        else:
+            # Barreira: aprovação, assinatura, webhook de saída, desconhecidos
+            deps = list(seen)
+            last_barrier = node_id
+
+        dependencies[node_id] = _unique(deps)
+        seen.append(node_id)
+
+    return dependencies
+
+
+def build_levels(nodes: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """
+    Agrupa nodes em níveis topológicos.
+
+    Todos os nodes de um nível têm suas dependências satisfeitas pelos
+    níveis anteriores. Dentro do nível, a ordem segue position.
+
+    Args:
+        nodes: Nodes do workflow
+
+    Returns:
+        Lista de níveis, cada um com a lista de nodes
+    """
+    ordered = sorted(nodes, key=lambda n: n.get('position', 0))
+    dependencies = build_dependencies(ordered)
+
+    level_of: Dict[str, int] = {}
+    levels: List[List[Dict[str, Any]]] = []
+
+    for node in ordered:
+        node_id = str(node['id'])
+        deps = dependencies[node_id]
+        level = max((level_of[d] + 1 for d in deps), default=0)
+        level_of[node_id] = level
+
+        while len(levels) <= level:
+            levels.append([])
+        levels[level].append(node)
+
+    return levels
+
+
+def _unique(items: List[str]) -> List[str]:
+    result = []
+    for item in items:
+        if item not in result:
+            result.append(item)
+    return result
@@ -11,6 +11,7 @@ from temporalio import workflow
 from temporalio.common import RetryPolicy
 
 from ..config import get_config, SignalNames
+from .dag import build_levels, TRIGGER_TYPES, DOCUMENT_TYPES, EMAIL_TYPES
 
 # Importar activities com alias para uso no workflow
 with workflow.unsafe.imports_passed_through():
@@ -23,6 +24,7 @@ with workflow.unsafe.imports_passed_through():
         complete_execution,
         fail_execution,
         add_execution_log,
+        record_node_transition,
         execute_trigger_node,
         execute_document_node,
         create_approval,
@@ -39,9 +41,9 @@ class DocGWorkflow:
     """
     Workflow principal do DocG.
     
-    Processa nodes sequencialmente:
+    Processa nodes por nível do grafo de dependências (ver dag.py):
     1. Trigger: Extrai dados da fonte
-    2. Documents: Gera documentos
+    2. Documents: Gera documentos (independentes rodam em paralelo)
     3. Approval: Pausa e aguarda aprovação humana
     4. Signature: Pausa e aguarda assinaturas
     5. Email: Envia notificações
@@ -62,6 +64,18 @@ class DocGWorkflow:
         self._source_object_type: str = ""
         self._generated_documents: List[Dict[str, Any]] = []
         self._signature_requests: List[Dict[str, Any]] = []
+        
+        # Context alterado desde o último snapshot persistido
+        self._context_dirty: bool = False
+        
+        # Ordem topológica dos nodes (para ordenar documentos gerados)
+        self._node_order: Dict[str, int] = {}
+        
+        # Versão do plano de execução do worker (ver execution_plan.py)
+        self._plan_version: Optional[str] = None
+        
+        # Execução anterior a record_node_transition (ver _run_legacy)
+        self._legacy_bookkeeping: bool = False
     
     @workflow.signal(name=SignalNames.APPROVAL_DECISION)
     async def approval_decision_signal(self, data: Dict[str, Any]):
@@ -113,98 +127,28 @@ class DocGWorkflow:
             workflow_id = execution_data['workflow']['id']
             organization_id = execution_data['organization_id']
             trigger_data = execution_data['execution'].get('trigger_data', {})
+            self._plan_version = execution_data.get('plan_version')
             
             workflow.logger.info(f"Carregados {len(nodes)} nodes para workflow {workflow_id}")
             
-            # 2. Processar cada node sequencialmente
-            for node in nodes:
-                node_id = node['id']
-                node_type = node['node_type']
-                node_position = node['position']
-                
-                workflow.logger.info(f"Executando node {node_position}: {node_type} ({node_id})")
-                
-                # Atualizar current_node
-                await workflow.execute_activity(
-                    update_current_node,
-                    {'execution_id': execution_id, 'node_id': node_id},
-                    start_to_close_timeout=timedelta(seconds=10)
-                )
-                
-                started_at = workflow.now()
-                
-                try:
-                    # Executar baseado no tipo
-                    if node_type in ['hubspot', 'webhook', 'google-forms', 'trigger']:
-                        await self._execute_trigger(
-                            execution_id, node, workflow_id, organization_id, trigger_data, config
-                        )
-                    
-                    elif node_type in ['google-docs', 'google-slides', 'microsoft-word', 'microsoft-powerpoint', 'uploaded-document', 'file-upload']:
-                        await self._execute_document(
-                            execution_id, node, workflow_id, organization_id, config
-                        )
-                    
-                    elif node_type in ['review-documents', 'human-in-loop']:
-                        await self._execute_approval(
-                            execution_id, node, workflow_id, organization_id, config
-                        )
-                    
-                    elif node_type in ['request-signatures', 'signature', 'clicksign']:
-                        await self._execute_signature(
-                            execution_id, node, workflow_id, organization_id, config
-                        )
-                    
-                    elif node_type in ['gmail', 'outlook']:
-                        await self._execute_email(
-                            execution_id, node, workflow_id, organization_id, config
-                        )
-                    
-                    elif node_type == 'webhook':
-                        await self._execute_webhook(
-                            execution_id, node, workflow_id, organization_id, config
-                        )
-                    
-                    else:
-                        workflow.logger.warning(f"Tipo de node não suportado: {node_type}")
-                    
-                    # Log de sucesso
-                    await workflow.execute_activity(
-                        add_execution_log,
-                        {
-                            'execution_id': execution_id,
-                            'node_id': node_id,
-                            'node_type': node_type,
-                            'status': 'success',
-                            'started_at': started_at.isoformat(),
-                            'completed_at': workflow.now().isoformat()
-                        },
-                        start_to_close_timeout=timedelta(seconds=10)
+            # 2. Processar nodes
+            # Execuções iniciadas antes de record_node_transition seguem a
+            # sequência antiga de activities no replay (aprovação/assinatura
+            # podem ficar pausadas por dias)
+            if workflow.patched('record-node-transition'):
+                # Idem para execuções sequenciais anteriores ao grafo de dependências
+                if workflow.patched('parallel-node-levels'):
+                    await self._run_levels(
+                        execution_id, nodes, workflow_id, organization_id, trigger_data, config
                     )
-                
-                except Exception as e:
-                    # Log de erro
-                    await workflow.execute_activity(
-                        add_execution_log,
-                        {
-                            'execution_id': execution_id,
-                            'node_id': node_id,
-                            'node_type': node_type,
-                            'status': 'failed',
-                            'started_at': started_at.isoformat(),
-                            'completed_at': workflow.now().isoformat(),
-                            'error': str(e)
-                        },
-                        start_to_close_timeout=timedelta(seconds=10)
+                else:
+                    await self._run_sequential(
+                        execution_id, nodes, workflow_id, organization_id, trigger_data, config
                     )
-                    raise
-            
-            # 3. Completar execução
-            await workflow.execute_activity(
-                complete_execution,
-                execution_id,
-                start_to_close_timeout=timedelta(seconds=10)
-            )
+            else:
+                await self._run_legacy(
+                    execution_id, nodes, workflow_id, organization_id, trigger_data, config
+                )
             
             workflow.logger.info(f"Workflow {workflow_id} completado com sucesso")
             
@@ -222,6 +166,302 @@ class DocGWorkflow:
             
             return {'status': 'failed', 'error': str(e)}
     
+    async def _run_levels(
+        self, execution_id: str, nodes: List[Dict], workflow_id: str,
+        organization_id: str, trigger_data: Dict, config
+    ):
+        """
+        Processa nodes por nível do grafo de dependências.
+        
+        Nodes independentes (ex: vários documentos a partir do mesmo
+        trigger) rodam em paralelo, limitados por max_parallel_nodes.
+        A bookkeeping de cada node (log, próximo node, snapshot do context)
+        é gravada por uma única activity record_node_transition.
+        """
+        levels = build_levels(nodes)
+        self._node_order = {
+            node['id']: index for index, node in enumerate(n for level in levels for n in level)
+        }
+        fan_out = asyncio.Semaphore(max(1, config.max_parallel_nodes))
+        
+        if levels:
+            await self._record_transition(execution_id, current_node_id=levels[0][0]['id'])
+        
+        for level_index, level in enumerate(levels):
+            is_last_level = level_index == len(levels) - 1
+            next_node_id = None if is_last_level else levels[level_index + 1][0]['id']
+            level_state = {'remaining': len(level)}
+            
+            if len(level) > 1:
+                workflow.logger.info(
+                    f"Executando {len(level)} nodes em paralelo: "
+                    f"{[n['node_type'] for n in level]}"
+                )
+            
+            results = await asyncio.gather(
+                *[
+                    self._run_node(
+                        execution_id, node, workflow_id, organization_id, trigger_data,
+                        config, fan_out, level_state, next_node_id, is_last_level
+                    )
+                    for node in level
+                ],
+                return_exceptions=True
+            )
+            
+            # Propagar a primeira falha (por position) após todos os ramos terminarem
+            failures = [result for result in results if isinstance(result, BaseException)]
+            if failures:
+                # Context do nível (ex: documentos já gerados) gravado uma vez,
+                # sem transição concorrente
+                if self._context_dirty:
+                    await self._save_context(execution_id)
+                raise failures[0]
+        
+        # Completar execução (workflow sem nodes)
+        if not levels:
+            await workflow.execute_activity(
+                complete_execution,
+                execution_id,
+                start_to_close_timeout=timedelta(seconds=10)
+            )
+    
+    async def _run_sequential(
+        self, execution_id: str, nodes: List[Dict], workflow_id: str,
+        organization_id: str, trigger_data: Dict, config
+    ):
+        """
+        Processa nodes sequencialmente, com uma record_node_transition por node.
+        
+        Mantido apenas para o replay de execuções iniciadas antes do grafo de
+        dependências; remover quando não houver mais nenhuma.
+        """
+        if nodes:
+            await self._record_transition(execution_id, current_node_id=nodes[0]['id'])
+        
+        for index, node in enumerate(nodes):
+            node_id = node['id']
+            node_type = node['node_type']
+            
+            workflow.logger.info(f"Executando node {node['position']}: {node_type} ({node_id})")
+            
+            started_at = workflow.now()
+            
+            try:
+                await self._execute_node(
+                    execution_id, node, workflow_id, organization_id, trigger_data, config
+                )
+            except Exception as e:
+                # Log de erro (+ context acumulado até aqui)
+                await self._record_transition(
+                    execution_id,
+                    log={
+                        'node_id': node_id,
+                        'node_type': node_type,
+                        'status': 'failed',
+                        'started_at': started_at.isoformat(),
+                        'completed_at': workflow.now().isoformat(),
+                        'error': str(e)
+                    }
+                )
+                raise
+            
+            # Log de sucesso + próximo node; o último node também completa a execução
+            is_last = index == len(nodes) - 1
+            await self._record_transition(
+                execution_id,
+                log={
+                    'node_id': node_id,
+                    'node_type': node_type,
+                    'status': 'success',
+                    'started_at': started_at.isoformat(),
+                    'completed_at': workflow.now().isoformat()
+                },
+                current_node_id=None if is_last else nodes[index + 1]['id'],
+                complete=is_last
+            )
+        
+        # Completar execução (workflow sem nodes)
+        if not nodes:
+            await workflow.execute_activity(
+                complete_execution,
+                execution_id,
+                start_to_close_timeout=timedelta(seconds=10)
+            )
+    
+    async def _run_legacy(
+        self, execution_id: str, nodes: List[Dict], workflow_id: str,
+        organization_id: str, trigger_data: Dict, config
+    ):
+        """
+        Processa nodes sequencialmente com uma activity por etapa de
+        bookkeeping (update_current_node, add_execution_log,
+        save_execution_context, complete_execution).
+        
+        Mantido apenas para o replay de execuções iniciadas antes de
+        record_node_transition; remover quando não houver mais nenhuma.
+        """
+        self._legacy_bookkeeping = True
+        
+        for node in nodes:
+            node_id = node['id']
+            node_type = node['node_type']
+            
+            workflow.logger.info(f"Executando node {node['position']}: {node_type} ({node_id})")
+            
+            # Atualizar current_node
+            await workflow.execute_activity(
+                update_current_node,
+                {'execution_id': execution_id, 'node_id': node_id},
+                start_to_close_timeout=timedelta(seconds=10)
+            )
+            
+            started_at = workflow.now()
+            
+            try:
+                await self._execute_node(
+                    execution_id, node, workflow_id, organization_id, trigger_data, config
+                )
+                
+                # Log de sucesso
+                await workflow.execute_activity(
+                    add_execution_log,
+                    {
+                        'execution_id': execution_id,
+                        'node_id': node_id,
+                        'node_type': node_type,
+                        'status': 'success',
+                        'started_at': started_at.isoformat(),
+                        'completed_at': workflow.now().isoformat()
+                    },
+                    start_to_close_timeout=timedelta(seconds=10)
+                )
+            
+            except Exception as e:
+                # Log de erro
+                await workflow.execute_activity(
+                    add_execution_log,
+                    {
+                        'execution_id': execution_id,
+                        'node_id': node_id,
+                        'node_type': node_type,
+                        'status': 'failed',
+                        'started_at': started_at.isoformat(),
+                        'completed_at': workflow.now().isoformat(),
+                        'error': str(e)
+                    },
+                    start_to_close_timeout=timedelta(seconds=10)
+                )
+                raise
+        
+        # Completar execução
+        await workflow.execute_activity(
+            complete_execution,
+            execution_id,
+            start_to_close_timeout=timedelta(seconds=10)
+        )
+    
+    async def _run_node(
+        self, execution_id: str, node: Dict, workflow_id: str, organization_id: str,
+        trigger_data: Dict, config, fan_out: asyncio.Semaphore, level_state: Dict[str, int],
+        next_node_id: Optional[str], is_last_level: bool
+    ):
+        """
+        Executa um node e registra sua transição.
+        
+        O último node a terminar com sucesso no nível aponta o próximo node
+        atual (ou completa a execução, se for o último nível) e grava o
+        context do nível. As transições rodam em paralelo no pool de
+        bookkeeping: se cada uma levasse um snapshot, um snapshot antigo
+        poderia ser gravado depois de um mais novo.
+        """
+        node_id = node['id']
+        node_type = node['node_type']
+        
+        async with fan_out:
+            workflow.logger.info(f"Executando node {node['position']}: {node_type} ({node_id})")
+            started_at = workflow.now()
+            
+            try:
+                await self._execute_node(
+                    execution_id, node, workflow_id, organization_id, trigger_data, config
+                )
+            except Exception as e:
+                # Log de erro; o context é gravado por _run_levels após o nível
+                await self._record_transition(
+                    execution_id,
+                    log={
+                        'node_id': node_id,
+                        'node_type': node_type,
+                        'status': 'failed',
+                        'started_at': started_at.isoformat(),
+                        'completed_at': workflow.now().isoformat(),
+                        'error': str(e)
+                    },
+                    save_context=False
+                )
+                raise
+            
+            completed_at = workflow.now()
+        
+        level_state['remaining'] -= 1
+        closes_level = level_state['remaining'] == 0
+        
+        # Log de sucesso + próximo node; o último node também completa a execução
+        await self._record_transition(
+            execution_id,
+            log={
+                'node_id': node_id,
+                'node_type': node_type,
+                'status': 'success',
+                'started_at': started_at.isoformat(),
+                'completed_at': completed_at.isoformat()
+            },
+            current_node_id=next_node_id if closes_level else None,
+            complete=closes_level and is_last_level,
+            save_context=closes_level
+        )
+    
+    async def _execute_node(
+        self, execution_id: str, node: Dict, workflow_id: str,
+        organization_id: str, trigger_data: Dict, config
+    ):
+        """Despacha o node para o executor do seu tipo"""
+        node_type = node['node_type']
+        
+        if node_type in TRIGGER_TYPES:
+            await self._execute_trigger(
+                execution_id, node, workflow_id, organization_id, trigger_data, config
+            )
+        
+        elif node_type in DOCUMENT_TYPES:
+            await self._execute_document(
+                execution_id, node, workflow_id, organization_id, config
+            )
+        
+        elif node_type in ['review-documents', 'human-in-loop']:
+            await self._execute_approval(
+                execution_id, node, workflow_id, organization_id, config
+            )
+        
+        elif node_type in ['request-signatures', 'signature', 'clicksign']:
+            await self._execute_signature(
+                execution_id, node, workflow_id, organization_id, config
+            )
+        
+        elif node_type in EMAIL_TYPES:
+            await self._execute_email(
+                execution_id, node, workflow_id, organization_id, config
+            )
+        
+        elif node_type == 'webhook':
+            await self._execute_webhook(
+                execution_id, node, workflow_id, organization_id, config
+            )
+        
+        else:
+            workflow.logger.warning(f"Tipo de node não suportado: {node_type}")
+    
     async def _execute_trigger(
         self, execution_id: str, node: Dict, workflow_id: str, 
         organization_id: str, trigger_data: Dict, config
@@ -245,8 +485,7 @@ class DocGWorkflow:
         self._source_object_id = result.get('source_object_id', '')
         self._source_object_type = result.get('source_object_type', '')
         
-        # Salvar context
-        await self._save_context(execution_id)
+        await self._context_changed(execution_id)
     
     async def _execute_document(
         self, execution_id: str, node: Dict, workflow_id: str, 
@@ -260,6 +499,7 @@ class DocGWorkflow:
                 'node': node,
                 'workflow_id': workflow_id,
                 'organization_id': organization_id,
+                'plan_version': self._plan_version,
                 'source_data': self._source_data,
                 'source_object_id': self._source_object_id,
                 'source_object_type': self._source_object_type
@@ -282,9 +522,10 @@ class DocGWorkflow:
             'pdf_file_id': result.get('pdf_file_id'),
             'pdf_url': result.get('pdf_url')
         })
+        # Manter ordem por position mesmo com documentos gerados em paralelo
+        self._generated_documents.sort(key=lambda d: self._node_order.get(d['node_id'], 0))
         
-        # Salvar context
-        await self._save_context(execution_id)
+        await self._context_changed(execution_id)
     
     async def _execute_approval(
         self, execution_id: str, node: Dict, workflow_id: str, 
@@ -385,6 +626,7 @@ class DocGWorkflow:
             'external_id': sig_data['external_id'],
             'external_url': sig_data['external_url']
         })
+        self._context_dirty = True
         
         # 2. Marcar como pausado
         await workflow.execute_activity(
@@ -482,19 +724,54 @@ class DocGWorkflow:
             retry_policy=RetryPolicy(maximum_attempts=3)
         )
     
-    async def _save_context(self, execution_id: str):
-        """Salva snapshot do context atual"""
-        context = {
+    def _context_snapshot(self) -> Dict[str, Any]:
+        """Snapshot do context atual"""
+        return {
             'source_data': self._source_data,
             'source_object_id': self._source_object_id,
             'source_object_type': self._source_object_type,
             'generated_documents': self._generated_documents,
             'signature_requests': self._signature_requests
         }
+    
+    async def _record_transition(
+        self, execution_id: str, log: Optional[Dict[str, Any]] = None,
+        current_node_id: Optional[str] = None, complete: bool = False,
+        save_context: bool = True
+    ):
+        """
+        Persiste log do node, próximo node e context (se alterado e
+        save_context) em uma única activity.
+        """
+        data: Dict[str, Any] = {'execution_id': execution_id}
+        if log:
+            data['log'] = log
+        if current_node_id:
+            data['current_node_id'] = current_node_id
+        if save_context and self._context_dirty:
+            data['context'] = self._context_snapshot()
+            self._context_dirty = False
+        if complete:
+            data['complete'] = True
         
+        await workflow.execute_activity(
+            record_node_transition,
+            data,
+            start_to_close_timeout=timedelta(seconds=10)
+        )
+    
+    async def _context_changed(self, execution_id: str):
+        """Salva o context na hora (legado) ou na próxima transição"""
+        if self._legacy_bookkeeping:
+            await self._save_context(execution_id)
+        else:
+            self._context_dirty = True
+    
+    async def _save_context(self, execution_id: str):
+        """Salva snapshot do context atual"""
         await workflow.execute_activity(
             save_execution_context,
-            {'execution_id': execution_id, 'context': context},
+            {'execution_id': execution_id, 'context': self._context_snapshot()},
             start_to_close_timeout=timedelta(seconds=10)
         )
-
+        self._context_dirty = False
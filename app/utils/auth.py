@@ -1,8 +1,10 @@
 from functools import wraps
 from flask import request, jsonify, g
+from werkzeug.local import LocalProxy
 from app.config import Config
 from app.models import User, Organization
 from app.database import db
+from app.utils.org_cache import get_organization_cache
 import uuid
 
 def require_auth(f):
@@ -65,6 +67,10 @@ def require_org(f):
     @require_auth
     @wraps(f)
     def decorated_function(*args, **kwargs):
+        # Já resolvida nesta requisição (ex: require_admin + require_org)
+        if getattr(g, 'organization_snapshot', None) is not None:
+            return f(*args, **kwargs)
+        
         # Tentar obter organization_id de várias formas
         organization_id = None
         
@@ -98,11 +104,10 @@ def require_org(f):
                 portal_id = json_data.get('portal_id') or json_data.get('portalId')
         
         if portal_id:
-            # Buscar organização pelo portal_id (via connection)
-            from app.utils.helpers import get_organization_id_from_portal_id
-            org_id = get_organization_id_from_portal_id(portal_id)
-            if org_id:
-                organization_id = str(org_id)
+            # Buscar organização pelo portal_id (via connection, em cache)
+            portal_org = get_organization_cache().get_by_portal(portal_id)
+            if portal_org:
+                organization_id = portal_org.id
         
         # 5. Se ainda não encontrou e tem portal_id, criar automaticamente se for requisição do HubSpot
         if not organization_id and portal_id:
@@ -146,15 +151,22 @@ def require_org(f):
         
         # Validar que organização existe
         try:
-            org = Organization.query.filter_by(id=organization_id).first_or_404()
-            g.organization_id = organization_id
-            g.organization = org
+            snapshot = get_organization_cache().get(organization_id)
         except Exception as e:
+            db.session.rollback()
+            snapshot = None
+        
+        if snapshot is None:
             return jsonify({
                 'error': 'Invalid organization',
                 'message': 'Organização não encontrada'
             }), 404
         
+        g.organization_id = organization_id
+        g.organization_snapshot = snapshot
+        # Organization completa só é carregada se alguém usar g.organization
+        g.organization = LocalProxy(lambda: Organization.query.get(snapshot.id))
+        
         return f(*args, **kwargs)
     
     return decorated_function
@@ -38,7 +38,7 @@ def get_organization_id_from_portal_id(portal_id):
         organization_id (UUID) ou None se não encontrado
     """
     # Buscar connection onde config.portal_id = portal_id
-    # Usar JSONB operator para buscar no campo config
+    # A expressão precisa ser igual à do índice idx_connections_hubspot_portal
     from sqlalchemy import text
     from app.database import db
     
@@ -47,7 +47,7 @@ def get_organization_id_from_portal_id(portal_id):
             SELECT organization_id 
             FROM data_source_connections 
             WHERE source_type = 'hubspot' 
-            AND (config->>'portal_id')::text = :portal_id
+            AND (config->>'portal_id') = :portal_id
             LIMIT 1
         """),
         {'portal_id': str(portal_id)}
@@ -4,16 +4,28 @@ Middleware de autenticação para requisições do HubSpot.
 
 from functools import wraps
 from flask import request, g, jsonify
-import requests
 import logging
 import os
 import hashlib
 import hmac
 import time
 
+from app.utils.hubspot_token_cache import get_token_cache
+
 logger = logging.getLogger(__name__)
 
 
+def _build_hubspot_context(token_info, token):
+    """Monta g.hubspot_context a partir da introspecção do token"""
+    return {
+        'hub_id': token_info.get('hub_id'),
+        'user_id': token_info.get('user_id'),
+        'user_email': token_info.get('user'),
+        'scopes': token_info.get('scopes', []),
+        'token': token
+    }
+
+
 def require_hubspot_auth(f):
     """
     Middleware que valida token OAuth do HubSpot.
@@ -33,25 +45,14 @@ def require_hubspot_auth(f):
             return jsonify({'error': 'Token não fornecido'}), 401
         
         try:
-            # Validar token com HubSpot
-            response = requests.get(
-                f'https://api.hubapi.com/oauth/v1/access-tokens/{token}'
-            )
+            # Validar token com HubSpot (resultado em cache, ver hubspot_token_cache)
+            token_info = get_token_cache().introspect(token)
             
-            if response.status_code != 200:
-                logger.warning(f'Token HubSpot inválido: {response.status_code}')
+            if token_info is None:
                 return jsonify({'error': 'Token inválido'}), 401
             
-            token_info = response.json()
-            
             # Armazenar informações no contexto da requisição
-            g.hubspot_context = {
-                'hub_id': token_info.get('hub_id'),
-                'user_id': token_info.get('user_id'),
-                'user_email': token_info.get('user'),
-                'scopes': token_info.get('scopes', []),
-                'token': token
-            }
+            g.hubspot_context = _build_hubspot_context(token_info, token)
             
             # Buscar organização associada ao hub_id
             # TODO: Implementar busca da organização
@@ -86,19 +87,9 @@ def optional_hubspot_auth(f):
         
         if token:
             try:
-                response = requests.get(
-                    f'https://api.hubapi.com/oauth/v1/access-tokens/{token}'
-                )
-                
-                if response.status_code == 200:
-                    token_info = response.json()
-                    g.hubspot_context = {
-                        'hub_id': token_info.get('hub_id'),
-                        'user_id': token_info.get('user_id'),
-                        'user_email': token_info.get('user'),
-                        'scopes': token_info.get('scopes', []),
-                        'token': token
-                    }
+                token_info = get_token_cache().introspect(token)
+                if token_info is not None:
+                    g.hubspot_context = _build_hubspot_context(token_info, token)
             except Exception as e:
                 logger.warning(f'Erro ao validar token HubSpot (opcional): {str(e)}')
         
@@ -0,0 +1,178 @@
+"""
+Cache da introspecção de access tokens do HubSpot.
+
+require_hubspot_auth/optional_hubspot_auth validavam o token com
+GET /oauth/v1/access-tokens/{token} em toda requisição. O resultado agora
+fica em cache, chaveado pelo SHA-256 do token (o token nunca é usado como
+chave nem gravado):
+
+- tokens válidos: até o menor entre expires_in do token e
+  HUBSPOT_TOKEN_CACHE_TTL
+- tokens inválidos (401/403/404 do HubSpot): cache negativo curto
+  (HUBSPOT_TOKEN_CACHE_NEGATIVE_TTL); rate limit (429), outros 4xx,
+  erros 5xx e de rede não são cacheados
+
+Dois níveis: LRU em processo (HUBSPOT_TOKEN_CACHE_MAX_ENTRIES) e,
+opcionalmente, Redis compartilhado entre os workers do gunicorn
+(HUBSPOT_TOKEN_CACHE_BACKEND=redis + REDIS_URL).
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+INTROSPECTION_URL = 'https://api.hubapi.com/oauth/v1/access-tokens/{token}'
+
+MAX_TTL_SECONDS = int(os.getenv('HUBSPOT_TOKEN_CACHE_TTL', '300'))
+NEGATIVE_TTL_SECONDS = int(os.getenv('HUBSPOT_TOKEN_CACHE_NEGATIVE_TTL', '30'))
+MAX_ENTRIES = int(os.getenv('HUBSPOT_TOKEN_CACHE_MAX_ENTRIES', '10000'))
+# Respostas que dizem algo sobre o token; 429 e 5xx não
+INVALID_TOKEN_STATUSES = (401, 403, 404)
+EXPIRY_SAFETY_SECONDS = 30  # não usar um token cacheado nos últimos segundos de vida
+REQUEST_TIMEOUT = 10
+
+
+class TokenIntrospectionCache:
+    """Cache (memória + Redis opcional) da introspecção de tokens HubSpot"""
+
+    REDIS_KEY_PREFIX = 'docg:hubspot_token:'
+
+    def __init__(
+        self,
+        max_entries: int = MAX_ENTRIES,
+        max_ttl: int = MAX_TTL_SECONDS,
+        negative_ttl: int = NEGATIVE_TTL_SECONDS,
+        redis_url: Optional[str] = None
+    ):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self.negative_ttl = negative_ttl
+        self._memory: 'OrderedDict[str, Tuple[float, Optional[Dict[str, Any]]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+
+        if redis_url:
+            try:
+                import redis
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5)
+            except Exception as e:
+                logger.warning(f'Redis indisponível para cache de tokens HubSpot: {e}')
+
+    @staticmethod
+    def cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def introspect(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Retorna as informações do token (hub_id, user_id, user, scopes...).
+
+        Returns:
+            Dict do HubSpot ou None se o token for inválido
+
+        Raises:
+            requests.RequestException: Falha de rede ao consultar o HubSpot
+        """
+        key = self.cache_key(token)
+
+        found, token_info = self._get(key)
+        if found:
+            return token_info
+
+        response = requests.get(INTROSPECTION_URL.format(token=token), timeout=REQUEST_TIMEOUT)
+
+        if response.status_code == 200:
+            token_info = response.json()
+            ttl = min(self.max_ttl, int(token_info.get('expires_in') or 0) - EXPIRY_SAFETY_SECONDS)
+            if ttl > 0:
+                self._set(key, token_info, ttl)
+            return token_info
+
+        if response.status_code in INVALID_TOKEN_STATUSES:
+            logger.warning(f'Token HubSpot inválido: {response.status_code}')
+            self._set(key, None, self.negative_ttl)
+        else:
+            logger.warning(f'Introspecção de token HubSpot falhou: {response.status_code}')
+        return None
+
+    def invalidate(self, token: str) -> None:
+        key = self.cache_key(token)
+        with self._lock:
+            self._memory.pop(key, None)
+        if self._redis is not None:
+            try:
+                self._redis.delete(self.REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f'Erro ao invalidar token HubSpot no Redis: {e}')
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+    def _get(self, key: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, token_info = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    return True, token_info
+                del self._memory[key]
+
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(self.REDIS_KEY_PREFIX + key)
+                if raw is not None:
+                    cached = json.loads(raw)
+                    self._set_memory(key, cached['info'], cached['expires_at'])
+                    return True, cached['info']
+            except Exception as e:
+                logger.warning(f'Erro ao ler token HubSpot do Redis: {e}')
+
+        return False, None
+
+    def _set(self, key: str, token_info: Optional[Dict[str, Any]], ttl: int) -> None:
+        expires_at = time.time() + ttl
+        self._set_memory(key, token_info, expires_at)
+
+        if self._redis is not None:
+            try:
+                self._redis.setex(
+                    self.REDIS_KEY_PREFIX + key,
+                    ttl,
+                    json.dumps({'info': token_info, 'expires_at': expires_at})
+                )
+            except Exception as e:
+                logger.warning(f'Erro ao gravar token HubSpot no Redis: {e}')
+
+    def _set_memory(self, key: str, token_info: Optional[Dict[str, Any]], expires_at: float) -> None:
+        with self._lock:
+            self._memory[key] = (expires_at, token_info)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+
+_cache: Optional[TokenIntrospectionCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenIntrospectionCache:
+    """Retorna singleton do cache de introspecção"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                redis_url = None
+                if os.getenv('HUBSPOT_TOKEN_CACHE_BACKEND', 'memory').lower() == 'redis':
+                    redis_url = os.getenv('REDIS_URL')
+                _cache = TokenIntrospectionCache(redis_url=redis_url)
+    return _cache
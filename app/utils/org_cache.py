@@ -0,0 +1,143 @@
+"""
+Cache curto da resolução de organização usada por require_org.
+
+require_org rodava, a cada requisição, a busca portal_id -> organização e
+depois carregava a Organization de novo. Aqui ficam, por ORG_CACHE_TTL
+segundos:
+
+- portal_id -> organization_id
+- organization_id -> OrganizationSnapshot (campos básicos, sem sessão)
+
+O ORM em si não é guardado entre requisições (objetos ficariam presos a
+sessões antigas); g.organization continua sendo a Organization, carregada
+sob demanda. Mudanças de plano, de dados da organização e de conexões
+HubSpot chamam invalidate().
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+ORG_CACHE_TTL = float(os.getenv('ORG_CACHE_TTL', '30'))
+ORG_CACHE_MAX_ENTRIES = int(os.getenv('ORG_CACHE_MAX_ENTRIES', '5000'))
+
+
+@dataclass(frozen=True)
+class OrganizationSnapshot:
+    """Cópia imutável dos campos de Organization usados na autenticação"""
+    id: str
+    name: str
+    slug: str
+    plan: str
+    is_active: bool
+
+    @classmethod
+    def from_model(cls, org) -> 'OrganizationSnapshot':
+        return cls(
+            id=str(org.id),
+            name=org.name,
+            slug=org.slug,
+            plan=org.plan,
+            is_active=bool(org.is_active)
+        )
+
+
+class OrganizationCache:
+    """Cache TTL + LRU de organizações por id e por portal_id"""
+
+    def __init__(self, ttl: float = ORG_CACHE_TTL, max_entries: int = ORG_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[float, object]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, organization_id) -> Optional[OrganizationSnapshot]:
+        """Organização pelo id (None se não existir)"""
+        key = ('org', str(organization_id))
+        snapshot = self._get(key)
+        if snapshot is not None:
+            return snapshot
+
+        from app.models import Organization
+        org = Organization.query.filter_by(id=organization_id).first()
+        if org is None:
+            return None
+
+        snapshot = OrganizationSnapshot.from_model(org)
+        self._set(key, snapshot)
+        return snapshot
+
+    def get_by_portal(self, portal_id) -> Optional[OrganizationSnapshot]:
+        """Organização dona da conexão HubSpot do portal (None se não houver)"""
+        key = ('portal', str(portal_id))
+        organization_id = self._get(key)
+
+        if organization_id is None:
+            from app.utils.helpers import get_organization_id_from_portal_id
+            organization_id = get_organization_id_from_portal_id(portal_id)
+            if organization_id is None:
+                return None
+            organization_id = str(organization_id)
+            self._set(key, organization_id)
+
+        return self.get(organization_id)
+
+    def invalidate(self, organization_id=None, portal_id=None) -> None:
+        """Remove a organização (e os portais que apontam para ela) e/ou um portal"""
+        with self._lock:
+            if portal_id is not None:
+                self._entries.pop(('portal', str(portal_id)), None)
+
+            if organization_id is not None:
+                organization_id = str(organization_id)
+                self._entries.pop(('org', organization_id), None)
+                for key in [
+                    k for k, (_, value) in self._entries.items()
+                    if k[0] == 'portal' and value == organization_id
+                ]:
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def _set(self, key, value) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_cache: Optional[OrganizationCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_organization_cache() -> OrganizationCache:
+    """Retorna singleton do cache de organizações"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OrganizationCache()
+    return _cache
+
+
+def invalidate_organization(organization_id=None, portal_id=None) -> None:
+    """Atalho para invalidar o cache após mudanças de plano/conexão"""
+    get_organization_cache().invalidate(organization_id=organization_id, portal_id=portal_id)
@@ -0,0 +1,185 @@
+"""
+Tabela de rotas de webhooks de trigger, em memória por processo.
+
+Cada chamada a /api/v1/webhooks/<workflow_id>/<webhook_token> buscava o
+trigger node pelo token e depois o Workflow. Aqui fica, por
+WEBHOOK_ROUTE_CACHE_TTL segundos:
+
+- webhook_token -> WebhookRoute (workflow, status, config do trigger e o
+  field_mapping/records_path já compilados, ver webhook_mapping.py)
+- trigger_node_id -> webhook_token (usado pelo drainer da fila)
+
+Tokens inexistentes também ficam em cache (None). Salvar o trigger node,
+regenerar o token e ativar/pausar/excluir o workflow chamam
+invalidate_webhook_routes(); em outros processos a entrada vence pelo TTL.
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+WEBHOOK_ROUTE_CACHE_TTL = float(os.getenv('WEBHOOK_ROUTE_CACHE_TTL', '60'))
+WEBHOOK_ROUTE_CACHE_MAX_ENTRIES = int(os.getenv('WEBHOOK_ROUTE_CACHE_MAX_ENTRIES', '10000'))
+
+# Tipos de node aceitos como trigger de webhook (webhook ou trigger legado)
+WEBHOOK_TRIGGER_TYPES = ('webhook', 'trigger')
+
+
+@dataclass(frozen=True)
+class WebhookRoute:
+    """Destino de um webhook_token (sem objetos do ORM)"""
+    token: str
+    workflow_id: str
+    trigger_node_id: str
+    workflow_status: str
+    source_object_type: str
+    config: Dict[str, Any]
+    mapping: Any  # CompiledMapping
+    records: Optional[Callable[[Any], List[Any]]]  # records_path compilado (webhook em lote)
+    mapping_error: Optional[str] = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.workflow_status == 'active'
+
+    @classmethod
+    def from_models(cls, node, workflow) -> 'WebhookRoute':
+        from app.services.webhook_mapping import (
+            CompiledMapping, compile_field_mapping, compile_records_path
+        )
+
+        config = dict(node.config or {})
+        mapping_error = None
+        try:
+            mapping = compile_field_mapping(config.get('field_mapping', {}))
+            records = compile_records_path(config['records_path']) if config.get('records_path') else None
+        except ValueError as e:
+            # Config salva antes da validação; o webhook responde com o erro
+            mapping, records, mapping_error = CompiledMapping(()), None, str(e)
+
+        return cls(
+            token=node.webhook_token,
+            workflow_id=str(workflow.id),
+            trigger_node_id=str(node.id),
+            workflow_status=workflow.status,
+            source_object_type=config.get('source_object_type', 'webhook'),
+            config=config,
+            mapping=mapping,
+            records=records,
+            mapping_error=mapping_error
+        )
+
+
+class WebhookRouteCache:
+    """Cache TTL + LRU de rotas de webhook por token e por trigger node"""
+
+    def __init__(self, ttl: float = WEBHOOK_ROUTE_CACHE_TTL, max_entries: int = WEBHOOK_ROUTE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[float, Optional[WebhookRoute]]]' = OrderedDict()
+        self._tokens_by_node: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[WebhookRoute]:
+        """Rota do token (None se o token não existir)"""
+        found, route = self._get(token)
+        if found:
+            return route
+
+        from app.models import Workflow, WorkflowNode
+        row = Workflow.query.join(
+            WorkflowNode, WorkflowNode.workflow_id == Workflow.id
+        ).filter(
+            WorkflowNode.webhook_token == token,
+            WorkflowNode.node_type.in_(WEBHOOK_TRIGGER_TYPES)
+        ).with_entities(WorkflowNode, Workflow).first()
+
+        route = WebhookRoute.from_models(*row) if row else None
+        self._set(token, route)
+        return route
+
+    def get_by_node(self, trigger_node_id) -> Optional[WebhookRoute]:
+        """Rota do trigger node (None se não for trigger de webhook)"""
+        with self._lock:
+            token = self._tokens_by_node.get(str(trigger_node_id))
+        if token is not None:
+            found, route = self._get(token)
+            if found and route is not None:
+                return route
+
+        from app.models import WorkflowNode
+        node = WorkflowNode.query.filter(
+            WorkflowNode.id == trigger_node_id,
+            WorkflowNode.node_type.in_(WEBHOOK_TRIGGER_TYPES)
+        ).first()
+        if node is None or not node.webhook_token:
+            return None
+        return self.get(node.webhook_token)
+
+    def invalidate(self, workflow_id=None, token=None) -> None:
+        """Remove o token e/ou todas as rotas do workflow"""
+        with self._lock:
+            if token is not None:
+                self._pop(token)
+            if workflow_id is not None:
+                workflow_id = str(workflow_id)
+                for key in [
+                    k for k, (_, route) in self._entries.items()
+                    if route is not None and route.workflow_id == workflow_id
+                ]:
+                    self._pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_node.clear()
+
+    def _get(self, token: str) -> Tuple[bool, Optional[WebhookRoute]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return False, None
+            expires_at, route = entry
+            if expires_at <= now:
+                self._pop(token)
+                return False, None
+            self._entries.move_to_end(token)
+            return True, route
+
+    def _set(self, token: str, route: Optional[WebhookRoute]) -> None:
+        with self._lock:
+            self._entries[token] = (time.monotonic() + self.ttl, route)
+            self._entries.move_to_end(token)
+            if route is not None:
+                self._tokens_by_node[route.trigger_node_id] = token
+            while len(self._entries) > self.max_entries:
+                oldest, _ = next(iter(self._entries.items()))
+                self._pop(oldest)
+
+    def _pop(self, token: str) -> None:
+        """Remove o token dos dois índices (chamar com o lock)"""
+        _, route = self._entries.pop(token, (None, None))
+        if route is not None and self._tokens_by_node.get(route.trigger_node_id) == token:
+            del self._tokens_by_node[route.trigger_node_id]
+
+
+_cache: Optional[WebhookRouteCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_webhook_routes() -> WebhookRouteCache:
+    """Retorna singleton da tabela de rotas de webhook"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = WebhookRouteCache()
+    return _cache
+
+
+def invalidate_webhook_routes(workflow_id=None, token=None) -> None:
+    """Atalho para invalidar rotas após mudanças no workflow ou no trigger"""
+    get_webhook_routes().invalidate(workflow_id=workflow_id, token=token)
@@ -0,0 +1,44 @@
+"""Add AI response cache
+
+Revision ID: q8r9s0t1u2v3
+Revises: p7q8r9s0t1u2
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'q8r9s0t1u2v3'
+down_revision = 'p7q8r9s0t1u2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Opt-in de cache por mapeamento de IA
+    op.add_column('ai_generation_mappings',
+        sa.Column('cache_enabled', sa.Boolean(), server_default=sa.false(), nullable=False)
+    )
+    op.add_column('ai_generation_mappings',
+        sa.Column('cache_ttl_seconds', sa.Integer(), nullable=True)
+    )
+    
+    # Tabela do backend 'database'
+    op.create_table(
+        'ai_response_cache',
+        sa.Column('cache_key', sa.String(64), primary_key=True),
+        sa.Column('response', postgresql.JSONB(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('idx_ai_response_cache_expires', 'ai_response_cache', ['expires_at'])
+
+
+def downgrade():
+    op.drop_index('idx_ai_response_cache_expires', table_name='ai_response_cache')
+    op.drop_table('ai_response_cache')
+    op.drop_column('ai_generation_mappings', 'cache_ttl_seconds')
+    op.drop_column('ai_generation_mappings', 'cache_enabled')
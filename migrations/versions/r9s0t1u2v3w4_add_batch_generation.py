@@ -0,0 +1,69 @@
+"""Add batch generation jobs
+
+Revision ID: r9s0t1u2v3w4
+Revises: q8r9s0t1u2v3
+Create Date: 2026-10-16 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'r9s0t1u2v3w4'
+down_revision = 'q8r9s0t1u2v3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'batch_generation_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('organization_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('organizations.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('workflow_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('workflows.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_by', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('users.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('status', sa.String(50), server_default='pending'),
+        sa.Column('source_object_type', sa.String(100)),
+        sa.Column('source', postgresql.JSONB()),
+        sa.Column('concurrency', sa.Integer(), server_default='5'),
+        sa.Column('total_items', sa.Integer(), server_default='0'),
+        sa.Column('completed_items', sa.Integer(), server_default='0'),
+        sa.Column('failed_items', sa.Integer(), server_default='0'),
+        sa.Column('temporal_workflow_id', sa.String(255), nullable=True),
+        sa.Column('runs', sa.Integer(), server_default='0'),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('completed_at', sa.DateTime()),
+    )
+    op.create_index('idx_batch_jobs_org_created', 'batch_generation_jobs', ['organization_id', 'created_at'])
+    
+    op.create_table(
+        'batch_generation_items',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('job_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('batch_generation_jobs.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('source_object_id', sa.String(255), nullable=False),
+        sa.Column('status', sa.String(50), server_default='pending'),
+        sa.Column('execution_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('workflow_executions.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('generated_document_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('generated_documents.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('attempts', sa.Integer(), server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('idx_batch_items_job_status', 'batch_generation_items', ['job_id', 'status', 'position'])
+
+
+def downgrade():
+    op.drop_index('idx_batch_items_job_status', table_name='batch_generation_items')
+    op.drop_table('batch_generation_items')
+    op.drop_index('idx_batch_jobs_org_created', table_name='batch_generation_jobs')
+    op.drop_table('batch_generation_jobs')
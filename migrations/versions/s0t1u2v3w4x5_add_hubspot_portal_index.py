@@ -0,0 +1,31 @@
+"""Index HubSpot connections by portal_id
+
+Revision ID: s0t1u2v3w4x5
+Revises: r9s0t1u2v3w4
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 's0t1u2v3w4x5'
+down_revision = 'r9s0t1u2v3w4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # portal_id -> organização (get_organization_id_from_portal_id / require_org)
+    # A expressão precisa ser igual à da consulta
+    op.create_index(
+        'idx_connections_hubspot_portal',
+        'data_source_connections',
+        [sa.text("(config->>'portal_id')")],
+        postgresql_where=sa.text("source_type = 'hubspot'")
+    )
+
+
+def downgrade():
+    op.drop_index('idx_connections_hubspot_portal', table_name='data_source_connections')
@@ -0,0 +1,85 @@
+"""Move execution logs to an append-only table
+
+Revision ID: t1u2v3w4x5y6
+Revises: s0t1u2v3w4x5
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 't1u2v3w4x5y6'
+down_revision = 's0t1u2v3w4x5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'workflow_execution_logs',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column('execution_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('workflow_executions.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('node_id', sa.String(255)),
+        sa.Column('node_type', sa.String(50)),
+        sa.Column('status', sa.String(50)),
+        sa.Column('started_at', sa.DateTime()),
+        sa.Column('completed_at', sa.DateTime()),
+        sa.Column('duration_ms', sa.Integer()),
+        sa.Column('output', postgresql.JSONB()),
+        sa.Column('error', sa.Text()),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index(
+        'idx_execution_logs_execution_created',
+        'workflow_execution_logs',
+        ['execution_id', 'created_at']
+    )
+
+    op.add_column(
+        'workflow_executions',
+        sa.Column('steps_completed', sa.Integer(), server_default='0', nullable=True)
+    )
+
+    # Copiar os logs existentes (na ordem do array) e preencher o contador
+    op.execute("""
+        INSERT INTO workflow_execution_logs
+            (execution_id, node_id, node_type, status, started_at, completed_at,
+             duration_ms, output, error, created_at)
+        SELECT e.id,
+               log.entry->>'node_id',
+               log.entry->>'node_type',
+               log.entry->>'status',
+               (log.entry->>'started_at')::timestamp,
+               (log.entry->>'completed_at')::timestamp,
+               (log.entry->>'duration_ms')::integer,
+               log.entry->'output',
+               log.entry->>'error',
+               COALESCE((log.entry->>'completed_at')::timestamp,
+                        (log.entry->>'started_at')::timestamp,
+                        e.created_at)
+        FROM workflow_executions e
+        CROSS JOIN LATERAL jsonb_array_elements(e.execution_logs) WITH ORDINALITY AS log(entry, position)
+        WHERE jsonb_typeof(e.execution_logs) = 'array'
+        ORDER BY e.id, log.position
+    """)
+    op.execute("""
+        UPDATE workflow_executions e
+        SET steps_completed = counts.total
+        FROM (
+            SELECT execution_id, COUNT(*) AS total
+            FROM workflow_execution_logs
+            WHERE status IN ('success', 'failed')
+            GROUP BY execution_id
+        ) counts
+        WHERE counts.execution_id = e.id
+    """)
+
+
+def downgrade():
+    op.drop_column('workflow_executions', 'steps_completed')
+    op.drop_index('idx_execution_logs_execution_created', table_name='workflow_execution_logs')
+    op.drop_table('workflow_execution_logs')
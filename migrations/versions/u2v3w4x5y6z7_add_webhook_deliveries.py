@@ -0,0 +1,48 @@
+"""Add webhook delivery queue
+
+Revision ID: u2v3w4x5y6z7
+Revises: t1u2v3w4x5y6
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'u2v3w4x5y6z7'
+down_revision = 't1u2v3w4x5y6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'webhook_deliveries',
+        sa.Column('id', postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column('workflow_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('workflows.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('trigger_node_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('workflow_nodes.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('dedup_key', sa.String(255), nullable=False),
+        sa.Column('payload', postgresql.JSONB()),
+        sa.Column('status', sa.String(50), server_default='pending'),
+        sa.Column('execution_id', postgresql.UUID(as_uuid=True),
+                  sa.ForeignKey('workflow_executions.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0'),
+        sa.Column('error_message', sa.Text()),
+        sa.Column('received_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now()),
+        sa.UniqueConstraint('workflow_id', 'dedup_key', name='unique_webhook_delivery_dedup'),
+    )
+    op.create_index(
+        'idx_webhook_deliveries_status_received',
+        'webhook_deliveries',
+        ['status', 'received_at']
+    )
+
+
+def downgrade():
+    op.drop_index('idx_webhook_deliveries_status_received', table_name='webhook_deliveries')
+    op.drop_table('webhook_deliveries')
@@ -0,0 +1,45 @@
+"""Unique index on workflow_nodes.webhook_token
+
+Revision ID: v3w4x5y6z7a8
+Revises: u2v3w4x5y6z7
+Create Date: 2026-10-16 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'v3w4x5y6z7a8'
+down_revision = 'u2v3w4x5y6z7'
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = 'idx_workflow_nodes_webhook_token'
+
+
+def upgrade():
+    # idx_workflow_node_webhook_token foi removido em 648d6d69e67d; a
+    # constraint UNIQUE da coluna pode não existir em bancos antigos
+    inspector = sa.inspect(op.get_bind())
+    covered = any(
+        c['column_names'] == ['webhook_token']
+        for c in inspector.get_unique_constraints('workflow_nodes')
+    ) or any(
+        i['column_names'] == ['webhook_token'] and i.get('unique')
+        for i in inspector.get_indexes('workflow_nodes')
+    )
+    if covered:
+        return
+
+    op.create_index(
+        INDEX_NAME,
+        'workflow_nodes',
+        ['webhook_token'],
+        unique=True,
+        postgresql_where=sa.text('webhook_token IS NOT NULL')
+    )
+
+
+def downgrade():
+    op.drop_index(INDEX_NAME, table_name='workflow_nodes', if_exists=True)
@@ -0,0 +1,31 @@
+"""Add claim-check table for Temporal payloads
+
+Revision ID: w4x5y6z7a8b9
+Revises: v3w4x5y6z7a8
+Create Date: 2026-10-16 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'w4x5y6z7a8b9'
+down_revision = 'v3w4x5y6z7a8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'temporal_payloads',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('data', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.func.now()),
+    )
+    op.create_index('idx_temporal_payloads_created', 'temporal_payloads', ['created_at'])
+
+
+def downgrade():
+    op.drop_index('idx_temporal_payloads_created', table_name='temporal_payloads')
+    op.drop_table('temporal_payloads')
@@ -0,0 +1,24 @@
+"""Add heartbeat to batch generation jobs
+
+Revision ID: x5y6z7a8b9c0
+Revises: w4x5y6z7a8b9
+Create Date: 2026-10-16 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'x5y6z7a8b9c0'
+down_revision = 'w4x5y6z7a8b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('batch_generation_jobs', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('batch_generation_jobs', 'heartbeat_at')
@@ -0,0 +1 @@
+# Models tests package
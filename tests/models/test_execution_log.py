@@ -0,0 +1,91 @@
+"""
+Testes para os logs de execução (app/models/execution.py)
+"""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.database import db
+from app.models import WorkflowExecution, WorkflowExecutionLog
+from app.routes.workflows import _run_steps_completed
+
+
+class TestAddLog:
+    """Testes para WorkflowExecution.add_log()"""
+
+    def test_inserts_single_log_row(self):
+        execution = WorkflowExecution(id=uuid.uuid4(), steps_completed=0)
+        session = MagicMock()
+
+        with patch.object(db, 'session', session):
+            execution.add_log(
+                node_id='node-1',
+                node_type='google-docs',
+                status='success',
+                started_at=datetime(2026, 1, 1, 12, 0, 0),
+                completed_at=datetime(2026, 1, 1, 12, 0, 2)
+            )
+
+        log = session.add.call_args.args[0]
+        assert isinstance(log, WorkflowExecutionLog)
+        assert log.execution_id == execution.id
+        assert log.duration_ms == 2000
+        assert execution.steps_completed == 1
+        session.commit.assert_not_called()
+
+    def test_only_finished_nodes_count_as_steps(self):
+        execution = WorkflowExecution(id=uuid.uuid4(), steps_completed=0)
+
+        with patch.object(db, 'session', MagicMock()):
+            execution.add_log(node_id='node-1', node_type='review-documents', status='paused')
+            execution.add_log(node_id='node-1', node_type='review-documents', status='failed', error='x')
+
+        assert execution.steps_completed == 1
+
+    def test_to_dict_keeps_legacy_format(self):
+        log = WorkflowExecutionLog(
+            node_id='node-1', node_type='webhook', status='success',
+            started_at=datetime(2026, 1, 1), output={'ok': True}
+        )
+
+        assert log.to_dict() == {
+            'node_id': 'node-1',
+            'node_type': 'webhook',
+            'status': 'success',
+            'started_at': '2026-01-01T00:00:00',
+            'completed_at': None,
+            'duration_ms': None,
+            'output': {'ok': True},
+            'error': None
+        }
+
+
+class TestRunStepsCompleted:
+    """Testes para o cálculo de steps das views de runs"""
+
+    def _node(self, position, node_type='google-docs'):
+        return SimpleNamespace(
+            id=f'node-{position}',
+            position=position,
+            is_trigger=lambda: node_type == 'trigger'
+        )
+
+    def _nodes(self):
+        return [self._node(1, 'trigger'), self._node(2), self._node(3), self._node(4)]
+
+    def test_completed_counts_all_steps(self):
+        execution = SimpleNamespace(status='completed', current_node_id=None, steps_completed=1)
+
+        assert _run_steps_completed(execution, self._nodes(), 3) == 3
+
+    def test_running_uses_current_node_position(self):
+        execution = SimpleNamespace(status='running', current_node_id='node-3', steps_completed=0)
+
+        assert _run_steps_completed(execution, self._nodes(), 3) == 1
+
+    def test_failed_uses_counter(self):
+        execution = SimpleNamespace(status='failed', current_node_id='node-3', steps_completed=2)
+
+        assert _run_steps_completed(execution, self._nodes(), 3) == 2
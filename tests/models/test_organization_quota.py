@@ -0,0 +1,82 @@
+"""
+Testes para a reserva de quota de documentos (app/models/organization.py)
+"""
+
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+
+from app.database import db
+from app.models import Organization
+
+
+def _sql(statement):
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestReserveDocuments:
+    """Testes para Organization.reserve_documents()"""
+
+    def test_single_conditional_update(self):
+        session = MagicMock()
+        session.execute.return_value.first.return_value = (5,)
+
+        with patch.object(db, 'session', session):
+            assert Organization.reserve_documents('org-1', 3) is True
+
+        sql = _sql(session.execute.call_args.args[0])
+        assert sql.startswith('UPDATE organizations SET documents_used=(coalesce(organizations.documents_used')
+        assert 'organizations.documents_limit IS NULL OR' in sql
+        assert '<= organizations.documents_limit' in sql
+        assert 'RETURNING organizations.documents_used' in sql
+        session.commit.assert_not_called()
+
+    def test_quota_exhausted(self):
+        session = MagicMock()
+        session.execute.return_value.first.return_value = None
+
+        with patch.object(db, 'session', session):
+            assert Organization.reserve_documents('org-1') is False
+
+    def test_release_never_goes_negative(self):
+        session = MagicMock()
+
+        with patch.object(db, 'session', session):
+            Organization.release_documents('org-1', 2)
+
+        assert 'greatest(' in _sql(session.execute.call_args.args[0])
+        session.commit.assert_not_called()
+
+
+class TestReserveDocumentsUpTo:
+    """Testes para Organization.reserve_documents_up_to()"""
+
+    def _reserve(self, rows, reserve_results, count):
+        session = MagicMock()
+        session.query.return_value.filter.return_value.first.side_effect = rows
+        with patch.object(db, 'session', session), \
+                patch.object(Organization, 'reserve_documents', side_effect=reserve_results) as reserve:
+            return Organization.reserve_documents_up_to('org-1', count), reserve
+
+    def test_reserves_what_fits(self):
+        granted, reserve = self._reserve([(8, 10)], [True], 5)
+
+        assert granted == 2
+        reserve.assert_called_once_with('org-1', 2)
+
+    def test_unlimited_plan(self):
+        granted, _ = self._reserve([(8, None)], [True], 50)
+
+        assert granted == 50
+
+    def test_retries_after_concurrent_reservation(self):
+        granted, reserve = self._reserve([(5, 10), (9, 10)], [False, True], 5)
+
+        assert granted == 1
+        assert [c.args[1] for c in reserve.call_args_list] == [5, 1]
+
+    def test_exhausted(self):
+        granted, reserve = self._reserve([(10, 10)], [], 5)
+
+        assert granted == 0
+        reserve.assert_not_called()
@@ -0,0 +1,55 @@
+"""
+Testes para app/services/ai/rate_limiter.py
+"""
+
+import asyncio
+import time
+
+from app.services.ai.rate_limiter import (
+    TokenBucket,
+    get_rate_limiter,
+    get_requests_per_minute,
+)
+
+
+class TestTokenBucket:
+    """Testes para TokenBucket"""
+
+    def test_burst_within_capacity_does_not_wait(self):
+        bucket = TokenBucket(rate=1, capacity=3)
+        assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+
+    def test_waits_when_empty(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+        bucket.acquire()
+        start = time.monotonic()
+        waited = bucket.acquire()
+        assert waited > 0
+        assert time.monotonic() - start >= waited * 0.9
+
+    def test_acquire_async(self):
+        bucket = TokenBucket(rate=50, capacity=1)
+
+        async def scenario():
+            return [await bucket.acquire_async() for _ in range(3)]
+
+        waits = asyncio.run(scenario())
+        assert waits[0] == 0.0
+        assert waits[1] > 0 and waits[2] > 0
+
+
+class TestGetRateLimiter:
+    """Testes para get_rate_limiter()"""
+
+    def test_same_key_returns_same_bucket(self):
+        assert get_rate_limiter('openai', 'sk-1') is get_rate_limiter('OpenAI', 'sk-1')
+
+    def test_different_keys_have_separate_buckets(self):
+        assert get_rate_limiter('openai', 'sk-1') is not get_rate_limiter('openai', 'sk-2')
+
+    def test_env_override(self, monkeypatch):
+        monkeypatch.setenv('AI_RATE_LIMIT_RPM_GEMINI', '12')
+        assert get_requests_per_minute('gemini') == 12
+
+    def test_unknown_provider_uses_fallback(self):
+        assert get_requests_per_minute('mistral') == 60
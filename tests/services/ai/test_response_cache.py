@@ -0,0 +1,79 @@
+"""
+Testes para o cache de respostas de LLM
+"""
+
+import time
+from unittest.mock import MagicMock, PropertyMock, patch
+
+import pytest
+
+from app.database import db
+from app.services.ai.response_cache import (
+    AIResponseCacheBackend, build_cache_key, DatabaseCacheBackend, MemoryCacheBackend
+)
+
+
+class TestBuildCacheKey:
+    """Testes para build_cache_key()"""
+
+    def test_same_request_same_key(self):
+        key1 = build_cache_key('openai', 'gpt-4', 0.7, 1000, 'Olá')
+        key2 = build_cache_key('OpenAI', 'gpt-4', 0.7, 1000, 'Olá')
+        assert key1 == key2
+        assert len(key1) == 64
+
+    def test_any_parameter_changes_key(self):
+        base = build_cache_key('openai', 'gpt-4', 0.7, 1000, 'Olá')
+        assert build_cache_key('gemini', 'gpt-4', 0.7, 1000, 'Olá') != base
+        assert build_cache_key('openai', 'gpt-4o', 0.7, 1000, 'Olá') != base
+        assert build_cache_key('openai', 'gpt-4', 0.2, 1000, 'Olá') != base
+        assert build_cache_key('openai', 'gpt-4', 0.7, 500, 'Olá') != base
+        assert build_cache_key('openai', 'gpt-4', 0.7, 1000, 'Oi') != base
+
+
+class TestMemoryCacheBackend:
+    """Testes para MemoryCacheBackend"""
+
+    def test_get_and_set(self):
+        cache = MemoryCacheBackend()
+        cache.set('k', {'text': 'a'}, ttl_seconds=60)
+        assert cache.get('k') == {'text': 'a'}
+        assert cache.get('outra') is None
+
+    def test_expired_entry_is_miss(self):
+        cache = MemoryCacheBackend()
+        cache.set('k', {'text': 'a'}, ttl_seconds=0)
+        time.sleep(0.01)
+        assert cache.get('k') is None
+
+    def test_evicts_least_recently_used(self):
+        cache = MemoryCacheBackend(max_entries=2)
+        cache.set('a', {'v': 1}, 60)
+        cache.set('b', {'v': 2}, 60)
+        cache.get('a')
+        cache.set('c', {'v': 3}, 60)
+
+        assert cache.get('a') == {'v': 1}
+        assert cache.get('b') is None
+        assert cache.get('c') == {'v': 3}
+
+
+class TestDatabaseCacheBackend:
+    """Testes para DatabaseCacheBackend"""
+
+    def test_set_uses_own_transaction(self):
+        engine = MagicMock()
+        session = MagicMock()
+
+        with patch.object(type(db), 'engine', new_callable=PropertyMock, return_value=engine), \
+                patch.object(db, 'session', session):
+            DatabaseCacheBackend().set('k', {'text': 'a'}, 60)
+
+        engine.begin.return_value.__enter__.return_value.execute.assert_called_once()
+        session.execute.assert_not_called()
+        session.commit.assert_not_called()
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        AIResponseCacheBackend()
@@ -0,0 +1 @@
+# Data sources tests package
@@ -0,0 +1,170 @@
+"""
+Testes para as buscas em lote de app/services/data_sources/hubspot.py
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.data_sources.hubspot import HubSpotDataSource
+from app.services.data_sources.hubspot_client import HubSpotClient
+
+
+def _source():
+    connection = MagicMock()
+    connection.credentials = {'access_token': 'token'}
+    connection.config = {'portal_id': '123'}
+    return HubSpotDataSource(connection)
+
+
+def _response(payload, ok=True):
+    response = MagicMock()
+    response.ok = ok
+    response.json.return_value = payload
+    response.raise_for_status.return_value = None
+    return response
+
+
+class TestGetObjectsBatch:
+    """Testes para get_objects_batch()"""
+
+    def test_reads_objects_in_chunks_of_100(self):
+        ids = [str(i) for i in range(250)]
+        calls = []
+
+        def post(url, headers=None, json=None, timeout=None):
+            calls.append((url, json))
+            if '/batch/read' in url and '/v3/' in url:
+                return _response({'results': [
+                    {'id': i['id'], 'properties': {'name': f"obj {i['id']}"}} for i in json['inputs']
+                ]})
+            return _response({'results': []})
+
+        with patch.object(HubSpotClient, 'post', side_effect=post):
+            objects = _source().get_objects_batch('ticket', ids)
+
+        object_calls = [c for c in calls if '/crm/v3/objects/tickets/batch/read' in c[0]]
+        assert [len(c[1]['inputs']) for c in object_calls] == [100, 100, 50]
+        assert len(objects) == 250
+        assert objects['7']['properties'] == {'name': 'obj 7'}
+
+    def test_merges_batch_associations(self):
+        def post(url, headers=None, json=None, timeout=None):
+            if '/crm/v3/objects/deals/batch/read' in url:
+                return _response({'results': [{'id': '1', 'properties': {}}, {'id': '2', 'properties': {}}]})
+            if '/crm/v4/associations/deal/company/batch/read' in url:
+                return _response({'results': [
+                    {'from': {'id': '1'}, 'to': [{'toObjectId': 10}, {'toObjectId': 11}]}
+                ]})
+            return _response({'results': []})
+
+        with patch.object(HubSpotClient, 'post', side_effect=post):
+            objects = _source().get_objects_batch('deals', ['1', '2'])
+
+        assert objects['1']['associations'] == {'companies': [10, 11]}
+        assert objects['2']['associations'] == {}
+
+    def test_missing_objects_are_omitted(self):
+        with patch.object(
+            HubSpotClient, 'post',
+            return_value=_response({'results': [{'id': '1', 'properties': {}}]})
+        ):
+            objects = _source().get_objects_batch('ticket', ['1', '2'])
+
+        assert list(objects) == ['1']
+
+    def test_unsupported_object_type(self):
+        with pytest.raises(Exception, match='não suportado'):
+            _source().get_objects_batch('invoice', ['1'])
+
+
+class TestHydrateAssociations:
+    """Testes para a hidratação de objetos associados"""
+
+    def test_get_object_data_hydrates_with_one_call_per_type(self):
+        deal = {
+            'id': '1',
+            'properties': {'dealname': 'Contrato'},
+            'associations': {
+                'contacts': {'results': [
+                    {'id': '10', 'type': 'deal_to_contact'},
+                    {'id': '10', 'type': 'deal_to_contact_primary'},
+                    {'id': '11', 'type': 'deal_to_contact'},
+                ]},
+                'companies': {'results': [{'id': '20', 'type': 'deal_to_company'}]},
+                'line items': {'results': [{'id': str(100 + i)} for i in range(40)]},
+            }
+        }
+        calls = []
+
+        def post(url, headers=None, json=None, timeout=None):
+            calls.append(url)
+            object_path = url.split('/crm/v3/objects/')[1].split('/')[0]
+            return _response({'results': [
+                {'id': i['id'], 'properties': {'name': f"{object_path} {i['id']}"}} for i in json['inputs']
+            ]})
+
+        with patch.object(HubSpotClient, 'get', return_value=_response(deal)), \
+                patch.object(HubSpotClient, 'post', side_effect=post):
+            data = _source().get_object_data('deal', '1')
+
+        assert len(calls) == 3
+        assert data['associations']['contacts'] == ['10', '11']
+        assert data['company'] == {'id': '20', 'name': 'companies 20'}
+        assert [c['id'] for c in data['contacts']] == ['10', '11']
+        assert data['contact']['name'] == 'contacts 10'
+        assert len(data['line_items']) == 40
+
+    def test_shares_reads_across_objects(self):
+        objects = [
+            {'id': '1', 'associations': {'companies': [20]}},
+            {'id': '2', 'associations': {'companies': [20, 21]}},
+        ]
+        post = MagicMock(return_value=_response({'results': [
+            {'id': '20', 'properties': {'name': 'A'}},
+            {'id': '21', 'properties': {'name': 'B'}},
+        ]}))
+
+        with patch.object(HubSpotClient, 'post', post):
+            _source().hydrate_associations(objects, {})
+
+        assert post.call_count == 1
+        assert post.call_args.kwargs['json']['inputs'] == [{'id': '20'}, {'id': '21'}]
+        assert objects[0]['company'] == {'id': '20', 'name': 'A'}
+        assert [c['name'] for c in objects[1]['companies']] == ['A', 'B']
+
+    def test_failed_type_is_left_unhydrated(self):
+        import requests
+
+        objects = [{'id': '1', 'associations': {'companies': ['20']}}]
+        response = _response({})
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError('500')
+
+        with patch.object(HubSpotClient, 'post', return_value=response):
+            _source().hydrate_associations(objects, {})
+
+        assert 'company' not in objects[0]
+        assert objects[0]['associations'] == {'companies': ['20']}
+
+
+class TestListMemberIds:
+    """Testes para list_member_ids()"""
+
+    def test_follows_pagination(self):
+        pages = [
+            _response({'results': [{'recordId': '1'}, {'recordId': '2'}], 'paging': {'next': {'after': 'x'}}}),
+            _response({'results': [{'recordId': '3'}]}),
+        ]
+        with patch.object(HubSpotClient, 'get', side_effect=pages) as get:
+            ids = _source().list_member_ids('42')
+
+        assert ids == ['1', '2', '3']
+        assert get.call_args_list[1].kwargs['params']['after'] == 'x'
+
+    def test_stops_at_max_results(self):
+        page = _response({'results': [{'recordId': str(i)} for i in range(5)], 'paging': {'next': {'after': 'x'}}})
+        with patch.object(HubSpotClient, 'get', return_value=page) as get:
+            ids = _source().list_member_ids('42', max_results=3)
+
+        assert ids == ['0', '1', '2']
+        assert get.call_count == 1
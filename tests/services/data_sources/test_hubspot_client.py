@@ -0,0 +1,127 @@
+"""
+Testes para app/services/data_sources/hubspot_client.py
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+import requests
+
+from app.services.data_sources import hubspot_client
+from app.services.data_sources.hubspot_client import HubSpotClient, _TokenBucket, get_hubspot_client
+
+
+class FakeClock:
+    """Substitui time.monotonic/time.sleep: sleep avança o relógio"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    fake = FakeClock()
+    with patch.object(hubspot_client, 'time', fake):
+        yield fake
+
+
+def _response(status=200, headers=None):
+    response = MagicMock()
+    response.status_code = status
+    response.headers = headers or {}
+    return response
+
+
+class TestTokenBucket:
+    """Testes para _TokenBucket"""
+
+    def test_waits_when_empty(self, clock):
+        bucket = _TokenBucket(capacity=2, interval=1)
+
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == 0
+        assert bucket.acquire() == pytest.approx(0.5)
+
+    def test_update_resizes_and_syncs_remaining(self, clock):
+        bucket = _TokenBucket(capacity=100, interval=10)
+
+        bucket.update(capacity=190, interval=10, remaining=3)
+
+        assert bucket.capacity == 190
+        assert bucket.tokens == 3
+
+
+class TestHubSpotClient:
+    """Testes para HubSpotClient"""
+
+    def test_retries_429_honouring_retry_after(self, clock):
+        client = HubSpotClient(portal_id='1')
+        responses = [_response(429, {'Retry-After': '2'}), _response(200)]
+
+        with patch.object(client.session, 'request', side_effect=responses) as request:
+            response = client.post('https://api.hubapi.com/x', json={})
+
+        assert response.status_code == 200
+        assert request.call_count == 2
+        assert sum(clock.sleeps) >= 2
+        metrics = client.metrics()
+        assert metrics['throttled'] == 1
+        assert metrics['retries'] == 1
+        assert metrics['requests'] == 2
+
+    def test_returns_last_response_after_max_retries(self, clock):
+        client = HubSpotClient(portal_id='1', max_retries=2)
+
+        with patch.object(client.session, 'request', return_value=_response(429)) as request:
+            response = client.get('https://api.hubapi.com/x')
+
+        assert response.status_code == 429
+        assert request.call_count == 3
+
+    def test_server_errors_retried_only_for_get(self, clock):
+        client = HubSpotClient(portal_id='1')
+
+        with patch.object(client.session, 'request', return_value=_response(503)) as request:
+            client.post('https://api.hubapi.com/x')
+        assert request.call_count == 1
+
+        with patch.object(client.session, 'request', side_effect=[_response(503), _response(200)]) as request:
+            assert client.get('https://api.hubapi.com/x').status_code == 200
+        assert request.call_count == 2
+
+    def test_applies_default_timeout_and_rate_limit_headers(self, clock):
+        client = HubSpotClient(portal_id='1', timeout=12)
+        headers = {
+            'X-HubSpot-RateLimit-Max': '190',
+            'X-HubSpot-RateLimit-Interval-Milliseconds': '10000',
+            'X-HubSpot-RateLimit-Remaining': '150',
+        }
+
+        with patch.object(client.session, 'request', return_value=_response(200, headers)) as request:
+            client.get('https://api.hubapi.com/x')
+
+        assert request.call_args.kwargs['timeout'] == 12
+        assert client._bucket.capacity == 190
+        assert client.metrics()['rate_limit_remaining'] == 150
+
+    def test_network_errors_propagate(self, clock):
+        client = HubSpotClient(portal_id='1')
+
+        with patch.object(client.session, 'request', side_effect=requests.exceptions.ConnectTimeout()):
+            with pytest.raises(requests.exceptions.RequestException):
+                client.get('https://api.hubapi.com/x')
+
+        assert client.metrics()['errors'] == 1
+
+
+def test_one_client_per_portal():
+    assert get_hubspot_client('123') is get_hubspot_client(123)
+    assert get_hubspot_client('123') is not get_hubspot_client('456')
@@ -0,0 +1,143 @@
+"""
+Testes para app/services/data_sources/hubspot_property_store.py
+"""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from flask import Flask
+from sqlalchemy.dialects import postgresql
+
+from app.services.data_sources.hubspot_property_store import (
+    HubSpotPropertyStore, PropertySnapshot, _rows, upsert_statement
+)
+
+
+def _snapshot(age=timedelta(0), names=('dealname',)):
+    return PropertySnapshot(
+        properties=[{'name': name} for name in names],
+        cached_at=datetime.utcnow() - age,
+        loaded_at=time.monotonic()
+    )
+
+
+@pytest.fixture
+def app():
+    return Flask('test')
+
+
+class TestHubSpotPropertyStore:
+    """Testes para HubSpotPropertyStore"""
+
+    def test_fresh_cache_is_memoized(self):
+        store = HubSpotPropertyStore()
+
+        with patch.object(store, '_load', return_value=_snapshot()) as load, \
+                patch.object(store, 'refresh') as refresh:
+            first, stale = store.get('org-1', 'deal')
+            second, _ = store.get('org-1', 'deal')
+
+        assert stale is False
+        assert first is second
+        assert load.call_count == 1
+        refresh.assert_not_called()
+
+    def test_empty_cache_refreshes_synchronously(self):
+        store = HubSpotPropertyStore()
+        fresh = _snapshot()
+
+        with patch.object(store, '_load', return_value=None), \
+                patch.object(store, 'refresh', return_value=fresh) as refresh:
+            snapshot, stale = store.get('org-1', 'deal')
+
+        assert snapshot is fresh
+        assert stale is False
+        refresh.assert_called_once_with('org-1', 'deal')
+
+    def test_stale_cache_is_served_and_refreshed_in_background(self, app):
+        store = HubSpotPropertyStore()
+        old = _snapshot(age=timedelta(days=1))
+        refreshed = []
+
+        with patch.object(store, '_load', return_value=old), \
+                patch.object(store, 'refresh', side_effect=lambda *key: refreshed.append(key)):
+            with app.app_context():
+                snapshot, stale = store.get('org-1', 'contact')
+
+            deadline = time.time() + 2
+            while not refreshed and time.time() < deadline:
+                time.sleep(0.01)
+
+        assert snapshot is old
+        assert stale is True
+        assert refreshed == [('org-1', 'contact')]
+
+    def test_force_refresh_skips_cache(self):
+        store = HubSpotPropertyStore()
+
+        with patch.object(store, '_load') as load, \
+                patch.object(store, 'refresh', return_value=_snapshot()) as refresh:
+            store.get('org-1', 'deal', force_refresh=True)
+
+        load.assert_not_called()
+        refresh.assert_called_once()
+
+    def test_refresh_reports_snapshot_not_from_cache(self):
+        store = HubSpotPropertyStore()
+        connection = object()
+
+        with patch('app.services.data_sources.hubspot_property_store.DataSourceConnection') as connections, \
+                patch('app.services.data_sources.hubspot.HubSpotDataSource') as data_source, \
+                patch('app.services.data_sources.hubspot_property_store.db'), \
+                patch('app.services.data_sources.hubspot_property_store.upsert_statement'), \
+                patch('app.services.data_sources.hubspot_property_store.HubSpotPropertyCache'):
+            connections.query.filter_by.return_value.first.return_value = connection
+            data_source.return_value.get_object_properties.return_value = [{'name': 'dealname'}]
+            snapshot, _ = store.get('org-1', 'deal', force_refresh=True)
+            memoized, _ = store.get('org-1', 'deal')
+
+        assert snapshot.from_cache is False
+        assert memoized.from_cache is True
+        assert memoized.properties == snapshot.properties
+
+    def test_unknown_object_type_is_rejected(self):
+        store = HubSpotPropertyStore()
+
+        with patch.object(store, '_load', return_value=None):
+            with pytest.raises(ValueError):
+                store.get('org-1', 'line_item')
+
+    def test_invalidate_drops_memo(self):
+        store = HubSpotPropertyStore()
+
+        with patch.object(store, '_load', return_value=_snapshot()) as load:
+            store.get('org-1', 'deal')
+            store.invalidate('org-1')
+            store.get('org-1', 'deal')
+
+        assert load.call_count == 2
+
+
+class TestBulkUpsert:
+    """Testes para a gravação em lote"""
+
+    def test_rows_are_truncated_and_deduplicated(self):
+        rows = _rows('org-1', 'deal', [
+            {'name': 'x' * 300, 'label': 'L', 'type': 'string'},
+            {'name': 'amount', 'label': 'Valor', 'type': 'number'},
+            {'name': 'amount', 'label': 'Valor (novo)', 'type': 'number'},
+            {'name': ''},
+        ], datetime(2026, 1, 1))
+
+        assert [len(r['property_name']) for r in rows] == [255, 6]
+        assert rows[1]['label'] == 'Valor (novo)'
+
+    def test_upsert_uses_unique_constraint(self):
+        rows = _rows('org-1', 'deal', [{'name': 'amount', 'type': 'number'}], datetime(2026, 1, 1))
+
+        sql = str(upsert_statement(rows).compile(dialect=postgresql.dialect()))
+
+        assert 'ON CONFLICT ON CONSTRAINT unique_org_object_property DO UPDATE' in sql
+        assert 'cached_at = excluded.cached_at' in sql
@@ -0,0 +1,149 @@
+"""
+Testes para app/services/data_sources/property_planner.py
+"""
+
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from app.models import Template
+from app.services.data_sources.hubspot import HubSpotDataSource
+from app.services.data_sources.hubspot_client import HubSpotClient
+from app.services.data_sources.property_planner import (
+    PropertyPlanCache, collect_workflow_fields, plan_properties
+)
+
+
+def _workflow(**kwargs):
+    defaults = dict(
+        id='wf-1',
+        updated_at=datetime(2026, 1, 1),
+        source_object_type='deal',
+        template_id='tpl-1',
+        output_name_template=None,
+        field_mappings=[],
+        ai_mappings=[],
+        nodes=[],
+    )
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+def _template(tags, version=1, storage_type='uploaded'):
+    return SimpleNamespace(id='tpl-1', version=version, detected_tags=tags, storage_type=storage_type)
+
+
+class TestPlanProperties:
+    """Testes para plan_properties()"""
+
+    def test_splits_primary_and_associated_properties(self):
+        plan = plan_properties('deals', [
+            'dealname', 'amount', 'company.name', 'contact.email',
+            'associations.contacts.phone', 'ai:resumo', 'date'
+        ])
+
+        assert plan.properties_for('deal') == ['dealname', 'amount']
+        assert plan.properties_for('company') == ['name']
+        assert plan.properties_for('contacts') == ['email', 'phone']
+        assert set(plan.associations) == {'companies', 'contacts'}
+
+    def test_unrelated_objects_are_ignored(self):
+        plan = plan_properties('contact', ['ticket.subject', 'firstname'])
+
+        assert plan.properties == {'contact': ('firstname',)}
+        assert plan.associations == ()
+
+
+class TestCollectWorkflowFields:
+    """Testes para collect_workflow_fields()"""
+
+    def test_collects_every_source(self):
+        workflow = _workflow(
+            output_name_template='{{dealname}} - {{date}}',
+            field_mappings=[SimpleNamespace(template_tag='valor', source_field='amount')],
+            ai_mappings=[SimpleNamespace(
+                source_fields=['description'], prompt_template='Resuma {{company.name}}'
+            )],
+            nodes=[SimpleNamespace(config={
+                'template_id': 'tpl-1',
+                'field_mappings': [{'template_tag': 'cliente', 'source_field': 'contact.firstname'}],
+                'recipients': ['{{contact.email}}'],
+            })]
+        )
+
+        fields = collect_workflow_fields(workflow, [_template(['valor', 'cliente', 'closedate'])])
+
+        assert set(fields) == {
+            'amount', 'contact.firstname', 'contact.email', 'description',
+            'company.name', 'dealname', 'date', 'closedate'
+        }
+
+    def test_template_without_detected_tags_disables_plan(self):
+        assert collect_workflow_fields(_workflow(), [_template(None)]) is None
+
+
+class TestPropertyPlanCache:
+    """Testes para PropertyPlanCache"""
+
+    def _get(self, cache, workflow, templates):
+        query = MagicMock()
+        query.filter.return_value.all.return_value = templates
+        Template.query = query
+        try:
+            with patch(
+                'app.services.data_sources.property_planner.collect_workflow_fields',
+                wraps=collect_workflow_fields
+            ) as collect:
+                plan = cache.get(workflow)
+            return plan, collect.call_count
+        finally:
+            del Template.query
+
+    def test_caches_per_template_version(self):
+        cache = PropertyPlanCache()
+        workflow = _workflow()
+
+        plan, calls = self._get(cache, workflow, [_template(['dealname'])])
+        assert plan.properties_for('deal') == ['dealname']
+        assert calls == 1
+
+        _, calls = self._get(cache, workflow, [_template(['dealname'])])
+        assert calls == 0
+
+        plan, calls = self._get(cache, workflow, [_template(['amount'], version=2)])
+        assert calls == 1
+        assert plan.properties_for('deal') == ['amount']
+
+    def test_live_templates_keep_default_properties(self):
+        plan, _ = self._get(PropertyPlanCache(), _workflow(), [_template(['dealname'], storage_type='google')])
+
+        # Tag adicionada no Drive sem /sync: a lista padrão continua coberta
+        assert set(plan.properties_for('deal')) >= {'dealname', 'amount', 'closedate'}
+        assert 'email' in plan.properties_for('contact')
+        assert set(plan.associations) == {'contacts', 'companies', 'line_items'}
+
+    def test_workflow_update_changes_key(self):
+        cache = PropertyPlanCache()
+
+        self._get(cache, _workflow(), [_template(['dealname'])])
+        _, calls = self._get(cache, _workflow(updated_at=datetime(2026, 1, 2)), [_template(['dealname'])])
+
+        assert calls == 1
+
+
+class TestGetObjectDataWithPlan:
+    """get_object_data() com plano de propriedades"""
+
+    def test_requests_only_planned_properties(self):
+        connection = MagicMock()
+        connection.credentials = {'access_token': 'token'}
+        connection.config = {}
+        response = MagicMock()
+        response.json.return_value = {'id': '1', 'properties': {'dealname': 'X'}, 'associations': {}}
+
+        plan = plan_properties('deal', ['dealname', 'company.name'])
+        with patch.object(HubSpotClient, 'get', return_value=response) as get:
+            HubSpotDataSource(connection).get_object_data('deal', '1', plan=plan)
+
+        params = get.call_args.kwargs['params']
+        assert params == {'properties': 'dealname', 'associations': ['companies']}
@@ -0,0 +1 @@
+# Document generation tests package
@@ -0,0 +1,111 @@
+"""
+Testes para DocxTemplateRenderer
+"""
+
+import zipfile
+from io import BytesIO
+
+import pytest
+from docx import Document
+
+from app.services.document_generation.docx_renderer import DocxTemplateRenderer
+
+
+def _docx(build) -> bytes:
+    doc = Document()
+    build(doc)
+    output = BytesIO()
+    doc.save(output)
+    return output.getvalue()
+
+
+def _load(docx_bytes: bytes) -> Document:
+    return Document(BytesIO(docx_bytes))
+
+
+class TestDocxTemplateRenderer:
+    """Testes para DocxTemplateRenderer.render()"""
+
+    def test_replaces_tag_split_across_runs_keeping_formatting(self):
+        def build(doc):
+            paragraph = doc.add_paragraph('Cliente: ')
+            bold = paragraph.add_run('{{contact.')
+            bold.bold = True
+            paragraph.add_run('firstname}}')
+            paragraph.add_run(' fim')
+
+        result = _load(DocxTemplateRenderer.render(
+            _docx(build), {'contact': {'firstname': 'Ana'}}
+        ))
+
+        paragraph = result.paragraphs[0]
+        assert paragraph.text == 'Cliente: Ana fim'
+        assert paragraph.runs[1].text == 'Ana'
+        assert paragraph.runs[1].bold is True
+
+    def test_replaces_tag_with_opening_braces_in_different_runs(self):
+        def build(doc):
+            paragraph = doc.add_paragraph('Olá {')
+            paragraph.add_run('{contact.firstname}}')
+
+        result = _load(DocxTemplateRenderer.render(
+            _docx(build), {'contact': {'firstname': 'Ana'}}
+        ))
+
+        assert result.paragraphs[0].text == 'Olá Ana'
+
+    def test_renders_nested_tables_headers_and_footers(self):
+        def build(doc):
+            section = doc.sections[0]
+            section.header.paragraphs[0].text = 'Cabeçalho {{dealname}}'
+            section.footer.paragraphs[0].text = 'Rodapé {{amount}}'
+            outer = doc.add_table(rows=1, cols=1)
+            inner = outer.cell(0, 0).add_table(rows=1, cols=1)
+            inner.cell(0, 0).text = 'Interno {{dealname}}'
+
+        result = _load(DocxTemplateRenderer.render(
+            _docx(build), {'dealname': 'Projeto X', 'amount': '100'}
+        ))
+
+        section = result.sections[0]
+        assert section.header.paragraphs[0].text == 'Cabeçalho Projeto X'
+        assert section.footer.paragraphs[0].text == 'Rodapé 100'
+        inner = result.tables[0].cell(0, 0).tables[0]
+        assert inner.cell(0, 0).text == 'Interno Projeto X'
+
+    def test_mappings_multiline_and_ai_tags(self):
+        def build(doc):
+            doc.add_paragraph('{{nome}} {{ai:resumo}} {{ai:outro}}')
+
+        result = _load(DocxTemplateRenderer.render(
+            _docx(build),
+            {'firstname': 'Ana', 'ai:resumo': 'linha 1\nlinha 2'},
+            {'nome': 'firstname'}
+        ))
+
+        assert result.paragraphs[0].text == 'Ana linha 1\nlinha 2 {{ai:outro}}'
+
+    def test_document_without_tags_is_unchanged(self):
+        def build(doc):
+            doc.add_paragraph('Sem tags')
+
+        result = _load(DocxTemplateRenderer.render(_docx(build), {}))
+
+        assert result.paragraphs[0].text == 'Sem tags'
+
+    def test_invalid_file_raises_value_error(self):
+        with pytest.raises(ValueError):
+            DocxTemplateRenderer.render(b'nao e um zip', {})
+
+    def test_corrupt_xml_part_raises_value_error(self):
+        source = zipfile.ZipFile(BytesIO(_docx(lambda doc: doc.add_paragraph('{{nome}}'))))
+        output = BytesIO()
+        with source, zipfile.ZipFile(output, 'w') as target:
+            for info in source.infolist():
+                content = source.read(info.filename)
+                if info.filename == 'word/document.xml':
+                    content = content.replace(b'</w:body>', b'')
+                target.writestr(info, content)
+
+        with pytest.raises(ValueError):
+            DocxTemplateRenderer.render(output.getvalue(), {'nome': 'ACME'})
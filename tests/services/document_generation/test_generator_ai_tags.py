@@ -0,0 +1,152 @@
+"""
+Testes para DocumentGenerator._process_ai_tags (geração concorrente)
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.ai import LLMResponse, AITimeoutError, AIQuotaExceededError
+from app.services.document_generation.generator import DocumentGenerator, AIGenerationMetrics
+
+
+def _mapping(tag, fallback=None, cache_enabled=False):
+    mapping = MagicMock()
+    mapping.ai_tag = tag
+    mapping.provider = 'openai'
+    mapping.model = 'gpt-4o-mini'
+    mapping.prompt_template = 'Descreva {{dealname}}'
+    mapping.source_fields = None
+    mapping.temperature = 0.2
+    mapping.max_tokens = 100
+    mapping.fallback_value = fallback
+    mapping.cache_enabled = cache_enabled
+    mapping.cache_ttl_seconds = None
+    return mapping
+
+
+def _response(text):
+    return LLMResponse(
+        text=text, provider='openai', model='gpt-4o-mini',
+        input_tokens=10, output_tokens=5, total_tokens=15,
+        time_ms=1.0, estimated_cost_usd=0.001
+    )
+
+
+@pytest.fixture
+def generator():
+    generator = DocumentGenerator.__new__(DocumentGenerator)
+    generator._llm_service = MagicMock()
+    generator._get_ai_api_key = MagicMock(return_value='sk-test')
+    return generator
+
+
+class TestProcessAITags:
+    """Testes para _process_ai_tags()"""
+
+    def test_generates_tags_concurrently(self, generator):
+        in_flight = {'current': 0, 'max': 0}
+
+        async def fake_generate(**kwargs):
+            in_flight['current'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['current'])
+            await asyncio.sleep(0.05)
+            in_flight['current'] -= 1
+            return _response(f"texto {kwargs['prompt']}")
+
+        generator._llm_service.generate_text_async = fake_generate
+        workflow = MagicMock(ai_mappings=[_mapping('a'), _mapping('b'), _mapping('c')])
+        metrics = AIGenerationMetrics()
+
+        result = generator._process_ai_tags(workflow, {'dealname': 'X'}, metrics)
+
+        assert result == {'ai:a': 'texto Descreva X', 'ai:b': 'texto Descreva X', 'ai:c': 'texto Descreva X'}
+        assert in_flight['max'] > 1
+        assert [d['tag'] for d in metrics.details] == ['a', 'b', 'c']
+        assert metrics.successful == 3
+
+    def test_timeout_uses_fallback(self, generator):
+        async def fake_generate(**kwargs):
+            raise AITimeoutError('timeout', 'openai', 'gpt-4o-mini', 60)
+
+        generator._llm_service.generate_text_async = fake_generate
+        workflow = MagicMock(ai_mappings=[_mapping('a', fallback='padrão')])
+        metrics = AIGenerationMetrics()
+
+        result = generator._process_ai_tags(workflow, {}, metrics)
+
+        assert result == {'ai:a': 'padrão'}
+        assert metrics.failed == 1
+
+    def test_quota_error_is_propagated(self, generator):
+        async def fake_generate(**kwargs):
+            raise AIQuotaExceededError('quota', 'openai', 'gpt-4o-mini')
+
+        generator._llm_service.generate_text_async = fake_generate
+        workflow = MagicMock(ai_mappings=[_mapping('a'), _mapping('b')])
+        metrics = AIGenerationMetrics()
+
+        with pytest.raises(AIQuotaExceededError):
+            generator._process_ai_tags(workflow, {}, metrics)
+
+        assert metrics.failed >= 1
+
+    def test_missing_api_key_stops_processing(self, generator):
+        generator._get_ai_api_key = MagicMock(return_value=None)
+        generator._llm_service.generate_text_async = MagicMock()
+        workflow = MagicMock(ai_mappings=[_mapping('a'), _mapping('b')])
+
+        with pytest.raises(Exception):
+            generator._process_ai_tags(workflow, {}, AIGenerationMetrics())
+
+        generator._llm_service.generate_text_async.assert_not_called()
+
+
+class TestProcessAITagsCache:
+    """Testes do cache de respostas em _process_ai_tags()"""
+
+    @pytest.fixture(autouse=True)
+    def memory_cache(self, monkeypatch):
+        from app.services.ai import response_cache
+        monkeypatch.setattr(response_cache, '_backend', response_cache.MemoryCacheBackend())
+
+    def test_second_run_is_served_from_cache(self, generator):
+        calls = []
+
+        async def fake_generate(**kwargs):
+            calls.append(kwargs['prompt'])
+            return _response('texto')
+
+        generator._llm_service.generate_text_async = fake_generate
+        workflow = MagicMock(ai_mappings=[_mapping('a', cache_enabled=True)])
+
+        first = AIGenerationMetrics()
+        generator._process_ai_tags(workflow, {'dealname': 'X'}, first)
+        second = AIGenerationMetrics()
+        result = generator._process_ai_tags(workflow, {'dealname': 'X'}, second)
+
+        assert result == {'ai:a': 'texto'}
+        assert len(calls) == 1
+        assert first.to_dict()['cache_misses'] == 1
+        assert second.to_dict()['cache_hits'] == 1
+        assert second.total_tokens == 0
+        assert second.details[0]['cached'] is True
+
+    def test_disabled_mapping_skips_cache(self, generator):
+        calls = []
+
+        async def fake_generate(**kwargs):
+            calls.append(kwargs['prompt'])
+            return _response('texto')
+
+        generator._llm_service.generate_text_async = fake_generate
+        workflow = MagicMock(ai_mappings=[_mapping('a')])
+
+        for _ in range(2):
+            metrics = AIGenerationMetrics()
+            generator._process_ai_tags(workflow, {'dealname': 'X'}, metrics)
+
+        assert len(calls) == 2
+        assert metrics.cache_hits == 0
+        assert metrics.cache_misses == 0
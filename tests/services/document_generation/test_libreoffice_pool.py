@@ -0,0 +1,123 @@
+"""
+Testes para LibreOfficePool (com worker falso, sem LibreOffice instalado)
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from app.services.document_generation import libreoffice_pool
+from app.services.document_generation.libreoffice_pool import (
+    LibreOfficePool, SubprocessWorker, ConversionTimeout
+)
+
+
+class FakeWorker(SubprocessWorker):
+    created = []
+
+    def __init__(self, slot, binary):
+        super().__init__(slot, binary)
+        self.healthy = True
+        self.stopped = False
+        self.delay = 0
+        FakeWorker.created.append(self)
+
+    def is_healthy(self):
+        return self.healthy and not self.stopped
+
+    def convert(self, input_path, output_dir, target, timeout):
+        if self.delay > timeout:
+            raise ConversionTimeout('timeout')
+        time.sleep(self.delay)
+        with open(input_path, 'rb') as f:
+            data = f.read()
+        output_path = os.path.join(output_dir, f'out.{target}')
+        with open(output_path, 'wb') as f:
+            f.write(data.upper())
+        return output_path
+
+    def stop(self):
+        self.stopped = True
+        super().stop()
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    FakeWorker.created = []
+    monkeypatch.setattr(libreoffice_pool, '_soffice_binary', lambda: '/usr/bin/soffice')
+    monkeypatch.setattr(LibreOfficePool, '_create_worker', lambda self, slot: FakeWorker(slot, self._binary))
+    pools = []
+
+    def factory(**kwargs):
+        pool = LibreOfficePool(**kwargs)
+        pools.append(pool)
+        return pool
+
+    yield factory
+    for pool in pools:
+        pool.shutdown()
+
+
+class TestLibreOfficePool:
+    """Testes para LibreOfficePool.convert()"""
+
+    def test_reuses_worker_between_jobs(self, make_pool):
+        pool = make_pool(size=1)
+
+        assert pool.convert(b'abc', '.docx', 'pdf', timeout=5) == b'ABC'
+        assert pool.convert(b'def', '.docx', 'pdf', timeout=5) == b'DEF'
+        assert len(FakeWorker.created) == 1
+
+    def test_recycles_worker_after_max_jobs(self, make_pool):
+        pool = make_pool(size=1, max_jobs_per_worker=2)
+
+        for _ in range(3):
+            pool.convert(b'x', '.docx', 'pdf', timeout=5)
+
+        assert len(FakeWorker.created) == 2
+        assert FakeWorker.created[0].stopped
+
+    def test_restarts_unhealthy_worker(self, make_pool):
+        pool = make_pool(size=1)
+        pool.convert(b'x', '.docx', 'pdf', timeout=5)
+        FakeWorker.created[0].healthy = False
+
+        pool.convert(b'x', '.docx', 'pdf', timeout=5)
+
+        assert len(FakeWorker.created) == 2
+
+    def test_timeout_discards_worker(self, make_pool):
+        pool = make_pool(size=1)
+        pool.convert(b'x', '.docx', 'pdf', timeout=5)
+        FakeWorker.created[0].delay = 10
+
+        with pytest.raises(ConversionTimeout):
+            pool.convert(b'x', '.docx', 'pdf', timeout=1)
+
+        assert FakeWorker.created[0].stopped
+        pool.convert(b'x', '.docx', 'pdf', timeout=5)
+        assert len(FakeWorker.created) == 2
+
+    def test_queue_timeout_when_all_workers_busy(self, make_pool):
+        pool = make_pool(size=1, queue_timeout=0.05)
+        pool.convert(b'x', '.docx', 'pdf', timeout=5)
+        FakeWorker.created[0].delay = 0.3
+
+        busy = threading.Thread(target=pool.convert, args=(b'x', '.docx', 'pdf', 5))
+        busy.start()
+        time.sleep(0.05)
+        try:
+            with pytest.raises(ValueError):
+                pool.convert(b'x', '.docx', 'pdf', timeout=5)
+        finally:
+            busy.join()
+
+    def test_unavailable_without_soffice(self, monkeypatch):
+        monkeypatch.setattr(libreoffice_pool, '_soffice_binary', lambda: None)
+        pool = LibreOfficePool(size=1)
+
+        assert not pool.available
+        with pytest.raises(ValueError):
+            pool.convert(b'x', '.doc', 'docx', timeout=5)
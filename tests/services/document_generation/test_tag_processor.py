@@ -0,0 +1,76 @@
+"""
+Testes para CompiledTemplate e o cache de templates compilados
+"""
+
+from app.services.document_generation.tag_processor import TagProcessor, CompiledTemplate
+
+
+class TestCompiledTemplate:
+    """Testes para CompiledTemplate.render()"""
+
+    def test_render_matches_replace_tags(self):
+        text = "Olá {{contact.firstname}}, deal {{ dealname }} {{missing}}!"
+        data = {'contact': {'firstname': 'Ana'}, 'dealname': 'Projeto X'}
+
+        assert CompiledTemplate(text).render(data) == "Olá Ana, deal Projeto X !"
+        assert TagProcessor.replace_tags(text, data) == "Olá Ana, deal Projeto X !"
+
+    def test_render_with_mappings(self):
+        tpl = CompiledTemplate("{{nome}} - {{empresa}}")
+        data = {'firstname': 'Ana', 'company': {'name': 'ACME'}}
+
+        result = tpl.render(data, {'nome': 'firstname', 'empresa': 'company.name'})
+
+        assert result == "Ana - ACME"
+
+    def test_render_with_transforms(self):
+        tpl = CompiledTemplate("{{name}} {{amount}}")
+        data = {'name': 'ana', 'amount': '1500'}
+
+        result = tpl.render(data, transforms={
+            'name': ('uppercase', None),
+            'amount': ('currency', {'symbol': 'R$', 'decimals': 2}),
+        })
+
+        assert result == "ANA R$ 1,500.00"
+
+    def test_ai_tags(self):
+        tpl = CompiledTemplate("{{ai:intro}} {{ai:outro}}")
+        data = {'ai:intro': 'Oi'}
+
+        assert tpl.render(data) == "Oi "
+        assert tpl.render(data, keep_unresolved_ai=True) == "Oi {{ai:outro}}"
+
+    def test_tag_names(self):
+        tpl = CompiledTemplate("{{a}} {{ai:x}} {{b}} {{a}}")
+
+        assert tpl.tag_names == ['a', 'b']
+        assert tpl.ai_tag_names == ['x']
+        assert tpl.has_tags
+
+    def test_text_without_tags_is_returned_as_is(self):
+        tpl = CompiledTemplate("sem tags")
+
+        assert not tpl.has_tags
+        assert tpl.render({'a': 1}) == "sem tags"
+
+
+class TestCompiledTemplateCache:
+    """Testes para TagProcessor.compile() e compiled_for()"""
+
+    def test_compile_reuses_instance(self):
+        assert TagProcessor.compile("{{a}}") is TagProcessor.compile("{{a}}")
+
+    def test_compiled_for_is_keyed_by_version(self):
+        v1 = TagProcessor.compiled_for('tpl-1', 1)
+        v1.get("{{a}}")
+
+        assert TagProcessor.compiled_for('tpl-1', 1) is v1
+        assert len(v1) == 1
+        assert TagProcessor.compiled_for('tpl-1', 2) is not v1
+
+    def test_invalidate_compiled(self):
+        v1 = TagProcessor.compiled_for('tpl-2', 1)
+        TagProcessor.invalidate_compiled('tpl-2')
+
+        assert TagProcessor.compiled_for('tpl-2', 1) is not v1
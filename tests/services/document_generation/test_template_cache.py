@@ -0,0 +1,105 @@
+"""
+Testes para UploadedTemplateCache
+"""
+
+import os
+import threading
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.document_generation.tag_processor import TagProcessor
+from app.services.document_generation.template_cache import UploadedTemplateCache
+
+
+def _template(version=1):
+    return SimpleNamespace(id='tpl-1', version=version, storage_file_key='docg/org/templates/a.docx')
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = UploadedTemplateCache(cache_dir=str(tmp_path), memory_limit=1024, disk_limit=1024)
+    loader = MagicMock(side_effect=lambda template: f'v{template.version}'.encode())
+    monkeypatch.setattr(UploadedTemplateCache, '_load', staticmethod(loader))
+    cache.loader = loader
+    return cache
+
+
+class TestUploadedTemplateCache:
+    """Testes para UploadedTemplateCache"""
+
+    def test_loads_once_per_version(self, cache):
+        assert cache.get_normalized(_template()) == b'v1'
+        assert cache.get_normalized(_template()) == b'v1'
+        assert cache.get_normalized(_template(version=2)) == b'v2'
+
+        assert cache.loader.call_count == 2
+
+    def test_concurrent_misses_load_once(self, cache):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_load(template):
+            started.set()
+            release.wait(5)
+            return b'v1'
+
+        cache.loader.side_effect = slow_load
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(cache.get_normalized(_template())))
+            for _ in range(3)
+        ]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert results == [b'v1'] * 3
+        assert cache.loader.call_count == 1
+        assert cache._fill_locks == {}
+
+    def test_failed_load_releases_fill_lock(self, cache):
+        cache.loader.side_effect = ValueError('Arquivo inválido')
+
+        with pytest.raises(ValueError):
+            cache.get_normalized(_template())
+
+        assert cache._fill_locks == {}
+
+    def test_disk_survives_memory_eviction(self, cache, tmp_path):
+        cache.get_normalized(_template())
+        cache._memory.clear()
+
+        assert cache.get_normalized(_template()) == b'v1'
+        assert cache.loader.call_count == 1
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_memory_lru_is_bounded_by_bytes(self, tmp_path):
+        cache = UploadedTemplateCache(cache_dir=str(tmp_path), memory_limit=10)
+        cache.put(_template(version=1), b'123456')
+        cache.put(_template(version=2), b'abcdef')
+
+        assert list(cache._memory) == [('tpl-1', 2, 'docg/org/templates/a.docx')]
+        assert cache._memory_size == 6
+
+    def test_disk_is_bounded_by_bytes(self, tmp_path):
+        cache = UploadedTemplateCache(cache_dir=str(tmp_path), disk_limit=10)
+        cache.put(_template(version=1), b'123456')
+        cache.put(_template(version=2), b'abcdef')
+
+        assert len(os.listdir(tmp_path)) == 1
+
+    def test_invalidate_removes_all_versions(self, cache, tmp_path):
+        cache.get_normalized(_template())
+        compiled = TagProcessor.compiled_for('tpl-1', 1)
+
+        cache.invalidate('tpl-1')
+
+        assert os.listdir(tmp_path) == []
+        assert TagProcessor.compiled_for('tpl-1', 1) is not compiled
+        cache.get_normalized(_template())
+        assert cache.loader.call_count == 2
@@ -0,0 +1,162 @@
+"""
+Testes para início, preparação e retomada de lotes (app/services/batch_generation.py)
+"""
+
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.database import db
+from app.services import batch_generation
+from app.services.batch_generation import (
+    HEARTBEAT_TIMEOUT, prepare_next_items, resume_batch_job, start_batch_job
+)
+
+
+def _job(status, heartbeat_age=None, temporal_workflow_id=None, running_items=0, in_flight=0):
+    items = MagicMock()
+    running = items.filter_by.return_value
+    running.all.return_value = []
+    running.count.return_value = running_items
+    running.join.return_value.filter.return_value.count.return_value = in_flight
+    return SimpleNamespace(
+        id='job-1',
+        organization_id='org-1',
+        status=status,
+        temporal_workflow_id=temporal_workflow_id,
+        heartbeat_at=(
+            datetime.utcnow() - timedelta(seconds=heartbeat_age) if heartbeat_age is not None else None
+        ),
+        items=items,
+        error_message=None
+    )
+
+
+@pytest.fixture
+def resume_mocks():
+    with patch.object(db, 'session', MagicMock()), \
+            patch.object(batch_generation, '_recount'), \
+            patch.object(batch_generation.Organization, 'release_documents') as release, \
+            patch.object(batch_generation, 'start_batch_job', side_effect=lambda job: job) as start, \
+            patch('app.temporal.service.terminate_workflow') as terminate:
+        yield SimpleNamespace(release=release, start=start, terminate=terminate)
+
+
+class TestResumeBatchJob:
+    """Testes para resume_batch_job()"""
+
+    def test_running_job_with_live_runner_is_refused(self, resume_mocks):
+        with pytest.raises(ValueError):
+            resume_batch_job(_job('running', heartbeat_age=10))
+
+        resume_mocks.start.assert_not_called()
+
+    def test_cancelled_job_with_children_in_flight_is_refused(self, resume_mocks):
+        job = _job('cancelled', heartbeat_age=10, temporal_workflow_id='batch_job-1_1', running_items=3, in_flight=2)
+
+        with pytest.raises(ValueError, match='2 itens'):
+            resume_batch_job(job)
+
+        resume_mocks.release.assert_not_called()
+        resume_mocks.start.assert_not_called()
+
+    def test_cancelled_local_job_waits_for_runner(self, resume_mocks):
+        with pytest.raises(ValueError):
+            resume_batch_job(_job('cancelled', heartbeat_age=10, running_items=3))
+
+    def test_crashed_local_runner_is_resumable(self, resume_mocks):
+        job = _job('running', heartbeat_age=HEARTBEAT_TIMEOUT + 60, running_items=3)
+
+        resume_batch_job(job)
+
+        resume_mocks.start.assert_called_once_with(job)
+        resume_mocks.terminate.assert_not_called()
+
+    def test_stale_temporal_run_is_terminated_before_resuming(self, resume_mocks):
+        job = _job('running', heartbeat_age=HEARTBEAT_TIMEOUT + 60, temporal_workflow_id='batch_job-1_1')
+
+        resume_batch_job(job)
+
+        resume_mocks.terminate.assert_called_once_with('batch_job-1_1', 'Lote retomado')
+        resume_mocks.start.assert_called_once_with(job)
+
+
+def _prepared_job(status, prepared):
+    job = MagicMock(id='job-1', organization_id='org-1', status=status)
+    running = job.items.filter_by.return_value.join.return_value.filter.return_value
+    running.order_by.return_value.limit.return_value.all.return_value = prepared
+    return job
+
+
+def _item(item_id, position):
+    return SimpleNamespace(
+        id=item_id, execution_id=f'exec-{item_id}', source_object_id=f'obj-{position}',
+        position=position, status='running'
+    )
+
+
+@pytest.fixture
+def prepare_mocks():
+    with patch.object(db, 'session', MagicMock()), \
+            patch.object(batch_generation.BatchGenerationJob, 'query') as job_query, \
+            patch.object(batch_generation.WorkflowExecution, 'query') as execution_query, \
+            patch.object(batch_generation, '_fetch_source_data') as fetch, \
+            patch.object(batch_generation.Organization, 'reserve_documents_up_to') as reserve, \
+            patch.object(batch_generation.Organization, 'release_documents') as release:
+        yield SimpleNamespace(
+            job_query=job_query, execution_query=execution_query,
+            fetch=fetch, reserve=reserve, release=release
+        )
+
+
+class TestPrepareNextItems:
+    """Testes para prepare_next_items() reexecutado pelo retry da activity"""
+
+    def test_retry_returns_page_prepared_by_previous_attempt(self, prepare_mocks):
+        items = [_item('i-1', 0), _item('i-2', 1)]
+        prepare_mocks.job_query.get.return_value = _prepared_job('running', items)
+
+        result = prepare_next_items('job-1')
+
+        assert result == {
+            'cancelled': False,
+            'items': [
+                {'item_id': 'i-1', 'execution_id': 'exec-i-1', 'source_object_id': 'obj-0'},
+                {'item_id': 'i-2', 'execution_id': 'exec-i-2', 'source_object_id': 'obj-1'},
+            ]
+        }
+        # Nem página nova, nem quota reservada de novo
+        prepare_mocks.fetch.assert_not_called()
+        prepare_mocks.reserve.assert_not_called()
+
+    def test_cancelled_job_releases_prepared_page(self, prepare_mocks):
+        items = [_item('i-1', 0), _item('i-2', 1)]
+        prepare_mocks.job_query.get.return_value = _prepared_job('cancelled', items)
+
+        result = prepare_next_items('job-1')
+
+        assert result == {'cancelled': True, 'items': []}
+        assert [(item.status, item.execution_id) for item in items] == [('pending', None), ('pending', None)]
+        prepare_mocks.release.assert_called_once_with('org-1', 2)
+
+
+class TestStartBatchJob:
+    """Testes para start_batch_job()"""
+
+    def test_failed_workflow_start_marks_job_failed(self):
+        job = SimpleNamespace(
+            id='job-1', status='pending', started_at=None, heartbeat_at=None,
+            completed_at=None, runs=0, error_message=None, temporal_workflow_id=None
+        )
+
+        with patch.object(db, 'session', MagicMock()), \
+                patch('app.temporal.service.is_temporal_enabled', return_value=True), \
+                patch('app.temporal.service.start_batch_workflow', side_effect=RuntimeError('Temporal indisponível')):
+            with pytest.raises(RuntimeError):
+                start_batch_job(job)
+
+        assert job.status == 'failed'
+        assert 'Temporal indisponível' in job.error_message
+        assert job.heartbeat_at is None
@@ -0,0 +1,161 @@
+"""
+Testes para app/services/credential_resolver.py
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from flask import Flask
+
+from app.services.credential_resolver import CredentialResolver, _Entry, _parse_expiry
+
+
+KEY = ('org-1', 'google', None)
+
+
+class CountingLoader:
+    """Loader fake que conta chamadas e devolve tokens numerados"""
+
+    def __init__(self, expires_in=timedelta(hours=1), delay=0, fail_forced=False):
+        self.calls = []
+        self.expires_in = expires_in
+        self.delay = delay
+        self.fail_forced = fail_forced
+        self._lock = threading.Lock()
+
+    def __call__(self, key, force_refresh):
+        with self._lock:
+            self.calls.append(force_refresh)
+            number = len(self.calls)
+        if self.delay:
+            time.sleep(self.delay)
+        if force_refresh and self.fail_forced:
+            return None
+        return _Entry(f'token-{number}', datetime.utcnow() + self.expires_in)
+
+
+@pytest.fixture
+def app():
+    return Flask('test')
+
+
+class TestCredentialResolver:
+    """Testes para CredentialResolver"""
+
+    def test_caches_valid_credentials(self):
+        resolver = CredentialResolver()
+        loader = CountingLoader()
+
+        assert resolver._get(KEY, loader) == 'token-1'
+        assert resolver._get(KEY, loader) == 'token-1'
+        assert loader.calls == [False]
+
+    def test_expired_entry_is_reloaded(self):
+        resolver = CredentialResolver(refresh_margin=timedelta(0))
+        loader = CountingLoader(expires_in=timedelta(seconds=-1))
+
+        resolver._get(KEY, loader)
+        resolver._get(KEY, loader)
+
+        assert len(loader.calls) == 2
+
+    def test_max_age_forces_reload(self):
+        resolver = CredentialResolver(max_age=timedelta(0))
+        loader = CountingLoader()
+
+        resolver._get(KEY, loader)
+        time.sleep(0.01)
+        resolver._get(KEY, loader)
+
+        assert len(loader.calls) == 2
+
+    def test_concurrent_callers_share_one_load(self):
+        resolver = CredentialResolver()
+        loader = CountingLoader(delay=0.1)
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(resolver._get(KEY, loader)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loader.calls == [False]
+        assert results == ['token-1'] * 8
+
+    def test_missing_credentials_are_not_cached(self):
+        resolver = CredentialResolver()
+        calls = []
+
+        def loader(key, force_refresh):
+            calls.append(force_refresh)
+            return None
+
+        assert resolver._get(KEY, loader) is None
+        assert resolver._get(KEY, loader) is None
+        assert len(calls) == 2
+
+    def test_refreshes_in_background_near_expiry(self, app):
+        resolver = CredentialResolver(refresh_margin=timedelta(minutes=10))
+        loader = CountingLoader(expires_in=timedelta(minutes=5))
+
+        with app.app_context():
+            assert resolver._get(KEY, loader) == 'token-1'
+            # Ainda válido: devolve o token atual e renova em background
+            assert resolver._get(KEY, loader) == 'token-1'
+
+        deadline = time.time() + 2
+        while len(loader.calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        assert loader.calls == [False, True]
+        assert resolver._entries[KEY].value == 'token-2'
+
+    def test_failed_background_refresh_keeps_valid_token(self, app):
+        resolver = CredentialResolver(refresh_margin=timedelta(minutes=10))
+        loader = CountingLoader(expires_in=timedelta(minutes=5), fail_forced=True)
+
+        with app.app_context():
+            resolver._get(KEY, loader)
+            resolver._get(KEY, loader)
+
+        deadline = time.time() + 2
+        while len(loader.calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+
+        assert resolver._entries[KEY].value == 'token-1'
+
+    def test_invalidate_by_provider(self):
+        resolver = CredentialResolver()
+        loader = CountingLoader()
+        microsoft_key = ('org-1', 'microsoft', None)
+
+        resolver._get(KEY, loader)
+        resolver._get(microsoft_key, loader)
+        resolver.invalidate('org-1', 'google')
+
+        assert KEY not in resolver._entries
+        assert microsoft_key in resolver._entries
+
+
+class TestParseExpiry:
+    """Testes para _parse_expiry()"""
+
+    def test_naive_iso(self):
+        assert _parse_expiry('2026-01-01T10:00:00') == datetime(2026, 1, 1, 10, 0)
+
+    def test_converts_offset_to_utc(self):
+        assert _parse_expiry('2026-01-01T10:00:00-03:00') == datetime(2026, 1, 1, 13, 0)
+
+    def test_zulu(self):
+        assert _parse_expiry('2026-01-01T10:00:00Z') == datetime(2026, 1, 1, 10, 0)
+
+    def test_empty(self):
+        assert _parse_expiry(None) is None
@@ -0,0 +1,252 @@
+"""
+Testes para app/services/webhook_ingestion.py
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.dialects import postgresql
+from temporalio.exceptions import WorkflowAlreadyStartedError
+
+from app.database import db
+from app.services import webhook_ingestion
+from app.services.webhook_ingestion import (
+    _start_via_temporal, dedup_key, drain_deliveries, enqueue_delivery, enqueue_records
+)
+from app.utils.webhook_routes import WebhookRoute
+
+
+def _delivery(**kwargs):
+    defaults = dict(
+        id=uuid.uuid4(),
+        trigger_node_id='node-1',
+        payload={'deal': {'id': '42'}},
+        status='pending',
+        execution_id=None,
+        attempts=0,
+        error_message=None,
+    )
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+def _routes(status='active', field_mapping=None):
+    workflow = SimpleNamespace(id=uuid.uuid4(), status=status)
+    node = SimpleNamespace(
+        id='node-1',
+        webhook_token='token-1',
+        config={'field_mapping': field_mapping or {'id': 'deal.id'}, 'source_object_type': 'deal'}
+    )
+    return {'node-1': WebhookRoute.from_models(node, workflow)}
+
+
+class TestDedupKey:
+    """Testes para dedup_key()"""
+
+    def test_prefers_idempotency_header(self):
+        assert dedup_key({'a': 1}, {'Idempotency-Key': ' abc '}) == 'h:abc'
+
+    def test_payload_hash_ignores_key_order(self):
+        assert dedup_key({'a': 1, 'b': 2}, {}) == dedup_key({'b': 2, 'a': 1}, {})
+        assert dedup_key({'a': 1}, {}) != dedup_key({'a': 2}, {})
+
+    def test_query_string_is_part_of_hash(self):
+        assert dedup_key({}, {}, {'deal': ['1']}) != dedup_key({}, {}, {'deal': ['2']})
+        assert dedup_key({'a': 1}, {}, {'x': ['1']}) != dedup_key({'a': 1}, {})
+
+    def test_empty_request_is_not_deduplicated(self):
+        assert dedup_key({}, {}) != dedup_key({}, {})
+        assert dedup_key({}, {}, {}).startswith('u:')
+
+
+class TestEnqueueDelivery:
+    """Testes para enqueue_delivery()"""
+
+    def test_inserts_with_on_conflict_do_nothing(self):
+        session = MagicMock()
+        session.execute.return_value.first.return_value = ('delivery-1',)
+
+        with patch.object(db, 'session', session), \
+                patch.object(webhook_ingestion, 'get_webhook_drainer') as drainer:
+            delivery_id, duplicate = enqueue_delivery('wf-1', 'node-1', {'a': 1}, {})
+
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert 'ON CONFLICT ON CONSTRAINT unique_webhook_delivery_dedup DO UPDATE' in sql
+        assert (delivery_id, duplicate) == ('delivery-1', False)
+        session.commit.assert_called_once()
+        drainer.return_value.notify.assert_called_once()
+
+    def test_payload_hash_key_is_reused_after_short_window(self):
+        session = MagicMock()
+        session.execute.return_value.first.return_value = ('delivery-1',)
+
+        with patch.object(db, 'session', session), \
+                patch.object(webhook_ingestion, 'get_webhook_drainer'):
+            enqueue_delivery('wf-1', 'node-1', {'a': 1}, {})
+
+        compiled = session.execute.call_args.args[0].compile(dialect=postgresql.dialect())
+        params = compiled.params
+        # Só chaves que não vêm de header, concluídas e mais velhas que PAYLOAD_DEDUP_WINDOW
+        assert 'dedup_key NOT LIKE' in str(compiled)
+        assert params['dedup_key_1'] == 'h:'
+        window = params['received_at_m0'] - params['received_at_1']
+        assert window.total_seconds() == webhook_ingestion.PAYLOAD_DEDUP_WINDOW
+
+    def test_duplicate_returns_existing_delivery(self):
+        session = MagicMock()
+        session.execute.return_value.first.return_value = None
+        session.query.return_value.filter_by.return_value.scalar.return_value = 'delivery-1'
+
+        with patch.object(db, 'session', session), \
+                patch.object(webhook_ingestion, 'get_webhook_drainer') as drainer:
+            delivery_id, duplicate = enqueue_delivery('wf-1', 'node-1', {'a': 1}, {})
+
+        assert (delivery_id, duplicate) == ('delivery-1', True)
+        session.commit.assert_not_called()
+        drainer.return_value.notify.assert_not_called()
+
+
+class TestEnqueueRecords:
+    """Testes para enqueue_records() (webhook em lote)"""
+
+    def _run(self, records, headers, inserted):
+        session = MagicMock()
+        session.execute.return_value = [(i,) for i in inserted]
+
+        with patch.object(db, 'session', session), \
+                patch.object(webhook_ingestion, 'get_webhook_drainer') as drainer:
+            result = enqueue_records('wf-1', 'node-1', records, headers)
+        return result, session.execute.call_args.args[0], drainer
+
+    def test_one_insert_with_key_per_record(self):
+        (ids, duplicates), statement, drainer = self._run(
+            [{'id': 1}, {'id': 2}], {'Idempotency-Key': 'abc'}, ['d1', 'd2']
+        )
+
+        params = statement.compile(dialect=postgresql.dialect()).params
+        assert {v for k, v in params.items() if k.startswith('dedup_key_m')} == {'h:abc:0', 'h:abc:1'}
+        assert (ids, duplicates) == (['d1', 'd2'], 0)
+        drainer.return_value.notify.assert_called_once()
+
+    def test_counts_duplicates_without_waking_drainer(self):
+        (ids, duplicates), _, drainer = self._run([{'id': 1}, {'id': 1}], {}, [])
+
+        assert (ids, duplicates) == ([], 2)
+        drainer.return_value.notify.assert_not_called()
+
+
+class TestStartViaTemporal:
+    """Testes para o início em lote das entregas"""
+
+    def _run(self, deliveries, routes, results):
+        with patch.object(db, 'session', MagicMock()), \
+                patch.object(webhook_ingestion, '_load_routes', return_value=routes), \
+                patch('app.temporal.service.start_workflow_executions', side_effect=results) as start:
+            _start_via_temporal(deliveries)
+        return start
+
+    def test_creates_executions_and_starts_in_one_batch(self):
+        deliveries = [_delivery(), _delivery(payload={'deal': {'id': '43'}})]
+
+        start = self._run(
+            deliveries, _routes(),
+            lambda executions: {str(e.id): {'temporal_run_id': 'r'} for e in executions}
+        )
+
+        executions = start.call_args.args[0]
+        assert [e.trigger_data['source_object_id'] for e in executions] == ['42', '43']
+        assert all(d.status == 'processed' for d in deliveries)
+        assert deliveries[0].execution_id == executions[0].id
+
+    def test_already_started_counts_as_processed(self):
+        delivery = _delivery()
+
+        self._run([delivery], _routes(), lambda executions: {
+            str(executions[0].id): WorkflowAlreadyStartedError('exec', 'DocGWorkflow')
+        })
+
+        assert delivery.status == 'processed'
+
+    def test_inactive_workflow_fails_without_starting(self):
+        delivery = _delivery()
+
+        start = self._run([delivery], _routes(status='paused'), lambda executions: {})
+
+        assert delivery.status == 'failed'
+        start.assert_not_called()
+
+    def test_temporal_outage_leaves_deliveries_for_retry(self):
+        delivery = _delivery()
+
+        self._run([delivery], _routes(), ConnectionError('down'))
+
+        assert delivery.status == 'starting'
+        assert delivery.execution_id is not None
+
+    def test_invalid_mapping_fails_delivery(self):
+        delivery = _delivery()
+
+        start = self._run([delivery], _routes(field_mapping={'id': 'deal..id'}), lambda executions: {})
+
+        assert delivery.status == 'failed'
+        assert 'deal..id' in delivery.error_message
+        start.assert_not_called()
+
+
+class TestDrainDeliveries:
+    """Testes para drain_deliveries()"""
+
+    def _run(self, temporal):
+        delivery = _delivery()
+        with patch.object(db, 'session', MagicMock()), \
+                patch.object(webhook_ingestion.WebhookDelivery, 'query') as query, \
+                patch('app.temporal.service.is_temporal_enabled', return_value=temporal), \
+                patch.object(webhook_ingestion, '_start_via_temporal') as via_temporal, \
+                patch.object(webhook_ingestion, '_execute_locally') as locally:
+            selected = query.filter.return_value.order_by.return_value.limit
+            selected.return_value.with_for_update.return_value.all.return_value = [delivery]
+            drain_deliveries()
+        return selected, via_temporal, locally
+
+    def test_temporal_claims_a_batch(self):
+        selected, via_temporal, _ = self._run(temporal=True)
+
+        selected.assert_called_once_with(webhook_ingestion.DRAIN_BATCH_SIZE)
+        via_temporal.assert_called_once()
+
+    def test_local_execution_claims_one_delivery_at_a_time(self):
+        selected, _, locally = self._run(temporal=False)
+
+        selected.assert_called_once_with(1)
+        locally.assert_called_once()
+
+
+class TestWebhookDrainer:
+    """Testes para WebhookDrainer"""
+
+    def test_start_runs_one_thread_per_process(self):
+        drainer = webhook_ingestion.WebhookDrainer()
+        app = object()
+
+        with patch.object(webhook_ingestion.threading, 'Thread') as thread:
+            thread.return_value.is_alive.return_value = True
+            drainer.start(app)
+            drainer.start(app)
+            drainer.notify()
+
+        thread.assert_called_once()
+        assert thread.call_args.kwargs['args'] == (app,)
+        thread.return_value.start.assert_called_once()
+
+    def test_restarts_in_forked_child(self):
+        drainer = webhook_ingestion.WebhookDrainer()
+        app = object()
+
+        with patch.object(webhook_ingestion.threading, 'Thread') as thread:
+            thread.return_value.is_alive.return_value = True
+            drainer.start(app)
+            with patch.object(webhook_ingestion.os, 'getpid', return_value=-1):
+                drainer.after_fork()
+
+        assert thread.return_value.start.call_count == 2
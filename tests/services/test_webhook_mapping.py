@@ -0,0 +1,63 @@
+"""
+Testes para app/services/webhook_mapping.py
+"""
+
+import pytest
+
+from app.services.webhook_mapping import (
+    compile_field_mapping, compile_records_path, map_webhook_payload, validate_trigger_mapping
+)
+
+
+def test_compiled_mapping_reads_nested_paths():
+    mapping = compile_field_mapping({'id': 'deal.id', 'nome': 'deal.name', 'x': 'deal.missing.y'})
+
+    assert mapping({'deal': {'id': '1', 'name': 'A'}}) == {'id': '1', 'nome': 'A'}
+    assert mapping({'deal': 'not-a-dict'}) == {}
+
+
+def test_without_mapping_returns_payload():
+    payload = {'a': 1}
+
+    assert map_webhook_payload(payload, {}) is payload
+
+
+def test_array_index_wildcard_and_default():
+    mapping = compile_field_mapping({
+        'primeiro': 'items[0].sku',
+        'terceiro': 'items.2.sku',
+        'skus': 'items[*].sku',
+        'valor': {'path': 'deal.amount', 'default': 0},
+    })
+
+    payload = {'items': [{'sku': 'A'}, {'sku': None}, {'sku': 'C'}], 'deal': {}}
+
+    assert mapping(payload) == {'primeiro': 'A', 'terceiro': 'C', 'skus': ['A', 'C'], 'valor': 0}
+
+
+def test_map_many_applies_mapping_to_each_payload():
+    mapping = compile_field_mapping({'id': 'id'})
+
+    assert mapping.map_many([{'id': 1}, {'id': 2}, {}]) == [{'id': 1}, {'id': 2}, {}]
+
+
+def test_records_path_extracts_records():
+    records = compile_records_path('events[*].object')
+
+    assert records({'events': [{'object': {'id': 1}}, {'object': {'id': 2}}]}) == [{'id': 1}, {'id': 2}]
+    assert records({'other': 1}) == []
+    assert compile_records_path(None)({'a': 1}) == [{'a': 1}]
+
+
+@pytest.mark.parametrize('path', ['a..b', '', '.a', 'a.', 'a[x]', 'a[0]b', 1])
+def test_invalid_paths_are_rejected(path):
+    with pytest.raises(ValueError):
+        compile_field_mapping({'campo': path})
+
+    assert validate_trigger_mapping({'field_mapping': {'campo': path}})
+
+
+def test_validate_trigger_mapping_accepts_valid_config():
+    assert validate_trigger_mapping({'field_mapping': {'id': 'data[0].id'}, 'records_path': 'data'}) is None
+    assert validate_trigger_mapping({'records_path': 'data[*'}) is not None
+    assert validate_trigger_mapping(None) is None
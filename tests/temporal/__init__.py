@@ -0,0 +1 @@
+# Temporal tests package
@@ -0,0 +1,21 @@
+"""
+Testes para app/temporal/workflows/batch_workflow.py
+"""
+
+from app.temporal.workflows.batch_workflow import page_size_for, MIN_PAGE_SIZE, MAX_PAGE_SIZE
+
+
+class TestPageSizeFor:
+    """Testes para page_size_for()"""
+
+    def test_low_concurrency_uses_minimum(self):
+        assert page_size_for(1) == MIN_PAGE_SIZE
+
+    def test_scales_with_concurrency(self):
+        assert page_size_for(20) == 80
+
+    def test_capped_at_hubspot_batch_limit(self):
+        assert page_size_for(50) == MAX_PAGE_SIZE
+
+    def test_invalid_concurrency(self):
+        assert page_size_for(0) == MIN_PAGE_SIZE
@@ -0,0 +1,84 @@
+"""
+Testes para TemporalClientThread (app/temporal/client.py)
+"""
+
+import threading
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from temporalio.service import RPCError, RPCStatusCode
+
+from app.temporal.client import TemporalClientThread, WorkflowStart
+
+
+def _fake_client(run_id='run-1'):
+    client = MagicMock()
+    client.start_workflow = AsyncMock(return_value=MagicMock(result_run_id=run_id))
+    handle = MagicMock()
+    handle.signal = AsyncMock()
+    client.get_workflow_handle.return_value = handle
+    return client
+
+
+@pytest.fixture
+def connect():
+    with patch('app.temporal.client.Client.connect', new_callable=AsyncMock) as connect:
+        yield connect
+
+
+class TestTemporalClientThread:
+    """Testes para TemporalClientThread"""
+
+    def test_connects_once_and_reuses_client(self, connect):
+        connect.return_value = _fake_client()
+        runner = TemporalClientThread()
+
+        assert runner.start_workflow('DocGWorkflow', 'exec-1', id='exec_1', task_queue='q') == 'run-1'
+        runner.signal('exec_1', 'approval_decision', {'decision': 'approved'})
+
+        assert connect.await_count == 1
+
+    def test_calls_run_on_dedicated_thread(self, connect):
+        connect.return_value = _fake_client()
+        runner = TemporalClientThread()
+
+        async def current_thread(client):
+            return threading.current_thread().name
+
+        assert runner.run(current_thread) == 'temporal-client'
+
+    def test_reconnects_when_unavailable(self, connect):
+        broken = _fake_client()
+        broken.start_workflow.side_effect = RPCError('unavailable', RPCStatusCode.UNAVAILABLE, b'')
+        connect.side_effect = [broken, _fake_client('run-2')]
+        runner = TemporalClientThread()
+
+        assert runner.start_workflow('DocGWorkflow', 'exec-1', id='exec_1', task_queue='q') == 'run-2'
+        assert connect.await_count == 2
+
+    def test_other_rpc_errors_propagate(self, connect):
+        client = _fake_client()
+        client.start_workflow.side_effect = RPCError('denied', RPCStatusCode.PERMISSION_DENIED, b'')
+        connect.return_value = client
+        runner = TemporalClientThread()
+
+        with pytest.raises(RPCError):
+            runner.start_workflow('DocGWorkflow', 'exec-1', id='exec_1', task_queue='q')
+        assert connect.await_count == 1
+
+    def test_start_workflows_returns_errors_per_start(self, connect):
+        client = _fake_client()
+        client.start_workflow.side_effect = [
+            MagicMock(result_run_id='run-a'),
+            ValueError('boom'),
+        ]
+        connect.return_value = client
+        runner = TemporalClientThread()
+
+        results = runner.start_workflows([
+            WorkflowStart('DocGWorkflow', 'a', 'exec_a', 'q'),
+            WorkflowStart('DocGWorkflow', 'b', 'exec_b', 'q'),
+        ])
+
+        assert results[0] == 'run-a'
+        assert isinstance(results[1], ValueError)
@@ -0,0 +1,110 @@
+"""
+Testes para o codec de payloads do Temporal (app/temporal/codec.py)
+"""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+from temporalio.api.common.v1 import Payload
+
+from app.temporal import codec
+from app.temporal.codec import ENCODING_CLAIM_CHECK, ENCODING_ZLIB, DocGPayloadCodec, get_data_converter
+
+
+class MemoryStore:
+    name = 'memory'
+
+    def __init__(self):
+        self.blobs = {}
+
+    def put_many(self, blobs):
+        self.blobs.update(blobs)
+
+    def get_many(self, keys):
+        return {key: self.blobs[key] for key in keys if key in self.blobs}
+
+
+def _payload(data: bytes) -> Payload:
+    return Payload(metadata={'encoding': b'json/plain'}, data=data)
+
+
+def _source_data(items=500) -> bytes:
+    return ('{"line_items": [%s]}' % ','.join('{"sku": "SKU-%d", "quantity": 1}' % i for i in range(items))).encode()
+
+
+@pytest.fixture
+def store():
+    store = MemoryStore()
+    with patch.dict(codec.PAYLOAD_STORES, {'memory': lambda app, config: store}):
+        yield store
+
+
+class TestCompression:
+    """Testes para a compressão de payloads"""
+
+    def test_large_payload_is_compressed_and_restored(self):
+        payload_codec = DocGPayloadCodec(compression_threshold=1024, claim_check='')
+        original = _payload(_source_data())
+
+        [encoded] = asyncio.run(payload_codec.encode([original]))
+        [decoded] = asyncio.run(payload_codec.decode([encoded]))
+
+        assert encoded.metadata['encoding'] == ENCODING_ZLIB
+        assert encoded.ByteSize() < original.ByteSize() / 5
+        assert decoded == original
+
+    def test_small_or_incompressible_payloads_are_kept(self):
+        payload_codec = DocGPayloadCodec(compression_threshold=1024, claim_check='')
+        small = _payload(b'"exec-1"')
+        random_bytes = _payload(os.urandom(4096))
+
+        assert asyncio.run(payload_codec.encode([small, random_bytes])) == [small, random_bytes]
+
+
+class TestClaimCheck:
+    """Testes para o claim-check de payloads grandes"""
+
+    def test_large_payload_is_replaced_by_reference(self, store):
+        payload_codec = DocGPayloadCodec(
+            app=object(), compression_threshold=1024, claim_check='memory', claim_check_threshold=100
+        )
+        original = _payload(_source_data())
+        small = _payload(b'"exec-1"')
+
+        encoded = asyncio.run(payload_codec.encode([original, small]))
+
+        assert encoded[0].metadata['encoding'] == ENCODING_CLAIM_CHECK
+        assert encoded[0].data.decode() in store.blobs
+        assert encoded[1] == small
+        assert asyncio.run(payload_codec.decode(encoded)) == [original, small]
+
+    def test_reference_decodes_without_claim_check_enabled(self, store):
+        writer = DocGPayloadCodec(app=object(), claim_check='memory', claim_check_threshold=100)
+        encoded = asyncio.run(writer.encode([_payload(_source_data())]))
+
+        reader = DocGPayloadCodec(app=object(), claim_check='')
+
+        assert asyncio.run(reader.decode(encoded)) == [_payload(_source_data())]
+
+    def test_missing_blob_raises(self, store):
+        payload_codec = DocGPayloadCodec(app=object(), claim_check='memory', claim_check_threshold=100)
+        encoded = asyncio.run(payload_codec.encode([_payload(_source_data())]))
+        store.blobs.clear()
+
+        with pytest.raises(ValueError):
+            asyncio.run(payload_codec.decode(encoded))
+
+    def test_unknown_store_is_rejected(self):
+        with pytest.raises(ValueError):
+            DocGPayloadCodec(claim_check='s3')
+
+
+def test_data_converter_round_trip():
+    converter = get_data_converter()
+    value = {'source_data': {'dealname': 'ACME', 'notes': 'x' * 10000}}
+
+    encoded = asyncio.run(converter.encode([value]))
+    assert encoded[0].metadata['encoding'] == ENCODING_ZLIB
+    assert asyncio.run(converter.decode(encoded, [dict])) == [value]
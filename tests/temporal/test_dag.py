@@ -0,0 +1,98 @@
+"""
+Testes para app/temporal/workflows/dag.py
+"""
+
+from app.temporal.workflows.dag import build_dependencies, build_levels
+
+
+def _node(node_id, node_type, position, **config):
+    return {'id': node_id, 'node_type': node_type, 'position': position, 'config': config}
+
+
+def _ids(levels):
+    return [[n['id'] for n in level] for level in levels]
+
+
+class TestBuildDependencies:
+    """Testes para build_dependencies()"""
+
+    def test_documents_depend_on_trigger(self):
+        nodes = [
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('d2', 'google-slides', 3),
+        ]
+        deps = build_dependencies(nodes)
+        assert deps == {'t': [], 'd1': ['t'], 'd2': ['t']}
+
+    def test_email_depends_on_referenced_documents(self):
+        nodes = [
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('d2', 'microsoft-word', 3),
+            _node('e', 'gmail', 4, attach_documents=True, document_node_ids=['d2']),
+        ]
+        assert build_dependencies(nodes)['e'] == ['t', 'd2']
+
+    def test_email_attaching_all_documents(self):
+        nodes = [
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('d2', 'google-docs', 3),
+            _node('e', 'outlook', 4, attach_documents=True),
+        ]
+        assert build_dependencies(nodes)['e'] == ['t', 'd1', 'd2']
+
+    def test_email_without_attachments_depends_only_on_trigger(self):
+        nodes = [
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('e', 'gmail', 3),
+        ]
+        assert build_dependencies(nodes)['e'] == ['t']
+
+    def test_barrier_depends_on_everything_before(self):
+        nodes = [
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('s', 'request-signatures', 3),
+            _node('d2', 'google-docs', 4),
+        ]
+        deps = build_dependencies(nodes)
+        assert deps['s'] == ['t', 'd1']
+        assert deps['d2'] == ['t', 's']
+
+
+class TestBuildLevels:
+    """Testes para build_levels()"""
+
+    def test_independent_documents_share_level(self):
+        nodes = [
+            _node('d2', 'google-slides', 3),
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('d3', 'microsoft-word', 4),
+        ]
+        assert _ids(build_levels(nodes)) == [['t'], ['d1', 'd2', 'd3']]
+
+    def test_sequential_workflow_has_one_node_per_level(self):
+        nodes = [
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('a', 'review-documents', 3),
+            _node('e', 'gmail', 4, attach_documents=True),
+        ]
+        assert _ids(build_levels(nodes)) == [['t'], ['d1'], ['a'], ['e']]
+
+    def test_email_waits_for_its_documents(self):
+        nodes = [
+            _node('t', 'hubspot', 1),
+            _node('d1', 'google-docs', 2),
+            _node('d2', 'google-docs', 3),
+            _node('e1', 'gmail', 4, attach_documents=True, document_node_ids=['d1']),
+            _node('e2', 'gmail', 5),
+        ]
+        assert _ids(build_levels(nodes)) == [['t'], ['d1', 'd2', 'e2'], ['e1']]
+
+    def test_empty(self):
+        assert build_levels([]) == []
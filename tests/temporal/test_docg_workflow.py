@@ -0,0 +1,129 @@
+"""
+Testes para a sequência de activities do DocGWorkflow (app/temporal/workflows/docg_workflow.py)
+
+O replay de execuções em andamento exige que cada versão (workflow.patched)
+continue agendando exatamente as mesmas activities.
+"""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from app.temporal.workflows import docg_workflow
+from app.temporal.workflows.docg_workflow import DocGWorkflow
+
+
+NODES = [
+    {'id': 'trigger', 'node_type': 'hubspot', 'position': 1, 'config': {}},
+    {'id': 'doc-a', 'node_type': 'google-docs', 'position': 2, 'config': {}},
+    {'id': 'doc-b', 'node_type': 'google-docs', 'position': 3, 'config': {}},
+]
+
+
+def _run(nodes, patches, on_call=None):
+    """Executa o workflow com activities simuladas; retorna (resultado, [(activity, input)])"""
+    calls = []
+
+    async def execute_activity(activity, arg, **kwargs):
+        name = activity.__name__
+        calls.append((name, arg))
+        await asyncio.sleep(0)  # ceder ao event loop como uma activity real
+        if on_call:
+            on_call(name, arg)
+        if name == 'load_execution':
+            return {
+                'nodes': nodes, 'workflow': {'id': 'wf-1'}, 'organization_id': 'org-1',
+                'execution': {'trigger_data': {}}, 'plan_version': 'v1'
+            }
+        if name == 'execute_trigger_node':
+            return {'source_data': {'dealname': 'ACME'}, 'source_object_id': '1', 'source_object_type': 'deal'}
+        if name == 'execute_document_node':
+            node_id = arg['node']['id']
+            return {'document_id': node_id, 'file_id': f'f-{node_id}', 'file_url': f'u-{node_id}'}
+        return None
+
+    with patch.object(docg_workflow.workflow, 'execute_activity', side_effect=execute_activity), \
+            patch.object(docg_workflow.workflow, 'patched', side_effect=lambda patch_id: patch_id in patches), \
+            patch.object(docg_workflow.workflow, 'now', return_value=datetime(2026, 1, 1)), \
+            patch.object(docg_workflow.workflow, 'logger', MagicMock()):
+        result = asyncio.run(DocGWorkflow().run('exec-1'))
+
+    return result, calls
+
+
+def _names(calls):
+    return [name for name, _ in calls]
+
+
+class TestLegacyBookkeeping:
+    """Execuções anteriores a record_node_transition"""
+
+    def test_replays_original_activity_sequence(self):
+        result, calls = _run(NODES, patches=set())
+
+        assert result == {'status': 'completed', 'error': None}
+        assert _names(calls) == [
+            'load_execution',
+            'update_current_node', 'execute_trigger_node', 'save_execution_context', 'add_execution_log',
+            'update_current_node', 'execute_document_node', 'save_execution_context', 'add_execution_log',
+            'update_current_node', 'execute_document_node', 'save_execution_context', 'add_execution_log',
+            'complete_execution',
+        ]
+
+
+class TestRecordNodeTransition:
+    """Execuções com record_node_transition, anteriores ao grafo de dependências"""
+
+    def test_one_transition_per_node_in_position_order(self):
+        result, calls = _run(NODES, patches={'record-node-transition'})
+
+        assert result == {'status': 'completed', 'error': None}
+        assert _names(calls) == [
+            'load_execution', 'record_node_transition',
+            'execute_trigger_node', 'record_node_transition',
+            'execute_document_node', 'record_node_transition',
+            'execute_document_node', 'record_node_transition',
+        ]
+        assert calls[-1][1].get('complete') is True
+
+
+class TestParallelLevels:
+    """Execuções atuais: nodes por nível do grafo de dependências"""
+
+    PATCHES = {'record-node-transition', 'parallel-node-levels'}
+
+    def test_documents_run_in_parallel(self):
+        result, calls = _run(NODES, patches=self.PATCHES)
+
+        assert result == {'status': 'completed', 'error': None}
+        assert _names(calls)[:4] == [
+            'load_execution', 'record_node_transition', 'execute_trigger_node', 'record_node_transition'
+        ]
+        # Os dois documentos são agendados antes de qualquer transição do nível
+        assert _names(calls)[4:6] == ['execute_document_node', 'execute_document_node']
+        assert calls[-1][1].get('complete') is True
+
+    def test_context_saved_once_by_level_closing_transition(self):
+        _, calls = _run(NODES, patches=self.PATCHES)
+
+        transitions = [arg for name, arg in calls if name == 'record_node_transition']
+        with_context = [t for t in transitions if 'context' in t]
+
+        # Trigger + nível dos documentos; nunca um snapshot parcial do nível
+        assert len(with_context) == 2
+        assert [d['node_id'] for d in with_context[-1]['context']['generated_documents']] == ['doc-a', 'doc-b']
+        assert with_context[-1].get('complete') is True
+
+    def test_failed_level_saves_context_after_all_branches(self):
+        def fail_doc_b(name, arg):
+            if name == 'execute_document_node' and arg['node']['id'] == 'doc-b':
+                raise RuntimeError('Template não encontrado')
+
+        result, calls = _run(NODES, patches=self.PATCHES, on_call=fail_doc_b)
+
+        assert result['status'] == 'failed'
+        level_calls = calls[4:]
+        assert all('context' not in arg for name, arg in level_calls if name == 'record_node_transition')
+        assert _names(level_calls)[-2:] == ['save_execution_context', 'fail_execution']
+        context = level_calls[-2][1]['context']
+        assert [d['node_id'] for d in context['generated_documents']] == ['doc-a']
@@ -0,0 +1,122 @@
+"""
+Testes para o cache de planos de execução (app/temporal/execution_plan.py)
+"""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.database import db
+from app.models import Template, Workflow
+from app.temporal import execution_plan
+from app.temporal.execution_plan import (
+    ExecutionPlan, ExecutionPlanCache, attach, compile_document_step, plan_version, resolve_document_type
+)
+
+
+def _template(**kwargs):
+    defaults = dict(
+        id=uuid.uuid4(), storage_type='google', google_file_id='g-1', google_file_type='document',
+        microsoft_file_id=None, microsoft_file_type=None
+    )
+    defaults.update(kwargs)
+    return SimpleNamespace(**defaults)
+
+
+def _node(**config):
+    return {'id': 'node-1', 'node_type': 'google-docs', 'config': config}
+
+
+def _plan(version, documents=None):
+    return ExecutionPlan(
+        workflow_id='wf-1', version=version, organization_id='org-1', workflow_data={},
+        nodes=[], workflow=None, ai_mappings=(), documents=documents or {}
+    )
+
+
+class TestExecutionPlanCache:
+    """Testes para ExecutionPlanCache"""
+
+    def test_reuses_plan_until_workflow_changes(self):
+        cache = ExecutionPlanCache()
+        plans = [_plan('2026-01-01T00:00:00.000000'), _plan('2026-01-02T00:00:00.000000')]
+
+        with patch.object(execution_plan, 'compile_execution_plan', side_effect=plans) as compile_plan:
+            first = cache.get('wf-1', version='2026-01-01T00:00:00.000000')
+            assert cache.get('wf-1', version='2026-01-01T00:00:00.000000') is first
+            assert cache.get('wf-1') is first
+            assert compile_plan.call_count == 1
+
+            # Workflow salvo: updated_at mais novo recompila
+            second = cache.get('wf-1', version='2026-01-02T00:00:00.000000')
+            assert second is plans[1]
+            # Activities de execuções antigas usam o plano mais novo
+            assert cache.get('wf-1', version='2026-01-01T00:00:00.000000') is second
+            assert compile_plan.call_count == 2
+
+    def test_expired_plan_is_recompiled(self):
+        cache = ExecutionPlanCache(ttl=0)
+
+        with patch.object(execution_plan, 'compile_execution_plan', side_effect=lambda _: _plan('v')) as compile_plan:
+            cache.get('wf-1')
+            cache.get('wf-1')
+
+        assert compile_plan.call_count == 2
+
+    def test_plan_version_orders_as_string(self):
+        assert plan_version(datetime(2026, 1, 1, 10, 0, 0)) < plan_version(datetime(2026, 1, 1, 10, 0, 0, 5))
+        assert plan_version(None) == ''
+
+
+class TestDocumentStep:
+    """Testes para os nodes de documento compilados"""
+
+    def test_resolves_type_and_mappings(self):
+        node = _node(template_id='t-1', field_mappings=[
+            {'template_tag': 'nome', 'source_field': 'dealname'},
+            {'template_tag': 'vazio'}
+        ])
+        node['node_type'] = 'google-slides'
+
+        step = compile_document_step(node, _template(google_file_type='presentation'))
+
+        assert step.node_type == 'google-slides'
+        assert step.mappings == {'nome': 'dealname'}
+
+    def test_infers_type_from_template_storage(self):
+        assert resolve_document_type('google-docs', _template(storage_type='uploaded')) == 'file-upload'
+        assert resolve_document_type(None, _template(google_file_type='presentation')) == 'google-slides'
+        assert resolve_document_type('google-docs', _template(
+            storage_type='microsoft', google_file_id=None, microsoft_file_id='m-1', microsoft_file_type='word'
+        )) == 'microsoft-word'
+
+    def test_changed_node_config_is_compiled_without_cache(self):
+        cached = compile_document_step(_node(template_id='t-1'), _template())
+        plan = _plan('v', documents={'node-1': cached})
+        assert plan.document_step(_node(template_id='t-1')) is cached
+
+        Template.query = MagicMock()
+        try:
+            Template.query.get.return_value = _template(storage_type='uploaded')
+            step = plan.document_step(_node(template_id='t-2'))
+        finally:
+            del Template.query
+
+        assert step is not cached
+        assert step.node_type == 'file-upload'
+
+
+def test_attach_merges_copy_without_loading():
+    workflow = Workflow(id=uuid.uuid4(), organization_id=uuid.uuid4(), name='Contratos', status='active')
+    make_transient_to_detached(workflow)
+    session = Session()
+
+    with patch.object(db, 'session', session):
+        attached = attach(workflow)
+
+    assert attached is not workflow
+    assert attached in session
+    assert attached.name == 'Contratos'
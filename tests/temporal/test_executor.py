@@ -0,0 +1,79 @@
+"""
+Testes para app/temporal/executor.py
+"""
+
+import asyncio
+import threading
+
+import pytest
+from flask import Flask, current_app
+from temporalio import activity
+
+from app.temporal.executor import (
+    ActivityClass,
+    blocking_activity,
+    init_activity_executors,
+    shutdown_activity_executors,
+)
+
+
+@pytest.fixture
+def app():
+    app = Flask('test')
+    init_activity_executors(app)
+    yield app
+    shutdown_activity_executors()
+
+
+class TestBlockingActivity:
+    """Testes para blocking_activity()"""
+
+    def test_runs_in_class_pool_thread(self, app):
+        @blocking_activity(ActivityClass.DOCUMENT)
+        def work(value):
+            return threading.current_thread().name, value
+
+        thread_name, value = asyncio.run(work(42))
+
+        assert thread_name.startswith('activity-document')
+        assert value == 42
+
+    def test_thread_has_app_context(self, app):
+        @blocking_activity(ActivityClass.BOOKKEEPING)
+        def work():
+            return current_app.name
+
+        assert asyncio.run(work()) == 'test'
+
+    def test_does_not_block_event_loop(self, app):
+        release = threading.Event()
+
+        @blocking_activity(ActivityClass.INTEGRATION)
+        def slow():
+            release.wait(timeout=5)
+            return 'done'
+
+        async def scenario():
+            task = asyncio.ensure_future(slow())
+            await asyncio.sleep(0)
+            # O loop continua livre enquanto a activity bloqueia a thread
+            release.set()
+            return await task
+
+        assert asyncio.run(scenario()) == 'done'
+
+    def test_compatible_with_activity_defn(self, app):
+        @activity.defn
+        @blocking_activity(ActivityClass.BOOKKEEPING)
+        def my_activity(data: dict) -> dict:
+            return data
+
+        assert activity._Definition.from_callable(my_activity).name == 'my_activity'
+
+    def test_unknown_class_raises(self, app):
+        @blocking_activity('unknown')
+        def work():
+            return None
+
+        with pytest.raises(ValueError):
+            asyncio.run(work())
@@ -0,0 +1,108 @@
+"""
+Testes para app/utils/hubspot_token_cache.py
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.utils.hubspot_token_cache import TokenIntrospectionCache
+
+
+def _response(status_code, payload=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = payload or {}
+    return response
+
+
+TOKEN_INFO = {'hub_id': 123, 'user_id': 7, 'user': 'a@b.com', 'scopes': ['crm'], 'expires_in': 1800}
+
+
+@pytest.fixture
+def cache():
+    return TokenIntrospectionCache(max_entries=3, max_ttl=300, negative_ttl=30)
+
+
+class TestTokenIntrospectionCache:
+    """Testes para TokenIntrospectionCache"""
+
+    def test_valid_token_is_cached(self, cache):
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(200, TOKEN_INFO)) as get:
+            assert cache.introspect('tok')['hub_id'] == 123
+            assert cache.introspect('tok')['hub_id'] == 123
+
+        assert get.call_count == 1
+
+    def test_ttl_respects_expires_in(self, cache):
+        info = dict(TOKEN_INFO, expires_in=100)
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(200, info)), \
+                patch('app.utils.hubspot_token_cache.time.time', return_value=1000.0):
+            cache.introspect('tok')
+
+        expires_at, _ = cache._memory[cache.cache_key('tok')]
+        assert expires_at == 1000.0 + 70  # expires_in - margem de segurança
+
+    def test_almost_expired_token_is_not_cached(self, cache):
+        info = dict(TOKEN_INFO, expires_in=10)
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(200, info)) as get:
+            cache.introspect('tok')
+            cache.introspect('tok')
+
+        assert get.call_count == 2
+
+    def test_invalid_token_is_negatively_cached(self, cache):
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(401)) as get:
+            assert cache.introspect('bad') is None
+            assert cache.introspect('bad') is None
+
+        assert get.call_count == 1
+
+    def test_rate_limit_is_not_cached(self, cache):
+        responses = [_response(429), _response(200, TOKEN_INFO)]
+        with patch('app.utils.hubspot_token_cache.requests.get', side_effect=responses) as get:
+            assert cache.introspect('tok') is None
+            assert cache.introspect('tok') == TOKEN_INFO
+
+        assert get.call_count == 2
+
+    def test_server_errors_are_not_cached(self, cache):
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(503)) as get:
+            assert cache.introspect('tok') is None
+            assert cache.introspect('tok') is None
+
+        assert get.call_count == 2
+
+    def test_key_is_hash_of_token(self, cache):
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(200, TOKEN_INFO)):
+            cache.introspect('secret-token')
+
+        assert all('secret-token' not in key for key in cache._memory)
+
+    def test_bounded_lru(self, cache):
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(200, TOKEN_INFO)):
+            for token in ['a', 'b', 'c', 'd']:
+                cache.introspect(token)
+
+        assert len(cache._memory) == 3
+        assert cache.cache_key('a') not in cache._memory
+
+    def test_shared_tier_is_used_on_memory_miss(self, cache):
+        redis = MagicMock()
+        redis.get.return_value = json.dumps({'info': TOKEN_INFO, 'expires_at': 9999999999})
+        cache._redis = redis
+
+        with patch('app.utils.hubspot_token_cache.requests.get') as get:
+            assert cache.introspect('tok')['hub_id'] == 123
+
+        get.assert_not_called()
+        assert cache.cache_key('tok') in cache._memory
+
+    def test_shared_tier_errors_fall_back_to_hubspot(self, cache):
+        redis = MagicMock()
+        redis.get.side_effect = ConnectionError('down')
+        cache._redis = redis
+
+        with patch('app.utils.hubspot_token_cache.requests.get', return_value=_response(200, TOKEN_INFO)):
+            assert cache.introspect('tok')['hub_id'] == 123
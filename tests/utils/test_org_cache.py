@@ -0,0 +1,88 @@
+"""
+Testes para app/utils/org_cache.py
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import Organization
+from app.utils.org_cache import OrganizationCache, OrganizationSnapshot
+
+
+ORG_ID = str(uuid.uuid4())
+
+
+def _org(name='Acme', plan='pro'):
+    return SimpleNamespace(id=uuid.UUID(ORG_ID), name=name, slug='acme', plan=plan, is_active=True)
+
+
+@pytest.fixture
+def query():
+    query = MagicMock()
+    query.filter_by.return_value.first.return_value = _org()
+    # Organization.query é um descriptor que exige app context: sobrescrever na classe
+    Organization.query = query
+    yield query
+    del Organization.query
+
+
+@pytest.fixture
+def portal_lookup():
+    with patch('app.utils.helpers.get_organization_id_from_portal_id', return_value=uuid.UUID(ORG_ID)) as lookup:
+        yield lookup
+
+
+class TestOrganizationCache:
+    """Testes para OrganizationCache"""
+
+    def test_snapshot_is_cached(self, query):
+        cache = OrganizationCache(ttl=60)
+
+        first = cache.get(ORG_ID)
+        second = cache.get(ORG_ID)
+
+        assert first == second == OrganizationSnapshot(ORG_ID, 'Acme', 'acme', 'pro', True)
+        assert query.filter_by.call_count == 1
+
+    def test_missing_organization_is_not_cached(self, query):
+        query.filter_by.return_value.first.return_value = None
+        cache = OrganizationCache(ttl=60)
+
+        assert cache.get(ORG_ID) is None
+        assert cache.get(ORG_ID) is None
+        assert query.filter_by.call_count == 2
+
+    def test_ttl_expiry(self, query):
+        cache = OrganizationCache(ttl=0)
+
+        cache.get(ORG_ID)
+        cache.get(ORG_ID)
+
+        assert query.filter_by.call_count == 2
+
+    def test_portal_lookup_is_cached(self, query, portal_lookup):
+        cache = OrganizationCache(ttl=60)
+
+        assert cache.get_by_portal('123').id == ORG_ID
+        assert cache.get_by_portal(123).id == ORG_ID
+        assert portal_lookup.call_count == 1
+
+    def test_invalidate_organization_drops_its_portals(self, query, portal_lookup):
+        cache = OrganizationCache(ttl=60)
+        cache.get_by_portal('123')
+
+        query.filter_by.return_value.first.return_value = _org(plan='free')
+        cache.invalidate(ORG_ID)
+
+        assert cache.get_by_portal('123').plan == 'free'
+        assert portal_lookup.call_count == 2
+
+    def test_bounded(self, query):
+        cache = OrganizationCache(ttl=60, max_entries=2)
+        for _ in range(3):
+            cache.get(str(uuid.uuid4()))
+
+        assert len(cache._entries) == 2
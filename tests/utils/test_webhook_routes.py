@@ -0,0 +1,88 @@
+"""
+Testes para app/utils/webhook_routes.py
+"""
+
+import uuid
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.models import Workflow, WorkflowNode
+from app.utils.webhook_routes import WebhookRouteCache
+
+
+def _row(token='token-1', status='active'):
+    workflow = SimpleNamespace(id=uuid.uuid4(), status=status)
+    node = SimpleNamespace(
+        id=uuid.uuid4(),
+        webhook_token=token,
+        config={'field_mapping': {'id': 'deal.id'}, 'source_object_type': 'deal'}
+    )
+    return node, workflow
+
+
+@pytest.fixture
+def workflow_query():
+    query = MagicMock()
+    Workflow.query = query
+    yield query.join.return_value.filter.return_value.with_entities.return_value.first
+    del Workflow.query
+
+
+class TestWebhookRouteCache:
+    """Testes para WebhookRouteCache"""
+
+    def test_route_is_cached_with_compiled_mapping(self, workflow_query):
+        node, workflow = _row()
+        workflow_query.return_value = (node, workflow)
+        cache = WebhookRouteCache()
+
+        route = cache.get('token-1')
+        assert cache.get('token-1') is route
+
+        assert workflow_query.call_count == 1
+        assert route.workflow_id == str(workflow.id)
+        assert route.source_object_type == 'deal'
+        assert route.mapping({'deal': {'id': '7'}}) == {'id': '7'}
+
+    def test_unknown_token_is_cached(self, workflow_query):
+        workflow_query.return_value = None
+        cache = WebhookRouteCache()
+
+        assert cache.get('nope') is None
+        assert cache.get('nope') is None
+        assert workflow_query.call_count == 1
+
+    def test_invalidate_by_workflow(self, workflow_query):
+        node, workflow = _row()
+        workflow_query.return_value = (node, workflow)
+        cache = WebhookRouteCache()
+
+        cache.get('token-1')
+        cache.invalidate(workflow_id=workflow.id)
+        cache.get('token-1')
+
+        assert workflow_query.call_count == 2
+
+    def test_get_by_node_uses_token_index(self, workflow_query):
+        node, workflow = _row()
+        workflow_query.return_value = (node, workflow)
+        cache = WebhookRouteCache()
+        route = cache.get('token-1')
+
+        WorkflowNode.query = MagicMock()
+        try:
+            assert cache.get_by_node(node.id) is route
+            WorkflowNode.query.filter.assert_not_called()
+        finally:
+            del WorkflowNode.query
+
+    def test_expired_entries_are_reloaded(self, workflow_query):
+        workflow_query.return_value = _row()
+        cache = WebhookRouteCache(ttl=0)
+
+        cache.get('token-1')
+        cache.get('token-1')
+
+        assert workflow_query.call_count == 2